@@ -52,6 +52,7 @@ from enum import Enum
 import boto3
 from PIL import Image
 from botocore.exceptions import ClientError
+from rate_limiter import bedrock_rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -748,11 +749,8 @@ def call_claude_3_fill(system_prompt: str, prompt: str, model_id: str = None):
     accept = "application/json"
     contentType = "application/json"
 
-    # Apply rate limiting before making the request
-    from mcp_server import bedrock_rate_limiter
-    bedrock_rate_limiter.wait_if_needed()
-    
-    response = bedrock_runtime.invoke_model(
+    response = bedrock_rate_limiter.invoke_model(
+        bedrock_runtime, priority='batch',
         body=body, modelId=modelId, accept=accept, contentType=contentType
     )
     response_body = json.loads(response.get("body").read())
@@ -3,11 +3,10 @@ AWS Architecture Design MCP Server
 Implements the Model Context Protocol for AWS architecture design tools
 """
 
+import asyncio
 import json
 import logging
 import os
-import time
-import threading
 from typing import Any, Dict, List, Optional
 import boto3
 from mcp.server import Server
@@ -24,35 +23,12 @@ import mcp.types as types
 # Import integrated modules
 import sa_tools_module
 import drawing_module
+from rate_limiter import bedrock_rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class BedrockRateLimiter:
-    """Rate limiter for Bedrock API calls to prevent throttling"""
-    
-    def __init__(self, requests_per_minute=10):
-        self.requests_per_minute = requests_per_minute
-        self.min_interval = 60.0 / requests_per_minute  # Minimum seconds between requests
-        self.last_request_time = 0
-        self.lock = threading.Lock()
-    
-    def wait_if_needed(self):
-        """Wait if necessary to respect rate limits"""
-        with self.lock:
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            
-            if time_since_last < self.min_interval:
-                sleep_time = self.min_interval - time_since_last
-                logger.info(f"Rate limiting: waiting {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-            
-            self.last_request_time = time.time()
-
-# Global rate limiter instance
-bedrock_rate_limiter = BedrockRateLimiter(requests_per_minute=50)  # Optimized rate limit for better performance
 
 class AWSArchitectureMCPServer:
     def __init__(self):
@@ -215,8 +191,9 @@ class AWSArchitectureMCPServer:
                 query = arguments.get("query", "")
                 pillar = arguments.get("pillar", "")
                 
-                # Call the AWS Well-Architected tool directly
-                result = sa_tools_module.aws_well_arch_tool(query)
+                # Call the AWS Well-Architected tool directly; it blocks on Bedrock,
+                # so run it on a worker thread to keep the event loop serving
+                result = await asyncio.to_thread(sa_tools_module.aws_well_arch_tool, query)
                 return [TextContent(type="text", text=result)]
             
             elif name == "generate_architecture_code":
@@ -230,7 +207,7 @@ class AWSArchitectureMCPServer:
                     code_prompt += f" Include these AWS services: {', '.join(services)}"
                 
                 # Call the code generation tool directly
-                result = sa_tools_module.code_gen_tool(code_prompt)
+                result = await asyncio.to_thread(sa_tools_module.code_gen_tool, code_prompt)
                 return [TextContent(type="text", text=result)]
             
             elif name == "create_architecture_diagram":
@@ -239,7 +216,9 @@ class AWSArchitectureMCPServer:
                 style = arguments.get("style", "technical")
                 
                 # Call the fixed drawing function
-                result = drawing_module.create_architecture_diagram(description, components, style)
+                result = await asyncio.to_thread(
+                    drawing_module.create_architecture_diagram, description, components, style
+                )
                 
                 if result and isinstance(result, dict) and result.get("content"):
                     # Handle new multi-part response format
@@ -285,11 +264,10 @@ class AWSArchitectureMCPServer:
                     accept = "application/json"
                     contentType = "application/json"
                     
-                    # Apply rate limiting before making the request
-                    bedrock_rate_limiter.wait_if_needed()
-                    
-                    response = self.bedrock_client.invoke_model(
-                        body=body, modelId=modelId, accept=accept, contentType=contentType
+                    # Wait for a turn on the event loop rather than blocking it; throttling
+                    # lowers the shared rate
+                    response = await bedrock_rate_limiter.invoke_model_async(
+                        self.bedrock_client, body=body, modelId=modelId, accept=accept, contentType=contentType
                     )
                     response_body = json.loads(response.get("body").read())
                     result_text = response_body.get("content")[0].get("text")
@@ -306,7 +284,7 @@ class AWSArchitectureMCPServer:
                     analysis_prompt += f" Focus on: {', '.join(focus_areas)}"
                 
                 # Call the AWS Well-Architected tool directly for analysis
-                result = sa_tools_module.aws_well_arch_tool(analysis_prompt)
+                result = await asyncio.to_thread(sa_tools_module.aws_well_arch_tool, analysis_prompt)
                 return [TextContent(type="text", text=result)]
             
 
@@ -338,5 +316,4 @@ async def run_server():
         )
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(run_server())
\ No newline at end of file
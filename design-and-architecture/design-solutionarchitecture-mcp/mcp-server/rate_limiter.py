@@ -0,0 +1,301 @@
+"""
+Rate Limiter Module
+Shared request and token budget for Bedrock model calls
+
+Bedrock enforces both requests-per-minute and tokens-per-minute quotas per
+model. Every tool that calls a model takes its turn from one limiter, which
+keeps a token bucket for each quota. Callers wait in priority lanes, so an
+interactive question does not queue behind a chunked diagram generation, and
+within a lane they are served in arrival order. Only the waiting caller
+sleeps: the lock guards bookkeeping, never a sleep, and async callers wait
+on the event loop instead of blocking it. Throttled responses halve the
+refill rate, which then recovers step by step as calls succeed.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lanes in the order they are served
+PRIORITY_LANES = ('interactive', 'batch')
+# Fraction of the per-minute request quota that may be spent in a burst
+REQUEST_BURST_FRACTION = 0.1
+# Refill rate multiplier bounds and adjustment steps
+MIN_RATE_MULTIPLIER = 0.1
+THROTTLE_BACKOFF_FACTOR = 0.5
+RATE_RECOVERY_STEP = 0.05
+# How often a caller that is not first in line checks again when the head is ready
+QUEUE_RECHECK_SECONDS = 0.01
+# Shortfall treated as rounding error rather than a reason to wait
+TOKEN_EPSILON = 1e-9
+# Rough characters per token when estimating a request before it is sent
+CHARS_PER_TOKEN = 4
+
+THROTTLING_ERROR_CODES = ('ThrottlingException', 'TooManyRequestsException', 'ServiceQuotaExceededException')
+
+
+class TokenBucket:
+    """Bucket holding up to capacity tokens, refilled continuously at rate per second."""
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available (call refill first)."""
+        missing = min(amount, self.capacity) - self.tokens
+        # Refill arithmetic can leave a rounding error short of a whole token
+        if missing <= TOKEN_EPSILON * max(1.0, amount):
+            return 0.0
+        return missing / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class BedrockRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter shared by all callers.
+
+    acquire() and acquire_async() wait for a turn and reserve one request and
+    the estimated tokens; record_response() settles the token reservation
+    against the usage Bedrock reports and adapts the rate to throttling.
+    """
+
+    def __init__(self, requests_per_minute: float = 50, tokens_per_minute: Optional[float] = None,
+                 burst_requests: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, async_sleep=asyncio.sleep):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute or None
+        self.rate_multiplier = 1.0
+        self._clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._lock = threading.Lock()
+        self._tickets = itertools.count()
+        # (lane index, arrival order) -> tokens requested
+        self._waiting: Dict[tuple, float] = {}
+
+        now = clock()
+        if burst_requests is None:
+            burst_requests = max(1.0, requests_per_minute * REQUEST_BURST_FRACTION)
+        self._requests = TokenBucket(burst_requests, requests_per_minute / 60.0, now)
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0, now) if self.tokens_per_minute else None
+
+        self._lane_stats = {lane: {'acquired': 0, 'total_wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+                            for lane in PRIORITY_LANES}
+        self._throttle_events = 0
+        self._tokens_reserved = 0
+        self._tokens_used = 0
+
+    @classmethod
+    def from_environment(cls, default_requests_per_minute: float = 50) -> 'BedrockRateLimiter':
+        """Limiter sized by BEDROCK_REQUESTS_PER_MINUTE and BEDROCK_TOKENS_PER_MINUTE."""
+        requests_per_minute = float(os.environ.get('BEDROCK_REQUESTS_PER_MINUTE', default_requests_per_minute))
+        tokens_per_minute = float(os.environ.get('BEDROCK_TOKENS_PER_MINUTE', 0))
+        return cls(requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute)
+
+    def wait_if_needed(self) -> None:
+        """Wait for an interactive turn without a token estimate (original interface)."""
+        self.acquire()
+
+    def acquire(self, tokens: float = 0, priority: str = 'interactive') -> float:
+        """Block the calling thread until it may send a request; return the seconds waited."""
+        ticket, enqueued = self._enqueue(tokens, priority)
+        try:
+            while True:
+                delay = self._try_grant(ticket, enqueued)
+                if delay is None:
+                    return self._clock() - enqueued
+                self._sleep(delay)
+        finally:
+            self._dequeue(ticket)
+
+    async def acquire_async(self, tokens: float = 0, priority: str = 'interactive') -> float:
+        """Wait on the event loop until the caller may send a request; return the seconds waited."""
+        ticket, enqueued = self._enqueue(tokens, priority)
+        try:
+            while True:
+                delay = self._try_grant(ticket, enqueued)
+                if delay is None:
+                    return self._clock() - enqueued
+                await self._async_sleep(delay)
+        finally:
+            self._dequeue(ticket)
+
+    def invoke_model(self, bedrock_client, priority: str = 'interactive', **kwargs) -> Dict[str, Any]:
+        """Call bedrock_client.invoke_model(**kwargs) within the shared budget."""
+        reserved = estimate_request_tokens(kwargs.get('body', ''))
+        self.acquire(reserved, priority)
+        return self._invoke_reserved(bedrock_client, reserved, kwargs)
+
+    async def invoke_model_async(self, bedrock_client, priority: str = 'interactive', **kwargs) -> Dict[str, Any]:
+        """invoke_model for event loop callers: waits with acquire_async and calls Bedrock on a worker thread."""
+        reserved = estimate_request_tokens(kwargs.get('body', ''))
+        await self.acquire_async(reserved, priority)
+        return await asyncio.to_thread(self._invoke_reserved, bedrock_client, reserved, kwargs)
+
+    def _invoke_reserved(self, bedrock_client, reserved: float, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Call Bedrock for an acquired reservation, feeding the outcome back into the rate."""
+        try:
+            response = bedrock_client.invoke_model(**kwargs)
+        except Exception as e:
+            if _error_code(e) in THROTTLING_ERROR_CODES:
+                self.record_throttle()
+            raise
+        self.record_response(reserved, response)
+        return response
+
+    def record_response(self, reserved_tokens: float, response: Dict[str, Any]) -> None:
+        """Settle a reservation from an invoke_model response and adapt the rate."""
+        metadata = response.get('ResponseMetadata', {}) if isinstance(response, dict) else {}
+        headers = metadata.get('HTTPHeaders', {})
+        used = None
+        if 'x-amzn-bedrock-input-token-count' in headers:
+            used = (int(headers.get('x-amzn-bedrock-input-token-count', 0))
+                    + int(headers.get('x-amzn-bedrock-output-token-count', 0)))
+        self.record_usage(reserved_tokens, reserved_tokens if used is None else used)
+
+        # The client's own retries absorbed throttling the caller never saw
+        if metadata.get('RetryAttempts', 0) > 0:
+            self.record_throttle()
+        else:
+            self.record_success()
+
+    def record_usage(self, reserved_tokens: float, used_tokens: float) -> None:
+        """Return unused reserved tokens to the bucket, or take the overrun from it."""
+        with self._lock:
+            self._tokens_reserved += reserved_tokens
+            self._tokens_used += used_tokens
+            if self._tokens is not None:
+                self._tokens.refill(self._clock())
+                self._tokens.tokens = min(self._tokens.capacity,
+                                          self._tokens.tokens + reserved_tokens - used_tokens)
+
+    def record_throttle(self) -> None:
+        """Halve the refill rate and empty the request bucket after a throttled call."""
+        with self._lock:
+            self._throttle_events += 1
+            self._set_multiplier(max(MIN_RATE_MULTIPLIER, self.rate_multiplier * THROTTLE_BACKOFF_FACTOR))
+            self._requests.tokens = min(self._requests.tokens, 0.0)
+        logger.warning(f"Bedrock throttled, request rate reduced to {self.rate_multiplier:.0%} of the quota")
+
+    def record_success(self) -> None:
+        """Step the refill rate back towards the configured quota."""
+        if self.rate_multiplier >= 1.0:
+            return
+        with self._lock:
+            self._set_multiplier(min(1.0, self.rate_multiplier + RATE_RECOVERY_STEP))
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lanes = {}
+            for lane, stats in self._lane_stats.items():
+                acquired = stats['acquired']
+                lanes[lane] = {
+                    'acquired': acquired,
+                    'waiting': sum(1 for (index, _) in self._waiting if PRIORITY_LANES[index] == lane),
+                    'mean_wait_seconds': round(stats['total_wait_seconds'] / acquired, 3) if acquired else 0.0,
+                    'max_wait_seconds': round(stats['max_wait_seconds'], 3),
+                }
+            return {
+                'requests_per_minute': self.requests_per_minute,
+                'tokens_per_minute': self.tokens_per_minute,
+                'rate_multiplier': round(self.rate_multiplier, 3),
+                'throttle_events': self._throttle_events,
+                'tokens_reserved': self._tokens_reserved,
+                'tokens_used': self._tokens_used,
+                'lanes': lanes,
+            }
+
+    def _set_multiplier(self, multiplier: float) -> None:
+        now = self._clock()
+        for bucket, per_minute in ((self._requests, self.requests_per_minute),
+                                   (self._tokens, self.tokens_per_minute)):
+            if bucket is not None:
+                bucket.refill(now)
+                bucket.rate = per_minute / 60.0 * multiplier
+        self.rate_multiplier = multiplier
+
+    def _enqueue(self, tokens: float, priority: str):
+        if priority not in PRIORITY_LANES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {PRIORITY_LANES}")
+        with self._lock:
+            ticket = (PRIORITY_LANES.index(priority), next(self._tickets))
+            self._waiting[ticket] = tokens
+            return ticket, self._clock()
+
+    def _dequeue(self, ticket) -> None:
+        with self._lock:
+            self._waiting.pop(ticket, None)
+
+    def _try_grant(self, ticket, enqueued: float) -> Optional[float]:
+        """Grant the ticket and return None, or return how long to wait before trying again."""
+        with self._lock:
+            now = self._clock()
+            head = min(self._waiting)
+            head_tokens = self._waiting[head]
+            self._requests.refill(now)
+            wait = self._requests.wait_time(1)
+            if self._tokens is not None:
+                self._tokens.refill(now)
+                wait = max(wait, self._tokens.wait_time(head_tokens))
+
+            if ticket != head:
+                # Wake when the head can go, then queue behind whoever is first by then
+                return max(wait, QUEUE_RECHECK_SECONDS)
+            if wait > 0:
+                return wait
+
+            self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(head_tokens)
+            del self._waiting[ticket]
+
+            waited = now - enqueued
+            stats = self._lane_stats[PRIORITY_LANES[ticket[0]]]
+            stats['acquired'] += 1
+            stats['total_wait_seconds'] += waited
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+        if waited >= 1.0:
+            logger.info(f"Rate limiting: waited {waited:.2f} seconds for a {PRIORITY_LANES[ticket[0]]} Bedrock call")
+        return None
+
+
+def estimate_request_tokens(body) -> int:
+    """Tokens an invoke_model body can consume: its prompt plus the requested max_tokens."""
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    if not body:
+        return 0
+    try:
+        max_tokens = int(json.loads(body).get('max_tokens', 0))
+    except (ValueError, AttributeError):
+        max_tokens = 0
+    return len(body) // CHARS_PER_TOKEN + max_tokens
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+# Shared by every tool in this process
+bedrock_rate_limiter = BedrockRateLimiter.from_environment()
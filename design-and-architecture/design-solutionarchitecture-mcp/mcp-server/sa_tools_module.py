@@ -9,6 +9,7 @@ import boto3
 from langchain_community.embeddings import BedrockEmbeddings
 from langchain_community.vectorstores import FAISS
 import logging
+from rate_limiter import bedrock_rate_limiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -53,11 +54,8 @@ def call_claude_sonnet(prompt):
     contentType = "application/json"
 
     try:
-        # Apply rate limiting before making the request
-        from mcp_server import bedrock_rate_limiter
-        bedrock_rate_limiter.wait_if_needed()
-        
-        response = bedrock_runtime.invoke_model(
+        response = bedrock_rate_limiter.invoke_model(
+            bedrock_runtime, priority='interactive',
             body=body, modelId=modelId, accept=accept, contentType=contentType
         )
         response_body = json.loads(response.get("body").read())
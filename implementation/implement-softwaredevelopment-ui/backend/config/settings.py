@@ -34,6 +34,10 @@ class Settings:
     # Session configuration
     MAX_SESSIONS: int = 1000
     SESSION_TIMEOUT_HOURS: int = 24
+    SESSION_REAPER_INTERVAL_SECONDS: int = int(os.getenv("SESSION_REAPER_INTERVAL_SECONDS", "60"))
+    # Optional persistence shared by workers: "sqlite" or "file" (empty keeps sessions in memory only)
+    SESSION_PERSISTENCE: str = os.getenv("SESSION_PERSISTENCE", "")
+    SESSION_PERSISTENCE_PATH: str = os.getenv("SESSION_PERSISTENCE_PATH", "sessions/sessions.db")
     
     # Authentication configuration (AWS Cognito)
     COGNITO_USER_POOL_ID: Optional[str] = os.getenv("COGNITO_USER_POOL_ID")
@@ -41,6 +45,9 @@ class Settings:
     COGNITO_CLIENT_SECRET: Optional[str] = os.getenv("COGNITO_CLIENT_SECRET")
     COGNITO_IDENTITY_POOL_ID: Optional[str] = os.getenv("COGNITO_IDENTITY_POOL_ID")
     COGNITO_REGION: str = os.getenv("COGNITO_REGION", AWS_REGION)
+    # Per-user credential cache for Cognito Identity Pool S3 access
+    COGNITO_CREDENTIAL_CACHE_SIZE: int = int(os.getenv("COGNITO_CREDENTIAL_CACHE_SIZE", "256"))
+    COGNITO_CREDENTIAL_REFRESH_AHEAD_SECONDS: int = int(os.getenv("COGNITO_CREDENTIAL_REFRESH_AHEAD_SECONDS", "300"))
     
     # JWT configuration
     JWT_SECRET_KEY: Optional[str] = os.getenv("JWT_SECRET_KEY")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Batch Transport Benchmark - Time concurrent JSON-RPC calls with and without request batching.
+
+Starts a minimal MCP server (aiohttp, on a thread) that accepts JSON-RPC
+batches and adds a fixed per-POST latency, then sends concurrent tool
+calls through HTTPTransport: once with batching disabled (one POST per
+call) and once with a batch window, where calls issued within the window
+share a POST. Reports throughput, per-call latency, the number of POSTs
+the server handled, and batch sends still tracked after the run.
+
+Usage:
+    python examples/batch_transport_benchmark.py [--requests 2000] [--concurrency 100] [--window-ms 2]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+from aiohttp import web
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.core.models import MCPRequest, MCPServerInfo, ServerType
+from mcp_client.protocol.handler import MCPProtocolHandler
+from mcp_client.transport.http import HTTPTransport
+
+
+class BatchStubServer:
+    """aiohttp MCP endpoint on its own thread that answers single calls and batches."""
+
+    def __init__(self, port: int, latency_seconds: float):
+        self.port = port
+        self.latency_seconds = latency_seconds
+        self.posts = 0
+        self.calls = 0
+        self._started = threading.Event()
+
+    @staticmethod
+    def _result(message):
+        return {"jsonrpc": "2.0", "id": message.get("id"), "result": {"status": "success", "content": {"text": "ok"}}}
+
+    async def _mcp(self, request: web.Request) -> web.Response:
+        self.posts += 1
+        body = await request.json()
+        await asyncio.sleep(self.latency_seconds)
+        if isinstance(body, list):
+            self.calls += len(body)
+            return web.json_response([self._result(message) for message in body])
+        self.calls += 1
+        return web.json_response(self._result(body))
+
+    def _serve(self) -> None:
+        loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_post("/mcp", self._mcp)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", self.port).start())
+        self._started.set()
+        loop.run_forever()
+
+    def start(self) -> None:
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._started.wait()
+
+    def reset(self) -> None:
+        self.posts = 0
+        self.calls = 0
+
+
+async def run(label: str, server: BatchStubServer, args, window_seconds: float) -> None:
+    server.reset()
+    transport = HTTPTransport(use_tls=False, max_retries=0, batch_window_seconds=window_seconds,
+                              max_batch_size=args.max_batch_size)
+    server_info = MCPServerInfo(
+        server_id="local", endpoint_url=f"http://127.0.0.1:{server.port}/mcp",
+        capabilities=["tools/call"], server_type=ServerType.TOOL, metadata={"supports_batch": True},
+    )
+    handler = MCPProtocolHandler()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def call(i: int) -> None:
+        request = MCPRequest(request_type="tools/call", content={"name": "lookup", "arguments": {"key": i}})
+        async with semaphore:
+            started = time.perf_counter()
+            await transport.send_request(server_info, handler.format_request(request, validated=True))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    in_flight = len(transport._batch_tasks)
+    await transport.close()
+
+    print(f"{label:16} {args.requests / elapsed:8.0f} calls/s  mean {statistics.mean(latencies):6.2f} ms  "
+          f"p50 {statistics.median(latencies):6.2f} ms  {server.posts} POSTs for {server.calls} calls  "
+          f"{in_flight} batch sends left")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch-size", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Server time per POST")
+    parser.add_argument("--port", type=int, default=18932)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    server = BatchStubServer(args.port, args.latency_ms / 1000)
+    server.start()
+
+    asyncio.run(run("no batching", server, args, 0.0))
+    asyncio.run(run(f"{args.window_ms:g} ms window", server, args, args.window_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Cognito Credential Cache Benchmark - Time repeat requests through CognitoS3StorageService.
+
+Replaces the Cognito identity exchange with a stub that counts exchanges and
+waits a fixed latency (GetId, GetCredentialsForIdentity and client setup),
+and S3 with a local in-memory stand-in. Compares per-request latency of the
+uncached exchange with the per-user cache, shows that a burst of concurrent
+first requests from one user shares a single exchange, and that credentials
+close to expiry are refreshed in the background without blocking requests.
+
+Usage:
+    python examples/cognito_credential_cache_benchmark.py [--users 20] [--requests 10] [--exchange-ms 150]
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings
+from models.auth_models import UserClaims
+from services.cognito_s3_service import CognitoS3StorageService
+from services.user_credential_cache import UserCredentialCache
+
+CREDENTIAL_LIFETIME_SECONDS = 3600
+
+
+class LocalS3Client:
+    """In-memory stand-in for a boto3 S3 client."""
+
+    def __init__(self, objects: Dict[str, bytes]):
+        self.objects = objects
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs) -> Dict[str, Any]:
+        self.objects[Key] = Body
+        return {}
+
+    def get_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str) -> Dict[str, Any]:
+        return {"Contents": [{"Key": key} for key in self.objects if key.startswith(Prefix)]}
+
+
+class StubAuthService:
+    """Accepts tokens of the form "token-<user>"."""
+
+    user_pool_id = "us-east-1_benchmark"
+
+    def extract_user_claims(self, token: str) -> Optional[UserClaims]:
+        username = token[len("token-"):]
+        now = datetime.now(timezone.utc)
+        return UserClaims(
+            user_id=f"sub-{username}", username=username, email=f"{username}@example.com",
+            groups=["developers"], token_expiry=now + timedelta(hours=1), issued_at=now,
+            cognito_sub=f"sub-{username}",
+        )
+
+
+class StubCognitoS3StorageService(CognitoS3StorageService):
+    """CognitoS3StorageService whose token exchange is a counted, fixed-latency stub."""
+
+    def __init__(self, exchange_seconds: float, objects: Dict[str, bytes], clock=time.time):
+        super().__init__(StubAuthService())
+        self.exchange_seconds = exchange_seconds
+        self.objects = objects
+        self.clock = clock
+        self.exchanges = 0
+
+    def _exchange_token_for_s3_client(self, id_token: str) -> Tuple[LocalS3Client, float]:
+        time.sleep(self.exchange_seconds)
+        self.exchanges += 1
+        return LocalS3Client(self.objects), self.clock() + CREDENTIAL_LIFETIME_SECONDS
+
+
+class UncachedStubService(StubCognitoS3StorageService):
+    """Exchanges the token on every request, as before the cache."""
+
+    async def _get_user_s3_client(self, user_token: str, user_claims: UserClaims):
+        return self._create_user_s3_client(user_token)
+
+
+async def timed_requests(service: CognitoS3StorageService, users: int, requests: int) -> float:
+    """Run every user's requests one after another; return mean latency in ms."""
+    latencies = []
+    for _ in range(requests):
+        for user in range(users):
+            started = time.perf_counter()
+            result = await service.load_project_metadata("benchmark-project", f"token-user{user}")
+            latencies.append(time.perf_counter() - started)
+            assert result.success, result.error_message
+    return sum(latencies) / len(latencies) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--exchange-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("services").setLevel(logging.CRITICAL)
+    settings.COGNITO_IDENTITY_POOL_ID = settings.COGNITO_IDENTITY_POOL_ID or "us-east-1:benchmark"
+    settings.COGNITO_USER_POOL_ID = settings.COGNITO_USER_POOL_ID or "us-east-1_benchmark"
+
+    objects = {"projects/benchmark-project/metadata.json": b'{"name": "benchmark"}'}
+    exchange_seconds = args.exchange_ms / 1000
+    total = args.users * args.requests
+
+    uncached = UncachedStubService(exchange_seconds, objects)
+    mean_ms = await timed_requests(uncached, args.users, args.requests)
+    print(f"uncached   {mean_ms:8.2f} ms/request  {uncached.exchanges} exchanges for {total} requests")
+
+    cached = StubCognitoS3StorageService(exchange_seconds, objects)
+    cached._credential_cache = UserCredentialCache()
+    mean_ms = await timed_requests(cached, args.users, args.requests)
+    print(f"cached     {mean_ms:8.2f} ms/request  {cached.exchanges} exchanges for {total} requests")
+    repeat_ms = await timed_requests(cached, args.users, args.requests)
+    print(f"  repeat   {repeat_ms:8.2f} ms/request  (all users cached)")
+
+    # A burst of first requests from one user shares a single exchange
+    burst = StubCognitoS3StorageService(exchange_seconds, objects)
+    burst._credential_cache = UserCredentialCache()
+    started = time.perf_counter()
+    await asyncio.gather(*(burst.load_project_metadata("benchmark-project", "token-burst") for _ in range(50)))
+    print(f"burst      {(time.perf_counter() - started) * 1000:8.2f} ms for 50 concurrent requests, "
+          f"{burst.exchanges} exchange")
+
+    # Credentials inside the refresh window keep serving while a new exchange runs
+    now = [time.time()]
+    refresh = StubCognitoS3StorageService(exchange_seconds, objects, clock=lambda: now[0])
+    refresh._credential_cache = UserCredentialCache(refresh_ahead_seconds=300, clock=lambda: now[0])
+    await refresh.load_project_metadata("benchmark-project", "token-refresh")
+    now[0] += CREDENTIAL_LIFETIME_SECONDS - 60
+    started = time.perf_counter()
+    for _ in range(20):
+        await refresh.load_project_metadata("benchmark-project", "token-refresh")
+    elapsed_ms = (time.perf_counter() - started) / 20 * 1000
+    await asyncio.sleep(exchange_seconds * 2)
+    print(f"refresh    {elapsed_ms:8.2f} ms/request inside the refresh window, "
+          f"{refresh.exchanges - 1} background exchange")
+    print(f"\nCache stats: {refresh._credential_cache.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Input Validator Benchmark - Time InputValidator.validate_json on a large nested payload.
+
+Builds a nested JSON payload (about 1 MB by default: conversation turns,
+tool calls with arguments, design documents and short identifiers) and
+validates it with the current InputValidator, first cold and then again
+as a re-sent payload served partly from the clean-string cache. For
+comparison, the same payload goes through a validator running the
+original scanning (every case-insensitive regex on every string) and
+sanitizing code. Both must produce the same result.
+
+Usage:
+    python examples/input_validator_benchmark.py [--size-mb 1] [--rounds 3]
+"""
+
+import argparse
+import html
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from typing import Any, Dict, List
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.security.validation import InputValidator
+
+PROSE = ("The order service publishes events to a queue; the billing service consumes them, "
+         "stores invoices in a relational database and exposes a REST API for the dashboard. ")
+
+
+class OriginalInputValidator(InputValidator):
+    """InputValidator with the original, unoptimized pattern checks and sanitizing."""
+
+    def validate_string(self, value: str, field_name: str, max_length=None) -> str:
+        max_len = max_length or self.MAX_LENGTHS.get(field_name, 1000000)
+        if len(value) > max_len:
+            raise ValueError(f"Field '{field_name}' exceeds maximum length of {max_len}")
+        checks = [(self.dangerous_regex, ())]
+        lowered = field_name.lower()
+        if not any(f in lowered for f in ('prompt', 'message', 'content', 'description', 'requirements',
+                                          'architecture_description', 'details', 'query', 'arguments',
+                                          'design', 'specification', 'features', 'functionality')):
+            checks.append((self.sql_injection_regex, ()))
+        if not any(f in lowered for f in ('prompt', 'message', 'content', 'description', 'requirements',
+                                          'architecture_description', 'details', 'query', 'arguments')):
+            checks.append((self.command_injection_regex, ()))
+        for regexes, _ in checks:
+            for pattern in regexes:
+                pattern.search(value)
+        sanitized = html.escape(value, quote=True).replace('\x00', '')
+        return re.sub(r'\s+', ' ', sanitized).strip()
+
+
+def build_payload(size_bytes: int, seed: int = 1) -> Dict[str, Any]:
+    """Nested conversation-shaped payload of roughly the requested JSON size."""
+    rng = random.Random(seed)
+    turns: List[Dict[str, Any]] = []
+    payload = {"conversation_id": "bench-1", "turns": turns}
+    while len(json.dumps(payload)) < size_bytes:
+        index = len(turns)
+        turns.append({
+            "role": "user" if index % 2 == 0 else "assistant",
+            "content": PROSE * rng.randint(1, 30),
+            "tool_calls": [
+                {
+                    "name": rng.choice(["generate_diagram", "generate_code", "review_design"]),
+                    "id": f"call_{index}_{i}",
+                    "arguments": {
+                        "design": {"components": [f"component-{n}" for n in range(rng.randint(2, 8))],
+                                   "notes": PROSE * rng.randint(0, 5)},
+                        "specification": {"version": i, "tags": ["aws", "serverless", "api"]},
+                    },
+                }
+                for i in range(rng.randint(0, 3))
+            ],
+            "metadata": {"turn": index, "tokens": rng.randint(10, 4000), "cached": False},
+        })
+    return payload
+
+
+def time_validation(validator: InputValidator, payload: Dict[str, Any], rounds: int):
+    timings = []
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = validator.validate_json(payload, "arguments")
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=1.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    payload = build_payload(int(args.size_mb * 1024 * 1024))
+    size_kb = len(json.dumps(payload)) / 1024
+    print(f"payload    {size_kb:8.0f} KB, {len(payload['turns'])} turns")
+
+    original_timings, original_result = time_validation(OriginalInputValidator(strict_mode=False),
+                                                        payload, args.rounds)
+    print(f"original   {min(original_timings):8.1f} ms per validation")
+
+    current_timings, current_result = time_validation(InputValidator(strict_mode=False), payload, args.rounds)
+    print(f"current    {current_timings[0]:8.1f} ms cold, "
+          f"{min(current_timings[1:] or current_timings):8.1f} ms re-sent (clean-string cache)")
+    print(f"\nSame result as the original: {current_result == original_result}")
+
+
+if __name__ == "__main__":
+    main()
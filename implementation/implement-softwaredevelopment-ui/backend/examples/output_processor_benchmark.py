@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Output Processor Benchmark - Time artifact extraction and storage on a large tool output.
+
+Builds a synthetic tool output (about 2 MB, 50 artifacts: diagram URLs and
+code blocks) and runs OutputProcessor.process_tool_outputs against a local
+S3 stand-in that keeps objects in memory and adds a fixed latency to every
+download and upload. The same output is then processed a second time to
+show content-hash dedup across turns.
+
+Usage:
+    python examples/output_processor_benchmark.py [--size-mb 2] [--artifacts 50] [--latency-ms 40]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.output_processor import OutputProcessor
+from services.s3_storage_service import S3OperationResult
+
+BUCKET = "benchmark-bucket"
+
+
+class LocalS3:
+    """In-memory stand-in for S3StorageService with a fixed latency per object."""
+
+    def __init__(self, latency_seconds: float):
+        self.bucket_name = BUCKET
+        self.latency_seconds = latency_seconds
+        self.objects: Dict[str, bytes] = {}
+        self.puts = 0
+
+    async def _put(self, key: str, body: bytes) -> None:
+        await asyncio.sleep(self.latency_seconds)
+        self.objects[key] = body
+        self.puts += 1
+
+    async def save_diagram(self, project_id: str, diagram_name: str, content: bytes,
+                           format: str = "png", metadata: Optional[Dict[str, Any]] = None) -> S3OperationResult:
+        key = f"projects/{project_id}/diagrams/{diagram_name}.{format}"
+        await self._put(key, content)
+        if metadata:
+            await self._put(f"projects/{project_id}/diagrams/{diagram_name}_metadata.json", repr(metadata).encode())
+        return S3OperationResult(success=True, data={"s3_key": key})
+
+    async def save_generated_code(self, project_id: str, files: Dict[str, str],
+                                  version: Optional[str] = None) -> S3OperationResult:
+        for filename, content in files.items():
+            await self._put(f"projects/{project_id}/generated-code/{version or 'v'}/{filename}", content.encode())
+            await self._put(f"projects/{project_id}/generated-code/latest/{filename}", content.encode())
+        return S3OperationResult(success=True, data={"file_count": len(files)})
+
+
+class LocalOutputProcessor(OutputProcessor):
+    """OutputProcessor whose S3 downloads come from generated bytes after a fixed delay."""
+
+    def __init__(self, storage: LocalS3):
+        super().__init__(diagram_service=object(), s3_storage_service=storage)
+        self.downloads = 0
+
+    def _sync_download_s3_object(self, bucket_name: str, key: str) -> bytes:
+        time.sleep(self.s3_storage_service.latency_seconds)
+        self.downloads += 1
+        return f"PNG:{bucket_name}/{key}".encode() * 256
+
+
+def build_tool_output(size_bytes: int, artifacts: int) -> str:
+    """Interleave filler prose with diagram URLs and code blocks."""
+    filler_line = "The service validates input, writes the record and emits an audit event.\n"
+    parts = []
+    per_gap = max(1, size_bytes // (artifacts + 1))
+    for i in range(artifacts):
+        parts.append(filler_line * (per_gap // len(filler_line)))
+        if i % 2 == 0:
+            parts.append(f"![Diagram](https://{BUCKET}.s3.amazonaws.com/diagrams/architecture_{i}.png)\n")
+        else:
+            body = "\n".join(f"    total += compute_step_{i}({n})" for n in range(40))
+            parts.append(f"```python\ndef handler_{i}(event):\n    total = 0\n{body}\n    return total\n```\n")
+    parts.append(filler_line * (per_gap // len(filler_line)))
+    return "".join(parts)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=2.0)
+    parser.add_argument("--artifacts", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("services").setLevel(logging.CRITICAL)
+
+    text = build_tool_output(int(args.size_mb * 1024 * 1024), args.artifacts)
+    storage = LocalS3(args.latency_ms / 1000)
+    processor = LocalOutputProcessor(storage)
+    session = {"project_name": "benchmark"}
+
+    started = time.perf_counter()
+    found = processor._scan_artifacts(text)
+    scan_ms = (time.perf_counter() - started) * 1000
+    print(f"Tool output: {len(text) / 1e6:.1f} MB, {len(found['diagram_urls'])} diagram URLs, "
+          f"{len(found['code_blocks'])} code blocks (scan {scan_ms:.0f}ms)\n")
+
+    for turn in (1, 2):
+        puts, downloads = storage.puts, processor.downloads
+        started = time.perf_counter()
+        outputs = await processor.process_tool_outputs([], text, session)
+        elapsed = time.perf_counter() - started
+        print(f"Turn {turn}: {elapsed:.2f}s, {len(outputs['diagrams'])} diagrams, "
+              f"{len(outputs['code_files'])} code files, {processor.downloads - downloads} downloads, "
+              f"{storage.puts - puts} uploads")
+    print(f"\nStats: {processor.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
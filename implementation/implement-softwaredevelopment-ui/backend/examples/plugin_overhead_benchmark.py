@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Plugin Overhead Benchmark - Measure MCPClient.send_request cost per plugin count.
+
+Sends requests through a client whose transport answers in-process, so the
+timings are the client's own overhead: validation, server selection,
+formatting, parsing and plugin hook dispatch. Runs with 0, 1 and 10 no-op
+plugins, then with 10 plugins whose hooks wait on 1ms of simulated I/O, run
+in order and marked independent.
+
+Usage:
+    python examples/plugin_overhead_benchmark.py [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.client import MCPClient
+from mcp_client.core.interfaces import Transport
+from mcp_client.core.models import MCPClientConfig, MCPServerInfo, ServerType
+from mcp_client.core.plugin import MCPPlugin, PluginHook, hook
+
+
+class InProcessTransport(Transport):
+    """Transport that answers every JSON-RPC request immediately."""
+
+    async def send_request(self, server_info: MCPServerInfo, formatted_request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": formatted_request.get("id"), "result": {"text": "ok"}}
+
+    async def check_server_health(self, server_info: MCPServerInfo) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+class NoOpPlugin(MCPPlugin):
+    """Plugin subscribing to the request hooks, optionally waiting on simulated I/O."""
+
+    def __init__(self, index: int, independent: bool = False, io_seconds: float = 0.0):
+        self._name = f"noop-{index}"
+        self._independent = independent
+        self._io_seconds = io_seconds
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def version(self) -> str:
+        return "1.0"
+
+    @property
+    def description(self) -> str:
+        return "Does nothing"
+
+    @property
+    def independent(self) -> bool:
+        return self._independent
+
+    @hook(PluginHook.PRE_REQUEST)
+    async def pre_request(self, client, request, server, formatted_request):
+        if self._io_seconds:
+            await asyncio.sleep(self._io_seconds)
+        return None
+
+    @hook(PluginHook.POST_REQUEST)
+    async def post_request(self, client, request, server, response):
+        if self._io_seconds:
+            await asyncio.sleep(self._io_seconds)
+        return None
+
+
+async def measure(plugins: List[MCPPlugin], requests: int) -> float:
+    """Return the mean send_request time in microseconds."""
+    config = MCPClientConfig(
+        aws_region="us-east-1",
+        discovery_mode="static",
+        static_servers=[
+            MCPServerInfo(
+                server_id="local",
+                endpoint_url="http://localhost/mcp",
+                capabilities=["text-generation"],
+                server_type=ServerType.CONVERSATIONAL,
+            )
+        ],
+        enable_metrics=False,
+        log_level="ERROR",
+    )
+    client = MCPClient(config, transport=InProcessTransport(), plugins=plugins)
+    await client.wait_for_server_registration()
+    request = client.create_text_generation_request("hello")
+
+    # Warm up caches before timing
+    for _ in range(200):
+        await client.send_request(request)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await client.send_request(request)
+    elapsed = time.perf_counter() - started
+
+    await client.close()
+    return elapsed / requests * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("mcp_client").setLevel(logging.CRITICAL)
+
+    scenarios = (
+        ("0 plugins", []),
+        ("1 plugin", [NoOpPlugin(0)]),
+        ("10 plugins", [NoOpPlugin(i) for i in range(10)]),
+        ("10 independent plugins", [NoOpPlugin(i, independent=True) for i in range(10)]),
+    )
+    io_scenarios = (
+        ("10 I/O plugins", [NoOpPlugin(i, io_seconds=0.001) for i in range(10)]),
+        ("10 independent I/O", [NoOpPlugin(i, independent=True, io_seconds=0.001) for i in range(10)]),
+    )
+    baseline = None
+    for name, plugins in scenarios:
+        mean_us = await measure(plugins, args.requests)
+        baseline = baseline if baseline is not None else mean_us
+        print(f"{name:<24} {mean_us:8.1f} us/request  (+{mean_us - baseline:.1f} us)")
+    for name, plugins in io_scenarios:
+        # Each request waits on real timers here, so fewer requests suffice
+        mean_us = await measure(plugins, max(1, args.requests // 100))
+        print(f"{name:<24} {mean_us:8.1f} us/request  (+{mean_us - baseline:.1f} us)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
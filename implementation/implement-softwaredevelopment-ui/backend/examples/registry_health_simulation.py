@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Registry Health Simulation - Compare health-check strategies on fake servers.
+
+Runs the adaptive InMemoryServerRegistry and the previous fixed loop (probe
+every server one after another, then sleep) against the same fleet of fake
+servers, and reports probe traffic and time-to-detect for failed servers.
+
+The simulation runs on an event loop with a virtual clock that jumps to
+the next timer whenever nothing is ready, so minutes of simulated time take
+a few seconds and timings are exact.
+
+Usage:
+    python examples/registry_health_simulation.py [--servers 500] [--minutes 15]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+from typing import Dict, List
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.core.models import MCPServerInfo, ServerStatus, ServerType
+from mcp_client.discovery.registry import InMemoryServerRegistry
+
+HEALTH_CHECK_INTERVAL = 60.0
+SERVER_TTL = 300.0
+HEALTHY_PROBE_LATENCY = 0.05
+DEAD_PROBE_LATENCY = 10.0  # A dead server costs a full transport timeout
+FAILURE_AT = 300.0
+FAILED_SERVERS = 10
+FLAPPING_SERVERS = 5
+FLAP_PERIOD = 45.0
+TRAFFIC_SHARE = 0.4  # Share of servers that receive real requests
+REQUESTS_PER_SECOND = 50
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock skips ahead to the next scheduled timer when idle."""
+
+    def __init__(self):
+        super().__init__()
+        self._virtual_now = 0.0
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def _run_once(self):
+        # Relies on BaseEventLoop internals; fine for a simulation script
+        if not self._ready and self._scheduled:
+            self._virtual_now = max(self._virtual_now, self._scheduled[0]._when)
+        super()._run_once()
+
+
+class FakeFleet:
+    """Fake servers with scripted failures, and a health-check transport for them."""
+
+    def __init__(self, count: int, seed: int = 7):
+        rng = random.Random(seed)
+        self.server_ids = [f"server-{i:03d}" for i in range(count)]
+        shuffled = self.server_ids[:]
+        rng.shuffle(shuffled)
+        self.failed = set(shuffled[:FAILED_SERVERS])
+        self.flapping = set(shuffled[FAILED_SERVERS:FAILED_SERVERS + FLAPPING_SERVERS])
+        self.with_traffic = [s for s in shuffled[FAILED_SERVERS + FLAPPING_SERVERS:]
+                             if rng.random() < TRAFFIC_SHARE] + sorted(self.failed)[:FAILED_SERVERS // 2]
+        self.started_at = asyncio.get_running_loop().time()
+        self.probes = 0
+
+    def now(self) -> float:
+        """Simulated seconds since the start."""
+        return asyncio.get_running_loop().time() - self.started_at
+
+    def is_up(self, server_id: str) -> bool:
+        now = self.now()
+        if server_id in self.failed:
+            return now < FAILURE_AT
+        if server_id in self.flapping:
+            return int(now // FLAP_PERIOD) % 2 == 0
+        return True
+
+    async def check_server_health(self, server_info: MCPServerInfo) -> bool:
+        self.probes += 1
+        if self.is_up(server_info.server_id):
+            await asyncio.sleep(HEALTHY_PROBE_LATENCY)
+            return True
+        await asyncio.sleep(DEAD_PROBE_LATENCY)
+        return False
+
+    def server_infos(self) -> List[MCPServerInfo]:
+        return [
+            MCPServerInfo(
+                server_id=server_id,
+                endpoint_url=f"http://{server_id}.local/mcp",
+                capabilities=["tools/call"],
+                server_type=ServerType.TOOL,
+            )
+            for server_id in self.server_ids
+        ]
+
+
+class DetectionTracker:
+    """Record when each failed server was first seen as degraded and as inactive."""
+
+    def __init__(self, fleet: FakeFleet):
+        self.fleet = fleet
+        self.degraded_at: Dict[str, float] = {}
+        self.inactive_at: Dict[str, float] = {}
+
+    def observe(self, statuses: Dict[str, ServerStatus]):
+        now = self.fleet.now()
+        if now < FAILURE_AT:
+            return
+        for server_id in self.fleet.failed:
+            status = statuses.get(server_id)
+            if status is None or status == ServerStatus.ACTIVE:
+                continue
+            self.degraded_at.setdefault(server_id, now)
+            if status == ServerStatus.INACTIVE:
+                self.inactive_at.setdefault(server_id, now)
+
+    def summary(self) -> Dict[str, str]:
+        def describe(found: Dict[str, float]) -> str:
+            if not found:
+                return "not detected"
+            delays = sorted(t - FAILURE_AT for t in found.values())
+            return (f"{len(delays)}/{len(self.fleet.failed)} servers, "
+                    f"median {delays[len(delays) // 2]:.0f}s, max {delays[-1]:.0f}s")
+        return {"degraded": describe(self.degraded_at), "inactive": describe(self.inactive_at)}
+
+
+async def watch(tracker: DetectionTracker, get_statuses, duration: float):
+    while tracker.fleet.now() < duration:
+        tracker.observe(get_statuses())
+        await asyncio.sleep(1.0)
+
+
+async def run_fixed_loop(count: int, duration: float) -> Dict[str, str]:
+    """The previous behaviour: probe all servers sequentially, then sleep."""
+    fleet = FakeFleet(count)
+    servers = {info.server_id: info for info in fleet.server_infos()}
+    tracker = DetectionTracker(fleet)
+
+    async def loop():
+        while True:
+            for server_info in list(servers.values()):
+                if await fleet.check_server_health(server_info):
+                    server_info.status = ServerStatus.ACTIVE
+                elif server_info.status == ServerStatus.ACTIVE:
+                    server_info.status = ServerStatus.DEGRADED
+                else:
+                    server_info.status = ServerStatus.INACTIVE
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+    task = asyncio.create_task(loop())
+    await watch(tracker, lambda: {s: i.status for s, i in servers.items()}, duration)
+    task.cancel()
+    return {"probes": str(fleet.probes), **tracker.summary()}
+
+
+async def run_adaptive_registry(count: int, duration: float) -> Dict[str, str]:
+    """The adaptive registry, with passive signals from simulated traffic."""
+    fleet = FakeFleet(count)
+    registry = InMemoryServerRegistry(
+        health_check_interval_seconds=HEALTH_CHECK_INTERVAL,
+        server_ttl_seconds=SERVER_TTL,
+        transport=fleet,
+        clock=asyncio.get_running_loop().time,
+    )
+    for server_info in fleet.server_infos():
+        await registry.register_server(server_info, skip_health_check=True)
+    await registry.start()
+    tracker = DetectionTracker(fleet)
+    rng = random.Random(11)
+
+    async def traffic():
+        while True:
+            for server_id in rng.sample(fleet.with_traffic, min(REQUESTS_PER_SECOND, len(fleet.with_traffic))):
+                registry.record_request_outcome(server_id, fleet.is_up(server_id))
+            await asyncio.sleep(1.0)
+
+    task = asyncio.create_task(traffic())
+    await watch(tracker, lambda: {s: i.status for s, i in registry._servers.items()}, duration)
+    task.cancel()
+    await registry.stop()
+    stats = registry.health_check_stats
+    return {
+        "probes": str(fleet.probes),
+        "passive successes": str(stats["passive_successes"]),
+        **tracker.summary(),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--servers", type=int, default=500)
+    parser.add_argument("--minutes", type=float, default=15.0)
+    args = parser.parse_args()
+    duration = args.minutes * 60
+
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("mcp_client").setLevel(logging.CRITICAL)
+
+    print(f"Simulating {args.servers} servers for {args.minutes:.0f} minutes; "
+          f"{FAILED_SERVERS} fail at t={FAILURE_AT:.0f}s, {FLAPPING_SERVERS} flap every {FLAP_PERIOD:.0f}s\n")
+    for name, runner in (("Fixed sequential loop", run_fixed_loop), ("Adaptive registry", run_adaptive_registry)):
+        result = await runner(args.servers, duration)
+        print(name)
+        for key, value in result.items():
+            print(f"  {key:<18} {value}")
+        print()
+
+
+if __name__ == "__main__":
+    loop = VirtualTimeLoop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Session Manager Benchmark - Time session create, get and cleanup with many live sessions.
+
+Fills a SessionManager with sessions up to its limit, then times random
+lookups, a cleanup pass in which a tenth of the sessions have expired, and
+creating sessions at the limit (each one evicts the least recently used).
+Time is driven by a fake clock, so expiry happens without waiting. Runs
+in memory only and with SQLite persistence in a temporary directory.
+
+Usage:
+    python examples/session_manager_benchmark.py [--sessions 100000] [--operations 20000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.session_manager import SessionManager
+from services.session_persistence import SQLiteSessionPersistence
+
+TIMEOUT_HOURS = 24
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(name: str, sessions: int, operations: int, persistence=None) -> None:
+    clock = FakeClock()
+    manager = SessionManager(
+        persistence=persistence,
+        max_sessions=sessions,
+        session_timeout_hours=TIMEOUT_HOURS,
+        reaper_interval_seconds=0,
+        clock=clock,
+    )
+
+    started = time.perf_counter()
+    ids = []
+    for i in range(sessions):
+        # A tenth of the sessions are half a day older than the rest
+        clock.now = 1_000_000.0 if i < sessions // 10 else 1_000_000.0 + TIMEOUT_HOURS * 1800
+        ids.append(manager.create_session(f"conv-{i}", phase="requirements"))
+    fill_seconds = time.perf_counter() - started
+
+    lookup_ids = random.Random(1).choices(ids[sessions // 10:], k=operations)
+    started = time.perf_counter()
+    for conversation_id in lookup_ids:
+        manager.get_session(conversation_id)
+    get_us = (time.perf_counter() - started) / operations * 1e6
+
+    clock.now = 1_000_000.0 + TIMEOUT_HOURS * 3600 + 1
+    started = time.perf_counter()
+    removed = manager.cleanup_sessions()
+    cleanup_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for i in range(operations):
+        manager.create_session(f"extra-{i}", phase="design")
+    create_us = (time.perf_counter() - started) / operations * 1e6
+
+    print(f"{name:<10} fill {fill_seconds:6.2f}s  create at limit {create_us:7.1f} us  "
+          f"get {get_us:6.1f} us  cleanup {cleanup_ms:7.1f} ms ({removed} expired)")
+    manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--operations", type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    run("memory", args.sessions, args.operations)
+    with tempfile.TemporaryDirectory() as directory:
+        run("sqlite", args.sessions, args.operations,
+            persistence=SQLiteSessionPersistence(os.path.join(directory, "sessions.db")))
+
+
+if __name__ == "__main__":
+    main()
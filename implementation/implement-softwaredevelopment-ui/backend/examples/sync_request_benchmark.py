@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Sync Request Benchmark - Time sequential send_request_sync calls against a local MCP server.
+
+Starts a minimal MCP server (aiohttp, on a thread) and sends sequential
+synchronous requests through one MCPClient, whose sync calls share its
+persistent background loop and connection pool. For comparison, the same
+requests are sent with a fresh client per call, paying for a new event
+loop, connection pool and TCP handshake each time as every sync call did
+when it ran on a throwaway loop. Reports per-request latency and the number of TCP
+connections the server accepted.
+
+Usage:
+    python examples/sync_request_benchmark.py [--requests 1000] [--port 18931]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+from aiohttp import web
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.client import MCPClient
+from mcp_client.core.models import MCPClientConfig, MCPServerInfo, ServerType
+
+
+class LocalMCPServer:
+    """aiohttp MCP endpoint on its own thread that records the connections it serves."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.connections = set()
+        self.requests = 0
+        self._started = threading.Event()
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def _mcp(self, request: web.Request) -> web.Response:
+        self.connections.add(request.transport.get_extra_info("peername"))
+        self.requests += 1
+        body = await request.json()
+        return web.json_response({
+            "jsonrpc": "2.0",
+            "id": body.get("id"),
+            "result": {"status": "success", "content": {"text": "ok"}},
+        })
+
+    def _serve(self) -> None:
+        loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_get("/health", self._health)
+        app.router.add_post("/mcp", self._mcp)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", self.port).start())
+        self._started.set()
+        loop.run_forever()
+
+    def start(self) -> None:
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._started.wait()
+
+    def reset(self) -> None:
+        self.connections = set()
+        self.requests = 0
+
+
+def make_client(server: LocalMCPServer) -> MCPClient:
+    client = MCPClient(MCPClientConfig(
+        aws_region="us-east-1", use_tls=False, log_level="CRITICAL", enable_metrics=False,
+    ))
+    client.register_server_sync(MCPServerInfo(
+        server_id="local", endpoint_url=f"http://127.0.0.1:{server.port}/mcp",
+        capabilities=["text-generation"], server_type=ServerType.CONVERSATIONAL,
+    ))
+    return client
+
+
+def report(label: str, server: LocalMCPServer, latencies, elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:22} {elapsed:6.2f} s  mean {statistics.mean(latencies):6.2f} ms  "
+          f"p50 {statistics.median(latencies):6.2f} ms  p99 {p99:6.2f} ms  "
+          f"{len(server.connections)} TCP connections for {server.requests} requests served")
+
+
+def run_shared_client(server: LocalMCPServer, requests: int) -> None:
+    """One client; every sync call runs on its persistent background loop."""
+    server.reset()
+    client = make_client(server)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(requests):
+        request_started = time.perf_counter()
+        client.send_request_sync(client.create_text_generation_request(f"prompt {i}"))
+        latencies.append((time.perf_counter() - request_started) * 1000)
+    report("shared client", server, latencies, time.perf_counter() - started)
+    client.close_sync()
+
+
+def run_client_per_call(server: LocalMCPServer, requests: int) -> None:
+    """A fresh client, event loop and connection pool for every call."""
+    server.reset()
+    latencies = []
+    started = time.perf_counter()
+    for i in range(requests):
+        request_started = time.perf_counter()
+        client = make_client(server)
+        client.send_request_sync(client.create_text_generation_request(f"prompt {i}"))
+        client.close_sync()
+        latencies.append((time.perf_counter() - request_started) * 1000)
+    report("client per call", server, latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=18931)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    server = LocalMCPServer(args.port)
+    server.start()
+
+    run_shared_client(server, args.requests)
+    run_client_per_call(server, args.requests)
+
+
+if __name__ == "__main__":
+    main()
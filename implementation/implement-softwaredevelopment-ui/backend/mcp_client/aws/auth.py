@@ -2,10 +2,15 @@
 AWS IAM authentication for the MCP Client.
 """
 
+import hashlib
+import hmac
 import logging
-from typing import Dict, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 
 import boto3
+from botocore.auth import SigV4Auth
 from botocore.credentials import Credentials
 from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
 from botocore.session import Session
@@ -14,6 +19,55 @@ from mcp_client.core.models import ErrorCode, MCPError
 
 logger = logging.getLogger(__name__)
 
+# Derived SigV4 signing keys. A key depends only on the credentials, the UTC
+# date, the region and the service, so a handful cover a whole day of traffic.
+SIGNING_KEY_CACHE_SIZE = 64
+_signing_keys: "OrderedDict[Tuple[str, str, str, str], bytes]" = OrderedDict()
+_signing_keys_lock = threading.Lock()
+
+
+def _hmac_sha256(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def get_signing_key(credentials: Credentials, date: str, region: str, service: str) -> bytes:
+    """
+    Return the SigV4 signing key for a set of credentials, a date (YYYYMMDD), region and service.
+
+    Keys are cached by access key ID, which identifies the secret key, so the
+    secret itself never becomes part of a cache key.
+    """
+    cache_key = (credentials.access_key, date, region, service)
+    with _signing_keys_lock:
+        signing_key = _signing_keys.get(cache_key)
+        if signing_key is not None:
+            _signing_keys.move_to_end(cache_key)
+            return signing_key
+
+    k_date = _hmac_sha256(f"AWS4{credentials.secret_key}".encode("utf-8"), date)
+    k_region = _hmac_sha256(k_date, region)
+    k_service = _hmac_sha256(k_region, service)
+    signing_key = _hmac_sha256(k_service, "aws4_request")
+
+    with _signing_keys_lock:
+        _signing_keys[cache_key] = signing_key
+        while len(_signing_keys) > SIGNING_KEY_CACHE_SIZE:
+            _signing_keys.popitem(last=False)
+    return signing_key
+
+
+class CachedKeySigV4Auth(SigV4Auth):
+    """SigV4 signer that reuses the derived signing key instead of deriving it per request."""
+
+    def signature(self, string_to_sign, request):
+        signing_key = get_signing_key(
+            self.credentials,
+            request.context["timestamp"][0:8],
+            self._region_name,
+            self._service_name,
+        )
+        return self._sign(signing_key, string_to_sign, hex=True)
+
 
 class AWSCredentialProvider:
     """Provides AWS credentials using various authentication methods."""
@@ -267,9 +321,8 @@ class AWSAuthenticator:
         Raises:
             MCPError: If signing fails
         """
-        logger.info(f"Starting simplified SigV4 signing for {method} request to {url}")
+        logger.debug(f"Starting simplified SigV4 signing for {method} request to {url}")
         try:
-            from botocore.auth import SigV4Auth
             from botocore.awsrequest import AWSRequest
             import os
             
@@ -294,8 +347,8 @@ class AWSAuthenticator:
             jwt_token = self._jwt_token or os.environ.get('COGNITO_JWT_TOKEN')
             is_amazon_q = server_id and 'amazon-q-business' in server_id
             
-            logger.info(f"Amazon Q Business detected: {is_amazon_q}")
-            logger.info(f"JWT token available: {bool(jwt_token)}")
+            logger.debug(f"Amazon Q Business detected: {is_amazon_q}")
+            logger.debug(f"JWT token available: {bool(jwt_token)}")
             
             # Add Cognito JWT token for Amazon Q Business
             if is_amazon_q and jwt_token:
@@ -313,7 +366,7 @@ class AWSAuthenticator:
             )
             
             # Sign with SigV4 using client's AWS credentials
-            signer = SigV4Auth(credentials, service, self.credential_provider.region)
+            signer = CachedKeySigV4Auth(credentials.get_frozen_credentials(), service, self.credential_provider.region)
             signer.add_auth(request)
             
             # Ensure JWT token is preserved after signing (if it was added)
@@ -321,8 +374,8 @@ class AWSAuthenticator:
                 request.headers['X-Cognito-JWT'] = jwt_token
                 logger.info("JWT token preserved after SigV4 signing")
             
-            logger.info(f"Successfully signed request with {len(request.headers)} headers")
-            logger.info(f"Final headers: {list(request.headers.keys())}")
+            logger.debug(f"Successfully signed request with {len(request.headers)} headers")
+            logger.debug(f"Final headers: {list(request.headers.keys())}")
             
             # Return the signed headers
             return dict(request.headers)
@@ -3,6 +3,7 @@ MCP Client implementation.
 """
 
 import asyncio
+import concurrent.futures
 import logging
 import threading
 import time
@@ -42,6 +43,94 @@ from mcp_client.transport.factory import TransportFactory, MultiTransport
 logger = get_logger(__name__)
 
 
+class _LoopRunner:
+    """
+    A long-lived event loop owned by a daemon thread.
+
+    The synchronous client APIs submit their coroutines here instead of
+    spinning up a fresh event loop per call, so loop-bound state (aiohttp
+    connection pools, circuit breakers, stdio readers, background health
+    checks) survives between calls.
+    """
+
+    def __init__(self, name: str = "mcp-client-loop"):
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop owned by the runner thread."""
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the runner thread is still serving its loop."""
+        return self._thread.is_alive() and not self._loop.is_closed()
+
+    def in_loop_thread(self) -> bool:
+        """Whether the caller is running on the runner thread."""
+        return threading.current_thread() is self._thread
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            # Cancel whatever is still scheduled (e.g. health check loops) so
+            # their cleanup runs before the loop is closed
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine on the runner loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the runner loop and wait for its result.
+
+        Args:
+            coro: The coroutine to run
+            timeout: Maximum time to wait in seconds, or None to wait indefinitely
+
+        Raises:
+            RuntimeError: If called from the runner thread itself (it would deadlock)
+            concurrent.futures.TimeoutError: If the coroutine does not finish in time;
+                the coroutine is cancelled
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("Cannot block on the MCP client loop from its own thread")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the loop and wait for the runner thread to exit."""
+        if self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        except RuntimeError:
+            # The loop was closed in the meantime
+            return
+        if not self.in_loop_thread():
+            self._thread.join(timeout)
+
+
 class MCPClient(MCPClientInterface):
     """Implementation of the MCP Client."""
 
@@ -105,11 +194,23 @@ class MCPClient(MCPClientInterface):
                 logger.error("Install AWS dependencies with: pip install boto3")
                 raise
         
+        # Set up a lock for thread safety
+        self._lock = threading.RLock()
+
+        # Synchronous APIs run on a dedicated long-lived loop. When the client
+        # is created inside a running loop the runner is started lazily, on the
+        # first synchronous call.
+        self._loop_runner: Optional[_LoopRunner] = None
+        if config.use_background_loop and not self._in_async_context():
+            self._loop_runner = _LoopRunner()
+
         # Set up security middleware
         self._security_middleware = SecurityMiddleware()
         logger.info("Security middleware initialized")
         
-        self._protocol_handler = protocol_handler or MCPProtocolHandler()
+        self._protocol_handler = protocol_handler or MCPProtocolHandler(
+            trusted_server=config.trust_server_responses
+        )
         
         # Create transport factory and multi-transport
         if transport:
@@ -131,6 +232,10 @@ class MCPClient(MCPClientInterface):
                 cert_fingerprints=config.cert_fingerprints,
                 cipher_suites=config.cipher_suites,
                 authenticator=self._aws_authenticator,
+                connection_pool_size_per_server=config.connection_pool_size_per_server,
+                keepalive_timeout_seconds=config.keepalive_timeout_seconds,
+                batch_window_seconds=config.batch_window_seconds,
+                max_response_bytes=config.max_response_bytes,
             )
             self._transport = MultiTransport(transport_factory)
             self._transport_factory = transport_factory
@@ -155,9 +260,6 @@ class MCPClient(MCPClientInterface):
         # Set up a thread pool for synchronous operations
         self._thread_pool = ThreadPoolExecutor(max_workers=10)
         
-        # Set up a lock for thread safety
-        self._lock = threading.RLock()
-        
         # Set up the plugin manager
         self._plugin_manager = PluginManager()
         
@@ -167,6 +269,11 @@ class MCPClient(MCPClientInterface):
                 self._plugin_manager.register_plugin(plugin)
                 
         # Execute the CLIENT_INIT hook
+        if self._loop_runner is not None:
+            self._loop_runner.run(self._plugin_manager.execute_hook(PluginHook.CLIENT_INIT, self))
+            logger.info(f"Initialized MCP Client with discovery mode: {config.discovery_mode}")
+            return
+
         try:
             loop = asyncio.get_running_loop()
             # We're in an async context, we can create a task
@@ -181,7 +288,13 @@ class MCPClient(MCPClientInterface):
     def __del__(self):
         """Clean up resources when the client is deleted."""
         # Shut down the thread pool
-        self._thread_pool.shutdown(wait=False)
+        if hasattr(self, "_thread_pool"):
+            self._thread_pool.shutdown(wait=False)
+
+        # Let the background loop thread exit without waiting for it
+        runner = getattr(self, "_loop_runner", None)
+        if runner is not None:
+            runner.stop(timeout=0)
         
         # Note: We don't stop the server discovery here because it might cause issues
         # with the event loop. The server discovery should be stopped explicitly by the user
@@ -197,6 +310,18 @@ class MCPClient(MCPClientInterface):
         
     async def close(self) -> None:
         """Close the client and release resources."""
+        runner = self._loop_runner
+        if runner is not None and runner.is_running and not runner.in_loop_thread():
+            # Transports and discovery tasks live on the background loop, so
+            # they have to be closed there
+            await asyncio.wrap_future(runner.submit(self._close_resources()))
+            await asyncio.to_thread(runner.stop)
+            self._loop_runner = None
+        else:
+            await self._close_resources()
+
+    async def _close_resources(self) -> None:
+        """Run the close hooks and release plugins, discovery and transports."""
         # Execute the CLIENT_CLOSE hook
         try:
             await self._plugin_manager.execute_hook(PluginHook.CLIENT_CLOSE, self)
@@ -237,6 +362,18 @@ class MCPClient(MCPClientInterface):
         
     def close_sync(self) -> None:
         """Synchronous version of close."""
+        runner = self._loop_runner
+        if runner is not None:
+            try:
+                runner.run(self._close_resources(), timeout=self._sync_timeout())
+            except Exception as e:
+                logger.error(f"Error closing client: {e}")
+                raise
+            finally:
+                runner.stop()
+                self._loop_runner = None
+            return
+
         with self._lock:
             try:
                 # Try to get the running loop - this will raise RuntimeError if there's no running loop
@@ -253,8 +390,59 @@ class MCPClient(MCPClientInterface):
                 logger.error(f"Error closing client: {e}")
                 raise
         
+    @staticmethod
+    def _in_async_context() -> bool:
+        """Whether the caller is running inside an event loop."""
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    def _get_loop_runner(self) -> Optional[_LoopRunner]:
+        """Return the background loop runner, starting it on first use."""
+        if not self.config.use_background_loop:
+            return None
+        with self._lock:
+            if self._loop_runner is None or not self._loop_runner.is_running:
+                self._loop_runner = _LoopRunner()
+            return self._loop_runner
+
+    def _sync_timeout(self) -> Optional[float]:
+        """Upper bound on how long a synchronous call waits for its coroutine."""
+        if self.config.sync_timeout_seconds is not None:
+            return self.config.sync_timeout_seconds
+        # Leave room for every transport attempt plus the backoff between them
+        retries = self.config.max_retries
+        backoff = self.config.retry_backoff_factor * (2 ** retries - 1)
+        return self.config.timeout_seconds * (retries + 1) + backoff
+
+    async def _on_client_loop(self, coro) -> Any:
+        """
+        Await a coroutine on the loop that owns the client's transports and discovery.
+
+        When the client was created outside a running loop, its aiohttp sessions,
+        circuit breakers and health check tasks live on the background loop, so
+        async calls made from any other loop are forwarded there.
+        """
+        runner = self._loop_runner
+        if runner is None or not runner.is_running or runner.in_loop_thread():
+            return await coro
+        return await asyncio.wrap_future(runner.submit(coro))
+
+    def _record_server_outcome(self, server_id: str, success: bool):
+        """Pass a request outcome to the registry as a passive health signal."""
+        record = getattr(self._server_discovery, "record_request_outcome", None)
+        if record is not None:
+            record(server_id, success)
+
     def _start_server_discovery(self):
         """Start the server discovery background task."""
+        if self._loop_runner is not None:
+            # The health check task keeps running on the background loop
+            self._loop_runner.run(self._server_discovery.start())
+            return
+
         try:
             # Try to get the running loop - this will raise RuntimeError if there's no running loop
             loop = asyncio.get_running_loop()
@@ -267,6 +455,11 @@ class MCPClient(MCPClientInterface):
             
     def _register_static_servers(self, servers):
         """Register static servers from the configuration."""
+        if self._loop_runner is not None:
+            self._loop_runner.run(self._register_static_servers_async(servers))
+            self._registration_task = None  # Already completed synchronously
+            return
+
         try:
             # Try to get the running loop - this will raise RuntimeError if there's no running loop
             loop = asyncio.get_running_loop()
@@ -329,6 +522,10 @@ class MCPClient(MCPClientInterface):
         Raises:
             MCPError: If the request fails
         """
+        return await self._on_client_loop(self._send_request(request))
+
+    async def _send_request(self, request: MCPRequest) -> MCPResponse:
+        """Send a request on the current loop."""
         # Generate request ID for correlation
         request_id = uuid4().hex
         start_time = time.time()
@@ -357,7 +554,8 @@ class MCPClient(MCPClientInterface):
             self._performance_logger.end_timer(security_timer, "security_validation")
             
             # Execute the PRE_SERVER_SELECTION hook
-            await self._plugin_manager.execute_hook(PluginHook.PRE_SERVER_SELECTION, self, request)
+            if self._plugin_manager.has_handlers(PluginHook.PRE_SERVER_SELECTION):
+                await self._plugin_manager.execute_hook(PluginHook.PRE_SERVER_SELECTION, self, request)
             
             # Select a server
             selection_timer = self._performance_logger.start_timer("server_selection")
@@ -379,22 +577,34 @@ class MCPClient(MCPClientInterface):
             logger.info(f"Selected server {server.server_id} for request")
             
             # Execute the POST_SERVER_SELECTION hook
-            await self._plugin_manager.execute_hook(PluginHook.POST_SERVER_SELECTION, self, request, server)
+            if self._plugin_manager.has_handlers(PluginHook.POST_SERVER_SELECTION):
+                await self._plugin_manager.execute_hook(PluginHook.POST_SERVER_SELECTION, self, request, server)
             
             # Format the request
             format_timer = self._performance_logger.start_timer("request_formatting")
-            formatted_request = self._protocol_handler.format_request(request)
+            if isinstance(self._protocol_handler, MCPProtocolHandler):
+                # The request was validated above; don't validate it twice
+                formatted_request = self._protocol_handler.format_request(request, validated=True)
+            else:
+                formatted_request = self._protocol_handler.format_request(request)
             self._performance_logger.end_timer(format_timer, "request_formatting")
             
             # Execute the PRE_REQUEST hook
-            await self._plugin_manager.execute_hook(PluginHook.PRE_REQUEST, self, request, server, formatted_request)
+            if self._plugin_manager.has_handlers(PluginHook.PRE_REQUEST):
+                await self._plugin_manager.execute_hook(PluginHook.PRE_REQUEST, self, request, server, formatted_request)
             
             # Log the outgoing request
             log_request(logger.logger, request, server)
             
             # Send the request
             transport_timer = self._performance_logger.start_timer("transport_request")
-            raw_response = await self._transport.send_request(server, formatted_request)
+            try:
+                raw_response = await self._transport.send_request(server, formatted_request)
+            except MCPError as e:
+                if e.error_code in (ErrorCode.TRANSPORT_ERROR, ErrorCode.TIMEOUT_ERROR):
+                    self._record_server_outcome(server.server_id, False)
+                raise
+            self._record_server_outcome(server.server_id, True)
             transport_duration = self._performance_logger.end_timer(transport_timer, "transport_request")
             
             # Parse the response
@@ -410,7 +620,8 @@ class MCPClient(MCPClientInterface):
             log_response(logger.logger, response, duration=total_duration)
             
             # Execute the POST_REQUEST hook
-            await self._plugin_manager.execute_hook(PluginHook.POST_REQUEST, self, request, server, response)
+            if self._plugin_manager.has_handlers(PluginHook.POST_REQUEST):
+                await self._plugin_manager.execute_hook(PluginHook.POST_REQUEST, self, request, server, response)
             
             # Check for errors
             if response.status == ResponseStatus.ERROR:
@@ -428,7 +639,8 @@ class MCPClient(MCPClientInterface):
                 })
                 
                 # Execute the ERROR_OCCURRED hook
-                await self._plugin_manager.execute_hook(PluginHook.ERROR_OCCURRED, self, error)
+                if self._plugin_manager.has_handlers(PluginHook.ERROR_OCCURRED):
+                    await self._plugin_manager.execute_hook(PluginHook.ERROR_OCCURRED, self, error)
                 
                 raise error
             
@@ -460,7 +672,8 @@ class MCPClient(MCPClientInterface):
             log_error(logger.logger, e, {"request_id": request_id})
             
             # Execute the ERROR_OCCURRED hook
-            await self._plugin_manager.execute_hook(PluginHook.ERROR_OCCURRED, self, e)
+            if self._plugin_manager.has_handlers(PluginHook.ERROR_OCCURRED):
+                await self._plugin_manager.execute_hook(PluginHook.ERROR_OCCURRED, self, e)
             
             # End performance timer with error
             self._performance_logger.end_timer(timer_id, "send_request", 
@@ -492,7 +705,8 @@ class MCPClient(MCPClientInterface):
             log_error(logger.logger, error, {"request_id": request_id})
             
             # Execute the ERROR_OCCURRED hook
-            await self._plugin_manager.execute_hook(PluginHook.ERROR_OCCURRED, self, error)
+            if self._plugin_manager.has_handlers(PluginHook.ERROR_OCCURRED):
+                await self._plugin_manager.execute_hook(PluginHook.ERROR_OCCURRED, self, error)
             
             # End performance timer with error
             self._performance_logger.end_timer(timer_id, "send_request", 
@@ -525,6 +739,28 @@ class MCPClient(MCPClientInterface):
         Returns:
             bool: True if registration completed successfully, False if timeout
         """
+        if self.config.use_background_loop:
+            task = getattr(self, "_registration_task", None)
+            if task is None:
+                return True
+            # The registration task belongs to the loop the client was created in
+            task_loop = task.get_loop()
+            if self._in_async_context() and asyncio.get_running_loop() is task_loop:
+                logger.error("Cannot call wait_for_server_registration_sync from the loop that owns the registration")
+                return False
+            future = asyncio.run_coroutine_threadsafe(self.wait_for_server_registration(timeout_seconds), task_loop)
+            try:
+                # The margin lets the coroutine report its own timeout; past it the
+                # owning loop is not running and the wait is abandoned
+                return future.result(timeout_seconds + 5.0)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                logger.warning(f"Server registration timed out after {timeout_seconds} seconds")
+                return False
+            except Exception as e:
+                logger.error(f"Error in synchronous server registration wait: {e}")
+                return False
+
         with self._lock:
             try:
                 # Try to get the running loop - this will raise RuntimeError if there's no running loop
@@ -554,6 +790,26 @@ class MCPClient(MCPClientInterface):
         Raises:
             MCPError: If the request fails
         """
+        runner = self._get_loop_runner()
+        if runner is not None:
+            timeout = self._sync_timeout()
+            try:
+                return runner.run(self._send_request(request), timeout=timeout)
+            except MCPError:
+                raise
+            except concurrent.futures.TimeoutError as e:
+                raise MCPError(
+                    error_code=ErrorCode.TIMEOUT_ERROR,
+                    message=f"Synchronous request timed out after {timeout} seconds",
+                    details={"timeout_seconds": timeout},
+                ) from e
+            except Exception as e:
+                raise MCPError(
+                    error_code=ErrorCode.CLIENT_ERROR,
+                    message=f"Client error in synchronous request: {str(e)}",
+                    details={"exception_type": type(e).__name__},
+                ) from e
+
         # Use the thread pool to run the async method
         with self._lock:
             try:
@@ -588,7 +844,7 @@ class MCPClient(MCPClientInterface):
         Returns:
             bool: True if the server was registered successfully, False otherwise
         """
-        return await self._server_discovery.register_server(server_info)
+        return await self._on_client_loop(self._server_discovery.register_server(server_info))
         
     def register_server_sync(self, server_info: MCPServerInfo) -> bool:
         """
@@ -600,6 +856,10 @@ class MCPClient(MCPClientInterface):
         Returns:
             bool: True if the server was registered successfully, False otherwise
         """
+        runner = self._get_loop_runner()
+        if runner is not None:
+            return runner.run(self._server_discovery.register_server(server_info), timeout=self._sync_timeout())
+
         # Use the thread pool to run the async method
         with self._lock:
             try:
@@ -623,7 +883,7 @@ class MCPClient(MCPClientInterface):
         Returns:
             List[MCPServerInfo]: A list of available servers
         """
-        servers = await self._server_discovery.discover_servers()
+        servers = await self._on_client_loop(self._server_discovery.discover_servers())
         
         if capabilities:
             # Filter servers by capabilities
@@ -645,6 +905,10 @@ class MCPClient(MCPClientInterface):
         Returns:
             List[MCPServerInfo]: A list of available servers
         """
+        runner = self._get_loop_runner()
+        if runner is not None:
+            return runner.run(self.get_servers(capabilities), timeout=self._sync_timeout())
+
         # Use the thread pool to run the async method
         with self._lock:
             try:
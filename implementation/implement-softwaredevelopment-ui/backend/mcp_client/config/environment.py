@@ -48,6 +48,10 @@ class EnvironmentConfig:
     timeout_seconds: float = 120.0  # Increased from 30 to 120 seconds for complex operations
     max_retries: int = 3
     retry_backoff_factor: float = 1.5
+    use_background_loop: bool = True
+    connection_pool_size_per_server: int = 50
+    keepalive_timeout_seconds: float = 30.0
+    batch_window_seconds: float = 0.0
     
     # Discovery Configuration
     discovery_mode: DiscoveryMode = DiscoveryMode.DYNAMIC
@@ -96,6 +100,12 @@ def load_config_from_env() -> EnvironmentConfig:
     config.timeout_seconds = _get_float_env("MCP_TIMEOUT_SECONDS", config.timeout_seconds)
     config.max_retries = _get_int_env("MCP_MAX_RETRIES", config.max_retries)
     config.retry_backoff_factor = _get_float_env("MCP_RETRY_BACKOFF_FACTOR", config.retry_backoff_factor)
+    config.use_background_loop = _get_bool_env("MCP_USE_BACKGROUND_LOOP", config.use_background_loop)
+    config.connection_pool_size_per_server = _get_int_env(
+        "MCP_CONNECTION_POOL_SIZE_PER_SERVER", config.connection_pool_size_per_server
+    )
+    config.keepalive_timeout_seconds = _get_float_env("MCP_KEEPALIVE_TIMEOUT_SECONDS", config.keepalive_timeout_seconds)
+    config.batch_window_seconds = _get_float_env("MCP_BATCH_WINDOW_SECONDS", config.batch_window_seconds)
     
     # Discovery settings
     discovery_mode_str = os.getenv("MCP_DISCOVERY_MODE", config.discovery_mode.value)
@@ -220,6 +230,10 @@ def create_mcp_client_config(env_config: Optional[EnvironmentConfig] = None) ->
         timeout_seconds=env_config.timeout_seconds,
         max_retries=env_config.max_retries,
         retry_backoff_factor=env_config.retry_backoff_factor,
+        use_background_loop=env_config.use_background_loop,
+        connection_pool_size_per_server=env_config.connection_pool_size_per_server,
+        keepalive_timeout_seconds=env_config.keepalive_timeout_seconds,
+        batch_window_seconds=env_config.batch_window_seconds,
         use_tls=env_config.use_tls,
         verify_ssl=env_config.verify_ssl,
         min_tls_version=env_config.min_tls_version,
@@ -57,8 +57,18 @@ class MCPClientConfig(BaseModel):
     timeout_seconds: float = 30.0
     max_retries: int = 3
     retry_backoff_factor: float = 1.5
+    connection_pool_size_per_server: int = 50  # Connections per host, so one failing server can't drain the pool
+    keepalive_timeout_seconds: float = 30.0  # Keep below the idle timeout of load balancers / function URLs
+    batch_window_seconds: float = 0.0  # Coalesce JSON-RPC calls to servers with metadata["supports_batch"]
+    max_response_bytes: Optional[int] = None
+
+    # Synchronous API configuration: run sync calls on one long-lived
+    # background event loop instead of a new loop per call
+    use_background_loop: bool = True
+    sync_timeout_seconds: Optional[float] = None  # None derives it from timeout and retries
 
     # Security configuration
+    trust_server_responses: bool = False  # Skip pydantic re-validation of server responses
     use_tls: bool = True
     verify_ssl: bool = True
     cert_path: Optional[str] = None  # Deprecated, use client_cert_path
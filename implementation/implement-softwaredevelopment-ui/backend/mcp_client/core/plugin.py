@@ -5,13 +5,16 @@ Plugin architecture for the MCP Client.
 import abc
 import asyncio
 import logging
+import time
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Type, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
 
 from mcp_client.core.models import MCPRequest, MCPResponse, MCPServerInfo
 
 logger = logging.getLogger(__name__)
 
+_perf_counter = time.perf_counter
+
 
 class PluginHook(Enum):
     """Enum defining the available hook points for plugins."""
@@ -102,6 +105,19 @@ class MCPPlugin(abc.ABC):
                 
         return hooks
         
+    @property
+    def independent(self) -> bool:
+        """
+        Whether this plugin's handlers can run concurrently with other plugins.
+        
+        Independent handlers must not rely on side effects of other plugins
+        (e.g. mutations of the request) for the same hook.
+        
+        Returns:
+            bool: True if the handlers can run concurrently, False to run them in order
+        """
+        return False
+        
     def initialize(self, config: Dict[str, Any]) -> None:
         """
         Initialize the plugin with configuration.
@@ -134,13 +150,76 @@ def hook(hook_point: PluginHook):
     return decorator
 
 
+class _PluginStats:
+    """Hook latency accounting for one plugin."""
+    
+    __slots__ = ("calls", "errors", "timeouts", "slow_calls", "total_seconds", "max_seconds")
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.slow_calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "slow_calls": self.slow_calls,
+            "total_seconds": self.total_seconds,
+            "max_seconds": self.max_seconds,
+            "avg_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+        }
+
+
+class _HookHandler:
+    """A registered hook handler with the facts needed to dispatch it."""
+    
+    __slots__ = ("plugin", "method", "handler", "is_coroutine", "stats")
+    
+    def __init__(self, plugin: str, method: str, handler: Callable[..., Any], stats: _PluginStats):
+        self.plugin = plugin
+        self.method = method
+        self.handler = handler
+        self.is_coroutine = asyncio.iscoroutinefunction(handler)
+        self.stats = stats
+
+
+# Returned by PluginManager._run_handler when a handler failed
+_FAILED = object()
+
+
+# Handlers for one hook: those that must run in registration order, and
+# those from independent plugins that run concurrently afterwards
+_HookDispatch = Tuple[Tuple[_HookHandler, ...], Tuple[_HookHandler, ...]]
+
+
 class PluginManager:
     """Manager for MCP Client plugins."""
     
-    def __init__(self):
-        """Initialize the plugin manager."""
+    def __init__(
+        self,
+        slow_hook_threshold_seconds: float = 0.05,
+        hook_timeout_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the plugin manager.
+        
+        Args:
+            slow_hook_threshold_seconds: Handlers taking longer than this are logged as slow
+            hook_timeout_seconds: Cancel async handlers running longer than this, or None
+                to let them run to completion
+        """
+        self.slow_hook_threshold_seconds = slow_hook_threshold_seconds
+        self.hook_timeout_seconds = hook_timeout_seconds
         self._plugins: Dict[str, MCPPlugin] = {}
-        self._hook_handlers: Dict[PluginHook, List[Dict[str, Any]]] = {}
+        self._hook_handlers: Dict[PluginHook, List[_HookHandler]] = {}
+        self._independent: Set[str] = set()
+        self._dispatch: Dict[PluginHook, _HookDispatch] = {}
+        self._plugin_stats: Dict[str, _PluginStats] = {}
         
     def register_plugin(self, plugin: MCPPlugin, config: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -158,22 +237,28 @@ class PluginManager:
         # Initialize the plugin
         plugin.initialize(config or {})
         
+        # Drop the handlers of a plugin being replaced
+        if plugin_name in self._plugins:
+            self._remove_handlers(plugin_name)
+            
         # Register the plugin
         self._plugins[plugin_name] = plugin
+        if plugin.independent:
+            self._independent.add(plugin_name)
+        else:
+            self._independent.discard(plugin_name)
+        stats = self._plugin_stats.setdefault(plugin_name, _PluginStats())
         
         # Register hook handlers
         for hook_point, method_names in plugin.hooks.items():
             if hook_point not in self._hook_handlers:
                 self._hook_handlers[hook_point] = []
                 
-            for method_name in method_names:
+            for method_name in sorted(method_names):
                 handler = getattr(plugin, method_name)
-                self._hook_handlers[hook_point].append({
-                    "plugin": plugin_name,
-                    "method": method_name,
-                    "handler": handler,
-                })
+                self._hook_handlers[hook_point].append(_HookHandler(plugin_name, method_name, handler, stats))
                 
+        self._rebuild_dispatch()
         logger.info(f"Registered plugin {plugin_name} v{plugin.version}")
         
     def unregister_plugin(self, plugin_name: str) -> bool:
@@ -191,21 +276,67 @@ class PluginManager:
             return False
             
         # Remove hook handlers
+        self._remove_handlers(plugin_name)
+                
+        # Remove the plugin
+        plugin = self._plugins.pop(plugin_name)
+        self._independent.discard(plugin_name)
+        self._plugin_stats.pop(plugin_name, None)
+        self._rebuild_dispatch()
+        
+        logger.info(f"Unregistered plugin {plugin_name}")
+        return True
+        
+    def _remove_handlers(self, plugin_name: str) -> None:
+        """Remove all hook handlers registered by a plugin."""
         for hook_point in list(self._hook_handlers.keys()):
             self._hook_handlers[hook_point] = [
                 handler for handler in self._hook_handlers[hook_point]
-                if handler["plugin"] != plugin_name
+                if handler.plugin != plugin_name
             ]
             
             # Remove empty hook points
             if not self._hook_handlers[hook_point]:
                 del self._hook_handlers[hook_point]
                 
-        # Remove the plugin
-        plugin = self._plugins.pop(plugin_name)
+    def _rebuild_dispatch(self) -> None:
+        """
+        Precompute the dispatch table used by execute_hook.
         
-        logger.info(f"Unregistered plugin {plugin_name}")
-        return True
+        Called whenever plugins change, so dispatching a hook never has to
+        inspect plugins or handlers.
+        """
+        dispatch = {}
+        for hook_point, handlers in self._hook_handlers.items():
+            ordered = tuple(h for h in handlers if h.plugin not in self._independent)
+            concurrent = tuple(h for h in handlers if h.plugin in self._independent)
+            dispatch[hook_point] = (ordered, concurrent)
+        self._dispatch = dispatch
+        
+    def has_handlers(self, hook_point: PluginHook) -> bool:
+        """
+        Check whether any plugin subscribes to a hook point.
+        
+        Callers on hot paths use this to skip building and awaiting
+        execute_hook entirely when nobody is listening.
+        
+        Args:
+            hook_point: The hook point to check
+            
+        Returns:
+            bool: True if at least one handler is registered for the hook point
+        """
+        return hook_point in self._dispatch
+        
+    def get_plugin_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-plugin hook latency statistics.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Call counts, errors, timeouts, slow calls and
+                total/max/average handler time in seconds, keyed by plugin name
+        """
+        return {plugin_name: stats.to_dict() for plugin_name, stats in self._plugin_stats.items()}
         
     def get_plugin(self, plugin_name: str) -> Optional[MCPPlugin]:
         """
@@ -242,32 +373,83 @@ class PluginManager:
         Returns:
             Dict[str, Any]: A dictionary mapping plugin names to handler results
         """
-        results = {}
-        
-        if hook_point not in self._hook_handlers:
-            return results
+        dispatch = self._dispatch.get(hook_point)
+        if dispatch is None:
+            return {}
             
-        for handler_info in self._hook_handlers[hook_point]:
-            plugin_name = handler_info["plugin"]
-            method_name = handler_info["method"]
-            handler = handler_info["handler"]
-            
-            try:
-                # Check if the handler is a coroutine function
-                if asyncio.iscoroutinefunction(handler):
-                    result = await handler(*args, **kwargs)
-                else:
-                    result = handler(*args, **kwargs)
-                    
-                results[plugin_name] = result
+        results = {}
+        ordered, concurrent = dispatch
+        for handler_info in ordered:
+            result = await self._run_handler(hook_point, handler_info, args, kwargs)
+            if result is not _FAILED:
+                results[handler_info.plugin] = result
                 
-            except Exception as e:
-                logger.error(
-                    f"Error executing hook {hook_point.value} in plugin {plugin_name}.{method_name}: {e}"
+        if concurrent:
+            if len(concurrent) == 1:
+                outcomes = [await self._run_handler(hook_point, concurrent[0], args, kwargs)]
+            else:
+                outcomes = await asyncio.gather(
+                    *(self._run_handler(hook_point, h, args, kwargs) for h in concurrent)
                 )
-                
+            for handler_info, result in zip(concurrent, outcomes):
+                if result is not _FAILED:
+                    results[handler_info.plugin] = result
+                    
         return results
         
+    async def _run_handler(
+        self, hook_point: PluginHook, handler_info: _HookHandler, args: tuple, kwargs: Dict[str, Any]
+    ) -> Any:
+        """
+        Run one handler, recording its latency and isolating its errors.
+        
+        Returns:
+            Any: The handler's result, or _FAILED if it raised or timed out
+        """
+        stats = handler_info.stats
+        result = _FAILED
+        started = _perf_counter()
+        try:
+            if not handler_info.is_coroutine:
+                result = handler_info.handler(*args, **kwargs)
+            elif self.hook_timeout_seconds is None:
+                result = await handler_info.handler(*args, **kwargs)
+            else:
+                result = await asyncio.wait_for(handler_info.handler(*args, **kwargs), self.hook_timeout_seconds)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            logger.error(
+                f"Hook {hook_point.value} in plugin {handler_info.plugin}.{handler_info.method} "
+                f"timed out after {self.hook_timeout_seconds}s"
+            )
+        except Exception as e:
+            stats.errors += 1
+            logger.error(
+                f"Error executing hook {hook_point.value} in plugin {handler_info.plugin}.{handler_info.method}: {e}"
+            )
+            
+        elapsed = _perf_counter() - started
+        stats.calls += 1
+        stats.total_seconds += elapsed
+        if elapsed > stats.max_seconds:
+            stats.max_seconds = elapsed
+        if elapsed > self.slow_hook_threshold_seconds:
+            self._report_slow(hook_point, handler_info, elapsed)
+        return result
+        
+    @staticmethod
+    def _report_slow(hook_point: PluginHook, handler_info: _HookHandler, elapsed: float) -> None:
+        """Slow-plugin watchdog: count the call and log it, rate limited."""
+        stats = handler_info.stats
+        stats.slow_calls += 1
+        # Log the first slow call and then every 100th, so a consistently
+        # slow plugin doesn't flood the logs
+        if stats.slow_calls % 100 == 1:
+            logger.warning(
+                f"Slow plugin hook {hook_point.value} in {handler_info.plugin}.{handler_info.method}: "
+                f"{elapsed * 1000:.1f}ms (slow calls: {stats.slow_calls})"
+            )
+        
     async def shutdown(self) -> None:
         """
         Shut down all plugins and release resources.
@@ -280,4 +462,6 @@ class PluginManager:
                 logger.error(f"Error shutting down plugin {plugin_name}: {e}")
                 
         self._plugins.clear()
-        self._hook_handlers.clear()
\ No newline at end of file
+        self._hook_handlers.clear()
+        self._independent.clear()
+        self._dispatch = {}
\ No newline at end of file
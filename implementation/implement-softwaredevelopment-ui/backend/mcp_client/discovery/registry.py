@@ -3,10 +3,11 @@ Server registry implementation for the MCP Client.
 """
 
 import asyncio
+import heapq
 import logging
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Type, Union
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple, Type, Union
 
 from mcp_client.core.interfaces import ServerDiscovery
 from mcp_client.core.models import ErrorCode, MCPError, MCPRequest, MCPServerInfo, ServerStatus
@@ -20,9 +21,75 @@ from mcp_client.transport.http import HTTPTransport
 
 logger = logging.getLogger(__name__)
 
+# Consecutive successful observations before a server counts as stable and
+# its probe interval starts to grow
+STABLE_AFTER_SUCCESSES = 3
+
+
+class _HealthState:
+    """Health-check bookkeeping for one registered server."""
+
+    def __init__(self, server_id: str, interval: float, last_seen_at: float):
+        self.server_id = server_id
+        self.interval = interval
+        self.consecutive_successes = STABLE_AFTER_SUCCESSES
+        self.next_check = 0.0
+        self.scheduled_at: Optional[float] = None  # Due time of the live heap entry, None while probing
+        self.last_seen_at = last_seen_at
+
+
+class _ExpiryWheel:
+    """
+    Hashed timer wheel for server expiry.
+
+    Deadlines are bucketed by tick. Entries are not moved when a server is
+    seen again; a fired entry whose server is still fresh is re-inserted at
+    its new deadline, so keeping a server alive costs nothing per request.
+    """
+
+    def __init__(self, tick_seconds: float):
+        self.tick_seconds = tick_seconds
+        self._buckets: Dict[int, List[_HealthState]] = {}
+        self._cursor: Optional[int] = None
+
+    def schedule(self, state: _HealthState, deadline: float) -> None:
+        slot = int(deadline // self.tick_seconds)
+        if self._cursor is not None and slot < self._cursor:
+            slot = self._cursor
+        self._buckets.setdefault(slot, []).append(state)
+
+    def advance(self, now: float) -> List[_HealthState]:
+        """Pop every entry whose tick has passed."""
+        current = int(now // self.tick_seconds)
+        if not self._buckets:
+            self._cursor = current + 1
+            return []
+        if self._cursor is None:
+            self._cursor = min(self._buckets)
+
+        due: List[_HealthState] = []
+        while self._cursor <= current:
+            due.extend(self._buckets.pop(self._cursor, ()))
+            self._cursor += 1
+        return due
+
+    def next_tick_time(self) -> Optional[float]:
+        if not self._buckets:
+            return None
+        return min(self._buckets) * self.tick_seconds
+
 
 class InMemoryServerRegistry(ServerDiscovery):
-    """In-memory implementation of the server registry."""
+    """
+    In-memory implementation of the server registry.
+
+    Each server has its own health-check schedule. Probes run concurrently
+    up to a global limit. Servers that are failing or flapping are probed
+    at the minimum interval; stable servers back off towards the maximum.
+    Successful requests reported through record_request_outcome count as
+    health checks, so servers with traffic are rarely probed. Expiry is
+    tracked with a timer wheel instead of scanning every server.
+    """
 
     def __init__(
         self,
@@ -30,6 +97,10 @@ class InMemoryServerRegistry(ServerDiscovery):
         server_ttl_seconds: float = 300.0,
         transport: Optional[HTTPTransport] = None,
         selection_strategy: Optional[ServerSelectionStrategy] = None,
+        max_concurrent_health_checks: int = 10,
+        min_health_check_interval_seconds: Optional[float] = None,
+        max_health_check_interval_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
     ):
         """
         Initialize the in-memory server registry.
@@ -38,14 +109,47 @@ class InMemoryServerRegistry(ServerDiscovery):
             health_check_interval_seconds: Interval between health checks in seconds
             server_ttl_seconds: Time-to-live for server entries in seconds
             transport: Transport to use for health checks, or None to create a new one
+            selection_strategy: Server selection strategy, or None for preferred-then-round-robin
+            max_concurrent_health_checks: Maximum number of health probes in flight at once
+            min_health_check_interval_seconds: Probe interval for failing or flapping servers
+                (defaults to a sixth of the base interval)
+            max_health_check_interval_seconds: Longest probe interval for stable servers
+                (defaults to twice the base interval, capped at half the TTL)
+            clock: Monotonic clock used for scheduling (injectable for simulations)
         """
         self.health_check_interval_seconds = health_check_interval_seconds
         self.server_ttl_seconds = server_ttl_seconds
+        self.max_concurrent_health_checks = max(1, max_concurrent_health_checks)
+        self.min_health_check_interval_seconds = min(
+            health_check_interval_seconds,
+            min_health_check_interval_seconds or health_check_interval_seconds / 6,
+        )
+        # Stable servers must still be seen well within the TTL
+        self.max_health_check_interval_seconds = max(
+            health_check_interval_seconds,
+            min(max_health_check_interval_seconds or health_check_interval_seconds * 2, server_ttl_seconds / 2),
+        )
+        self._clock = clock
         self._servers: Dict[str, MCPServerInfo] = {}
         self._capabilities_index: Dict[str, Set[str]] = {}  # capability -> set of server_ids
         self._transport = transport or HTTPTransport()
         self._health_check_task: Optional[asyncio.Task] = None
         self._lock = asyncio.Lock()
+
+        self._health: Dict[str, _HealthState] = {}
+        self._probe_heap: List[Tuple[float, int, str]] = []
+        self._probe_seq = 0
+        self._probe_tasks: Set[asyncio.Task] = set()
+        self._probe_semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._expiry_wheel = _ExpiryWheel(max(server_ttl_seconds / 64, 0.01))
+        self.health_check_stats = {
+            'probes': 0,
+            'probe_failures': 0,
+            'passive_successes': 0,
+            'passive_failures': 0,
+            'expired': 0,
+        }
         
         # Set up the selection strategy
         if selection_strategy is None:
@@ -79,31 +183,104 @@ class InMemoryServerRegistry(ServerDiscovery):
             self._health_check_task = None
             logger.info("Stopped server health check background task")
             
+        probe_tasks = list(self._probe_tasks)
+        for task in probe_tasks:
+            task.cancel()
+        if probe_tasks:
+            await asyncio.gather(*probe_tasks, return_exceptions=True)
+        self._probe_tasks.clear()
+            
     async def _health_check_loop(self) -> None:
-        """Background task to periodically check server health and remove expired servers."""
+        """Background task that starts due health checks and removes expired servers."""
+        self._wakeup = asyncio.Event()
+        # One waiter task is kept across timeouts and awaited with
+        # asyncio.wait, which never swallows a cancellation: wait_for can
+        # drop one that lands in the same pass as a _schedule_probe wake-up,
+        # and stop() would then wait forever
+        waiter: Optional[asyncio.Task] = None
         try:
             while True:
-                await self._check_all_servers_health()
+                self._wakeup.clear()
+                self._start_due_health_checks(self._clock())
                 await self._remove_expired_servers()
-                await asyncio.sleep(self.health_check_interval_seconds)
+                
+                if waiter is None or waiter.done():
+                    waiter = asyncio.create_task(self._wakeup.wait())
+                await asyncio.wait((waiter,), timeout=self._next_wakeup_delay(self._clock()))
         except asyncio.CancelledError:
             logger.debug("Health check loop cancelled")
             raise
         except Exception as e:
             logger.error(f"Error in health check loop: {e}")
+        finally:
+            if waiter is not None:
+                waiter.cancel()
             
-    async def _check_all_servers_health(self) -> None:
-        """Check the health of all registered servers."""
-        logger.debug("Starting health check for all servers")
+    def _next_wakeup_delay(self, now: float) -> float:
+        """Seconds until the next probe or expiry tick is due."""
+        wake_at = now + self.health_check_interval_seconds
+        if self._probe_heap:
+            wake_at = min(wake_at, self._probe_heap[0][0])
+        next_tick = self._expiry_wheel.next_tick_time()
+        if next_tick is not None:
+            wake_at = min(wake_at, next_tick)
+        # Everything due now was just handled; don't spin on clock rounding
+        return max(0.01, wake_at - now)
         
-        async with self._lock:
-            server_ids = list(self._servers.keys())
+    def _schedule_probe(self, state: _HealthState, due: float) -> None:
+        """Make ``due`` the server's next probe time; older heap entries go stale."""
+        state.next_check = due
+        state.scheduled_at = due
+        self._probe_seq += 1
+        heapq.heappush(self._probe_heap, (due, self._probe_seq, state.server_id))
+        if self._wakeup is not None and self._probe_heap[0][1] == self._probe_seq:
+            # The new entry is the earliest one; the loop may be sleeping past it
+            self._wakeup.set()
+        
+    def _pop_due_servers(self, now: float) -> List[str]:
+        """Pop servers whose probe is due, skipping stale heap entries."""
+        due_ids = []
+        heap = self._probe_heap
+        while heap and heap[0][0] <= now:
+            due, _, server_id = heapq.heappop(heap)
+            state = self._health.get(server_id)
+            if state is None or state.scheduled_at != due:
+                continue
+            if state.next_check > now:
+                # Real traffic pushed the probe back
+                self._schedule_probe(state, state.next_check)
+                continue
+            state.scheduled_at = None
+            due_ids.append(server_id)
+        return due_ids
+        
+    def _start_due_health_checks(self, now: float) -> None:
+        """Start a probe task for every server whose health check is due."""
+        for server_id in self._pop_due_servers(now):
+            task = asyncio.create_task(self._probe_server(server_id))
+            self._probe_tasks.add(task)
+            task.add_done_callback(self._probe_tasks.discard)
             
-        for server_id in server_ids:
+    async def _probe_server(self, server_id: str) -> None:
+        """Run one health probe under the global concurrency limit."""
+        if self._probe_semaphore is None:
+            self._probe_semaphore = asyncio.Semaphore(self.max_concurrent_health_checks)
+            
+        async with self._probe_semaphore:
             try:
                 await self._check_server_health(server_id)
             except Exception as e:
                 logger.error(f"Error checking health of server {server_id}: {e}")
+                self._record_health_result(server_id, False)
+                
+    async def _check_all_servers_health(self) -> None:
+        """Check the health of all registered servers concurrently."""
+        logger.debug("Starting health check for all servers")
+        
+        async with self._lock:
+            server_ids = list(self._servers.keys())
+            
+        await asyncio.gather(*(self._probe_server(server_id) for server_id in server_ids))
                 
         logger.debug("Completed health check for all servers")
         
@@ -121,6 +298,7 @@ class InMemoryServerRegistry(ServerDiscovery):
             server_info = self._servers[server_id]
             
         # Check server health using the transport
+        self.health_check_stats['probes'] += 1
         is_healthy = await self._transport.check_server_health(server_info)
         
         async with self._lock:
@@ -135,6 +313,7 @@ class InMemoryServerRegistry(ServerDiscovery):
                 logger.debug(f"Server {server_id} is healthy")
             else:
                 # Mark the server as degraded or inactive
+                self.health_check_stats['probe_failures'] += 1
                 if server_info.status == ServerStatus.ACTIVE:
                     server_info.status = ServerStatus.DEGRADED
                     logger.warning(f"Server {server_id} is degraded")
@@ -144,25 +323,88 @@ class InMemoryServerRegistry(ServerDiscovery):
                     
                 self._servers[server_id] = server_info
                 
+            self._record_health_result(server_id, is_healthy)
+            
+    def _record_health_result(self, server_id: str, is_healthy: bool) -> None:
+        """Adapt a server's probe interval to a health observation and schedule its next probe."""
+        state = self._health.get(server_id)
+        if state is None:
+            return
+            
+        now = self._clock()
+        if is_healthy:
+            state.consecutive_successes += 1
+            state.last_seen_at = now
+        else:
+            state.consecutive_successes = 0
+            
+        if state.consecutive_successes < STABLE_AFTER_SUCCESSES:
+            # Failing, or recovering from a failure (flapping servers never leave this state)
+            state.interval = self.min_health_check_interval_seconds
+        else:
+            growth = 2 ** min(state.consecutive_successes - STABLE_AFTER_SUCCESSES, 16)
+            state.interval = min(self.max_health_check_interval_seconds, self.health_check_interval_seconds * growth)
+            
+        if state.scheduled_at is None:
+            self._schedule_probe(state, now + state.interval)
+            
+    def record_request_outcome(self, server_id: str, success: bool) -> None:
+        """
+        Feed the outcome of a real request into the server's health state.
+        
+        A successful request counts as a passing health check and postpones
+        the next probe. A transport failure does not change the server's
+        status by itself, but brings its next probe forward so the failure
+        is confirmed or cleared quickly.
+        
+        Args:
+            server_id: The ID of the server that handled the request
+            success: Whether the server was reachable
+        """
+        state = self._health.get(server_id)
+        server_info = self._servers.get(server_id)
+        if state is None or server_info is None:
+            return
+            
+        now = self._clock()
+        if success:
+            self.health_check_stats['passive_successes'] += 1
+            state.last_seen_at = now
+            server_info.last_seen = datetime.now()
+            if server_info.status != ServerStatus.ACTIVE:
+                # Let the next probe confirm the recovery
+                return
+            state.consecutive_successes += 1
+            # The heap entry is moved lazily when it comes due
+            state.next_check = max(state.next_check, now + state.interval)
+        else:
+            self.health_check_stats['passive_failures'] += 1
+            # Servers already known to be failing are on the short interval anyway
+            if (server_info.status == ServerStatus.ACTIVE
+                    and state.scheduled_at is not None and state.scheduled_at > now):
+                self._schedule_probe(state, now)
+                
     async def _remove_expired_servers(self) -> None:
         """Remove servers that haven't been seen for longer than the TTL."""
-        logger.debug("Checking for expired servers")
-        now = datetime.now()
+        now = self._clock()
         expired_server_ids = []
         
         async with self._lock:
-            for server_id, server_info in self._servers.items():
-                if server_info.last_seen is None:
-                    continue
+            for state in self._expiry_wheel.advance(now):
+                if self._health.get(state.server_id) is not state:
+                    continue  # Unregistered or re-registered since it was scheduled
                     
-                age = now - server_info.last_seen
-                if age > timedelta(seconds=self.server_ttl_seconds):
-                    expired_server_ids.append(server_id)
+                deadline = state.last_seen_at + self.server_ttl_seconds
+                if deadline < now:
+                    expired_server_ids.append(state.server_id)
+                else:
+                    self._expiry_wheel.schedule(state, deadline)
                     
             for server_id in expired_server_ids:
                 await self._remove_server(server_id)
                 
         if expired_server_ids:
+            self.health_check_stats['expired'] += len(expired_server_ids)
             logger.info(f"Removed {len(expired_server_ids)} expired servers: {expired_server_ids}")
             
     async def _remove_server(self, server_id: str) -> None:
@@ -176,6 +418,7 @@ class InMemoryServerRegistry(ServerDiscovery):
             return
             
         server_info = self._servers.pop(server_id)
+        self._health.pop(server_id, None)
         
         # Remove from capabilities index
         for capability in server_info.capabilities:
@@ -186,12 +429,13 @@ class InMemoryServerRegistry(ServerDiscovery):
                     
         logger.debug(f"Removed server {server_id} from registry")
         
-    async def _add_server(self, server_info: MCPServerInfo) -> None:
+    async def _add_server(self, server_info: MCPServerInfo, probe_immediately: bool = False) -> None:
         """
         Add a server to the registry.
         
         Args:
             server_info: The server information to add
+            probe_immediately: Whether the first health check is due now rather than after one interval
         """
         server_id = server_info.server_id
         
@@ -201,6 +445,17 @@ class InMemoryServerRegistry(ServerDiscovery):
             
         self._servers[server_id] = server_info
         
+        # Schedule health checks and expiry
+        now = self._clock()
+        age = max(0.0, (datetime.now() - server_info.last_seen).total_seconds())
+        state = _HealthState(server_id, self.health_check_interval_seconds, now - age)
+        if server_info.status != ServerStatus.ACTIVE:
+            state.consecutive_successes = 0
+            state.interval = self.min_health_check_interval_seconds
+        self._health[server_id] = state
+        self._schedule_probe(state, now if probe_immediately else now + state.interval)
+        self._expiry_wheel.schedule(state, state.last_seen_at + self.server_ttl_seconds)
+        
         # Update capabilities index
         for capability in server_info.capabilities:
             if capability not in self._capabilities_index:
@@ -254,7 +509,7 @@ class InMemoryServerRegistry(ServerDiscovery):
                 logger.info(f"Skipping health check for server {server_info.server_id} during registration")
                 
             async with self._lock:
-                await self._add_server(server_info)
+                await self._add_server(server_info, probe_immediately=skip_health_check)
                 
             logger.info(f"Registered server {server_info.server_id} with capabilities {server_info.capabilities}")
             return True
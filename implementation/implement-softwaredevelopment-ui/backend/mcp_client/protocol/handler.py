@@ -6,8 +6,14 @@ import json
 import logging
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union, cast
 
+try:
+    import orjson
+except ImportError:  # Optional faster JSON backend
+    orjson = None
+
 from mcp_client.core.interfaces import ProtocolHandler
 from mcp_client.core.models import (
     ErrorCode,
@@ -27,6 +33,21 @@ from mcp_client.protocol.models import (
 
 logger = logging.getLogger(__name__)
 
+# Enum value sets, built once instead of on every message
+_KNOWN_REQUEST_TYPES = frozenset(rt.value for rt in RequestType)
+_RESPONSE_STATUSES = frozenset(status.value for status in ResponseStatus)
+
+# Top-level request fields each protocol version does not support
+_UNSUPPORTED_REQUEST_FIELDS = {
+    "1.0": ("stream",),
+}
+
+
+@lru_cache(maxsize=64)
+def _version_key(version: str) -> Tuple[int, ...]:
+    """Parse a dotted version string into a tuple of ints."""
+    return tuple(int(x) for x in version.split("."))
+
 
 class MCPProtocolHandler(ProtocolHandler):
     """Implementation of the MCP protocol handler."""
@@ -46,12 +67,24 @@ class MCPProtocolHandler(ProtocolHandler):
         "1.1": "1.0"
     }
 
-    def __init__(self, protocol_version: str = DEFAULT_VERSION):
+    # Response class per request type
+    RESPONSE_CLASSES = {
+        RequestType.TEXT_GENERATION.value: TextGenerationResponse,
+        RequestType.IMAGE_GENERATION.value: ImageGenerationResponse,
+        RequestType.EMBEDDING.value: EmbeddingResponse,
+        RequestType.CHAT.value: ChatResponse,
+        RequestType.ACTION.value: ActionResponse,
+    }
+
+    def __init__(self, protocol_version: str = DEFAULT_VERSION, trusted_server: bool = False):
         """
         Initialize the protocol handler.
 
         Args:
             protocol_version: The MCP protocol version to use
+            trusted_server: Build response models without re-running pydantic
+                validation when the protocol checks already guarantee the
+                field types. Only use this for servers you control.
             
         Raises:
             ValueError: If the protocol version is not supported
@@ -60,13 +93,9 @@ class MCPProtocolHandler(ProtocolHandler):
             raise ValueError(f"Unsupported protocol version: {protocol_version}. Supported versions: {self.SUPPORTED_VERSIONS}")
             
         self.protocol_version = protocol_version
-        self._response_type_map = {
-            RequestType.TEXT_GENERATION: TextGenerationResponse,
-            RequestType.IMAGE_GENERATION: ImageGenerationResponse,
-            RequestType.EMBEDDING: EmbeddingResponse,
-            RequestType.CHAT: ChatResponse,
-            RequestType.ACTION: ActionResponse,
-        }
+        self.trusted_server = trusted_server
+        self._response_type_map = self.RESPONSE_CLASSES
+        self._compatible_versions: Dict[str, str] = {}
         
         logger.info(f"Initialized MCP Protocol Handler with version {protocol_version}")
         
@@ -86,7 +115,17 @@ class MCPProtocolHandler(ProtocolHandler):
         # If versions match exactly, use that version
         if server_version == self.protocol_version:
             return self.protocol_version
-            
+        
+        cached = self._compatible_versions.get(server_version)
+        if cached is not None:
+            return cached
+        
+        compatible_version = self._find_compatible_version(server_version)
+        self._compatible_versions[server_version] = compatible_version
+        return compatible_version
+    
+    def _find_compatible_version(self, server_version: str) -> str:
+        """Resolve the compatible version for a server version that differs from ours."""
         # If server version is newer than client version, use client version
         # (assuming server maintains backward compatibility)
         if self._compare_versions(server_version, self.protocol_version) > 0:
@@ -115,8 +154,8 @@ class MCPProtocolHandler(ProtocolHandler):
         Returns:
             int: 1 if version1 > version2, -1 if version1 < version2, 0 if equal
         """
-        v1_parts = [int(x) for x in version1.split(".")]
-        v2_parts = [int(x) for x in version2.split(".")]
+        v1_parts = _version_key(version1)
+        v2_parts = _version_key(version2)
         
         for i in range(max(len(v1_parts), len(v2_parts))):
             v1 = v1_parts[i] if i < len(v1_parts) else 0
@@ -154,8 +193,7 @@ class MCPProtocolHandler(ProtocolHandler):
                     raise ValueError(f"Request must have a {field}")
 
         # Validate request type - allow custom request types for tool servers
-        known_types = [rt.value for rt in RequestType]
-        if request.request_type not in known_types:
+        if request.request_type not in _KNOWN_REQUEST_TYPES:
             # Allow custom request types that aren't in the predefined list
             # This enables tool servers to define their own request types
             logger.debug(f"Using custom request type: {request.request_type}")
@@ -260,7 +298,7 @@ class MCPProtocolHandler(ProtocolHandler):
                 logger.warning(f"Response uses unsupported protocol version: {protocol_version}")
                 
         # Validate status
-        if response["status"] not in [status.value for status in ResponseStatus]:
+        if response["status"] not in _RESPONSE_STATUSES:
             raise ValueError(f"Unknown response status: {response['status']}")
             
         # Validate content is a dictionary
@@ -338,13 +376,19 @@ class MCPProtocolHandler(ProtocolHandler):
 
         return True
 
-    def format_request(self, request: MCPRequest, server_protocol_version: Optional[str] = None) -> Dict[str, Any]:
+    def format_request(
+        self,
+        request: MCPRequest,
+        server_protocol_version: Optional[str] = None,
+        validated: bool = False,
+    ) -> Dict[str, Any]:
         """
         Format a request according to the MCP protocol.
 
         Args:
             request: The request to format
             server_protocol_version: Optional protocol version supported by the target server
+            validated: Whether the caller already ran validate_request on this request
 
         Returns:
             Dict[str, Any]: The formatted request
@@ -353,7 +397,8 @@ class MCPProtocolHandler(ProtocolHandler):
             ValueError: If the request is invalid or no compatible protocol version can be found
         """
         # Validate the request first
-        self.validate_request(request)
+        if not validated:
+            self.validate_request(request)
         
         # Determine the protocol version to use
         protocol_version = self.protocol_version
@@ -424,8 +469,6 @@ class MCPProtocolHandler(ProtocolHandler):
         Returns:
             MCPResponse: The parsed response
         """
-        from mcp_client.core.models import ResponseStatus
-        
         # Extract basic info
         request_id = raw_response.get("id", "unknown")
         timestamp = datetime.now()
@@ -454,6 +497,17 @@ class MCPProtocolHandler(ProtocolHandler):
             }
         
         # Create MCPResponse
+        if self.trusted_server and isinstance(content, dict):
+            # Every field is already of the declared type
+            return MCPResponse.model_construct(
+                status=status,
+                content=content,
+                server_id="unknown",
+                request_id=str(request_id),
+                timestamp=timestamp,
+                metadata={},
+            )
+        
         response = MCPResponse(
             status=status,
             content=content,
@@ -464,8 +518,6 @@ class MCPProtocolHandler(ProtocolHandler):
         )
         
         return response
-    
-
         
     def _apply_version_specific_formatting(self, request: Dict[str, Any], version: str) -> Dict[str, Any]:
         """
@@ -478,24 +530,16 @@ class MCPProtocolHandler(ProtocolHandler):
         Returns:
             Dict[str, Any]: The transformed request
         """
-        # Clone the request to avoid modifying the original
-        result = request.copy()
+        # Remove fields the target version does not support (e.g. "stream"
+        # before 1.1). Versions 1.1 and 2.0 need no transformation, so the
+        # request is only cloned when something has to be dropped.
+        unsupported = [field for field in _UNSUPPORTED_REQUEST_FIELDS.get(version, ()) if field in request]
+        if not unsupported:
+            return request
         
-        # Apply transformations based on version
-        if version == "1.0":
-            # Version 1.0 doesn't support certain fields that might be in newer versions
-            # Remove any fields that aren't supported in 1.0
-            if "stream" in result:
-                del result["stream"]
-                
-        elif version == "1.1":
-            # Version 1.1 specific transformations
-            pass
-            
-        elif version == "2.0":
-            # Version 2.0 specific transformations
-            pass
-            
+        result = request.copy()
+        for field in unsupported:
+            del result[field]
         return result
 
     def parse_response(self, raw_response: Dict[str, Any]) -> MCPResponse:
@@ -546,6 +590,20 @@ class MCPProtocolHandler(ProtocolHandler):
                     raw_response, raw_response["protocol_version"]
                 )
 
+            # validate_response has already checked every field's type, so a
+            # trusted server's plain MCPResponse can skip pydantic validation.
+            # Subclasses have their own content validators and always validate.
+            metadata = raw_response.get("metadata", {})
+            if self.trusted_server and response_class is MCPResponse and isinstance(metadata, dict):
+                return MCPResponse.model_construct(
+                    status=ResponseStatus(raw_response["status"]),
+                    content=raw_response["content"],
+                    server_id=raw_response["server_id"],
+                    request_id=raw_response["request_id"],
+                    timestamp=timestamp,
+                    metadata=metadata,
+                )
+
             # Create the response object
             response = response_class(
                 status=raw_response["status"],
@@ -584,25 +642,57 @@ class MCPProtocolHandler(ProtocolHandler):
         Returns:
             Dict[str, Any]: The transformed response
         """
-        # Clone the response to avoid modifying the original
-        result = response.copy()
-        
-        # Apply transformations based on version
-        if version == "1.0":
-            # Version 1.0 specific transformations
-            pass
-            
-        elif version == "1.1":
-            # Version 1.1 specific transformations
-            pass
-            
-        elif version == "2.0":
+        # Versions 1.0 and 1.1 need no transformation
+        if version == "2.0":
             # Version 2.0 specific transformations
             # For example, if 2.0 uses a different field name that we need to map to our model
-            if "response_content" in result and "content" not in result:
+            if "response_content" in response and "content" not in response:
+                # Clone the response to avoid modifying the original
+                result = response.copy()
                 result["content"] = result["response_content"]
+                return result
                 
-        return result
+        return response
+
+    @staticmethod
+    def encode_message(message: Dict[str, Any]) -> bytes:
+        """
+        Serialize a formatted request to JSON bytes.
+        
+        Uses orjson when it is installed and falls back to the standard
+        library otherwise.
+        
+        Args:
+            message: The formatted request
+            
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(message)
+            except TypeError:
+                # orjson rejects some inputs json accepts (e.g. non-str keys)
+                pass
+        return json.dumps(message).encode("utf-8")
+    
+    @staticmethod
+    def decode_message(body: Union[bytes, str]) -> Dict[str, Any]:
+        """
+        Deserialize a raw JSON response body.
+        
+        Args:
+            body: The response body
+            
+        Returns:
+            Dict[str, Any]: The decoded message
+            
+        Raises:
+            ValueError: If the body is not valid JSON
+        """
+        if orjson is not None:
+            return orjson.loads(body)
+        return json.loads(body)
 
     def _get_response_class(self, request_type: Optional[str]) -> Type[MCPResponse]:
         """
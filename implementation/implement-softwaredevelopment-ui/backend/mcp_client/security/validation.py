@@ -6,13 +6,67 @@ import re
 import html
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 from mcp_client.core.models import ErrorCode, MCPError, MCPRequest
 
 logger = logging.getLogger(__name__)
 
+# Field name fragments for which SQL injection checks are skipped
+# (architecture/design content legitimately talks about SQL)
+SQL_CHECK_EXEMPT_FIELDS = (
+    'prompt', 'message', 'content', 'description', 'requirements',
+    'architecture_description', 'details', 'query', 'arguments',
+    'design', 'specification', 'features', 'functionality'
+)
+
+# Field name fragments for which command injection checks are skipped
+COMMAND_CHECK_EXEMPT_FIELDS = (
+    'prompt', 'message', 'content', 'description', 'requirements',
+    'architecture_description', 'details', 'query', 'arguments'
+)
+
+# Lowercase literals at least one of which must occur in a string for the
+# keyed pattern to match. Used to skip regexes that cannot match; patterns
+# without an entry are always run.
+PATTERN_REQUIRED_LITERALS = {
+    r'<script[^>]*>.*?</script>': ('<script',),
+    r'javascript:': ('javascript:',),
+    r'on\w+\s*=': ('=',),
+    r'<iframe[^>]*>.*?</iframe>': ('<iframe',),
+    r'<object[^>]*>.*?</object>': ('<object',),
+    r'<embed[^>]*>.*?</embed>': ('<embed',),
+    r'<link[^>]*>': ('<link',),
+    r'<meta[^>]*>': ('<meta',),
+    r'<style[^>]*>.*?</style>': ('<style',),
+    r'data:text/html': ('data:text/html',),
+    r'vbscript:': ('vbscript:',),
+    r'(\b(SELECT|INSERT|UPDATE|DELETE|DROP|EXEC|UNION)\s+\w+\s+FROM\b)': ('from',),
+    r'(\b(OR|AND)\s+\d+\s*=\s*\d+)': ('=',),
+    r'(\b(OR|AND)\s+[\'"][^\'"]*[\'"])': ("'", '"'),
+    r'(--\s*[^\n]*(\n|$))': ('--',),
+    r'(/\*.*?\*/)': ('/*',),
+    r'(\bxp_cmdshell\b)': ('xp_cmdshell',),
+    r'(\bsp_executesql\b)': ('sp_executesql',),
+    r'(\bUNION\s+SELECT\b)': ('union',),
+    r'(\'\s*(OR|AND)\s+\'\w*\'\s*=\s*\'\w*)': ("'",),
+    r'(\.\.\/|\.\.\\)': ('..',),
+    r'(\$\{|\$\()': ('$',),
+}
+
+
+@lru_cache(maxsize=4096)
+def _field_checks(field_name: str) -> Tuple[bool, bool]:
+    """Return (check_sql, check_command) for a field name."""
+    lowered = field_name.lower()
+    check_sql = not any(fragment in lowered for fragment in SQL_CHECK_EXEMPT_FIELDS)
+    check_command = not any(fragment in lowered for fragment in COMMAND_CHECK_EXEMPT_FIELDS)
+    return check_sql, check_command
+
 
 class InputValidator:
     """Validates and sanitizes input data for MCP Client."""
@@ -67,6 +121,11 @@ class InputValidator:
         'external_id': 100,
     }
     
+    # Clean strings at least this long are remembered so re-sent payloads
+    # (e.g. conversation history) are not scanned again
+    CACHE_MIN_LENGTH = 1024
+    CACHE_MAX_CHARS = 8 * 1024 * 1024
+    
     def __init__(self, strict_mode: bool = True):
         """
         Initialize the input validator.
@@ -76,6 +135,10 @@ class InputValidator:
         """
         self.strict_mode = strict_mode
         self._compile_patterns()
+        
+        self._clean_cache: "OrderedDict[Tuple[bool, bool, str], str]" = OrderedDict()
+        self._clean_cache_chars = 0
+        self._cache_lock = threading.Lock()
     
     def _compile_patterns(self):
         """Compile regex patterns for better performance."""
@@ -85,6 +148,41 @@ class InputValidator:
                                    for pattern in self.SQL_INJECTION_PATTERNS]
         self.command_injection_regex = [re.compile(pattern, re.IGNORECASE) 
                                        for pattern in self.COMMAND_INJECTION_PATTERNS]
+        
+        # Case-insensitive searches that start with a letter are slow in the
+        # re module. For ASCII input, a case-sensitive twin of each pattern run
+        # on the lowercased string matches exactly the same strings; the
+        # patterns only use lowercase escapes, so lowering them is safe.
+        self._ascii_dangerous = self._compile_ascii_scanners(self.DANGEROUS_PATTERNS, re.DOTALL)
+        self._ascii_sql_injection = self._compile_ascii_scanners(self.SQL_INJECTION_PATTERNS)
+        self._ascii_command_injection = self._compile_ascii_scanners(self.COMMAND_INJECTION_PATTERNS)
+    
+    @staticmethod
+    def _compile_ascii_scanners(patterns: List[str], flags: int = 0) -> List[Tuple[Optional[tuple], re.Pattern]]:
+        """Compile (required literals, case-sensitive pattern) pairs for lowercased ASCII input."""
+        return [(PATTERN_REQUIRED_LITERALS.get(pattern), re.compile(pattern.lower(), flags))
+                for pattern in patterns]
+    
+    @staticmethod
+    def _matching_patterns(value: str, lowered: Optional[str], regexes: List[re.Pattern],
+                           ascii_scanners: List[Tuple[Optional[tuple], re.Pattern]]):
+        """Yield the patterns of a category that match, in declaration order."""
+        if lowered is None:
+            for pattern in regexes:
+                if pattern.search(value):
+                    yield pattern
+            return
+        
+        for pattern, (literals, scanner) in zip(regexes, ascii_scanners):
+            if literals is not None:
+                # A plain loop: any() with a generator costs more than the scan on short strings
+                for literal in literals:
+                    if literal in lowered:
+                        break
+                else:
+                    continue
+            if scanner.search(lowered):
+                yield pattern
     
     def validate_string(self, value: str, field_name: str, max_length: Optional[int] = None) -> str:
         """
@@ -117,14 +215,47 @@ class InputValidator:
                 details={"field": field_name, "length": len(value), "max_length": max_len}
             )
         
+        checks = _field_checks(field_name)
+        cacheable = len(value) >= self.CACHE_MIN_LENGTH
+        if cacheable:
+            cached = self._get_cached(checks, value)
+            if cached is not None:
+                return cached
+        
         # Check for dangerous patterns
-        self._check_dangerous_patterns(value, field_name)
+        clean = self._check_dangerous_patterns(value, field_name)
         
         # Sanitize the string
         sanitized = self._sanitize_string(value)
         
+        if cacheable and clean:
+            self._store_cached(checks, value, sanitized)
+        
         return sanitized
     
+    def _get_cached(self, checks: Tuple[bool, bool], value: str) -> Optional[str]:
+        """Look up the sanitized form of a string that previously passed validation."""
+        key = (checks[0], checks[1], value)
+        with self._cache_lock:
+            sanitized = self._clean_cache.get(key)
+            if sanitized is not None:
+                self._clean_cache.move_to_end(key)
+            return sanitized
+    
+    def _store_cached(self, checks: Tuple[bool, bool], value: str, sanitized: str):
+        """Remember a clean string, evicting the least recently used ones over budget."""
+        if len(value) > self.CACHE_MAX_CHARS:
+            return
+        key = (checks[0], checks[1], value)
+        with self._cache_lock:
+            if key in self._clean_cache:
+                return
+            self._clean_cache[key] = sanitized
+            self._clean_cache_chars += len(value)
+            while self._clean_cache_chars > self.CACHE_MAX_CHARS:
+                (_, _, evicted), _ = self._clean_cache.popitem(last=False)
+                self._clean_cache_chars -= len(evicted)
+    
     def validate_url(self, url: str, field_name: str = "url") -> str:
         """
         Validate and sanitize a URL.
@@ -278,55 +409,60 @@ class InputValidator:
         
         return request
     
-    def _check_dangerous_patterns(self, value: str, field_name: str):
-        """Check for dangerous patterns in input."""
+    def _check_dangerous_patterns(self, value: str, field_name: str) -> bool:
+        """
+        Check for dangerous patterns in input.
+        
+        Returns:
+            bool: True if no pattern matched
+            
+        Raises:
+            MCPError: In strict mode, if a pattern matched
+        """
+        check_sql, check_command = _field_checks(field_name)
+        clean = True
+        
+        # Non-ASCII input goes through the original case-insensitive regexes
+        lowered = value.lower() if value.isascii() else None
+        
         # Check for XSS patterns
-        for pattern in self.dangerous_regex:
-            if pattern.search(value):
-                logger.warning(f"Dangerous pattern detected in field '{field_name}': {pattern.pattern}")
+        for pattern in self._matching_patterns(value, lowered, self.dangerous_regex, self._ascii_dangerous):
+            clean = False
+            logger.warning(f"Dangerous pattern detected in field '{field_name}': {pattern.pattern}")
+            if self.strict_mode:
+                raise MCPError(
+                    error_code=ErrorCode.VALIDATION_ERROR,
+                    message=f"Potentially dangerous content detected in field '{field_name}'",
+                    details={"field": field_name, "pattern": "XSS"}
+                )
+        
+        # Only check SQL injection for non-architecture fields
+        if check_sql:
+            for pattern in self._matching_patterns(value, lowered, self.sql_injection_regex,
+                                                   self._ascii_sql_injection):
+                clean = False
+                logger.warning(f"SQL injection pattern detected in field '{field_name}': {pattern.pattern}")
                 if self.strict_mode:
                     raise MCPError(
                         error_code=ErrorCode.VALIDATION_ERROR,
-                        message=f"Potentially dangerous content detected in field '{field_name}'",
-                        details={"field": field_name, "pattern": "XSS"}
+                        message=f"Potentially dangerous SQL content detected in field '{field_name}'",
+                        details={"field": field_name, "pattern": "SQL_INJECTION"}
                     )
         
-        # Check for SQL injection patterns (skip for architecture/design content)
-        architecture_fields = [
-            'prompt', 'message', 'content', 'description', 'requirements', 
-            'architecture_description', 'details', 'query', 'arguments',
-            'design', 'specification', 'features', 'functionality'
-        ]
-        
-        # Only check SQL injection for non-architecture fields
-        if not any(arch_field in field_name.lower() for arch_field in architecture_fields):
-            for pattern in self.sql_injection_regex:
-                if pattern.search(value):
-                    logger.warning(f"SQL injection pattern detected in field '{field_name}': {pattern.pattern}")
-                    if self.strict_mode:
-                        raise MCPError(
-                            error_code=ErrorCode.VALIDATION_ERROR,
-                            message=f"Potentially dangerous SQL content detected in field '{field_name}'",
-                            details={"field": field_name, "pattern": "SQL_INJECTION"}
-                        )
-        
-        # Check for command injection patterns (less strict for architecture content)
-        architecture_fields = [
-            'prompt', 'message', 'content', 'description', 'requirements', 
-            'architecture_description', 'details', 'query', 'arguments'
-        ]
-        
         # Skip command injection checks for architecture-related fields
-        if not any(arch_field in field_name.lower() for arch_field in architecture_fields):
-            for pattern in self.command_injection_regex:
-                if pattern.search(value):
-                    logger.warning(f"Command injection pattern detected in field '{field_name}': {pattern.pattern}")
-                    if self.strict_mode:
-                        raise MCPError(
-                            error_code=ErrorCode.VALIDATION_ERROR,
-                            message=f"Potentially dangerous command content detected in field '{field_name}'",
-                            details={"field": field_name, "pattern": "COMMAND_INJECTION"}
-                        )
+        if check_command:
+            for pattern in self._matching_patterns(value, lowered, self.command_injection_regex,
+                                                   self._ascii_command_injection):
+                clean = False
+                logger.warning(f"Command injection pattern detected in field '{field_name}': {pattern.pattern}")
+                if self.strict_mode:
+                    raise MCPError(
+                        error_code=ErrorCode.VALIDATION_ERROR,
+                        message=f"Potentially dangerous command content detected in field '{field_name}'",
+                        details={"field": field_name, "pattern": "COMMAND_INJECTION"}
+                    )
+        
+        return clean
     
     def _sanitize_string(self, value: str) -> str:
         """Sanitize a string by removing or escaping dangerous content."""
@@ -336,8 +472,8 @@ class InputValidator:
         # Remove null bytes
         sanitized = sanitized.replace('\x00', '')
         
-        # Normalize whitespace
-        sanitized = re.sub(r'\s+', ' ', sanitized).strip()
+        # Normalize whitespace (split() uses the same whitespace class as \s)
+        sanitized = ' '.join(sanitized.split())
         
         return sanitized
     
@@ -7,7 +7,7 @@ import json
 import logging
 import secrets
 import ssl
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 from urllib.parse import urlparse
 from uuid import uuid4
 
@@ -17,6 +17,7 @@ from pydantic import ValidationError
 
 from mcp_client.core.interfaces import Transport
 from mcp_client.core.models import ErrorCode, MCPError, MCPServerInfo
+from mcp_client.protocol.handler import MCPProtocolHandler
 from mcp_client.security.tls import (
     CertificateVerificationMode,
     CertificateVerifier,
@@ -28,6 +29,17 @@ from mcp_client.transport.circuit_breaker import CircuitBreaker, CircuitBreakerE
 
 logger = logging.getLogger(__name__)
 
+# Responses without a Content-Length, or larger than this, are read in chunks
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class _BatchQueue:
+    """JSON-RPC requests for one server waiting to go out as a single batch."""
+
+    def __init__(self):
+        self.items: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
 
 class HTTPTransport(Transport):
     """HTTP transport implementation for the MCP Client."""
@@ -52,6 +64,12 @@ class HTTPTransport(Transport):
         circuit_breaker_failure_threshold: int = 5,
         circuit_breaker_reset_timeout_seconds: float = 60.0,
         authenticator: Optional[Any] = None,
+        connection_pool_size_per_server: int = 50,
+        keepalive_timeout_seconds: float = 30.0,
+        batch_window_seconds: float = 0.0,
+        max_batch_size: int = 20,
+        stream_threshold_bytes: int = 1024 * 1024,
+        max_response_bytes: Optional[int] = None,
     ):
         """
         Initialize the HTTP transport.
@@ -75,6 +93,17 @@ class HTTPTransport(Transport):
             circuit_breaker_failure_threshold: Number of failures before opening the circuit
             circuit_breaker_reset_timeout_seconds: Time to wait before transitioning from open to half-open
             authenticator: Optional authenticator for request signing
+            connection_pool_size_per_server: Maximum connections to one host, so a slow or
+                failing server cannot hold the whole pool while its circuit breaker trips;
+                a server can lower its own limit with metadata["max_connections"]
+            keepalive_timeout_seconds: How long idle connections are kept; keep this below the
+                idle timeout of load balancers and function URLs in front of the servers
+            batch_window_seconds: Coalesce JSON-RPC requests issued within this window into one
+                batch request, for servers with metadata["supports_batch"] (0 disables batching)
+            max_batch_size: Maximum number of requests in one batch
+            stream_threshold_bytes: Responses larger than this (or of unknown length) are read
+                in chunks instead of being buffered and decoded as text
+            max_response_bytes: Abort responses larger than this (None for no limit)
         """
         self.timeout_seconds = timeout_seconds
         self.max_retries = max_retries
@@ -92,11 +121,22 @@ class HTTPTransport(Transport):
         self.connection_pool_size = connection_pool_size
         self.connection_keepalive = connection_keepalive
         self.authenticator = authenticator
+        self.connection_pool_size_per_server = connection_pool_size_per_server
+        self.keepalive_timeout_seconds = keepalive_timeout_seconds
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch_size = max(1, max_batch_size)
+        self.stream_threshold_bytes = stream_threshold_bytes
+        self.max_response_bytes = max_response_bytes
         
         self._session: Optional[ClientSession] = None
         self._ssl_context: Optional[ssl.SSLContext] = None
         self._cert_verifier: Optional[CertificateVerifier] = None
         self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self._server_slots: Dict[str, Tuple[int, asyncio.Semaphore]] = {}
+        self._role_authenticators: Dict[Tuple[str, Optional[str], str], Any] = {}
+        self._batch_queues: Dict[str, _BatchQueue] = {}
+        self._batch_unsupported: set = set()
+        self._batch_tasks: Set[asyncio.Task] = set()  # Batches in flight, kept until they finish
         
         # Circuit breaker configuration
         self.circuit_breaker_failure_threshold = circuit_breaker_failure_threshold
@@ -151,10 +191,18 @@ class HTTPTransport(Transport):
         """
         if self._session is None or self._session.closed:
             timeout = ClientTimeout(total=self.timeout_seconds)
+            keepalive_options = (
+                {"keepalive_timeout": self.keepalive_timeout_seconds}
+                if self.connection_keepalive
+                else {"force_close": True}
+            )
             connector = aiohttp.TCPConnector(
                 ssl=self._ssl_context if self.use_tls else None,
                 limit=self.connection_pool_size,
-                keepalive_timeout=300.0 if self.connection_keepalive else 0.0,
+                limit_per_host=self.connection_pool_size_per_server,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+                **keepalive_options,
             )
             self._session = aiohttp.ClientSession(
                 connector=connector,
@@ -167,6 +215,23 @@ class HTTPTransport(Transport):
         
     async def close(self) -> None:
         """Close the transport and release resources."""
+        for queue in self._batch_queues.values():
+            if queue.flush_handle is not None:
+                queue.flush_handle.cancel()
+            for _, future in queue.items:
+                if not future.done():
+                    future.set_exception(MCPError(
+                        error_code=ErrorCode.TRANSPORT_ERROR,
+                        message="HTTP transport closed before the batch was sent",
+                    ))
+        self._batch_queues.clear()
+        
+        batch_tasks = list(self._batch_tasks)
+        for task in batch_tasks:
+            task.cancel()
+        if batch_tasks:
+            await asyncio.gather(*batch_tasks, return_exceptions=True)
+        
         if self._session:
             await self._session.close()
             self._session = None
@@ -197,6 +262,46 @@ class HTTPTransport(Transport):
             )
             
         return self._circuit_breakers[server_id]
+        
+    def _get_server_slots(self, server_info: MCPServerInfo) -> Optional[asyncio.Semaphore]:
+        """
+        Get the semaphore bounding in-flight requests to a server.
+        
+        Only servers that set metadata["max_connections"] below the per-host
+        connection limit get one; the others are bounded by the connector.
+        """
+        limit = server_info.metadata.get("max_connections") if server_info.metadata else None
+        if not limit or (self.connection_pool_size_per_server and limit >= self.connection_pool_size_per_server):
+            return None
+            
+        slots = self._server_slots.get(server_info.server_id)
+        if slots is None or slots[0] != limit:
+            slots = (limit, asyncio.Semaphore(limit))
+            self._server_slots[server_info.server_id] = slots
+        return slots[1]
+        
+    def _get_role_authenticator(self, auth_config: Dict[str, Any]) -> Any:
+        """
+        Get the authenticator for a cross-account role, creating it on first use.
+        
+        Building a credential provider resolves credentials through STS, so
+        it is done once per role rather than once per request.
+        """
+        from mcp_client.aws.auth import AWSCredentialProvider, AWSAuthenticator
+        
+        region = auth_config.get("region", "us-east-1")
+        key = (auth_config["role_arn"], auth_config.get("external_id"), region)
+        authenticator = self._role_authenticators.get(key)
+        if authenticator is None:
+            logger.info(f"Using cross-account role: {auth_config.get('role_arn')}")
+            temp_provider = AWSCredentialProvider(
+                region=region,
+                role_arn=auth_config.get("role_arn"),
+                external_id=auth_config.get("external_id")
+            )
+            authenticator = AWSAuthenticator(temp_provider)
+            self._role_authenticators[key] = authenticator
+        return authenticator
 
     async def send_request(
         self, server_info: MCPServerInfo, formatted_request: Dict[str, Any]
@@ -214,13 +319,25 @@ class HTTPTransport(Transport):
         Raises:
             MCPError: If the request fails
         """
+        if self._is_batchable(server_info, formatted_request):
+            return await self._send_batched(server_info, formatted_request)
+        return await self._send_protected(server_info, formatted_request)
+        
+    async def _send_protected(
+        self, server_info: MCPServerInfo, formatted_request: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> Any:
+        """Send a request (or a batch) through the server's circuit breaker and connection limit."""
         endpoint_url = server_info.endpoint_url
         server_id = server_info.server_id
         circuit_breaker = self._get_circuit_breaker(server_id)
         
         # Use the circuit breaker to protect the request
         try:
-            return await circuit_breaker.execute(self._do_send_request, server_info, formatted_request)
+            slots = self._get_server_slots(server_info)
+            if slots is None:
+                return await circuit_breaker.execute(self._do_send_request, server_info, formatted_request)
+            async with slots:
+                return await circuit_breaker.execute(self._do_send_request, server_info, formatted_request)
         except CircuitBreakerError as e:
             # Circuit is open, server is considered unavailable
             raise MCPError(
@@ -233,6 +350,148 @@ class HTTPTransport(Transport):
                 },
             )
             
+    def _is_batchable(self, server_info: MCPServerInfo, formatted_request: Dict[str, Any]) -> bool:
+        """Whether a request can be coalesced into a JSON-RPC batch."""
+        return (
+            self.batch_window_seconds > 0
+            and bool(server_info.metadata and server_info.metadata.get("supports_batch"))
+            and server_info.server_id not in self._batch_unsupported
+            and isinstance(formatted_request, dict)
+            and formatted_request.get("jsonrpc") == "2.0"
+            and formatted_request.get("id") is not None
+            # Requests with their own headers (e.g. per-user tokens) are sent alone
+            and "headers" not in formatted_request
+        )
+        
+    async def _send_batched(self, server_info: MCPServerInfo, formatted_request: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a request for the server's next batch and wait for its response."""
+        loop = asyncio.get_running_loop()
+        queue = self._batch_queues.setdefault(server_info.server_id, _BatchQueue())
+        future = loop.create_future()
+        queue.items.append((formatted_request, future))
+        
+        if len(queue.items) >= self.max_batch_size:
+            self._flush_batch(server_info)
+        elif queue.flush_handle is None:
+            queue.flush_handle = loop.call_later(self.batch_window_seconds, self._flush_batch, server_info)
+            
+        return await future
+        
+    def _flush_batch(self, server_info: MCPServerInfo) -> None:
+        """Send everything queued for a server as one batch."""
+        queue = self._batch_queues.get(server_info.server_id)
+        if queue is None or not queue.items:
+            return
+        if queue.flush_handle is not None:
+            queue.flush_handle.cancel()
+            queue.flush_handle = None
+        items, queue.items = queue.items, []
+        task = asyncio.get_running_loop().create_task(self._send_batch(server_info, items))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+        
+    async def _send_batch(
+        self, server_info: MCPServerInfo, items: List[Tuple[Dict[str, Any], asyncio.Future]]
+    ) -> None:
+        """Send a batch and hand each response to the request that is waiting for it."""
+        try:
+            outcomes = await self._send_batch_requests(server_info, items)
+        except asyncio.CancelledError:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(MCPError(
+                        error_code=ErrorCode.TRANSPORT_ERROR,
+                        message="HTTP transport closed before the batch response arrived",
+                    ))
+            raise
+            
+        for (_, future), outcome in zip(items, outcomes):
+            if future.done():
+                continue  # The caller gave up (timeout or cancellation)
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+                
+    async def _send_batch_requests(
+        self, server_info: MCPServerInfo, items: List[Tuple[Dict[str, Any], asyncio.Future]]
+    ) -> List[Any]:
+        """Send a batch and return each request's response or exception, in order."""
+        if len(items) == 1:
+            request, _ = items[0]
+            outcomes = [await self._capture(self._send_protected(server_info, request))]
+        else:
+            batch_response = await self._capture(
+                self._send_protected(server_info, [request for request, _ in items])
+            )
+            if isinstance(batch_response, BaseException):
+                outcomes = [batch_response] * len(items)
+            elif isinstance(batch_response, list):
+                by_id = {
+                    response.get("id"): response for response in batch_response if isinstance(response, dict)
+                }
+                outcomes = [
+                    by_id.get(request["id"]) or MCPError(
+                        error_code=ErrorCode.PROTOCOL_ERROR,
+                        message=f"No response for request {request['id']} in batch",
+                        details={"server_id": server_info.server_id},
+                    )
+                    for request, _ in items
+                ]
+            else:
+                # The server answered the batch with a single object, so it does
+                # not support batches; send these requests (and later ones) alone
+                logger.warning(f"Server {server_info.server_id} does not support JSON-RPC batches, disabling batching")
+                self._batch_unsupported.add(server_info.server_id)
+                outcomes = await asyncio.gather(
+                    *(self._capture(self._send_protected(server_info, request)) for request, _ in items)
+                )
+        return outcomes
+                
+    @staticmethod
+    async def _capture(coro) -> Any:
+        """Await a coroutine, returning its exception instead of raising it."""
+        try:
+            return await coro
+        except Exception as e:
+            return e
+            
+    async def _read_body(self, response: ClientResponse) -> Union[bytes, bytearray]:
+        """
+        Read a response body.
+        
+        Small responses are read in one go. Large responses and responses of
+        unknown length are read in chunks into a single buffer, which is then
+        decoded straight from bytes: no decoded text copy of large tool
+        results is held, and max_response_bytes stops oversized bodies early.
+        
+        Raises:
+            MCPError: If the body exceeds max_response_bytes
+        """
+        length = response.content_length
+        if length is not None and self.max_response_bytes is not None and length > self.max_response_bytes:
+            raise self._response_too_large(length)
+            
+        if length is not None and length <= self.stream_threshold_bytes:
+            body = await response.read()
+            if self.max_response_bytes is not None and len(body) > self.max_response_bytes:
+                raise self._response_too_large(len(body))  # Compressed bodies can expand
+        else:
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                body += chunk
+                if self.max_response_bytes is not None and len(body) > self.max_response_bytes:
+                    raise self._response_too_large(len(body))
+                    
+        return body
+        
+    def _response_too_large(self, size: int) -> MCPError:
+        return MCPError(
+            error_code=ErrorCode.PROTOCOL_ERROR,
+            message=f"Response of {size} bytes exceeds the limit of {self.max_response_bytes} bytes",
+            details={"max_response_bytes": self.max_response_bytes},
+        )
+        
     async def _do_send_request(
         self, server_info: MCPServerInfo, formatted_request: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -274,8 +533,6 @@ class HTTPTransport(Transport):
                     "retry_count": retry_count,
                 }
                 
-                logger.debug(f"Sending request to {endpoint_url}: {json.dumps(formatted_request)}")
-                
                 # Prepare headers
                 headers = {"Content-Type": "application/json"}
                 
@@ -291,11 +548,15 @@ class HTTPTransport(Transport):
                     headers.update(formatted_request.headers)
                     logger.debug(f"Added custom headers from request object: {list(headers.keys())}")
                 
-                logger.debug(f"Request headers: {headers}")
+                # Serialize once: the signed body must be exactly the bytes that are sent
+                request_bytes = MCPProtocolHandler.encode_message(formatted_request)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Sending request to {endpoint_url}: {request_bytes.decode('utf-8')}")
+                    logger.debug(f"Request header names: {list(headers.keys())}")
                 
                 # Handle authentication
                 auth_config = server_info.auth or server_info.auth_config
-                logger.error(f"DEBUG: Authentication check - server_id: {server_info.server_id}, auth: {server_info.auth}, auth_config: {server_info.auth_config}, authenticator: {self.authenticator is not None}")
+                logger.debug(f"Authentication check - server_id: {server_info.server_id}, auth_type: {self._auth_type(auth_config)}, authenticator: {self.authenticator is not None}")
                 if auth_config or self.authenticator:
                     try:
                         # Check for server-specific AWS SigV4 authentication
@@ -310,12 +571,12 @@ class HTTPTransport(Transport):
                                 auth_type = auth_config.type
                                 is_sigv4 = auth_type == "aws_sigv4"
                         
-                        logger.error(f"DEBUG: SigV4 check - is_sigv4: {is_sigv4}, auth_type: {auth_type}, auth_config: {type(auth_config)}, auth_config_value: {auth_config}")
+                        logger.debug(f"SigV4 check - is_sigv4: {is_sigv4}, auth_type: {auth_type}")
                         if is_sigv4:
                             # Handle AWS SigV4 authentication with server-specific config
                             logger.debug(f"About to sign request - authenticator: {self.authenticator is not None}, has_sign_request: {hasattr(self.authenticator, 'sign_request') if self.authenticator else False}")
                             if self.authenticator and hasattr(self.authenticator, 'sign_request'):
-                                request_body = json.dumps(formatted_request)
+                                request_body = request_bytes.decode("utf-8")
                                 
                                 # Get service from auth config
                                 service = "lambda"  # default
@@ -324,20 +585,12 @@ class HTTPTransport(Transport):
                                 elif hasattr(auth_config, "service"):
                                     service = auth_config.service
                                 
-                                logger.info(f"Signing request for service: {service} to {endpoint_url}")
+                                logger.debug(f"Signing request for service: {service} to {endpoint_url}")
                                 
                                 # Handle cross-account role if specified
                                 if isinstance(auth_config, dict) and auth_config.get("role_arn"):
-                                    # Create a temporary credential provider for this specific role
-                                    from mcp_client.aws.auth import AWSCredentialProvider, AWSAuthenticator
-                                    logger.info(f"Using cross-account role: {auth_config.get('role_arn')}")
-                                    temp_provider = AWSCredentialProvider(
-                                        region=auth_config.get("region", "us-east-1"),
-                                        role_arn=auth_config.get("role_arn"),
-                                        external_id=auth_config.get("external_id")
-                                    )
-                                    temp_authenticator = AWSAuthenticator(temp_provider)
-                                    signed_headers = temp_authenticator.sign_request(
+                                    role_authenticator = self._get_role_authenticator(auth_config)
+                                    signed_headers = role_authenticator.sign_request(
                                         method="POST",
                                         url=endpoint_url,
                                         headers=headers,
@@ -347,7 +600,7 @@ class HTTPTransport(Transport):
                                     )
                                 else:
                                     # Use default authenticator
-                                    logger.info(f"Signing request with default authenticator for {endpoint_url}")
+                                    logger.debug(f"Signing request with default authenticator for {endpoint_url}")
                                     signed_headers = self.authenticator.sign_request(
                                         method="POST",
                                         url=endpoint_url,
@@ -357,7 +610,7 @@ class HTTPTransport(Transport):
                                         server_id=server_info.server_id
                                     )
                                 headers.update(signed_headers)
-                                logger.info(f"Successfully added AWS SigV4 authentication for service: {service}")
+                                logger.debug(f"Successfully added AWS SigV4 authentication for service: {service}")
                                 logger.debug(f"Signed headers: {list(signed_headers.keys())}")
                             else:
                                 logger.error("AWS SigV4 requested but no compatible authenticator available")
@@ -373,7 +626,7 @@ class HTTPTransport(Transport):
                         elif self.authenticator:
                             # Fallback to basic header authentication
                             if hasattr(self.authenticator, 'sign_request'):
-                                request_body = json.dumps(formatted_request)
+                                request_body = request_bytes.decode("utf-8")
                                 signed_headers = self.authenticator.sign_request(
                                     method="POST",
                                     url=endpoint_url,
@@ -407,11 +660,10 @@ class HTTPTransport(Transport):
                         logger.warning("Continuing request without authentication headers due to auth error")
                 
                 # Send the request
-                logger.info(f"Final request headers being sent to {endpoint_url}: {headers}")
-                logger.info(f"Request body: {json.dumps(formatted_request)}")
+                logger.debug(f"Final request header names for {endpoint_url}: {list(headers.keys())}")
                 async with session.post(
                     endpoint_url,
-                    json=formatted_request,
+                    data=request_bytes,
                     headers=headers,
                     raise_for_status=False,
                 ) as response:
@@ -434,24 +686,27 @@ class HTTPTransport(Transport):
                             )
                     
                     # Parse the response
+                    body = await self._read_body(response)
                     try:
-                        raw_response = await response.json()
-                        logger.debug(f"Received response from {endpoint_url}: {json.dumps(raw_response)}")
+                        raw_response = MCPProtocolHandler.decode_message(body)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"Received {len(body)} byte response from {endpoint_url}")
                         return raw_response
-                    except (json.JSONDecodeError, aiohttp.ContentTypeError) as e:
+                    except ValueError as e:
+                        response_text = bytes(body).decode("utf-8", errors="replace")
                         if self._should_retry(response.status, retry_count):
                             retry_count += 1
                             last_exception = MCPError(
                                 error_code=ErrorCode.PROTOCOL_ERROR,
                                 message=f"Failed to parse response as JSON: {str(e)}",
-                                details={"response_text": await response.text(), **request_metadata},
+                                details={"response_text": response_text, **request_metadata},
                             )
                             continue
                         else:
                             raise MCPError(
                                 error_code=ErrorCode.PROTOCOL_ERROR,
                                 message=f"Failed to parse response as JSON: {str(e)}",
-                                details={"response_text": await response.text(), **request_metadata},
+                                details={"response_text": response_text, **request_metadata},
                             )
                             
             except (ClientError, asyncio.TimeoutError) as e:
@@ -702,6 +957,13 @@ class HTTPTransport(Transport):
             logger.debug(f"POST health check failed: {str(e)}")
             return False
     
+    @staticmethod
+    def _auth_type(auth_config: Union[Dict[str, Any], Any, None]) -> Optional[str]:
+        """The configured auth type, for logging without exposing the auth config."""
+        if isinstance(auth_config, dict):
+            return auth_config.get("type")
+        return getattr(auth_config, "type", None)
+        
     def _is_aws_sigv4_auth(self, auth_config: Union[Dict[str, Any], Any]) -> bool:
         """Check if the auth config is for AWS SigV4."""
         if isinstance(auth_config, dict):
@@ -723,17 +985,9 @@ class HTTPTransport(Transport):
         try:
             # Handle AWS SigV4 authentication
             if isinstance(auth_config, dict) and auth_config.get("role_arn"):
-                # Create a temporary credential provider for this specific role
-                from mcp_client.aws.auth import AWSCredentialProvider, AWSAuthenticator
-                logger.debug(f"Creating temporary credential provider for role: {auth_config.get('role_arn')}")
-                temp_provider = AWSCredentialProvider(
-                    region=auth_config.get("region", "us-east-1"),
-                    role_arn=auth_config.get("role_arn"),
-                    external_id=auth_config.get("external_id")
-                )
-                temp_authenticator = AWSAuthenticator(temp_provider)
+                role_authenticator = self._get_role_authenticator(auth_config)
                 service = auth_config.get("service", "lambda")
-                signed_headers = temp_authenticator.sign_request(
+                signed_headers = role_authenticator.sign_request(
                     method=method,
                     url=url,
                     headers=headers,
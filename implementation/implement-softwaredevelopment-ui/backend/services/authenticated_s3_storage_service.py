@@ -7,6 +7,8 @@ storage operations with group-based project access and user-specific session sto
 
 import json
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
@@ -17,6 +19,14 @@ from models.auth_models import UserClaims
 
 logger = logging.getLogger(__name__)
 
+# Validated tokens kept so repeat requests skip JWT signature checks
+VALIDATED_TOKEN_CACHE_SIZE = 1024
+
+# Shared by all service instances; routes create a service per request.
+# Keyed by (user pool, token); entries are dropped once the token expires.
+_validated_tokens: "OrderedDict[Tuple[Optional[str], str], UserClaims]" = OrderedDict()
+_validated_tokens_lock = threading.Lock()
+
 
 @dataclass
 class AuthenticatedS3OperationResult(S3OperationResult):
@@ -61,6 +71,8 @@ class AuthenticatedS3StorageService(S3StorageService):
         """
         Validate user token and extract claims.
         
+        Validated tokens are cached until they expire.
+        
         Args:
             user_token: JWT token string
             
@@ -75,11 +87,26 @@ class AuthenticatedS3StorageService(S3StorageService):
         if user_token.startswith('Bearer '):
             user_token = user_token[7:]
         
+        cache_key = (self.auth_service.user_pool_id, user_token)
+        now = datetime.now(timezone.utc)
+        with _validated_tokens_lock:
+            user_claims = _validated_tokens.get(cache_key)
+            if user_claims is not None:
+                if user_claims.token_expiry > now:
+                    _validated_tokens.move_to_end(cache_key)
+                    return user_claims
+                del _validated_tokens[cache_key]
+        
         user_claims = self.auth_service.extract_user_claims(user_token)
         if not user_claims:
             self.logger.error("Invalid or expired user token")
             return None
         
+        with _validated_tokens_lock:
+            _validated_tokens[cache_key] = user_claims
+            while len(_validated_tokens) > VALIDATED_TOKEN_CACHE_SIZE:
+                _validated_tokens.popitem(last=False)
+        
         return user_claims
     
     def _generate_project_s3_key(self, project_id: str, file_type: str, filename: str = "") -> str:
@@ -285,12 +285,11 @@ class ChatboxManager:
                                 # Execute tools and get additional response
                                 additional_response = ""
                                 failed_tools = []
-                                for tool_call in tool_calls:
-                                    tool_result, success = await self._tool_service.execute_tool(
-                                        tool_call["tool_name"], 
-                                        tool_call["arguments"],
-                                        jwt_token=id_token if 'id_token' in locals() else None
-                                    )
+                                results = await self._tool_service.execute_tool_calls(
+                                    tool_calls,
+                                    jwt_token=id_token if 'id_token' in locals() else None
+                                )
+                                for tool_call, (tool_result, success) in zip(tool_calls, results):
                                     if tool_result:  # Include both success and failure results
                                         if success:
                                             tools_used.append(tool_call["tool_name"])
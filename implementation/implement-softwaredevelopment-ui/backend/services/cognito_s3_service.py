@@ -9,17 +9,27 @@ import json
 import logging
 import boto3
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, FrozenSet, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError, NoCredentialsError
 
 from .authentication_service import AuthenticationService
+from .user_credential_cache import UserCredentialCache
 from models.auth_models import UserClaims
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# S3 error codes meaning the cached temporary credentials are no longer valid
+CREDENTIAL_ERROR_CODES = frozenset({"ExpiredToken", "InvalidAccessKeyId", "InvalidToken", "TokenRefreshRequired"})
+
+# Shared by all service instances; routes create a service per request
+_user_s3_client_cache = UserCredentialCache(
+    max_entries=settings.COGNITO_CREDENTIAL_CACHE_SIZE,
+    refresh_ahead_seconds=settings.COGNITO_CREDENTIAL_REFRESH_AHEAD_SECONDS,
+)
+
 
 @dataclass
 class CognitoS3OperationResult:
@@ -40,6 +50,9 @@ class CognitoS3StorageService:
     - Uses user-specific credentials for all S3 operations
     - Enforces IAM policies based on user's Cognito groups
     - Provides proper access control at the AWS level
+    
+    Clients built from user credentials are cached per user identity and
+    refreshed in the background shortly before the credentials expire.
     """
     
     def __init__(self, auth_service: AuthenticationService):
@@ -55,6 +68,8 @@ class CognitoS3StorageService:
         self.identity_pool_id = settings.COGNITO_IDENTITY_POOL_ID
         self.user_pool_id = settings.COGNITO_USER_POOL_ID
         self._executor = ThreadPoolExecutor(max_workers=4)
+        self._identity_client = None
+        self._credential_cache = _user_s3_client_cache
         
         if not self.identity_pool_id:
             raise ValueError("COGNITO_IDENTITY_POOL_ID is required")
@@ -108,66 +123,125 @@ class CognitoS3StorageService:
                 logger.error("Cannot extract user claims from token")
                 return None
             
-            # We need to get the ID token from the authentication service
-            # For now, let's try using the token directly and see if it works
-            id_token = cognito_token  # This might be the access token, we'll need to get ID token
-            
-            # Create Cognito Identity client
-            identity_client = boto3.client(
-                'cognito-identity', 
-                region_name=self.aws_region
-            )
-            
-            # Construct the login provider key
-            login_provider = f'cognito-idp.{self.aws_region}.amazonaws.com/{self.user_pool_id}'
-            
-            # Get identity ID using ID token
-            identity_response = identity_client.get_id(
-                IdentityPoolId=self.identity_pool_id,
-                Logins={
-                    login_provider: id_token
-                }
-            )
-            
-            identity_id = identity_response['IdentityId']
-            logger.debug(f"Got identity ID: {identity_id}")
-            
-            # Get temporary credentials for the identity
-            credentials_response = identity_client.get_credentials_for_identity(
-                IdentityId=identity_id,
-                Logins={
-                    login_provider: id_token
-                }
-            )
-            
-            credentials = credentials_response['Credentials']
-            logger.debug("Successfully obtained temporary AWS credentials")
-            
-            # Create S3 client with user's temporary credentials
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretKey'],
-                aws_session_token=credentials['SessionToken'],
-                region_name=self.aws_region
-            )
-            
+            s3_client, _ = self._exchange_token_for_s3_client(cognito_token)
             return s3_client
             
         except ClientError as e:
-            error_code = e.response.get("Error", {}).get("Code", "Unknown")
-            error_message = e.response.get("Error", {}).get("Message", "Unknown error")
-            logger.error(f"Failed to create user S3 client: {error_code} - {error_message}")
-            
-            # Provide more specific error messages
-            if error_code == "NotAuthorizedException" and "Missing a required claim: aud" in error_message:
-                logger.error("Token is missing 'aud' claim - need ID token instead of access token")
+            self._log_exchange_error(e)
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error creating user S3 client: {str(e)}")
+            return None
+    
+    async def _get_user_s3_client(self, user_token: str, user_claims: UserClaims) -> Optional[boto3.client]:
+        """
+        Get the cached S3 client for a user, exchanging their token if needed.
+        
+        Args:
+            user_token: User's validated Cognito token
+            user_claims: Claims extracted from the token
             
+        Returns:
+            boto3 S3 client with user credentials, None if failed
+        """
+        if user_token.startswith('Bearer '):
+            user_token = user_token[7:]
+        
+        try:
+            return await self._credential_cache.get(
+                self._credential_cache_key(user_claims),
+                lambda: self._exchange_token_for_s3_client(user_token)
+            )
+        except ClientError as e:
+            self._log_exchange_error(e)
             return None
         except Exception as e:
             logger.error(f"Unexpected error creating user S3 client: {str(e)}")
             return None
     
+    def _credential_cache_key(self, user_claims: UserClaims) -> Tuple[str, str, FrozenSet[str]]:
+        """
+        Cache key for a user's credentials: one identity per user per identity pool,
+        and per group membership, since the groups select the IAM role that is assumed.
+        """
+        return self.identity_pool_id, user_claims.user_id, frozenset(user_claims.groups or ())
+    
+    def _exchange_token_for_s3_client(self, id_token: str) -> Tuple[boto3.client, float]:
+        """
+        Exchange a Cognito token for temporary AWS credentials and build an S3 client.
+        
+        Args:
+            id_token: User's Cognito token without the Bearer prefix
+            
+        Returns:
+            Tuple of (S3 client, credential expiry as seconds since the epoch)
+            
+        Raises:
+            ClientError: If Cognito rejects the token
+        """
+        # We need to get the ID token from the authentication service
+        # For now, let's try using the token directly and see if it works
+        if self._identity_client is None:
+            self._identity_client = boto3.client(
+                'cognito-identity', 
+                region_name=self.aws_region
+            )
+        identity_client = self._identity_client
+        
+        # Construct the login provider key
+        login_provider = f'cognito-idp.{self.aws_region}.amazonaws.com/{self.user_pool_id}'
+        
+        # Get identity ID using ID token
+        identity_response = identity_client.get_id(
+            IdentityPoolId=self.identity_pool_id,
+            Logins={
+                login_provider: id_token
+            }
+        )
+        
+        identity_id = identity_response['IdentityId']
+        logger.debug(f"Got identity ID: {identity_id}")
+        
+        # Get temporary credentials for the identity
+        credentials_response = identity_client.get_credentials_for_identity(
+            IdentityId=identity_id,
+            Logins={
+                login_provider: id_token
+            }
+        )
+        
+        credentials = credentials_response['Credentials']
+        logger.debug("Successfully obtained temporary AWS credentials")
+        
+        # Create S3 client with user's temporary credentials
+        s3_client = boto3.client(
+            's3',
+            aws_access_key_id=credentials['AccessKeyId'],
+            aws_secret_access_key=credentials['SecretKey'],
+            aws_session_token=credentials['SessionToken'],
+            region_name=self.aws_region
+        )
+        
+        expiration = credentials['Expiration']
+        if isinstance(expiration, datetime):
+            expiration = expiration.timestamp()
+        return s3_client, float(expiration)
+    
+    def _log_exchange_error(self, e: ClientError) -> None:
+        """Log a failed token exchange."""
+        error_code = e.response.get("Error", {}).get("Code", "Unknown")
+        error_message = e.response.get("Error", {}).get("Message", "Unknown error")
+        logger.error(f"Failed to create user S3 client: {error_code} - {error_message}")
+        
+        # Provide more specific error messages
+        if error_code == "NotAuthorizedException" and "Missing a required claim: aud" in error_message:
+            logger.error("Token is missing 'aud' claim - need ID token instead of access token")
+    
+    def _invalidate_rejected_credentials(self, error_code: str, user_claims: Optional[UserClaims]) -> None:
+        """Drop a user's cached client when S3 rejects its credentials."""
+        if user_claims is not None and error_code in CREDENTIAL_ERROR_CODES:
+            self._credential_cache.invalidate(self._credential_cache_key(user_claims))
+    
     def _generate_s3_key(self, project_id: str, file_type: str, filename: str = "") -> str:
         """
         Generate S3 key for project files.
@@ -211,6 +285,7 @@ class CognitoS3StorageService:
         Returns:
             CognitoS3OperationResult with operation status
         """
+        user_claims = None
         try:
             # Validate user token
             user_claims = self._validate_user_token(user_token)
@@ -220,8 +295,8 @@ class CognitoS3StorageService:
                     error_message="Authentication failed"
                 )
             
-            # Create user-specific S3 client
-            s3_client = self._create_user_s3_client(user_token)
+            # Get user-specific S3 client
+            s3_client = await self._get_user_s3_client(user_token, user_claims)
             if not s3_client:
                 return CognitoS3OperationResult(
                     success=False, 
@@ -281,6 +356,7 @@ class CognitoS3StorageService:
                 
         except ClientError as e:
             error_code = e.response.get("Error", {}).get("Code", "Unknown")
+            self._invalidate_rejected_credentials(error_code, user_claims)
             error_msg = f"S3 operation failed: {error_code}"
             if error_code == "AccessDenied":
                 error_msg = f"Access denied to project: {project_id}"
@@ -288,8 +364,8 @@ class CognitoS3StorageService:
             return CognitoS3OperationResult(
                 success=False, 
                 error_message=error_msg,
-                user_id=user_claims.user_id if 'user_claims' in locals() else None,
-                groups=user_claims.groups if 'user_claims' in locals() else None
+                user_id=user_claims.user_id if user_claims else None,
+                groups=user_claims.groups if user_claims else None
             )
         except Exception as e:
             error_msg = f"Error saving project metadata to S3: {str(e)}"
@@ -297,8 +373,8 @@ class CognitoS3StorageService:
             return CognitoS3OperationResult(
                 success=False, 
                 error_message=error_msg,
-                user_id=user_claims.user_id if 'user_claims' in locals() else None,
-                groups=user_claims.groups if 'user_claims' in locals() else None
+                user_id=user_claims.user_id if user_claims else None,
+                groups=user_claims.groups if user_claims else None
             )
     
     async def load_project_metadata(self, project_id: str, user_token: str) -> CognitoS3OperationResult:
@@ -312,6 +388,7 @@ class CognitoS3StorageService:
         Returns:
             CognitoS3OperationResult with metadata or error
         """
+        user_claims = None
         try:
             # Validate user token
             user_claims = self._validate_user_token(user_token)
@@ -321,8 +398,8 @@ class CognitoS3StorageService:
                     error_message="Authentication failed"
                 )
             
-            # Create user-specific S3 client
-            s3_client = self._create_user_s3_client(user_token)
+            # Get user-specific S3 client
+            s3_client = await self._get_user_s3_client(user_token, user_claims)
             if not s3_client:
                 return CognitoS3OperationResult(
                     success=False, 
@@ -372,6 +449,7 @@ class CognitoS3StorageService:
             
         except ClientError as e:
             error_code = e.response.get("Error", {}).get("Code", "Unknown")
+            self._invalidate_rejected_credentials(error_code, user_claims)
             error_msg = f"S3 operation failed: {error_code}"
             if error_code == "AccessDenied":
                 error_msg = f"Access denied to project: {project_id}"
@@ -379,8 +457,8 @@ class CognitoS3StorageService:
             return CognitoS3OperationResult(
                 success=False, 
                 error_message=error_msg,
-                user_id=user_claims.user_id if 'user_claims' in locals() else None,
-                groups=user_claims.groups if 'user_claims' in locals() else None
+                user_id=user_claims.user_id if user_claims else None,
+                groups=user_claims.groups if user_claims else None
             )
         except json.JSONDecodeError as e:
             error_msg = f"Invalid JSON in project metadata: {str(e)}"
@@ -388,8 +466,8 @@ class CognitoS3StorageService:
             return CognitoS3OperationResult(
                 success=False, 
                 error_message=error_msg,
-                user_id=user_claims.user_id if 'user_claims' in locals() else None,
-                groups=user_claims.groups if 'user_claims' in locals() else None
+                user_id=user_claims.user_id if user_claims else None,
+                groups=user_claims.groups if user_claims else None
             )
         except Exception as e:
             error_msg = f"Error loading project metadata from S3: {str(e)}"
@@ -397,8 +475,8 @@ class CognitoS3StorageService:
             return CognitoS3OperationResult(
                 success=False, 
                 error_message=error_msg,
-                user_id=user_claims.user_id if 'user_claims' in locals() else None,
-                groups=user_claims.groups if 'user_claims' in locals() else None
+                user_id=user_claims.user_id if user_claims else None,
+                groups=user_claims.groups if user_claims else None
             )
     
     async def list_user_projects(self, user_token: str) -> CognitoS3OperationResult:
@@ -411,6 +489,7 @@ class CognitoS3StorageService:
         Returns:
             CognitoS3OperationResult with list of accessible projects
         """
+        user_claims = None
         try:
             # Validate user token
             user_claims = self._validate_user_token(user_token)
@@ -420,8 +499,8 @@ class CognitoS3StorageService:
                     error_message="Authentication failed"
                 )
             
-            # Create user-specific S3 client
-            s3_client = self._create_user_s3_client(user_token)
+            # Get user-specific S3 client
+            s3_client = await self._get_user_s3_client(user_token, user_claims)
             if not s3_client:
                 return CognitoS3OperationResult(
                     success=False, 
@@ -477,6 +556,7 @@ class CognitoS3StorageService:
             
         except ClientError as e:
             error_code = e.response.get("Error", {}).get("Code", "Unknown")
+            self._invalidate_rejected_credentials(error_code, user_claims)
             error_msg = f"S3 operation failed: {error_code}"
             if error_code == "AccessDenied":
                 error_msg = "Access denied to list projects"
@@ -484,8 +564,8 @@ class CognitoS3StorageService:
             return CognitoS3OperationResult(
                 success=False, 
                 error_message=error_msg,
-                user_id=user_claims.user_id if 'user_claims' in locals() else None,
-                groups=user_claims.groups if 'user_claims' in locals() else None
+                user_id=user_claims.user_id if user_claims else None,
+                groups=user_claims.groups if user_claims else None
             )
         except Exception as e:
             error_msg = f"Error listing user projects from S3: {str(e)}"
@@ -493,6 +573,6 @@ class CognitoS3StorageService:
             return CognitoS3OperationResult(
                 success=False, 
                 error_message=error_msg,
-                user_id=user_claims.user_id if 'user_claims' in locals() else None,
-                groups=user_claims.groups if 'user_claims' in locals() else None
+                user_id=user_claims.user_id if user_claims else None,
+                groups=user_claims.groups if user_claims else None
             )
\ No newline at end of file
@@ -70,19 +70,18 @@ class EnhancedClaudeService(ClaudeService):
                     all_results = []
                     all_tools_used = []
                     
-                    for i, tool_call in enumerate(tool_calls):
-                        self.logger.info(f"Executing tool call {i+1}/{len(tool_calls)}: {tool_call['tool_name']}")
-                        
-                        # Execute the tool
-                        user_id = user_context.get('user_id') if user_context else None
-                        jwt_token = user_context.get('jwt_token') if user_context else None
-                        tool_result, success = await self.tool_service.execute_tool(
-                            tool_call["tool_name"], 
-                            tool_call["arguments"],
-                            user_id=user_id,
-                            jwt_token=jwt_token
-                        )
-                        
+                    self.logger.info(f"Executing tool calls: {', '.join(tool_call['tool_name'] for tool_call in tool_calls)}")
+                    
+                    # Independent tool calls run concurrently; results keep the request order
+                    user_id = user_context.get('user_id') if user_context else None
+                    jwt_token = user_context.get('jwt_token') if user_context else None
+                    results = await self.tool_service.execute_tool_calls(
+                        tool_calls,
+                        user_id=user_id,
+                        jwt_token=jwt_token
+                    )
+                    
+                    for i, (tool_call, (tool_result, success)) in enumerate(zip(tool_calls, results)):
                         if success and tool_result:
                             self.logger.info(f"Tool execution {i+1} successful, result length: {len(tool_result)} characters")
                             all_results.append({
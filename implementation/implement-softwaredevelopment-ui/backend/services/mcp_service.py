@@ -254,6 +254,12 @@ class MCPService:
         """Get the server configurations."""
         return getattr(self, '_server_configs', {})
     
+    def invalidate_server_registration(self, server_id: str):
+        """Forget that a server is registered so the next use registers it again."""
+        self._registered_servers.discard(server_id)
+        if server_id in self._available_tools:
+            self._available_tools[server_id]['registered'] = False
+    
 
     
     def get_design_integration(self):
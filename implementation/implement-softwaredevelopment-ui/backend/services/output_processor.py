@@ -8,7 +8,9 @@ Automatically detects and processes tool outputs:
 """
 
 import re
+import hashlib
 import logging
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse
 import aiohttp
@@ -17,15 +19,51 @@ import asyncio
 from services.diagram_service import DiagramService
 from services.s3_storage_service import S3StorageService
 
+# A single scan over the output finds fenced code blocks and URLs. URLs
+# inside a code block are picked up by scanning just that block's body.
+ARTIFACT_PATTERN = re.compile(
+    r'```(?P<language>\w+)?\n(?P<code>.*?)\n```|(?P<url>https?://[^\s\)]+)',
+    re.DOTALL | re.IGNORECASE,
+)
+URL_PATTERN = re.compile(r'https?://[^\s\)]+', re.IGNORECASE)
+# Greedy, so a match ends at the last extension in the URL
+IMAGE_URL_PATTERN = re.compile(r'.+\.(?:png|jpg|jpeg|gif|svg)', re.IGNORECASE)
+DOCUMENT_URL_PATTERN = re.compile(r'.+\.(?:pdf|doc|docx|txt)', re.IGNORECASE)
+
+# Stored artifacts remembered for dedup across turns
+STORED_ARTIFACT_CACHE_SIZE = 512
+
 
 class OutputProcessor:
     """Processes tool outputs and stores them appropriately."""
     
-    def __init__(self, diagram_service: DiagramService = None, s3_storage_service: S3StorageService = None):
-        """Initialize the output processor."""
+    def __init__(
+        self,
+        diagram_service: DiagramService = None,
+        s3_storage_service: S3StorageService = None,
+        max_concurrent_artifacts: int = 4,
+    ):
+        """
+        Initialize the output processor.
+        
+        Args:
+            diagram_service: Diagram service, or None to create one
+            s3_storage_service: S3 storage service, or None to create one
+            max_concurrent_artifacts: Maximum diagrams, code blocks and documents
+                downloaded or uploaded at the same time
+        """
         self.logger = logging.getLogger(__name__)
         self.diagram_service = diagram_service or DiagramService()
         self.s3_storage_service = s3_storage_service or S3StorageService()
+        self.max_concurrent_artifacts = max(1, max_concurrent_artifacts)
+        self._artifact_slots: Optional[asyncio.Semaphore] = None
+        self._s3_download_client = None
+        # (project, kind, content hash or URL) -> result of storing the artifact
+        self._stored_artifacts: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self.stats = {
+            'artifacts_stored': 0,
+            'artifacts_deduplicated': 0,
+        }
     
     async def process_tool_outputs(
         self, 
@@ -50,57 +88,35 @@ class OutputProcessor:
         }
         
         try:
-            # Debug: Log AI response content
             self.logger.info(f"AI response length: {len(ai_response)} characters")
-            if "https://" in ai_response:
-                self.logger.info("AI response contains https URLs")
-                # Find all https URLs for debugging
-                import re
-                all_urls = re.findall(r'https://[^\s\)]+', ai_response)
-                self.logger.info(f"All https URLs found: {all_urls}")
-                
-                # Check specifically for S3 URLs
-                s3_urls = [url for url in all_urls if 's3.amazonaws.com' in url]
-                if s3_urls:
-                    self.logger.info(f"S3 URLs found: {s3_urls}")
-                
-                # Check for diagram-related URLs
-                diagram_related = [url for url in all_urls if any(keyword in url.lower() for keyword in ['diagram', 'architecture', 'technical', '.png', '.jpg', '.svg'])]
-                if diagram_related:
-                    self.logger.info(f"Diagram-related URLs found: {diagram_related}")
-            else:
-                self.logger.info("AI response does NOT contain https URLs")
-            
-            # Extract diagram URLs from AI response
-            diagram_urls = self._extract_diagram_urls(ai_response)
-            if diagram_urls:
-                self.logger.info(f"Processing {len(diagram_urls)} diagram URLs")
-                for url in diagram_urls:
-                    diagram_data = await self._process_diagram_url(url, session)
-                    if diagram_data:
-                        processed_outputs['diagrams'].append(diagram_data)
-                    else:
-                        self.logger.error(f"Failed to process diagram URL: {url}")
+            
+            # Extract diagrams, code blocks and documents in one pass
+            artifacts = self._scan_artifacts(ai_response)
+            diagram_urls = artifacts['diagram_urls']
+            code_blocks = artifacts['code_blocks']
+            document_urls = artifacts['document_urls']
+            
+            if diagram_urls or code_blocks or document_urls:
+                self.logger.info(
+                    f"Processing {len(diagram_urls)} diagram URLs, {len(code_blocks)} code blocks, "
+                    f"{len(document_urls)} document URLs"
+                )
             else:
-                self.logger.info("No diagram URLs found in AI response text")
-            
-            # Extract code blocks from AI response
-            code_blocks = self._extract_code_blocks(ai_response)
-            if code_blocks:
-                self.logger.info(f"Processing {len(code_blocks)} code blocks")
-                for code_block in code_blocks:
-                    code_file = await self._process_code_block(code_block, session)
-                    if code_file:
-                        processed_outputs['code_files'].append(code_file)
-            
-            # Extract document URLs (PDFs, etc.)
-            document_urls = self._extract_document_urls(ai_response)
-            if document_urls:
-                self.logger.info(f"Processing {len(document_urls)} document URLs")
-                for url in document_urls:
-                    document_data = await self._process_document_url(url, session)
-                    if document_data:
-                        processed_outputs['documents'].append(document_data)
+                self.logger.info("No diagrams, code blocks or documents found in AI response text")
+            
+            # Process and upload all artifacts concurrently, keeping their order
+            diagrams, code_files, documents = await asyncio.gather(
+                self._process_artifacts(self._process_diagram_url, diagram_urls, session),
+                self._process_artifacts(self._process_code_block, code_blocks, session),
+                self._process_artifacts(self._process_document_url, document_urls, session),
+            )
+            for url, diagram_data in zip(diagram_urls, diagrams):
+                if diagram_data:
+                    processed_outputs['diagrams'].append(diagram_data)
+                else:
+                    self.logger.error(f"Failed to process diagram URL: {url}")
+            processed_outputs['code_files'].extend(code_file for code_file in code_files if code_file)
+            processed_outputs['documents'].extend(document for document in documents if document)
             
 
             
@@ -157,88 +173,119 @@ class OutputProcessor:
         
         return processed_outputs
     
-    def _extract_diagram_urls(self, text: str) -> List[str]:
-        """Extract diagram URLs from text."""
-        # Debug logging to see what text we're processing
-        self.logger.debug(f"Extracting diagram URLs from text (length: {len(text)})")
-        if "https://" in text:
-            self.logger.debug(f"Text contains https URLs: {text[:500]}...")
+    def _scan_artifacts(self, text: str) -> Dict[str, List[Any]]:
+        """
+        Extract diagram URLs, code blocks and document URLs in a single scan.
         
-        # Look for various diagram URL patterns
-        patterns = [
-            r'https?://[^\s\)]+\.(?:png|jpg|jpeg|gif|svg)',  # Image URLs (fixed to handle markdown)
-            r'https?://[^\s\)]+/diagram[^\s\)]*',  # URLs containing 'diagram'
-            r'https?://[^\s\)]+/architecture[^\s\)]*',  # URLs containing 'architecture'
-            r'!\[.*?\]\((https?://[^\s\)]+\.(?:png|jpg|jpeg|gif|svg))\)',  # Markdown image syntax
-            r'https?://[^\s\)]+\.s3\.amazonaws\.com[^\s\)]*\.(?:png|jpg|jpeg|gif|svg)',  # S3 image URLs
-            r'https?://[^\s\)]+\.s3\.amazonaws\.com[^\s\)]*_diagram\.png',  # S3 diagram URLs with _diagram suffix
-            r'https?://[^\s\)]+\.s3\.amazonaws\.com[^\s\)]*architecture[^\s\)]*\.png',  # S3 architecture diagram URLs
-            r'https?://[^\s\)]+\.s3\.amazonaws\.com[^\s\)]*technical[^\s\)]*\.png',  # S3 technical diagram URLs
-        ]
+        Returns:
+            Dictionary with 'diagram_urls', 'code_blocks' and 'document_urls',
+            each deduplicated and in order of appearance
+        """
+        urls: List[str] = []
+        code_blocks: List[Dict[str, str]] = []
+        seen_code = set()
         
-        urls = []
-        for i, pattern in enumerate(patterns):
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                self.logger.debug(f"Pattern {i+1} found {len(matches)} matches: {matches}")
-                # Handle both tuple and string matches from regex groups
-                for match in matches:
-                    if isinstance(match, tuple):
-                        # From markdown syntax pattern - take the URL part
-                        urls.append(match[0] if match[0] else match[1])
-                    else:
-                        urls.append(match)
-            else:
-                self.logger.debug(f"Pattern {i+1} found no matches")
+        for match in ARTIFACT_PATTERN.finditer(text):
+            url = match.group('url')
+            if url is not None:
+                urls.append(url)
+                continue
+                
+            code = match.group('code')
+            # URLs in tool results often sit inside code blocks
+            if '://' in code:
+                urls.extend(URL_PATTERN.findall(code))
+            code = code.strip()
+            if len(code) > 10:  # Only process substantial code blocks
+                language = match.group('language') or 'text'
+                if (language, code) not in seen_code:
+                    seen_code.add((language, code))
+                    code_blocks.append({
+                        'language': language,
+                        'code': code,
+                        'type': 'block'
+                    })
         
-        # Remove duplicates and filter valid URLs
-        unique_urls = list(set(urls))
-        valid_urls = [url for url in unique_urls if self._is_valid_url(url)]
+        diagram_urls: Dict[str, None] = {}
+        document_urls: Dict[str, None] = {}
+        for url in urls:
+            diagram_url = self._diagram_url_from(url)
+            if diagram_url and self._is_valid_url(diagram_url):
+                diagram_urls[diagram_url] = None
+            document_url = self._document_url_from(url)
+            if document_url:
+                document_urls[document_url] = None
         
-        if valid_urls:
-            self.logger.info(f"Found {len(valid_urls)} valid diagram URLs: {valid_urls}")
-        else:
-            self.logger.debug("No diagram URLs found in text")
+        if diagram_urls:
+            self.logger.info(f"Found {len(diagram_urls)} valid diagram URLs: {list(diagram_urls)}")
         
-        return valid_urls
+        return {
+            'diagram_urls': list(diagram_urls),
+            'code_blocks': code_blocks,
+            'document_urls': list(document_urls),
+        }
+    
+    @staticmethod
+    def _diagram_url_from(url: str) -> Optional[str]:
+        """Return the diagram URL contained in a URL token, if it points to one."""
+        lowered = url.lower()
+        if '/diagram' in lowered or '/architecture' in lowered:
+            return url
+        # Image URLs end at the image extension (e.g. markdown or quoted URLs)
+        match = IMAGE_URL_PATTERN.match(url)
+        return match.group(0) if match else None
+    
+    @staticmethod
+    def _document_url_from(url: str) -> Optional[str]:
+        """Return the document URL contained in a URL token, if it points to one."""
+        lowered = url.lower()
+        if '/document' in lowered or '/specification' in lowered:
+            return url
+        match = DOCUMENT_URL_PATTERN.match(url)
+        return match.group(0) if match else None
+    
+    def _extract_diagram_urls(self, text: str) -> List[str]:
+        """Extract diagram URLs from text."""
+        return self._scan_artifacts(text)['diagram_urls']
     
     def _extract_code_blocks(self, text: str) -> List[Dict[str, str]]:
         """Extract code blocks from text."""
-        # Look for code blocks in various formats
-        patterns = [
-            r'```(\w+)?\n(.*?)\n```',  # Standard code blocks
-            r'`([^`\n]+)`',  # Inline code
-        ]
-        
-        code_blocks = []
-        
-        # Extract fenced code blocks
-        fenced_pattern = r'```(\w+)?\n(.*?)\n```'
-        matches = re.findall(fenced_pattern, text, re.DOTALL)
-        for language, code in matches:
-            if len(code.strip()) > 10:  # Only process substantial code blocks
-                code_blocks.append({
-                    'language': language or 'text',
-                    'code': code.strip(),
-                    'type': 'block'
-                })
-        
-        return code_blocks
+        return self._scan_artifacts(text)['code_blocks']
     
     def _extract_document_urls(self, text: str) -> List[str]:
         """Extract document URLs from text."""
-        patterns = [
-            r'https?://[^\s]+\.(?:pdf|doc|docx|txt)',  # Document URLs
-            r'https?://[^\s]+/document[^\s]*',  # URLs containing 'document'
-            r'https?://[^\s]+/specification[^\s]*',  # URLs containing 'specification'
-        ]
+        return self._scan_artifacts(text)['document_urls']
+    
+    async def _process_artifacts(self, process, items: List[Any], session: Dict[str, Any]) -> List[Any]:
+        """Run an artifact processor over items, bounded by max_concurrent_artifacts."""
+        if not items:
+            return []
+        if self._artifact_slots is None:
+            self._artifact_slots = asyncio.Semaphore(self.max_concurrent_artifacts)
         
-        urls = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            urls.extend(matches)
+        async def run(item):
+            async with self._artifact_slots:
+                return await process(item, session)
         
-        return list(set(urls))
+        return await asyncio.gather(*(run(item) for item in items))
+    
+    def _get_stored_artifact(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """Look up an artifact stored in an earlier turn."""
+        stored = self._stored_artifacts.get(key)
+        if stored is None:
+            return None
+        self._stored_artifacts.move_to_end(key)
+        self.stats['artifacts_deduplicated'] += 1
+        return {**stored, 'deduplicated': True}
+    
+    def _remember_stored_artifact(self, keys: List[Tuple[str, str, str]], stored: Dict[str, Any]) -> None:
+        """Remember a stored artifact under one or more dedup keys."""
+        self.stats['artifacts_stored'] += 1
+        for key in keys:
+            self._stored_artifacts[key] = stored
+            self._stored_artifacts.move_to_end(key)
+        while len(self._stored_artifacts) > STORED_ARTIFACT_CACHE_SIZE:
+            self._stored_artifacts.popitem(last=False)
     
     def _extract_openapi_specs(self, text: str) -> List[Dict[str, Any]]:
         """Extract OpenAPI specifications from text."""
@@ -1059,14 +1106,27 @@ class OutputProcessor:
         """Process a diagram URL by downloading and storing it."""
         try:
             project_name = session.get('project_name', 'unknown-project')
+            url_key = (project_name, 'diagram_url', url)
+            stored = self._get_stored_artifact(url_key)
+            if stored:
+                return stored
             
             # Download the image using the same method as diagram service
             image_data = await self._download_s3_image_data(url)
             if image_data:
-                # Generate filename (same approach as diagram service)
+                # The same image behind a different URL is stored once
+                digest = hashlib.sha256(image_data).hexdigest()
+                content_key = (project_name, 'diagram', digest)
+                stored = self._get_stored_artifact(content_key)
+                if stored:
+                    self._remember_stored_artifact([url_key], stored)
+                    return stored
+                
+                # Generate filename (same approach as diagram service). The hash
+                # suffix keeps diagrams stored within the same second apart.
                 from datetime import datetime
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                diagram_name = f"architecture_diagram_{timestamp}"
+                diagram_name = f"architecture_diagram_{timestamp}_{digest[:8]}"
                 format = 'png'
                 filename = f"{diagram_name}.{format}"
                 
@@ -1092,7 +1152,7 @@ class OutputProcessor:
                     
                     self.logger.info(f"✅ Stored diagram: {filename} → {local_url}")
                     
-                    return {
+                    diagram_data = {
                         'filename': filename,
                         'local_url': local_url,
                         'original_url': url,
@@ -1101,6 +1161,8 @@ class OutputProcessor:
                         'is_latest': True,  # New diagrams are always latest
                         'type': 'diagram'
                     }
+                    self._remember_stored_artifact([url_key, content_key], diagram_data)
+                    return dict(diagram_data)
             else:
                 self.logger.error(f"❌ Failed to download image data from: {url}")
         
@@ -1134,9 +1196,17 @@ class OutputProcessor:
             
             extension = extensions.get(language.lower(), 'txt')
             
+            # Identical code produced in an earlier turn is stored once
+            digest = hashlib.sha256(f"{language}\0{code}".encode('utf-8')).hexdigest()
+            content_key = (project_name, 'code', digest)
+            stored = self._get_stored_artifact(content_key)
+            if stored:
+                return stored
+            
+            # The hash suffix keeps blocks stored within the same second apart
             from datetime import datetime
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{language}_{timestamp}.{extension}"
+            filename = f"{language}_{timestamp}_{digest[:8]}.{extension}"
             
             # Store in S3 using save_generated_code method
             files_dict = {filename: code}
@@ -1147,12 +1217,14 @@ class OutputProcessor:
             if result.success:
                 self.logger.debug(f"Stored code file: {filename}")
                 
-                return {
+                code_file = {
                     'filename': filename,
                     'language': language,
                     'project_name': project_name,
                     'timestamp': timestamp
                 }
+                self._remember_stored_artifact([content_key], code_file)
+                return dict(code_file)
         
         except Exception as e:
             self.logger.error(f"❌ Failed to process code block: {e}")
@@ -1222,12 +1294,9 @@ class OutputProcessor:
             else:
                 raise ValueError(f"Unsupported S3 URL format: {s3_url}")
             
-            # Download the object
-            import boto3
-            from config.settings import settings
-            s3_client = boto3.client('s3', region_name=settings.AWS_REGION)
-            response = s3_client.get_object(Bucket=bucket_name, Key=key)
-            image_data = response['Body'].read()
+            # Download the object without blocking the event loop
+            loop = asyncio.get_event_loop()
+            image_data = await loop.run_in_executor(None, self._sync_download_s3_object, bucket_name, key)
             
             self.logger.info(f"Successfully downloaded image data ({len(image_data)} bytes)")
             return image_data
@@ -1236,6 +1305,15 @@ class OutputProcessor:
             self.logger.error(f"Error downloading S3 image: {e}")
             return None
 
+    def _sync_download_s3_object(self, bucket_name: str, key: str) -> bytes:
+        """Download an S3 object with a client shared across downloads."""
+        if self._s3_download_client is None:
+            import boto3
+            from config.settings import settings
+            self._s3_download_client = boto3.client('s3', region_name=settings.AWS_REGION)
+        response = self._s3_download_client.get_object(Bucket=bucket_name, Key=key)
+        return response['Body'].read()
+    
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is valid."""
         try:
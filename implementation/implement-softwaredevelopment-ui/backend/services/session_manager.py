@@ -1,32 +1,94 @@
 """Session management service."""
 
+import heapq
 import json
 import uuid
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Any, List
+from typing import Callable, Dict, Optional, Any, List, Tuple
 
 from config.settings import settings
 from models.session import ConversationSession, MessageEntry, SessionStats
+from services.session_persistence import SessionPersistence, create_session_persistence
 
 
 class SessionManager:
-    """Manages conversation sessions with persistence."""
+    """
+    Manages conversation sessions with persistence.
     
-    def __init__(self):
-        """Initialize the SessionManager."""
+    Sessions are kept in an in-memory LRU store bounded by MAX_SESSIONS and
+    expire after SESSION_TIMEOUT_HOURS without activity. An expiry heap keeps
+    cleanup proportional to the number of expired sessions, and a background
+    reaper runs it periodically. With a persistence backend, sessions are
+    written through on create and update and loaded on a miss, so they
+    survive restarts and can be shared by several workers.
+    """
+    
+    def __init__(
+        self,
+        persistence: Optional[SessionPersistence] = None,
+        max_sessions: Optional[int] = None,
+        session_timeout_hours: Optional[float] = None,
+        reaper_interval_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the SessionManager.
+        
+        Args:
+            persistence: Backend to persist sessions to, or None to use the one from settings
+            max_sessions: Maximum sessions kept in memory (defaults to settings)
+            session_timeout_hours: Idle time after which a session expires (defaults to settings)
+            reaper_interval_seconds: Seconds between background cleanups, 0 to disable
+                (defaults to settings)
+            clock: Wall-clock time source in seconds; persisted expiry times use it too
+        """
         self.logger = logging.getLogger(__name__)
         
-        # In-memory storage for conversation sessions
-        self._sessions: Dict[str, Dict[str, Any]] = {}
-        self._session_timestamps: Dict[str, datetime] = {}
+        # In-memory storage for conversation sessions, least recently used first
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}
+        # (expiry time, conversation_id). Entries are not updated on activity;
+        # an entry that comes due for a session used since is pushed back instead.
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Version of each session as last saved to or loaded from persistence
+        self._versions: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._clock = clock
         
         # Configuration
-        self._max_sessions = settings.MAX_SESSIONS
-        self._session_timeout_hours = settings.SESSION_TIMEOUT_HOURS
+        self._max_sessions = max_sessions if max_sessions is not None else settings.MAX_SESSIONS
+        self._session_timeout_hours = (
+            session_timeout_hours if session_timeout_hours is not None else settings.SESSION_TIMEOUT_HOURS
+        )
+        self._ttl_seconds = self._session_timeout_hours * 3600
+        
+        if persistence is None and settings.SESSION_PERSISTENCE:
+            persistence = create_session_persistence(settings.SESSION_PERSISTENCE, settings.SESSION_PERSISTENCE_PATH)
+        self._persistence = persistence
         
-        # Note: Using in-memory storage only for simplicity
+        if reaper_interval_seconds is None:
+            reaper_interval_seconds = settings.SESSION_REAPER_INTERVAL_SECONDS
+        self._reaper_stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        if reaper_interval_seconds > 0:
+            self._reaper = threading.Thread(
+                target=self._reap_loop, args=(reaper_interval_seconds,), name="session-reaper", daemon=True
+            )
+            self._reaper.start()
+    
+    def close(self) -> None:
+        """Stop the background reaper and release the persistence backend."""
+        self._reaper_stop.set()
+        if self._reaper is not None:
+            self._reaper.join(timeout=5.0)
+            self._reaper = None
+        if self._persistence is not None:
+            self._persistence.close()
     
     def create_session(self, conversation_id: Optional[str] = None, phase: Optional[str] = None) -> str:
         """Create a new conversation session."""
@@ -44,33 +106,57 @@ class SessionManager:
             'specification_data': None
         }
         
-        self._sessions[conversation_id] = session_data
-        self._session_timestamps[conversation_id] = datetime.utcnow()
-        
-        # Session created in memory only
-        
-        # Cleanup if needed
-        self._cleanup_old_sessions()
+        now = self._clock()
+        with self._lock:
+            self._store(conversation_id, session_data, now)
+            
+            # Cleanup if needed; only expired and excess sessions are visited
+            self._cleanup_memory(now)
         
+        self._persist(conversation_id, session_data, now)
         return conversation_id
     
     def get_session(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a conversation session by ID."""
-        if conversation_id in self._sessions:
-            self._sessions[conversation_id]['last_activity'] = datetime.utcnow()
-            return self._sessions[conversation_id]
+        now = self._clock()
+        with self._lock:
+            session = self._sessions.get(conversation_id)
+            if session is not None and now - self._last_seen[conversation_id] >= self._ttl_seconds:
+                # Expired but not reaped yet
+                self._remove(conversation_id)
+                session = None
+            if session is not None and self._persistence is None:
+                self._touch(conversation_id, session, now)
+                return session
+            cached_version = self._versions.get(conversation_id)
         
-        # Session not found in memory
+        if self._persistence is None:
+            return None
         
-        return None
+        try:
+            if session is not None:
+                # Another worker may have saved a newer version of this session
+                version = self._persistence.get_version(conversation_id)
+                if version is None:
+                    # Expired from the backend but still active here
+                    self._persist(conversation_id, session, now)
+                if version is None or version == cached_version:
+                    with self._lock:
+                        if self._sessions.get(conversation_id) is session:
+                            self._touch(conversation_id, session, now)
+                    return session
+            
+            return self._load_persisted(conversation_id, now)
+        except Exception as e:
+            self.logger.error(f"Failed to load session {conversation_id} from persistence: {e}")
+            return session
     
     def update_session(self, conversation_id: str, message: str, response: str, tools_used: Optional[List[str]] = None) -> bool:
         """Update a session with new message and response."""
-        if conversation_id not in self._sessions:
+        session = self.get_session(conversation_id)
+        if session is None:
             return False
         
-        session = self._sessions[conversation_id]
-        
         message_entry = {
             'timestamp': datetime.utcnow().isoformat(),
             'user_message': message,
@@ -82,21 +168,23 @@ class SessionManager:
         session['message_count'] += 1
         session['last_activity'] = datetime.utcnow()
         
-        # Session updated in memory
-        
+        self._persist(conversation_id, session, self._clock())
         return True
     
     def session_exists(self, conversation_id: str) -> bool:
         """Check if a conversation session exists."""
-        return conversation_id in self._sessions
+        return self.get_session(conversation_id) is not None
     
     def get_session_count(self) -> int:
-        """Get the total number of active sessions."""
+        """Get the number of sessions held in memory."""
         return len(self._sessions)
     
     def get_session_stats(self) -> SessionStats:
         """Get statistics about current sessions."""
-        if not self._sessions:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        
+        if not sessions:
             return SessionStats(
                 total_sessions=0,
                 total_messages=0,
@@ -106,10 +194,10 @@ class SessionManager:
             )
         
         current_time = datetime.utcnow()
-        total_messages = sum(session.get('message_count', 0) for session in self._sessions.values())
+        total_messages = sum(session.get('message_count', 0) for session in sessions)
         
         session_ages = []
-        for session in self._sessions.values():
+        for session in sessions:
             created_at = session.get('created_at')
             if isinstance(created_at, str):
                 created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
@@ -117,9 +205,9 @@ class SessionManager:
             session_ages.append(age_hours)
         
         return SessionStats(
-            total_sessions=len(self._sessions),
+            total_sessions=len(sessions),
             total_messages=total_messages,
-            average_messages_per_session=total_messages / len(self._sessions),
+            average_messages_per_session=total_messages / len(sessions),
             oldest_session_age_hours=max(session_ages) if session_ages else 0,
             newest_session_age_hours=min(session_ages) if session_ages else 0
         )
@@ -130,42 +218,109 @@ class SessionManager:
     
     def _cleanup_old_sessions(self) -> int:
         """Clean up old sessions based on timeout and max session limits."""
-        current_time = datetime.utcnow()
-        sessions_to_remove = []
+        now = self._clock()
+        with self._lock:
+            removed = self._cleanup_memory(now)
+        
+        if self._persistence is not None:
+            try:
+                expired = self._persistence.delete_expired(now)
+                if expired:
+                    self.logger.debug(f"Deleted {expired} expired sessions from persistence")
+            except Exception as e:
+                self.logger.error(f"Failed to delete expired sessions from persistence: {e}")
+        
+        return removed
+    
+    def _cleanup_memory(self, now: float) -> int:
+        """Expire idle sessions and evict the least recently used beyond the limit. Call with the lock held."""
+        removed = 0
+        ttl = self._ttl_seconds
+        heap = self._expiry_heap
         
         # Find sessions that have timed out
-        for conversation_id, session in self._sessions.items():
-            last_activity = session.get('last_activity', session.get('created_at'))
-            if isinstance(last_activity, str):
-                last_activity = datetime.fromisoformat(last_activity.replace('Z', '+00:00'))
-            
-            time_diff = current_time - last_activity
-            if time_diff.total_seconds() > (self._session_timeout_hours * 3600):
-                sessions_to_remove.append(conversation_id)
-        
-        # Remove excess sessions if over limit
-        if len(self._sessions) > self._max_sessions:
-            sorted_sessions = sorted(
-                self._sessions.items(),
-                key=lambda x: x[1].get('last_activity', x[1].get('created_at'))
-            )
-            
-            excess_count = len(self._sessions) - self._max_sessions
-            for i in range(excess_count):
-                conversation_id = sorted_sessions[i][0]
-                if conversation_id not in sessions_to_remove:
-                    sessions_to_remove.append(conversation_id)
+        while heap and heap[0][0] <= now:
+            _, conversation_id = heapq.heappop(heap)
+            last_seen = self._last_seen.get(conversation_id)
+            if last_seen is None:
+                continue  # Already removed
+            if last_seen + ttl > now:
+                heapq.heappush(heap, (last_seen + ttl, conversation_id))
+                continue
+            self._remove(conversation_id)
+            removed += 1
+        
+        # Remove excess sessions if over limit. Persisted copies stay in the
+        # backend and are loaded again on the next access.
+        while len(self._sessions) > self._max_sessions:
+            conversation_id, _ = self._sessions.popitem(last=False)
+            self._remove(conversation_id)
+            removed += 1
         
-        # Remove the sessions
-        for conversation_id in sessions_to_remove:
-            if conversation_id in self._sessions:
-                del self._sessions[conversation_id]
-            if conversation_id in self._session_timestamps:
-                del self._session_timestamps[conversation_id]
+        # Drop heap entries left behind by evicted sessions
+        if len(heap) > 2 * len(self._last_seen) + 64:
+            self._expiry_heap = [(last_seen + ttl, cid) for cid, last_seen in self._last_seen.items()]
+            heapq.heapify(self._expiry_heap)
+        
+        return removed
+    
+    def _store(self, conversation_id: str, session: Dict[str, Any], now: float) -> None:
+        """Put a session in the memory store as most recently used. Call with the lock held."""
+        self._sessions[conversation_id] = session
+        self._sessions.move_to_end(conversation_id)
+        if conversation_id not in self._last_seen:
+            heapq.heappush(self._expiry_heap, (now + self._ttl_seconds, conversation_id))
+        self._last_seen[conversation_id] = now
+    
+    def _touch(self, conversation_id: str, session: Dict[str, Any], now: float) -> None:
+        """Record activity on a session. Call with the lock held."""
+        self._sessions.move_to_end(conversation_id)
+        self._last_seen[conversation_id] = now
+        session['last_activity'] = datetime.utcnow()
+    
+    def _remove(self, conversation_id: str) -> None:
+        """Remove a session from the memory store. Call with the lock held."""
+        self._sessions.pop(conversation_id, None)
+        self._last_seen.pop(conversation_id, None)
+        self._versions.pop(conversation_id, None)
+    
+    def _persist(self, conversation_id: str, session: Dict[str, Any], now: float) -> None:
+        """Write a session through to the persistence backend, if any."""
+        if self._persistence is None:
+            return
+        try:
+            version = self._persistence.save(conversation_id, session, now + self._ttl_seconds)
+        except Exception as e:
+            self.logger.error(f"Failed to persist session {conversation_id}: {e}")
+            return
+        with self._lock:
+            if self._sessions.get(conversation_id) is session:
+                self._versions[conversation_id] = version
+    
+    def _load_persisted(self, conversation_id: str, now: float) -> Optional[Dict[str, Any]]:
+        """Load a session from the persistence backend into the memory store."""
+        record = self._persistence.load(conversation_id)
+        if record is None:
+            return None
+        session, expires_at, version = record
+        if expires_at <= now:
+            return None
         
-        return len(sessions_to_remove)
+        with self._lock:
+            self._store(conversation_id, session, now)
+            self._versions[conversation_id] = version
+            self._cleanup_memory(now)
+        return session
     
-    # JSON persistence methods removed - using in-memory only for simplicity
+    def _reap_loop(self, interval_seconds: float) -> None:
+        """Background reaper: periodically expire idle sessions."""
+        while not self._reaper_stop.wait(interval_seconds):
+            try:
+                removed = self._cleanup_old_sessions()
+                if removed:
+                    self.logger.debug(f"Session reaper removed {removed} sessions")
+            except Exception as e:
+                self.logger.error(f"Session reaper failed: {e}")
     
     def _convert_session_to_json(self, session: Dict[str, Any]) -> Dict[str, Any]:
         """Convert session data to JSON-serializable format for API responses."""
@@ -182,7 +337,9 @@ class SessionManager:
     def get_phase_sessions(self, phase: str) -> List[Dict[str, Any]]:
         """Get all sessions for a specific SDLC phase."""
         phase_sessions = []
-        for conversation_id, session in self._sessions.items():
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for conversation_id, session in sessions:
             if session.get('phase') == phase:
                 phase_sessions.append(session)
         return phase_sessions
@@ -208,19 +365,23 @@ class SessionManager:
     
     def get_all_conversation_ids(self, phase: Optional[str] = None) -> List[str]:
         """Get all conversation IDs in memory, optionally filtered by phase."""
+        with self._lock:
+            sessions = list(self._sessions.items())
         if phase:
             return [
-                conv_id for conv_id, session in self._sessions.items()
+                conv_id for conv_id, session in sessions
                 if session.get('phase') == phase
             ]
         else:
-            return list(self._sessions.keys())
+            return [conv_id for conv_id, _ in sessions]
     
     def get_all_conversations_for_phase(self, phase: str) -> List[Dict[str, Any]]:
         """Get all conversations for a specific phase from memory."""
         conversations = []
+        with self._lock:
+            sessions = list(self._sessions.items())
         
-        for conversation_id, session in self._sessions.items():
+        for conversation_id, session in sessions:
             if session.get('phase') == phase:
                 context = self.get_conversation_context(conversation_id)
                 conversations.append(context)
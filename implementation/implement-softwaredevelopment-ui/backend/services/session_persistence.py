@@ -0,0 +1,278 @@
+"""Persistence backends for conversation sessions.
+
+Backends keep serialized sessions outside the process so they survive
+restarts and can be shared by several uvicorn workers. SessionManager keeps
+its in-memory store as the first-level cache and writes through to the
+backend when sessions are created or updated.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Session fields stored as datetime objects in memory and ISO strings on disk
+DATETIME_FIELDS = ('created_at', 'last_activity')
+
+
+def serialize_session(session: Dict[str, Any]) -> str:
+    """Serialize a session dictionary to JSON."""
+    return json.dumps(session, default=_json_default)
+
+
+def deserialize_session(data: str) -> Dict[str, Any]:
+    """Deserialize a session dictionary, restoring datetime fields."""
+    return _restore_datetimes(json.loads(data))
+
+
+def _restore_datetimes(session: Dict[str, Any]) -> Dict[str, Any]:
+    for field in DATETIME_FIELDS:
+        value = session.get(field)
+        if isinstance(value, str):
+            try:
+                session[field] = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    return session
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class SessionPersistence(ABC):
+    """
+    Base class for session persistence backends.
+
+    Every save produces a version token. Comparing tokens tells a worker
+    whether its cached copy of a session was replaced by another worker.
+    """
+
+    @abstractmethod
+    def load(self, conversation_id: str) -> Optional[Tuple[Dict[str, Any], float, Any]]:
+        """
+        Load a session.
+
+        Returns:
+            Tuple of (session, expires_at, version), or None if not stored
+        """
+        ...
+
+    @abstractmethod
+    def get_version(self, conversation_id: str) -> Optional[Any]:
+        """Return the version token of a stored session, or None if not stored."""
+        ...
+
+    @abstractmethod
+    def save(self, conversation_id: str, session: Dict[str, Any], expires_at: float) -> Any:
+        """Store a session, replacing any previous version, and return the new version token."""
+        ...
+
+    @abstractmethod
+    def delete(self, conversation_id: str) -> None:
+        """Delete a session if stored."""
+        ...
+
+    @abstractmethod
+    def delete_expired(self, now: float) -> int:
+        """Delete sessions that expired before now and return how many were deleted."""
+        ...
+
+    def close(self) -> None:
+        """Release backend resources."""
+        pass
+
+
+class SQLiteSessionPersistence(SessionPersistence):
+    """
+    Sessions stored in a SQLite database.
+
+    The database runs in WAL mode, so several worker processes can share
+    the same file with concurrent readers.
+    """
+
+    def __init__(self, path: str, busy_timeout_seconds: float = 5.0):
+        """
+        Initialize the backend.
+
+        Args:
+            path: Path of the database file (created if missing)
+            busy_timeout_seconds: How long to wait for another process holding a write lock
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_seconds, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " conversation_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " version TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+        self._conn.commit()
+
+    def load(self, conversation_id: str) -> Optional[Tuple[Dict[str, Any], float, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, expires_at, version FROM sessions WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return deserialize_session(row[0]), row[1], row[2]
+
+    def get_version(self, conversation_id: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM sessions WHERE conversation_id = ?", (conversation_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, conversation_id: str, session: Dict[str, Any], expires_at: float) -> Any:
+        data = serialize_session(session)
+        version = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (conversation_id, data, expires_at, version) VALUES (?, ?, ?, ?)",
+                (conversation_id, data, expires_at, version),
+            )
+            self._conn.commit()
+        return version
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE conversation_id = ?", (conversation_id,))
+            self._conn.commit()
+
+    def delete_expired(self, now: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class FileSessionPersistence(SessionPersistence):
+    """
+    Sessions stored as one JSON file each in a directory.
+
+    Files are written to a temporary name and renamed into place, so readers
+    in other processes never see a partially written session.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the backend.
+
+        Args:
+            directory: Directory holding the session files (created if missing)
+        """
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, conversation_id: str) -> Path:
+        # Conversation IDs come from clients: hashing keeps them inside the directory
+        # and gives distinct IDs distinct files, whatever characters they contain
+        digest = hashlib.sha256(conversation_id.encode('utf-8')).hexdigest()
+        return self._directory / f"{digest}.json"
+
+    def load(self, conversation_id: str) -> Optional[Tuple[Dict[str, Any], float, Any]]:
+        path = self._path(conversation_id)
+        try:
+            with path.open('r', encoding='utf-8') as f:
+                version = self._file_version(os.fstat(f.fileno()))
+                record = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read session file {path}: {e}")
+            return None
+        return _restore_datetimes(record['session']), record['expires_at'], version
+
+    @staticmethod
+    def _file_version(stat_result: os.stat_result) -> Tuple[int, int, int]:
+        # Every save renames a new file into place, so its inode changes
+        # even when two saves land within the same timestamp tick
+        return stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size
+
+    def get_version(self, conversation_id: str) -> Optional[Any]:
+        try:
+            return self._file_version(self._path(conversation_id).stat())
+        except FileNotFoundError:
+            return None
+
+    def save(self, conversation_id: str, session: Dict[str, Any], expires_at: float) -> Any:
+        path = self._path(conversation_id)
+        record = '{"expires_at": %r, "session": %s}' % (expires_at, serialize_session(session))
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, prefix=".session-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(record)
+            version = self._file_version(os.stat(tmp_path))
+            os.replace(tmp_path, path)
+            return version
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def delete(self, conversation_id: str) -> None:
+        try:
+            self._path(conversation_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def delete_expired(self, now: float) -> int:
+        deleted = 0
+        for path in self._directory.glob("*.json"):
+            try:
+                record = json.loads(path.read_text(encoding='utf-8'))
+                if record.get('expires_at', 0) <= now:
+                    path.unlink()
+                    deleted += 1
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not check session file {path}: {e}")
+        return deleted
+
+
+def create_session_persistence(backend: str, path: str) -> Optional[SessionPersistence]:
+    """
+    Create a persistence backend by name.
+
+    Args:
+        backend: "sqlite", "file", or an empty string / "memory" for none
+        path: Database file for SQLite, or directory for file storage
+
+    Returns:
+        The backend, or None for in-memory sessions only
+    """
+    backend = (backend or "").strip().lower()
+    if backend in ("", "memory", "none"):
+        return None
+    if backend == "sqlite":
+        return SQLiteSessionPersistence(path)
+    if backend == "file":
+        return FileSessionPersistence(path)
+    raise ValueError(f"Unknown session persistence backend: {backend}")
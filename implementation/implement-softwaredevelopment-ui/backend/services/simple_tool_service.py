@@ -2,6 +2,7 @@
 Simple Tool Service - Let the LLM decide which tools to use based on descriptions
 """
 
+import asyncio
 import logging
 import json
 import os
@@ -10,9 +11,16 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from mcp_client.client import MCPClient
-from mcp_client.core.models import MCPRequest, MCPResponse
+from mcp_client.core.models import ErrorCode, MCPError, MCPRequest, MCPResponse
 from .bedrock_kb_service import BedrockKBService, ProjectContext
 
+# Servers that reject concurrent requests from the same user (ChatSync
+# ConflictException), so their tool calls within one turn run one at a time
+SERIALIZED_TOOL_SERVERS = ("amazon-q-business", "amazon-q-business-prod")
+
+# Transport-level failures after which a server is registered again
+REREGISTER_ERROR_CODES = (ErrorCode.TRANSPORT_ERROR, ErrorCode.DISCOVERY_ERROR)
+
 
 class SimpleToolService:
     """
@@ -28,6 +36,14 @@ class SimpleToolService:
         self.logger = logging.getLogger(__name__)
         self.available_tools = {}
         self._active_requests = 0  # Track concurrent requests
+        self.max_concurrent_tool_calls = int(os.getenv('MCP_MAX_CONCURRENT_TOOL_CALLS', '4'))
+        
+        # Versioned tool schema cache: the version changes whenever tools or
+        # schemas change, and the LLM tool prompt is rebuilt only then
+        self._schema_version = 0
+        self._tools_prompt_cache: Optional[Tuple[int, str]] = None
+        self._schema_refresh_task: Optional[asyncio.Task] = None
+        self._server_fingerprint: Optional[Tuple] = None
         
         # Initialize Bedrock KB service
         self.kb_service = BedrockKBService()
@@ -62,8 +78,38 @@ class SimpleToolService:
         if self.mcp_client:
             await self._discover_available_tools()
             # Run schema discovery in background to avoid blocking streaming
-            import asyncio
-            asyncio.create_task(self._discover_tool_schemas_background())
+            self._start_schema_refresh()
+    
+    def _mark_tools_changed(self):
+        """Bump the schema version so cached tool descriptions are rebuilt."""
+        self._schema_version += 1
+    
+    def _current_server_fingerprint(self) -> Optional[Tuple]:
+        """Identify the configured server list (IDs and endpoints)."""
+        if not self.mcp_service:
+            return None
+        configs = self.mcp_service.get_server_configs()
+        return tuple(sorted(
+            (server_id, str(getattr(config, 'endpoint_url', ''))) for server_id, config in configs.items()
+        ))
+    
+    def _start_schema_refresh(self) -> bool:
+        """Start background schema discovery unless a refresh is already running."""
+        if self._schema_refresh_task is not None and not self._schema_refresh_task.done():
+            return False
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._server_fingerprint = self._current_server_fingerprint()
+        self._schema_refresh_task = asyncio.create_task(self._discover_tool_schemas_background())
+        return True
+    
+    def _refresh_schemas_if_servers_changed(self):
+        """Schedule a background schema refresh when the server list has changed."""
+        if self.mcp_client and self._current_server_fingerprint() != self._server_fingerprint:
+            if self._start_schema_refresh():
+                self.logger.info("MCP server list changed - refreshing tool schemas in background")
     
     async def re_register_servers(self):
         """Re-register all MCP servers - useful after authentication changes."""
@@ -73,6 +119,7 @@ class SimpleToolService:
             # Clear existing tools to force fresh discovery
             old_tool_count = len(self.available_tools)
             self.available_tools.clear()
+            self._mark_tools_changed()
             self.logger.info(f"🧹 Cleared {old_tool_count} existing tools")
             
             # Re-discover tools from config
@@ -88,9 +135,10 @@ class SimpleToolService:
             else:
                 self.logger.warning("⚠️ No MCP service available for re-registration")
             
-            # Run schema discovery in background
-            import asyncio
-            asyncio.create_task(self._discover_tool_schemas_background())
+            # Run schema discovery in background (waiting for one already in flight)
+            if self._schema_refresh_task is not None and not self._schema_refresh_task.done():
+                await self._schema_refresh_task
+            self._start_schema_refresh()
             self.logger.info("🚀 Started background schema discovery")
             
             self.logger.info(f"✅ Successfully re-registered {len(self.available_tools)} tools")
@@ -183,6 +231,7 @@ class SimpleToolService:
                         'last_used': None
                     }
                     
+            self._mark_tools_changed()
             self.logger.info(f"Loaded {len(self.available_tools)} tools from ../mcp_servers.json")
             
             # Log all loaded servers for debugging
@@ -204,114 +253,9 @@ class SimpleToolService:
         for tool_info in self.available_tools.values():
             server_ids.add(tool_info['server_id'])
         
-        for server_id in server_ids:
-            try:
-                # Ensure server is registered with timeout
-                import asyncio
-                try:
-                    await asyncio.wait_for(
-                        self.mcp_service.ensure_server_registered(server_id),
-                        timeout=10.0  # 10 second timeout for server registration
-                    )
-                except asyncio.TimeoutError:
-                    self.logger.warning(f"Server registration for {server_id} timed out during schema discovery, skipping")
-                    continue
-                except Exception as e:
-                    self.logger.warning(f"Server registration for {server_id} failed during schema discovery: {e}, skipping")
-                    continue
-                
-                # Get tools list from this server with timeout
-                request = MCPRequest(
-                    request_type="tools/list",
-                    content={"list_tools": True},  # Provide proper content for tools/list
-                    required_capabilities=[],
-                    preferred_server_id=server_id
-                )
-                
-                response = await asyncio.wait_for(
-                    self.mcp_client.send_request(request),
-                    timeout=15.0  # 15 second timeout for tools/list request
-                )
-                
-                if response and hasattr(response, 'status') and response.status.value == 'success':
-                    tools_data = response.content
-                    if 'tools' in tools_data:
-                        # Track which tools were discovered from the server
-                        discovered_tools = set()
-                        for tool in tools_data['tools']:
-                            tool_name = tool.get('name')
-                            discovered_tools.add(tool_name)
-                            schema = tool.get('inputSchema', {})
-                            server_description = tool.get('description', '')
-                            
-                            if tool_name in self.available_tools:
-                                # Update existing configured tool with server data
-                                self.available_tools[tool_name]['schema'] = schema
-                                if server_description:
-                                    self.available_tools[tool_name]['description'] = server_description
-                                    self.logger.info(f"Updated configured tool: {tool_name} with server data")
-                                
-                                # Debug: Log schema for Amazon Q Business tools
-                                if 'amazon_q_business' in tool_name:
-                                    self.logger.info(f"🔍 Amazon Q Business tool {tool_name} schema: {schema}")
-                            else:
-                                # Add newly discovered tool not in configuration
-                                server_info = None
-                                for existing_tool in self.available_tools.values():
-                                    if existing_tool['server_id'] == server_id:
-                                        server_info = existing_tool
-                                        break
-                                
-                                if server_info:
-                                    self.available_tools[tool_name] = {
-                                        'name': tool_name,
-                                        'description': server_description or f"{tool_name.replace('_', ' ').title()} - {server_info['server_description']}",
-                                        'server_id': server_id,
-                                        'server_type': server_info['server_type'],
-                                        'server_description': server_info['server_description'],
-                                        'endpoint_url': server_info['endpoint_url'],
-                                        'auth': server_info['auth'],
-                                        'schema': schema,
-                                        'usage_count': 0,
-                                        'last_used': None,
-                                        'discovered_dynamically': True  # Mark as dynamically discovered
-                                    }
-                                    self.logger.info(f"Dynamically discovered new tool: {tool_name} from server {server_id}")
-                            
-                            # Log the actual schema for debugging
-                            if schema and 'properties' in schema:
-                                params = list(schema['properties'].keys())
-                                self.logger.info(f"Updated schema for tool: {tool_name} - Parameters: {params}")
-                            else:
-                                self.logger.info(f"Updated schema for tool: {tool_name} - No parameters found")
-                        
-                        # For tools in configuration but not discovered, add basic schema
-                        for tool_name, tool_info in self.available_tools.items():
-                            if tool_info['server_id'] == server_id and tool_name not in discovered_tools:
-                                # Add basic schema for configured tools not discovered
-                                if 'schema' not in tool_info:
-                                    tool_info['schema'] = {
-                                        "type": "object",
-                                        "properties": {},
-                                        "required": []
-                                    }
-                                self.logger.info(f"Tool {tool_name} configured but not discovered from server {server_id} - using basic schema")
-                    else:
-                        # If no tools were discovered at all, add basic schemas for all configured tools
-                        for tool_name, tool_info in self.available_tools.items():
-                            if tool_info['server_id'] == server_id:
-                                if 'schema' not in tool_info:
-                                    tool_info['schema'] = {
-                                        "type": "object",
-                                        "properties": {},
-                                        "required": []
-                                    }
-                                self.logger.info(f"No tools discovered from server {server_id}, using basic schema for configured tool: {tool_name}")
-                
-            except asyncio.TimeoutError:
-                self.logger.warning(f"Timeout getting tool schemas from server {server_id}, skipping")
-            except Exception as e:
-                self.logger.warning(f"Failed to get tool schemas from server {server_id}: {e}")
+        # Query all servers concurrently; each one is bounded by its own timeouts
+        await asyncio.gather(*(self._discover_server_tool_schemas(server_id) for server_id in server_ids))
+        self._mark_tools_changed()
         
         # Log summary of discovered tools
         configured_tools = [name for name, info in self.available_tools.items() if not info.get('discovered_dynamically', False)]
@@ -324,6 +268,115 @@ class SimpleToolService:
         # Update server capabilities in MCP client registry with discovered tools
         await self._update_server_capabilities_with_discovered_tools()
     
+    async def _discover_server_tool_schemas(self, server_id: str):
+        """Fetch tools/list from one server and merge the schemas into available_tools."""
+        try:
+            # Ensure server is registered with timeout
+            try:
+                await asyncio.wait_for(
+                    self.mcp_service.ensure_server_registered(server_id),
+                    timeout=10.0  # 10 second timeout for server registration
+                )
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Server registration for {server_id} timed out during schema discovery, skipping")
+                return
+            except Exception as e:
+                self.logger.warning(f"Server registration for {server_id} failed during schema discovery: {e}, skipping")
+                return
+            
+            # Get tools list from this server with timeout
+            request = MCPRequest(
+                request_type="tools/list",
+                content={"list_tools": True},  # Provide proper content for tools/list
+                required_capabilities=[],
+                preferred_server_id=server_id
+            )
+            
+            response = await asyncio.wait_for(
+                self.mcp_client.send_request(request),
+                timeout=15.0  # 15 second timeout for tools/list request
+            )
+            
+            if response and hasattr(response, 'status') and response.status.value == 'success':
+                tools_data = response.content
+                if 'tools' in tools_data:
+                    # Track which tools were discovered from the server
+                    discovered_tools = set()
+                    for tool in tools_data['tools']:
+                        tool_name = tool.get('name')
+                        discovered_tools.add(tool_name)
+                        schema = tool.get('inputSchema', {})
+                        server_description = tool.get('description', '')
+                        
+                        if tool_name in self.available_tools:
+                            # Update existing configured tool with server data
+                            self.available_tools[tool_name]['schema'] = schema
+                            if server_description:
+                                self.available_tools[tool_name]['description'] = server_description
+                                self.logger.info(f"Updated configured tool: {tool_name} with server data")
+                            
+                            # Debug: Log schema for Amazon Q Business tools
+                            if 'amazon_q_business' in tool_name:
+                                self.logger.info(f"🔍 Amazon Q Business tool {tool_name} schema: {schema}")
+                        else:
+                            # Add newly discovered tool not in configuration
+                            server_info = None
+                            for existing_tool in self.available_tools.values():
+                                if existing_tool['server_id'] == server_id:
+                                    server_info = existing_tool
+                                    break
+                            
+                            if server_info:
+                                self.available_tools[tool_name] = {
+                                    'name': tool_name,
+                                    'description': server_description or f"{tool_name.replace('_', ' ').title()} - {server_info['server_description']}",
+                                    'server_id': server_id,
+                                    'server_type': server_info['server_type'],
+                                    'server_description': server_info['server_description'],
+                                    'endpoint_url': server_info['endpoint_url'],
+                                    'auth': server_info['auth'],
+                                    'schema': schema,
+                                    'usage_count': 0,
+                                    'last_used': None,
+                                    'discovered_dynamically': True  # Mark as dynamically discovered
+                                }
+                                self.logger.info(f"Dynamically discovered new tool: {tool_name} from server {server_id}")
+                        
+                        # Log the actual schema for debugging
+                        if schema and 'properties' in schema:
+                            params = list(schema['properties'].keys())
+                            self.logger.info(f"Updated schema for tool: {tool_name} - Parameters: {params}")
+                        else:
+                            self.logger.info(f"Updated schema for tool: {tool_name} - No parameters found")
+                    
+                    # For tools in configuration but not discovered, add basic schema
+                    for tool_name, tool_info in self.available_tools.items():
+                        if tool_info['server_id'] == server_id and tool_name not in discovered_tools:
+                            # Add basic schema for configured tools not discovered
+                            if 'schema' not in tool_info:
+                                tool_info['schema'] = {
+                                    "type": "object",
+                                    "properties": {},
+                                    "required": []
+                                }
+                            self.logger.info(f"Tool {tool_name} configured but not discovered from server {server_id} - using basic schema")
+                else:
+                    # If no tools were discovered at all, add basic schemas for all configured tools
+                    for tool_name, tool_info in self.available_tools.items():
+                        if tool_info['server_id'] == server_id:
+                            if 'schema' not in tool_info:
+                                tool_info['schema'] = {
+                                    "type": "object",
+                                    "properties": {},
+                                    "required": []
+                                }
+                            self.logger.info(f"No tools discovered from server {server_id}, using basic schema for configured tool: {tool_name}")
+            
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Timeout getting tool schemas from server {server_id}, skipping")
+        except Exception as e:
+            self.logger.warning(f"Failed to get tool schemas from server {server_id}: {e}")
+    
     async def _discover_tool_schemas_background(self):
         """Discover tool schemas in background to avoid blocking streaming responses."""
         try:
@@ -369,9 +422,21 @@ class SimpleToolService:
         Generate tool descriptions for the LLM to make intelligent tool selection decisions.
         Similar to the reference chatbot approach - let Claude decide what to use.
         """
+        self._refresh_schemas_if_servers_changed()
+        
         if not self.available_tools:
             return "No external tools are currently available."
         
+        cached = self._tools_prompt_cache
+        if cached is not None and cached[0] == self._schema_version:
+            return cached[1]
+        
+        tools_description = self._build_tools_description()
+        self._tools_prompt_cache = (self._schema_version, tools_description)
+        return tools_description
+    
+    def _build_tools_description(self) -> str:
+        """Render the tool descriptions prompt from the current tool schemas."""
         # Build system prompt similar to the reference code
         tools_description = """You have access to the following MCP servers and their capabilities:
 
@@ -753,6 +818,7 @@ REMEMBER:
         # Retry logic for ConflictException (concurrent requests)
         max_retries = 5
         base_delay = 2.0  # seconds
+        reregistered = False
         
         for attempt in range(max_retries + 1):
             try:
@@ -775,23 +841,7 @@ REMEMBER:
                 self.logger.info(f"📊 Active concurrent requests: {self._active_requests}")
                 
                 # Ensure the server is registered before executing the tool
-                if self.mcp_service:
-                    import asyncio
-                    try:
-                        # Add timeout to prevent hanging on server registration
-                        registration_success = await asyncio.wait_for(
-                            self.mcp_service.ensure_server_registered(server_id), 
-                            timeout=10.0  # 10 second timeout
-                        )
-                        if not registration_success:
-                            self.logger.warning(f"Failed to register server {server_id}, but continuing anyway")
-                            # Don't return failure - try to execute anyway
-                    except asyncio.TimeoutError:
-                        self.logger.warning(f"Server registration for {server_id} timed out after 10s, continuing anyway")
-                        # Don't return failure - try to execute anyway
-                    except Exception as e:
-                        self.logger.warning(f"Server registration for {server_id} failed: {e}, continuing anyway")
-                        # Don't return failure - try to execute anyway
+                await self._ensure_server_ready(server_id)
                 
                 # Create and send request
                 request = MCPRequest(
@@ -930,6 +980,16 @@ REMEMBER:
                 
                 self.logger.error(f"❌ ERROR after {duration:.2f}s: {error_msg}")
                 
+                # The server may have dropped out of the registry (failed health
+                # check, restart): register it again and retry once
+                if (isinstance(e, MCPError) and e.error_code in REREGISTER_ERROR_CODES
+                        and self.mcp_service and not reregistered and attempt < max_retries):
+                    reregistered = True
+                    self._active_requests -= 1
+                    self.logger.warning(f"🔁 Transport failure on {server_id}, re-registering server and retrying: {error_msg}")
+                    self.mcp_service.invalidate_server_registration(server_id)
+                    continue
+                
                 # Check if it's a ConflictException (concurrent request)
                 if ("ConflictException" in error_msg or 
                     "conflicts with another ongoing request" in error_msg or
@@ -999,6 +1059,71 @@ REMEMBER:
         # Should not reach here, but just in case
         return None, False
     
+    async def _ensure_server_ready(self, server_id: str):
+        """Register a server on first use; an already registered server costs a set lookup."""
+        if not self.mcp_service or server_id in self.mcp_service.get_registered_servers():
+            return
+        
+        try:
+            # Add timeout to prevent hanging on server registration
+            registration_success = await asyncio.wait_for(
+                self.mcp_service.ensure_server_registered(server_id), 
+                timeout=10.0  # 10 second timeout
+            )
+            if not registration_success:
+                self.logger.warning(f"Failed to register server {server_id}, but continuing anyway")
+                # Don't return failure - try to execute anyway
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Server registration for {server_id} timed out after 10s, continuing anyway")
+            # Don't return failure - try to execute anyway
+        except Exception as e:
+            self.logger.warning(f"Server registration for {server_id} failed: {e}, continuing anyway")
+            # Don't return failure - try to execute anyway
+    
+    async def execute_tool_calls(self, tool_calls: List[Dict[str, Any]], user_id: Optional[str] = None,
+                                 jwt_token: Optional[str] = None) -> List[Tuple[Optional[str], bool]]:
+        """
+        Execute several tool calls from one model turn concurrently.
+        
+        At most ``max_concurrent_tool_calls`` run at once, and calls to
+        servers in SERIALIZED_TOOL_SERVERS run one at a time.
+        
+        Args:
+            tool_calls: Parsed tool calls (see parse_tool_calls)
+            user_id: User ID for authentication context
+            jwt_token: Cognito ID token for Amazon Q Business requests
+            
+        Returns:
+            List of (response, success) tuples in the same order as tool_calls
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_tool_calls))
+        server_locks: Dict[str, asyncio.Lock] = {}
+        
+        async def run(tool_call: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+            tool_name = tool_call["tool_name"]
+            server_id = self.available_tools.get(tool_name, {}).get('server_id', tool_call.get("server_id"))
+            lock = server_locks.setdefault(server_id, asyncio.Lock()) if server_id in SERIALIZED_TOOL_SERVERS else None
+            
+            if lock is not None:
+                async with lock, semaphore:
+                    return await self.execute_tool(tool_name, tool_call["arguments"], user_id=user_id, jwt_token=jwt_token)
+            async with semaphore:
+                return await self.execute_tool(tool_name, tool_call["arguments"], user_id=user_id, jwt_token=jwt_token)
+        
+        if len(tool_calls) > 1:
+            self.logger.info(f"Executing {len(tool_calls)} tool calls concurrently (limit {self.max_concurrent_tool_calls})")
+        
+        results = await asyncio.gather(*(run(tool_call) for tool_call in tool_calls), return_exceptions=True)
+        
+        outcomes = []
+        for tool_call, result in zip(tool_calls, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Tool {tool_call['tool_name']} raised: {result}")
+                outcomes.append((None, False))
+            else:
+                outcomes.append(result)
+        return outcomes
+    
     def _is_jira_tool(self, tool_name: str) -> bool:
         """Check if a tool is Jira-related and needs authentication."""
         jira_tools = [
@@ -1092,16 +1217,36 @@ REMEMBER:
         Returns:
             Tuple of (tool_response, tools_used)
         """
-        tool_call = self.parse_tool_call(llm_response)
-        if not tool_call:
+        tool_calls = self.parse_tool_calls(llm_response)
+        if not tool_calls:
             return None, []
         
-        tool_name = tool_call["tool_name"]
-        arguments = tool_call["arguments"]
-        server_id = tool_call["server_id"]
+        for tool_call in tool_calls:
+            self.logger.info(f"Executing tool: {tool_call['tool_name']} from server: {tool_call['server_id']}")
+            tool_call["arguments"] = self._filter_arguments(tool_call["tool_name"], tool_call["arguments"])
+        
+        # Check Atlassian authentication before attempting to use Atlassian tools
+        # if server_id in ["atlassian-remote", "atlassian-remote-prod"]:
+        #     auth_check = await self._check_atlassian_authentication()
+        #     if not auth_check['authenticated']:
+        #         return auth_check['message'], []
         
-        self.logger.info(f"Executing tool: {tool_name} from server: {server_id}")
+        # Execute the tools
+        results = await self.execute_tool_calls(tool_calls, jwt_token=jwt_token)
         
+        tool_results = []
+        tools_used = []
+        for tool_call, (tool_result, success) in zip(tool_calls, results):
+            if success and tool_result:
+                tool_results.append(tool_result)
+                tools_used.append(tool_call["tool_name"])
+        
+        if not tool_results:
+            return None, []
+        return "\n\n".join(tool_results), tools_used
+    
+    def _filter_arguments(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop arguments that are not in the tool's schema to prevent tool errors."""
         # Validate and filter arguments based on tool schema
         if tool_name in self.available_tools:
             tool_info = self.available_tools[tool_name]
@@ -1120,19 +1265,7 @@ REMEMBER:
             else:
                 self.logger.warning(f"⚠️ No schema found for tool {tool_name}, using arguments as-is")
         
-        # Check Atlassian authentication before attempting to use Atlassian tools
-        # if server_id in ["atlassian-remote", "atlassian-remote-prod"]:
-        #     auth_check = await self._check_atlassian_authentication()
-        #     if not auth_check['authenticated']:
-        #         return auth_check['message'], []
-        
-        # Execute the tool
-        tool_result, success = await self.execute_tool(tool_name, arguments, jwt_token=jwt_token)
-        
-        if success and tool_result:
-            return tool_result, [tool_name]
-        else:
-            return None, []
+        return arguments
     
     async def execute_tool_if_requested(self, user_message: str, conversation_context: Dict[str, Any]) -> Tuple[Optional[str], List[str]]:
         """
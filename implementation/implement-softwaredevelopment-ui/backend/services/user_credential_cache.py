@@ -0,0 +1,160 @@
+"""
+Per-user cache for temporary credentials and the clients built from them.
+
+Exchanging a user's token for temporary AWS credentials and building a boto3
+client from them takes several network round trips. The cache keeps the
+result per user identity until shortly before the credentials expire:
+- Repeat requests reuse the cached client.
+- Credentials close to expiry are refreshed in the background while the
+  current ones keep serving.
+- Concurrent requests for the same user share one exchange.
+- The number of users held is bounded, evicting the least recently used.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Loads a value and returns it with its expiry time (seconds since the epoch)
+CredentialLoader = Callable[[], Tuple[Any, float]]
+
+
+class _CacheEntry:
+    """Cached value for one user, with the loader used to refresh it."""
+
+    __slots__ = ("value", "expires_at", "loader", "refresh")
+
+    def __init__(self, loader: CredentialLoader):
+        self.value: Any = None
+        self.expires_at = 0.0
+        self.loader = loader
+        self.refresh: Optional[Future] = None
+
+
+class UserCredentialCache:
+    """
+    LRU cache of per-user credentials with refresh ahead of expiry.
+
+    Loaders are blocking calls (boto3) and run on the cache's own thread
+    pool, so the cache can be shared by services on any event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        refresh_ahead_seconds: float = 300.0,
+        max_workers: int = 4,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of users held
+            refresh_ahead_seconds: Start a background refresh this long before expiry
+            max_workers: Threads running loaders
+            clock: Wall-clock time source in seconds, comparable to loader expiry times
+        """
+        self._max_entries = max_entries
+        self._refresh_ahead_seconds = refresh_ahead_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="credential-refresh")
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "background_refreshes": 0,
+            "load_failures": 0,
+            "evictions": 0,
+        }
+
+    async def get(self, key: Hashable, loader: CredentialLoader) -> Any:
+        """
+        Get the cached value for a user, loading it if missing or expired.
+
+        Args:
+            key: User identity
+            loader: Blocking callable returning (value, expires_at); it replaces
+                the loader used for later background refreshes of this user
+
+        Returns:
+            The cached or newly loaded value
+
+        Raises:
+            Exception: Whatever the loader raised, if no unexpired value was cached
+        """
+        value, pending = self._lookup(key, loader)
+        if pending is None:
+            return value
+        # Shielded so a cancelled waiter cannot cancel the load shared with other waiters
+        return await asyncio.shield(asyncio.wrap_future(pending))
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a user's cached value, e.g. after S3 rejected its credentials."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached values."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable, loader: CredentialLoader) -> Tuple[Any, Optional[Future]]:
+        """Return (value, None) on a hit, or (None, future) for a load to wait on."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                # Refresh with the most recent token seen for this user
+                entry.loader = loader
+                if entry.value is not None and now < entry.expires_at:
+                    self.stats["hits"] += 1
+                    if ((entry.refresh is None or entry.refresh.done())
+                            and now >= entry.expires_at - self._refresh_ahead_seconds):
+                        self.stats["background_refreshes"] += 1
+                        entry.refresh = self._executor.submit(self._load, key, entry)
+                    return entry.value, None
+            else:
+                entry = _CacheEntry(loader)
+                self._entries[key] = entry
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+
+            self.stats["misses"] += 1
+            # A cancelled or finished load is stale: _load resets it unless it never ran
+            if entry.refresh is None or entry.refresh.done():
+                entry.refresh = self._executor.submit(self._load, key, entry)
+            return None, entry.refresh
+
+    def _load(self, key: Hashable, entry: _CacheEntry) -> Any:
+        """Run the entry's loader on a worker thread and store the result."""
+        try:
+            value, expires_at = entry.loader()
+        except Exception as e:
+            with self._lock:
+                entry.refresh = None
+                self.stats["load_failures"] += 1
+                if entry.value is None and self._entries.get(key) is entry:
+                    del self._entries[key]
+            logger.warning(f"Failed to load credentials for {key}: {e}")
+            raise
+
+        with self._lock:
+            entry.value = value
+            entry.expires_at = expires_at
+            entry.refresh = None
+            self.stats["loads"] += 1
+        return value
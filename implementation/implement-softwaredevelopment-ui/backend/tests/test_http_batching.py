@@ -0,0 +1,91 @@
+"""
+HTTP transport batching tests: batch sends are tracked until they finish,
+and closing the transport fails the requests of a batch still in flight
+instead of leaving their callers waiting.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.core.models import ErrorCode, MCPError, MCPServerInfo, ServerType
+from mcp_client.transport.http import HTTPTransport
+
+SERVER = MCPServerInfo(
+    server_id="local", endpoint_url="http://127.0.0.1:1/mcp",
+    capabilities=["tools/call"], server_type=ServerType.TOOL, metadata={"supports_batch": True},
+)
+
+
+class FakeBatchServer:
+    """Stands in for _send_protected: answers every message after a delay and counts the sends."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.sends = []
+
+    async def __call__(self, server_info, request):
+        self.sends.append(request)
+        await asyncio.sleep(self.delay)
+        messages = request if isinstance(request, list) else [request]
+        results = [{"jsonrpc": "2.0", "id": message["id"], "result": {"key": message["params"]["key"]}}
+                   for message in messages]
+        return results if isinstance(request, list) else results[0]
+
+
+def make_transport(delay: float) -> HTTPTransport:
+    transport = HTTPTransport(use_tls=False, batch_window_seconds=0.005, max_batch_size=4)
+    transport._send_protected = FakeBatchServer(delay)
+    return transport
+
+
+def message(i: int):
+    return {"jsonrpc": "2.0", "id": f"req-{i}", "method": "tools/call", "params": {"key": i}}
+
+
+def test_batched_requests_get_their_own_responses():
+    async def run():
+        transport = make_transport(0.001)
+        responses = await asyncio.gather(*(transport.send_request(SERVER, message(i)) for i in range(10)))
+        assert not transport._batch_tasks
+        await transport.close()
+        return responses, transport._send_protected.sends
+
+    responses, sends = asyncio.run(run())
+
+    assert [response["result"]["key"] for response in responses] == list(range(10))
+    assert [len(send) if isinstance(send, list) else 1 for send in sends] == [4, 4, 2]
+
+
+def test_close_fails_requests_of_a_batch_in_flight():
+    async def run():
+        transport = make_transport(10.0)
+        calls = [asyncio.create_task(transport.send_request(SERVER, message(i))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        assert len(transport._batch_tasks) == 1
+        await asyncio.wait_for(transport.close(), 1.0)
+        assert not transport._batch_tasks
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    outcomes = asyncio.run(run())
+
+    for outcome in outcomes:
+        assert isinstance(outcome, MCPError)
+        assert outcome.error_code == ErrorCode.TRANSPORT_ERROR
+
+
+@pytest.mark.parametrize("delay", [0.0, 0.001])
+def test_batch_sends_are_released_when_done(delay):
+    async def run():
+        transport = make_transport(delay)
+        for _ in range(5):
+            await asyncio.gather(*(transport.send_request(SERVER, message(i)) for i in range(6)))
+            assert not transport._batch_tasks
+        await transport.close()
+
+    asyncio.run(run())
@@ -0,0 +1,155 @@
+"""
+Input validator tests: the optimized pattern scanning, field exemptions,
+whitespace normalization and clean-string cache must give exactly the same
+results as the original straightforward implementation, kept here as a
+reference.
+"""
+
+import html
+import logging
+import os
+import random
+import re
+import sys
+
+import pytest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.core.models import MCPError
+from mcp_client.security.validation import InputValidator
+
+SQL_EXEMPT_FIELDS = [
+    'prompt', 'message', 'content', 'description', 'requirements',
+    'architecture_description', 'details', 'query', 'arguments',
+    'design', 'specification', 'features', 'functionality'
+]
+COMMAND_EXEMPT_FIELDS = [
+    'prompt', 'message', 'content', 'description', 'requirements',
+    'architecture_description', 'details', 'query', 'arguments'
+]
+
+FIELD_NAMES = ["prompt", "user_name", "tool_name", "Description", "request.params.Query",
+               "payload[3].design", "config_path", "metadata_value", "payload.key"]
+
+FRAGMENTS = [
+    "hello", "world", "Design a service", "  ", "\t", "\n", "\r\n", "\x0b", "\x0c", "\x1c", "\x85",
+    "\xa0", " ", "　", "​", "\x00", "&", "<", ">", "\"", "'", "é", "ß", "ſ", "K", "İ", "日本",
+    "<script>alert(1)</script>", "<ScRiPt src=x>", "</SCRIPT>", "JavaScript:", "javascript :",
+    "onClick =", "onload=", "on =", "<iframe>", "</IFRAME>", "<object data=x>", "</object>",
+    "<embed>", "</embed>", "<LINK rel=x>", "<meta charset=x>", "<style>", "</style>",
+    "data:text/HTML", "VBScript:", "SELECT name FROM", "select * from", "DELETE x FROM",
+    "UNION SELECT", "union  select", "OR 1=1", "and 2 = 3", "Or 'x'", "AND \"", "-- comment",
+    "--", "/* note */", "/*", "*/", "xp_cmdshell", "XP_CMDSHELL", "sp_executesql", "' OR 'a'='a",
+    ";", "|", "`", "$", "(", ")", "{", "}", "[", "]", "cat", "LS", "whoami", "curl", "wget",
+    "catalog", "../", "..\\", "${HOME}", "$(id)", "=", ",", ".", "FROM", "from", "Union",
+]
+
+
+def reference_findings(validator, value, field_name):
+    """Warnings the original implementation logged, in order, as (category, message)."""
+    findings = []
+    for pattern in validator.dangerous_regex:
+        if pattern.search(value):
+            findings.append(("XSS", f"Dangerous pattern detected in field '{field_name}': {pattern.pattern}"))
+    if not any(fragment in field_name.lower() for fragment in SQL_EXEMPT_FIELDS):
+        for pattern in validator.sql_injection_regex:
+            if pattern.search(value):
+                findings.append(("SQL_INJECTION",
+                                 f"SQL injection pattern detected in field '{field_name}': {pattern.pattern}"))
+    if not any(fragment in field_name.lower() for fragment in COMMAND_EXEMPT_FIELDS):
+        for pattern in validator.command_injection_regex:
+            if pattern.search(value):
+                findings.append(("COMMAND_INJECTION",
+                                 f"Command injection pattern detected in field '{field_name}': {pattern.pattern}"))
+    return findings
+
+
+def reference_sanitize(value):
+    sanitized = html.escape(value, quote=True)
+    sanitized = sanitized.replace('\x00', '')
+    return re.sub(r'\s+', ' ', sanitized).strip()
+
+
+def random_values(count, seed=5):
+    rng = random.Random(seed)
+    for _ in range(count):
+        parts = rng.choices(FRAGMENTS, k=rng.randint(1, 8))
+        separators = rng.choices(["", " ", "\n", "x"], k=len(parts))
+        yield "".join(part + separator for part, separator in zip(parts, separators))
+
+
+def warnings_logged(caplog, validator, value, field_name):
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="mcp_client.security.validation"):
+        result = validator.validate_string(value, field_name)
+    return result, [record.getMessage() for record in caplog.records]
+
+
+def test_non_strict_mode_matches_reference(caplog):
+    validator = InputValidator(strict_mode=False)
+    for value in random_values(3000):
+        for field_name in FIELD_NAMES:
+            result, messages = warnings_logged(caplog, validator, value, field_name)
+            expected = reference_findings(validator, value, field_name)
+            assert messages == [message for _, message in expected], (value, field_name)
+            assert result == reference_sanitize(value), (value, field_name)
+
+
+def test_strict_mode_matches_reference():
+    validator = InputValidator(strict_mode=True)
+    for value in random_values(3000, seed=6):
+        for field_name in FIELD_NAMES:
+            expected = reference_findings(validator, value, field_name)
+            if expected:
+                with pytest.raises(MCPError) as error:
+                    validator.validate_string(value, field_name)
+                assert error.value.details["pattern"] == expected[0][0], (value, field_name)
+            else:
+                assert validator.validate_string(value, field_name) == reference_sanitize(value)
+
+
+@pytest.mark.parametrize("strict_mode", [True, False])
+def test_cached_strings_give_the_same_result(caplog, strict_mode):
+    validator = InputValidator(strict_mode=strict_mode)
+    filler = "Design a resilient event driven architecture. " * 40
+    values = [filler, filler + "<script>x</script>", filler + "; rm -rf /", filler + " OR 1=1"]
+    for value in values:
+        for field_name in FIELD_NAMES:
+            outcomes = []
+            for _ in range(2):
+                try:
+                    outcomes.append(warnings_logged(caplog, validator, value, field_name))
+                except MCPError as e:
+                    outcomes.append(("error", e.message))
+            assert outcomes[0] == outcomes[1], (value[-20:], field_name)
+
+
+def test_cache_is_keyed_on_the_checks_a_field_gets():
+    validator = InputValidator(strict_mode=True)
+    value = "Run this shell step; then continue. " * 40
+
+    assert validator.validate_string(value, "prompt") == reference_sanitize(value)
+    with pytest.raises(MCPError):
+        validator.validate_string(value, "tool_name")
+
+
+def test_json_validation_matches_reference():
+    validator = InputValidator(strict_mode=False)
+    reference = InputValidator(strict_mode=False)
+    reference.validate_string = lambda value, field_name, max_length=None: reference_sanitize(value)
+    rng = random.Random(8)
+    values = list(random_values(200, seed=9))
+
+    def document(depth):
+        if depth == 0:
+            return rng.choice(values + [1, 2.5, True, None])
+        if rng.random() < 0.5:
+            return [document(depth - 1) for _ in range(3)]
+        return {rng.choice(["prompt", "name", "items", "details", "path"]) + str(i): document(depth - 1)
+                for i in range(3)}
+
+    for _ in range(20):
+        data = {"payload": document(4)}
+        assert validator.validate_json(data, "arguments") == reference.validate_json(data, "arguments")
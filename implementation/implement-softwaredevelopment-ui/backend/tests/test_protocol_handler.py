@@ -0,0 +1,207 @@
+"""
+Protocol handler round-trip tests over randomly generated messages: what
+format_request and encode_message put on the wire decodes back to the
+request, and parse_response gives the same result with and without
+trusted_server.
+"""
+
+import math
+import os
+import random
+import string
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mcp_client.protocol.handler as handler_module
+from mcp_client.core.models import MCPRequest, MCPResponse, ResponseStatus
+from mcp_client.protocol.handler import MCPProtocolHandler
+from mcp_client.protocol.models import RequestType
+
+TEXT_ALPHABET = string.ascii_letters + string.digits + " \n\t\"\\/<>&'é日本😀\x00\x1f"
+
+REQUEST_CONTENT = {
+    RequestType.TEXT_GENERATION.value: lambda rng: {"prompt": random_text(rng)},
+    RequestType.IMAGE_GENERATION.value: lambda rng: {"prompt": random_text(rng), "size": "512x512"},
+    RequestType.EMBEDDING.value: lambda rng: {"text": [random_text(rng) for _ in range(rng.randint(1, 3))]},
+    RequestType.CHAT.value: lambda rng: {"messages": [{"role": "user", "content": random_text(rng)}]},
+    RequestType.ACTION.value: lambda rng: {"action": random_text(rng), "parameters": random_json(rng, 2)},
+    "tools/call": lambda rng: {"name": "generate_code", "arguments": random_json(rng, 3)},
+}
+
+RESPONSE_CONTENT = {
+    None: lambda rng: random_object(rng, 2),
+    RequestType.TEXT_GENERATION.value: lambda rng: {"text": random_text(rng)},
+    RequestType.IMAGE_GENERATION.value: lambda rng: {"image_url": "https://example.com/" + random_text(rng)},
+    RequestType.EMBEDDING.value: lambda rng: {"embeddings": [[rng.random() for _ in range(4)]]},
+    RequestType.CHAT.value: lambda rng: {"message": {"role": "assistant", "content": random_text(rng)}},
+    RequestType.ACTION.value: lambda rng: {"result": random_json(rng, 2)},
+}
+
+
+def random_text(rng, max_length=20):
+    return "".join(rng.choice(TEXT_ALPHABET) for _ in range(rng.randint(0, max_length)))
+
+
+def random_scalar(rng):
+    choice = rng.randrange(6)
+    if choice == 0:
+        return random_text(rng)
+    if choice == 1:
+        return rng.randint(-2 ** 63, 2 ** 63 - 1)
+    if choice == 2:
+        value = rng.uniform(-1e12, 1e12)
+        return value if math.isfinite(value) else 0.0
+    if choice == 3:
+        return rng.choice([True, False])
+    if choice == 4:
+        return None
+    return rng.randint(-1000, 1000)
+
+
+def random_object(rng, depth):
+    return {random_text(rng, 8): random_json(rng, depth - 1) for _ in range(rng.randint(0, 4))}
+
+
+def random_json(rng, depth):
+    if depth <= 0 or rng.random() < 0.3:
+        return random_scalar(rng)
+    if rng.random() < 0.5:
+        return [random_json(rng, depth - 1) for _ in range(rng.randint(0, 4))]
+    return random_object(rng, depth)
+
+
+def random_request(rng):
+    request_type = rng.choice(sorted(REQUEST_CONTENT))
+    return MCPRequest(
+        request_type=request_type,
+        content=REQUEST_CONTENT[request_type](rng),
+        preferred_server_id=rng.choice([None, "amazon-q-business", "design-server"]),
+        metadata=random_object(rng, 2) if rng.random() < 0.5 else {},
+        headers={"x-trace-id": random_text(rng, 8)} if rng.random() < 0.3 else {},
+    )
+
+
+def random_raw_response(rng):
+    request_type = rng.choice(list(RESPONSE_CONTENT))
+    status = rng.choice([ResponseStatus.SUCCESS.value, ResponseStatus.ERROR.value])
+    content = RESPONSE_CONTENT[request_type](rng)
+    if status == ResponseStatus.ERROR.value:
+        content.update({"error_code": "server_error", "message": random_text(rng)})
+    raw = {
+        "status": status,
+        "content": content,
+        "server_id": random_text(rng, 10),
+        "request_id": random_text(rng, 10),
+        "timestamp": (datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, 10 ** 7))).isoformat(),
+        "metadata": random_object(rng, 2),
+    }
+    if request_type is not None:
+        raw["request_type"] = request_type
+    if rng.random() < 0.3:
+        raw["protocol_version"] = rng.choice(MCPProtocolHandler.SUPPORTED_VERSIONS)
+    return raw
+
+
+@pytest.fixture(params=["orjson", "json"])
+def codec(request, monkeypatch):
+    """Run each test with the orjson backend (when installed) and the stdlib fallback."""
+    if request.param == "json":
+        monkeypatch.setattr(handler_module, "orjson", None)
+    elif handler_module.orjson is None:
+        pytest.skip("orjson is not installed")
+    return MCPProtocolHandler
+
+
+def test_encoded_messages_decode_to_the_same_message(codec):
+    rng = random.Random(1)
+    for _ in range(2000):
+        message = random_json(rng, 4)
+        assert codec.decode_message(codec.encode_message(message)) == message
+        assert codec.decode_message(codec.encode_message(message).decode("utf-8")) == message
+
+
+def test_non_string_keys_fall_back_to_json(codec):
+    message = {"params": {1: "one", 2.5: "two and a half"}}
+    assert codec.decode_message(codec.encode_message(message)) == {"params": {"1": "one", "2.5": "two and a half"}}
+
+
+@pytest.mark.parametrize("version", MCPProtocolHandler.SUPPORTED_VERSIONS)
+def test_formatted_requests_round_trip_through_the_wire(codec, version):
+    rng = random.Random(2)
+    handler = MCPProtocolHandler(protocol_version=version)
+    for _ in range(1000):
+        request = random_request(rng)
+        content_before = request.model_copy(deep=True).content
+
+        formatted = handler.format_request(request)
+        wire = codec.decode_message(codec.encode_message(formatted))
+
+        expected_params = dict(request.content)
+        if request.preferred_server_id == "amazon-q-business" and request.request_type == "tools/call":
+            expected_params = {"name": request.content["name"], "arguments": request.content["arguments"]}
+        if request.metadata:
+            expected_params["_mcp_metadata"] = request.metadata
+        assert wire["jsonrpc"] == "2.0"
+        assert wire["method"] == request.request_type
+        assert wire["params"] == expected_params
+        assert wire.get("headers", {}) == request.headers
+        assert wire == formatted
+        # Formatting never modifies the caller's request
+        assert request.content == content_before
+
+
+def test_prevalidated_requests_format_the_same():
+    rng = random.Random(3)
+    handler = MCPProtocolHandler()
+    for _ in range(500):
+        request = random_request(rng)
+        handler.validate_request(request)
+        checked = handler.format_request(request)
+        prevalidated = handler.format_request(request, validated=True)
+        checked.pop("id"), prevalidated.pop("id")
+        assert checked == prevalidated
+
+
+def test_parsed_responses_match_in_trusted_and_untrusted_mode(codec):
+    rng = random.Random(4)
+    untrusted = MCPProtocolHandler()
+    trusted = MCPProtocolHandler(trusted_server=True)
+    for _ in range(2000):
+        raw = codec.decode_message(codec.encode_message(random_raw_response(rng)))
+
+        expected = untrusted.parse_response(raw)
+        parsed = trusted.parse_response(raw)
+
+        assert type(parsed) is type(expected)
+        assert parsed.model_dump() == expected.model_dump()
+        assert expected.status.value == raw["status"]
+        assert expected.content == raw["content"]
+        assert expected.metadata == raw["metadata"]
+        assert expected.timestamp == datetime.fromisoformat(raw["timestamp"])
+
+
+def test_jsonrpc_results_round_trip(codec):
+    rng = random.Random(5)
+    for trusted_server in (False, True):
+        handler = MCPProtocolHandler(trusted_server=trusted_server)
+        for _ in range(500):
+            result = random_object(rng, 3)
+            raw = codec.decode_message(codec.encode_message({"jsonrpc": "2.0", "id": "r-1", "result": result}))
+            response = handler.parse_response(raw)
+            assert isinstance(response, MCPResponse)
+            assert response.status == ResponseStatus.SUCCESS
+            assert response.content == result
+            assert response.request_id == "r-1"
+
+
+def test_compatible_versions_are_stable_across_calls():
+    handler = MCPProtocolHandler(protocol_version="1.1")
+    first = {version: handler.get_compatible_version(version) for version in handler.SUPPORTED_VERSIONS}
+    second = {version: handler.get_compatible_version(version) for version in handler.SUPPORTED_VERSIONS}
+    assert first == second
+    assert first == {"1.0": "1.0", "1.1": "1.1", "2.0": "1.1"}
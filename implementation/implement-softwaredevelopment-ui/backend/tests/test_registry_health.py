@@ -0,0 +1,109 @@
+"""
+Server registry health loop tests: a probe rescheduled to the front of the
+queue wakes the loop, and stop() returns even when it lands in the same
+event loop pass as that wake-up.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.core.models import MCPServerInfo, ServerType
+from mcp_client.discovery.registry import InMemoryServerRegistry
+
+STOP_TIMEOUT = 2.0
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeTransport:
+    """Transport whose health checks always pass after a short delay."""
+
+    def __init__(self):
+        self.probes = []
+
+    async def check_server_health(self, server_info: MCPServerInfo) -> bool:
+        self.probes.append(server_info.server_id)
+        await asyncio.sleep(0.001)
+        return True
+
+
+def server_info(index: int) -> MCPServerInfo:
+    return MCPServerInfo(
+        server_id=f"server-{index}",
+        endpoint_url=f"http://server-{index}.local/mcp",
+        capabilities=["tools/call"],
+        server_type=ServerType.TOOL,
+    )
+
+
+async def started_registry(servers: int):
+    transport = FakeTransport()
+    registry = InMemoryServerRegistry(transport=transport, clock=FakeClock())
+    for i in range(servers):
+        assert await registry.register_server(server_info(i))
+    await registry.start()
+    # Let the loop go to sleep until the next probe, an interval away
+    await asyncio.sleep(0.01)
+    return registry, transport
+
+
+async def stop_within_timeout(registry) -> None:
+    # Not wait_for: cancelling a hung stop() would cancel the loop a second time
+    stopping = asyncio.create_task(registry.stop())
+    done, _ = await asyncio.wait((stopping,), timeout=STOP_TIMEOUT)
+    assert stopping in done, "stop() did not return"
+    stopping.result()
+
+
+def test_rescheduled_probe_wakes_the_loop():
+    async def run():
+        registry, transport = await started_registry(3)
+        registrations = len(transport.probes)
+
+        registry.record_request_outcome("server-1", success=False)
+        await asyncio.sleep(0.05)
+        await stop_within_timeout(registry)
+        return transport.probes[registrations:]
+
+    assert asyncio.run(run()) == ["server-1"]
+
+
+def test_stop_returns_when_cancelled_during_a_wakeup():
+    async def run():
+        registry, _ = await started_registry(20)
+        for round_number in range(20):
+            # The failure moves the server's probe to the front of the queue and
+            # sets the wake-up event; stop() cancels the loop in the same pass
+            registry.record_request_outcome(f"server-{round_number}", success=False)
+            await stop_within_timeout(registry)
+            assert registry._health_check_task is None
+            await registry.start()
+            await asyncio.sleep(0.01)
+        await stop_within_timeout(registry)
+
+    asyncio.run(run())
+
+
+def test_stop_returns_while_probes_are_rescheduled():
+    async def run():
+        registry, _ = await started_registry(50)
+        for i in range(50):
+            registry.record_request_outcome(f"server-{i}", success=False)
+        # Probes are now completing and rescheduling themselves
+        await asyncio.sleep(0)
+        await stop_within_timeout(registry)
+        assert not registry._probe_tasks
+
+    asyncio.run(run())
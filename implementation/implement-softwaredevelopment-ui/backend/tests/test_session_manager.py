@@ -0,0 +1,145 @@
+"""
+Session manager tests: expiry, LRU eviction and persistence, driven by a fake clock.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.session_manager import SessionManager
+from services.session_persistence import (
+    FileSessionPersistence,
+    SessionPersistence,
+    SQLiteSessionPersistence,
+)
+
+HOUR = 3600.0
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_manager(clock, persistence=None, max_sessions=100, timeout_hours=1.0):
+    return SessionManager(
+        persistence=persistence,
+        max_sessions=max_sessions,
+        session_timeout_hours=timeout_hours,
+        reaper_interval_seconds=0,
+        clock=clock,
+    )
+
+
+def test_session_expires_after_idle_timeout(clock):
+    manager = make_manager(clock)
+    manager.create_session("idle")
+
+    clock.advance(HOUR - 1)
+    assert manager.get_session("idle") is not None
+
+    # The lookup above counted as activity, so the timeout restarts from it
+    clock.advance(HOUR - 1)
+    assert manager.get_session("idle") is not None
+
+    clock.advance(HOUR)
+    assert manager.get_session("idle") is None
+    assert not manager.session_exists("idle")
+
+
+def test_cleanup_removes_only_expired_sessions(clock):
+    manager = make_manager(clock)
+    manager.create_session("old")
+    clock.advance(HOUR / 2)
+    manager.create_session("recent")
+
+    clock.advance(HOUR / 2)
+    assert manager.cleanup_sessions() == 1
+    assert manager.get_all_conversation_ids() == ["recent"]
+
+
+def test_least_recently_used_session_is_evicted_at_the_limit(clock):
+    manager = make_manager(clock, max_sessions=3)
+    for conversation_id in ("a", "b", "c"):
+        manager.create_session(conversation_id)
+        clock.advance(1)
+
+    # "a" becomes the most recently used, leaving "b" as the oldest
+    manager.get_session("a")
+    manager.create_session("d")
+
+    assert manager.get_session_count() == 3
+    assert sorted(manager.get_all_conversation_ids()) == ["a", "c", "d"]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "file"])
+def test_evicted_session_is_reloaded_from_persistence(clock, tmp_path, backend):
+    persistence = (SQLiteSessionPersistence(str(tmp_path / "sessions.db")) if backend == "sqlite"
+                   else FileSessionPersistence(str(tmp_path / "sessions")))
+    manager = make_manager(clock, persistence=persistence, max_sessions=1)
+    manager.create_session("first")
+    manager.update_session("first", "hello", "hi")
+    manager.create_session("second")
+    assert manager.get_session_count() == 1
+
+    session = manager.get_session("first")
+    assert session is not None and session["message_count"] == 1
+
+    # Expired in the backend as well: not loaded again, and deleted by cleanup
+    clock.advance(HOUR + 1)
+    assert manager.get_session("second") is None
+    assert persistence.load("second") is not None
+    manager.cleanup_sessions()
+    assert persistence.load("second") is None
+    manager.close()
+
+
+def test_workers_sharing_a_backend_see_each_others_updates(clock, tmp_path):
+    path = str(tmp_path / "sessions.db")
+    worker_a = make_manager(clock, persistence=SQLiteSessionPersistence(path))
+    worker_b = make_manager(clock, persistence=SQLiteSessionPersistence(path))
+
+    worker_a.create_session("shared")
+    assert worker_b.get_session("shared")["message_count"] == 0
+
+    clock.advance(1)
+    worker_a.update_session("shared", "question", "answer")
+    assert worker_b.get_session("shared")["message_count"] == 1
+    worker_a.close()
+    worker_b.close()
+
+
+def test_file_backend_keeps_distinct_ids_in_distinct_files(tmp_path):
+    persistence = FileSessionPersistence(str(tmp_path / "sessions"))
+    for conversation_id in ("a.b", "a_b", "a/b", "../a"):
+        persistence.save(conversation_id, {"conversation_id": conversation_id}, expires_at=2.0)
+
+    for conversation_id in ("a.b", "a_b", "a/b", "../a"):
+        session, _, _ = persistence.load(conversation_id)
+        assert session["conversation_id"] == conversation_id
+    assert len(list((tmp_path / "sessions").glob("*.json"))) == 4
+    assert not list(tmp_path.glob("*.json"))
+
+    assert persistence.delete_expired(now=3.0) == 4
+
+
+def test_persistence_backends_must_implement_the_interface():
+    with pytest.raises(TypeError):
+        SessionPersistence()
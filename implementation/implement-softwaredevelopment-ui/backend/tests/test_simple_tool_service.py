@@ -0,0 +1,207 @@
+"""
+Simple tool service tests: tool calls from one model turn run concurrently
+within the configured limit, calls to serialized servers run one at a time,
+and results come back in request order whatever the completion order.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_client.core.models import ErrorCode, MCPError, MCPResponse, ResponseStatus
+from services.simple_tool_service import SimpleToolService
+
+
+class FakeMCPClient:
+    """MCP client whose tool calls sleep for a per-tool delay and record how many overlap."""
+
+    def __init__(self, delays=None, failures=None):
+        self.delays = delays or {}
+        self.failures = failures or {}
+        self.active = 0
+        self.peak = 0
+        self.active_by_server = {}
+        self.peak_by_server = {}
+        self.calls = []
+
+    async def send_request(self, request):
+        return await self.call(request.preferred_server_id, request.content["name"], request.content["arguments"])
+
+    async def call(self, server_id, tool_name, arguments):
+        self.calls.append(tool_name)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.active_by_server[server_id] = self.active_by_server.get(server_id, 0) + 1
+        self.peak_by_server[server_id] = max(self.peak_by_server.get(server_id, 0), self.active_by_server[server_id])
+        try:
+            await asyncio.sleep(self.delays.get(tool_name, 0.01))
+            failures = self.failures.get(tool_name)
+            if failures:
+                raise failures.pop(0)
+            return MCPResponse(
+                status=ResponseStatus.SUCCESS,
+                content={"result": f"{tool_name} done with {arguments}"},
+                server_id=server_id,
+                request_id=f"req-{len(self.calls)}",
+                timestamp=datetime(2024, 1, 1),
+            )
+        finally:
+            self.active -= 1
+            self.active_by_server[server_id] -= 1
+
+
+class FakeMCPService:
+    """MCP service with every server registered; Amazon Q calls go through the same fake client."""
+
+    def __init__(self, client):
+        self.client = client
+        self.invalidated = []
+        self.id_token = None
+
+    def get_registered_servers(self):
+        return {"design-server", "code-server", "amazon-q-business"}
+
+    def invalidate_server_registration(self, server_id):
+        self.invalidated.append(server_id)
+
+    def set_cognito_id_token(self, id_token):
+        self.id_token = id_token
+
+    def get_cognito_id_token(self):
+        return self.id_token
+
+    async def send_request_with_jwt(self, request_data, server_id):
+        params = request_data["params"]
+        return await self.client.call(server_id, params["name"], params["arguments"])
+
+
+def make_service(client, max_concurrent=4):
+    service = SimpleToolService(mcp_client=client, mcp_service=FakeMCPService(client))
+    service.max_concurrent_tool_calls = max_concurrent
+    tools = {
+        "generate_diagram": "design-server",
+        "review_design": "design-server",
+        "generate_code": "code-server",
+        "generate_tests": "code-server",
+        "mcp_amazon_q_business_retrieve": "amazon-q-business",
+    }
+    service.available_tools = {
+        name: {"server_id": server_id, "usage_count": 0, "last_used": None}
+        for name, server_id in tools.items()
+    }
+    return service
+
+
+def tool_call(name, **arguments):
+    return {"tool_name": name, "arguments": arguments or {"index": name}}
+
+
+def test_results_keep_request_order():
+    client = FakeMCPClient(delays={"generate_diagram": 0.05, "review_design": 0.03, "generate_code": 0.001})
+    service = make_service(client)
+    calls = [tool_call("generate_diagram"), tool_call("review_design"), tool_call("generate_code")]
+
+    results = asyncio.run(service.execute_tool_calls(calls, user_id="user-1"))
+
+    assert [success for _, success in results] == [True, True, True]
+    for call, (result, _) in zip(calls, results):
+        assert f"{call['tool_name']} done" in result
+    # The slowest call was issued first yet its result still comes first
+    assert client.calls[0] == "generate_diagram"
+    assert service._active_requests == 0
+
+
+def test_independent_calls_overlap():
+    client = FakeMCPClient(delays={"generate_diagram": 0.2, "generate_code": 0.2, "review_design": 0.2})
+    service = make_service(client)
+    calls = [tool_call("generate_diagram"), tool_call("generate_code"), tool_call("review_design")]
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await service.execute_tool_calls(calls)
+        return results, loop.time() - started
+
+    results, elapsed = asyncio.run(run())
+
+    assert all(success for _, success in results)
+    assert client.peak == 3
+    assert elapsed < 0.5
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_concurrency_is_capped(limit):
+    client = FakeMCPClient()
+    service = make_service(client, max_concurrent=limit)
+    calls = [tool_call(name, index=i)
+             for i in range(4) for name in ("generate_diagram", "generate_code", "review_design")]
+
+    results = asyncio.run(service.execute_tool_calls(calls))
+
+    assert all(success for _, success in results)
+    assert client.peak == limit
+
+
+def test_serialized_server_calls_run_one_at_a_time():
+    client = FakeMCPClient(delays={"mcp_amazon_q_business_retrieve": 0.02})
+    service = make_service(client)
+    calls = [tool_call("mcp_amazon_q_business_retrieve", query=f"q{i}") for i in range(4)]
+    calls += [tool_call("generate_diagram"), tool_call("generate_code")]
+
+    results = asyncio.run(service.execute_tool_calls(calls, jwt_token="id-token"))
+
+    assert all(success for _, success in results)
+    assert client.peak_by_server["amazon-q-business"] == 1
+    assert client.peak > 1
+
+
+def test_failed_calls_do_not_affect_the_others():
+    client = FakeMCPClient(failures={"review_design": [RuntimeError("boom")]})
+    service = make_service(client)
+    calls = [tool_call("generate_diagram"), tool_call("review_design"), tool_call("unknown_tool"),
+             tool_call("generate_code")]
+
+    results = asyncio.run(service.execute_tool_calls(calls))
+
+    assert [success for _, success in results] == [True, False, False, True]
+    assert results[1] == (None, False)
+    assert results[2] == (None, False)
+    assert service._active_requests == 0
+
+
+def test_exceptions_from_execute_tool_become_failures():
+    service = make_service(FakeMCPClient())
+
+    async def execute_tool(tool_name, arguments, user_id=None, jwt_token=None):
+        if tool_name == "generate_code":
+            raise ValueError("unexpected")
+        return f"{tool_name} ok", True
+
+    service.execute_tool = execute_tool
+    calls = [tool_call("generate_diagram"), tool_call("generate_code")]
+
+    assert asyncio.run(service.execute_tool_calls(calls)) == [("generate_diagram ok", True), (None, False)]
+
+
+def test_transport_failure_reregisters_server_and_retries_once():
+    error = MCPError(ErrorCode.TRANSPORT_ERROR, "connection reset")
+    client = FakeMCPClient(failures={"generate_code": [error]})
+    service = make_service(client)
+
+    result, success = asyncio.run(service.execute_tool("generate_code", {"spec": "api"}))
+
+    assert success
+    assert "generate_code done" in result
+    assert client.calls == ["generate_code", "generate_code"]
+    assert service.mcp_service.invalidated == ["code-server"]
+    assert service._active_requests == 0
+
+
+def test_empty_batch():
+    assert asyncio.run(make_service(FakeMCPClient()).execute_tool_calls([])) == []
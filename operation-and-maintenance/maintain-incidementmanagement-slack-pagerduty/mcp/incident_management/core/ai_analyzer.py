@@ -5,6 +5,7 @@ This module provides intelligent analysis of incidents using the existing
 Bedrock client integration from the Splunk MCP server.
 """
 
+import asyncio
 import json
 import logging
 import boto3
@@ -19,6 +20,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.incident import Incident, IncidentSeverity
 from models.analysis import AnalysisResult, RiskLevel, IncidentCorrelation
 from interfaces.base import BaseAnalyzer
+from utils.similarity_index import IncidentSimilarityIndex
+from .bedrock_invoker import AsyncBedrockInvoker
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +45,15 @@ class AIAnalyzer(BaseAnalyzer):
         self.bedrock_region = bedrock_region
         self.model_id = model_id
         self.bedrock_client = boto3.client('bedrock-runtime', region_name=bedrock_region)
+        # Runs model calls off the event loop with coalescing, caching and throttling retries
+        self.bedrock_invoker = AsyncBedrockInvoker(
+            self.bedrock_client,
+            model_id,
+            max_concurrency=int(os.getenv('BEDROCK_MAX_CONCURRENCY', '4')),
+            cache_ttl_seconds=float(os.getenv('BEDROCK_CACHE_TTL_SECONDS', '300'))
+        )
         self.knowledge_base = {}  # Simple in-memory knowledge base for now
+        self.similarity_index = IncidentSimilarityIndex()  # Resolved incidents, indexed by text
         
         logger.info(f"Initialized AIAnalyzer with model {model_id} in region {bedrock_region}")
     
@@ -63,11 +74,11 @@ class AIAnalyzer(BaseAnalyzer):
             # Prepare context for analysis
             context = self._prepare_analysis_context(incident, log_data)
             
-            # Perform root cause analysis
-            root_causes = await self._analyze_root_causes(context)
-            
-            # Classify severity
-            severity_analysis = await self._classify_severity(context)
+            # Root cause analysis and severity classification are independent model calls
+            root_causes, severity_analysis = await asyncio.gather(
+                self._analyze_root_causes(context),
+                self._classify_severity(context)
+            )
             
             # Generate remediation suggestions
             suggested_actions = await self._suggest_remediation(context, root_causes)
@@ -202,6 +213,7 @@ class AIAnalyzer(BaseAnalyzer):
                 'insights': learning_insights,
                 'timestamp': datetime.utcnow().isoformat()
             })
+            self.similarity_index.add(incident.id, self._incident_similarity_text(incident))
             
             logger.info(f"Stored learning insights for incident {incident.id}")
             
@@ -262,7 +274,14 @@ class AIAnalyzer(BaseAnalyzer):
     
     async def _find_similar_incidents(self, incident: Incident) -> List[str]:
         """Find similar incidents from knowledge base."""
-        # Simplified similarity search
+        # Rank resolved incidents by text similarity using the incremental index
+        matches = self.similarity_index.query(
+            self._incident_similarity_text(incident), k=5, min_score=0.2, exclude=[incident.id]
+        )
+        if matches:
+            return [incident_id for incident_id, _ in matches]
+        
+        # Fall back to recent incidents of the same severity
         similar = []
         key_pattern = f"{incident.severity.value}_"
         
@@ -273,6 +292,10 @@ class AIAnalyzer(BaseAnalyzer):
         
         return similar[:5]  # Return top 5 similar incidents
     
+    def _incident_similarity_text(self, incident: Incident) -> str:
+        """Text used to compare incidents for similarity."""
+        return ' '.join([incident.title, incident.description, *incident.affected_systems])
+    
     def _assess_risk_level(self, incident: Incident, severity_analysis: Dict[str, Any]) -> RiskLevel:
         """Assess risk level based on incident and analysis data."""
         severity_mapping = {
@@ -386,15 +409,7 @@ class AIAnalyzer(BaseAnalyzer):
                 ]
             }
             
-            response = self.bedrock_client.invoke_model(
-                body=json.dumps(body),
-                modelId=self.model_id,
-                accept='application/json',
-                contentType='application/json'
-            )
-            
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+            return await self.bedrock_invoker.invoke(body)
             
         except Exception as e:
             logger.error(f"Error invoking Bedrock model: {str(e)}")
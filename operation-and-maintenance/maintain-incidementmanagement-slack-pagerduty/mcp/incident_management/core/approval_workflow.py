@@ -3,9 +3,13 @@ Approval workflow system for high-risk automation tasks.
 """
 
 import asyncio
+import heapq
+import json
 import logging
+import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Set
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import uuid
@@ -82,21 +86,21 @@ class ApprovalRequest:
         unique_suffix = str(uuid.uuid4())[:8]
         return f"APPROVAL-{timestamp}-{unique_suffix.upper()}"
     
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
         """Check if approval request has expired"""
-        return datetime.utcnow() > self.expires_at
+        return (now or datetime.utcnow()) > self.expires_at
     
-    def can_approve(self, user_id: str) -> bool:
+    def can_approve(self, user_id: str, now: Optional[datetime] = None) -> bool:
         """Check if user can approve this request"""
         return (user_id in self.required_approvers and 
                 user_id not in self.approved_by and 
                 user_id not in self.rejected_by and
                 self.status == ApprovalStatus.PENDING and
-                not self.is_expired())
+                not self.is_expired(now))
     
-    def add_approval(self, user_id: str, comment: Optional[str] = None) -> bool:
+    def add_approval(self, user_id: str, comment: Optional[str] = None, now: Optional[datetime] = None) -> bool:
         """Add approval from user"""
-        if not self.can_approve(user_id):
+        if not self.can_approve(user_id, now):
             return False
         
         self.approved_by.append(user_id)
@@ -115,9 +119,9 @@ class ApprovalRequest:
         
         return True
     
-    def add_rejection(self, user_id: str, reason: str) -> bool:
+    def add_rejection(self, user_id: str, reason: str, now: Optional[datetime] = None) -> bool:
         """Add rejection from user"""
-        if not self.can_approve(user_id):
+        if not self.can_approve(user_id, now):
             return False
         
         self.rejected_by.append(user_id)
@@ -150,6 +154,45 @@ class ApprovalRequest:
         """Get list of users who still need to approve"""
         return [user for user in self.required_approvers 
                 if user not in self.approved_by and user not in self.rejected_by]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert approval request to dictionary"""
+        return {
+            'request_id': self.request_id,
+            'task_id': self.task_id,
+            'task': self.task.to_dict(),
+            'requester_id': self.requester_id,
+            'approval_level': self.approval_level.value,
+            'required_approvers': self.required_approvers,
+            'status': self.status.value,
+            'created_at': self.created_at.isoformat(),
+            'expires_at': self.expires_at.isoformat(),
+            'approved_by': self.approved_by,
+            'rejected_by': self.rejected_by,
+            'rejection_reason': self.rejection_reason,
+            'approval_comments': self.approval_comments,
+            'metadata': self.metadata
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ApprovalRequest':
+        """Create approval request from dictionary"""
+        return cls(
+            request_id=data['request_id'],
+            task_id=data['task_id'],
+            task=RemediationTask.from_dict(data['task']),
+            requester_id=data['requester_id'],
+            approval_level=ApprovalLevel(data['approval_level']),
+            required_approvers=data['required_approvers'],
+            status=ApprovalStatus(data['status']),
+            created_at=datetime.fromisoformat(data['created_at']),
+            expires_at=datetime.fromisoformat(data['expires_at']),
+            approved_by=data.get('approved_by', []),
+            rejected_by=data.get('rejected_by', []),
+            rejection_reason=data.get('rejection_reason'),
+            approval_comments=data.get('approval_comments', []),
+            metadata=data.get('metadata', {})
+        )
 
 
 class ApprovalWorkflowManager:
@@ -157,17 +200,37 @@ class ApprovalWorkflowManager:
     Manages approval workflows for high-risk automation tasks.
     """
     
-    def __init__(self, audit_logger=None, notification_manager=None):
+    def __init__(self, audit_logger=None, notification_manager=None,
+                 persistence_path: Optional[str] = None,
+                 clock: Optional[Callable[[], datetime]] = None):
+        """
+        Initialize the approval workflow manager.
+        
+        Args:
+            audit_logger: Optional audit logger
+            notification_manager: Optional notification manager for approver messages
+            persistence_path: JSON-lines journal used to persist pending approvals across restarts
+                (defaults to the APPROVAL_PERSISTENCE_PATH environment variable, disabled if unset)
+            clock: Function returning the current UTC time (injectable for tests)
+        """
         self.logger = logging.getLogger(__name__)
         self.audit_logger = audit_logger
         self.notification_manager = notification_manager
+        self._now = clock or datetime.utcnow
         
         # Active approval requests
         self.active_requests: Dict[str, ApprovalRequest] = {}
         self.completed_requests: Dict[str, ApprovalRequest] = {}
         
-        # Approval rules
-        self.approval_rules: List[ApprovalRule] = []
+        # Min-heap of (expires_at, request_id) so expiry fires at the deadline without scans.
+        # Entries for requests completed before their deadline are skipped when popped.
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._expiry_wakeup = asyncio.Event()
+        
+        # Approval rules, indexed by task type (rules without task types match any type)
+        self._approval_rules: List[ApprovalRule] = []
+        self._rules_by_task_type: Dict[str, List[Tuple[int, ApprovalRule]]] = {}
+        self._untyped_rules: List[Tuple[int, ApprovalRule]] = []
         
         # Configuration
         self.default_timeout_minutes = 60
@@ -176,6 +239,14 @@ class ApprovalWorkflowManager:
         # Initialize default approval rules
         self._initialize_default_rules()
         
+        # Pending approvals survive restarts when a persistence file is configured
+        persistence_path = persistence_path or os.getenv('APPROVAL_PERSISTENCE_PATH')
+        self.persistence_path = Path(persistence_path) if persistence_path else None
+        self._journal_entries = 0
+        if self.persistence_path:
+            self.persistence_path.parent.mkdir(parents=True, exist_ok=True)
+            self._load_pending_requests()
+        
         # Start background task for cleanup
         self._cleanup_task = None
     
@@ -235,7 +306,43 @@ class ApprovalWorkflowManager:
             }
         )
         
-        self.approval_rules.extend([critical_rule, scaling_rule, restart_rule])
+        self.approval_rules = [critical_rule, scaling_rule, restart_rule]
+    
+    @property
+    def approval_rules(self) -> Tuple[ApprovalRule, ...]:
+        """Approval rules in priority order (read-only; use the add/remove methods to change them)"""
+        return tuple(self._approval_rules)
+    
+    @approval_rules.setter
+    def approval_rules(self, rules: List[ApprovalRule]):
+        """Replace all approval rules and refresh the rule index"""
+        self._approval_rules = list(rules)
+        self._rebuild_rule_index()
+    
+    def add_approval_rule(self, rule: ApprovalRule):
+        """Add an approval rule (lowest priority) and refresh the rule index"""
+        self._approval_rules.append(rule)
+        self._rebuild_rule_index()
+    
+    def remove_approval_rule(self, rule_id: str) -> bool:
+        """Remove an approval rule by ID and refresh the rule index"""
+        remaining = [rule for rule in self._approval_rules if rule.rule_id != rule_id]
+        if len(remaining) == len(self._approval_rules):
+            return False
+        self.approval_rules = remaining
+        return True
+    
+    def _rebuild_rule_index(self):
+        """Index rules by task type, keeping their priority (list position)"""
+        self._rules_by_task_type = {}
+        self._untyped_rules = []
+        for position, rule in enumerate(self._approval_rules):
+            task_types = rule.conditions.get("task_types")
+            if task_types is None:
+                self._untyped_rules.append((position, rule))
+                continue
+            for task_type in task_types:
+                self._rules_by_task_type.setdefault(task_type, []).append((position, rule))
     
     async def evaluate_approval_requirement(self, task: RemediationTask, context: Dict[str, Any]) -> Optional[ApprovalRequest]:
         """
@@ -279,16 +386,18 @@ class ApprovalWorkflowManager:
                         approval_level=matching_rule.approval_level,
                         required_approvers=matching_rule.required_approvers.copy(),
                         status=ApprovalStatus.PENDING,
-                        created_at=datetime.utcnow(),
-                        expires_at=datetime.utcnow() + timedelta(minutes=matching_rule.timeout_minutes),
+                        created_at=self._now(),
+                        expires_at=self._now() + timedelta(minutes=matching_rule.timeout_minutes),
                         metadata={
                             "rule_id": matching_rule.rule_id,
                             "rule_name": matching_rule.name
                         }
                     )
                     
-                    # Store the request
+                    # Store the request and schedule its expiry
                     self.active_requests[approval_request.request_id] = approval_request
+                    self._schedule_expiry(approval_request)
+                    self._persist_upsert(approval_request)
                     
                     # Update task status
                     task.status = TaskStatus.REQUIRES_APPROVAL
@@ -340,7 +449,8 @@ class ApprovalWorkflowManager:
                 }
             
             # Check if request has expired
-            if request.is_expired():
+            now = self._now()
+            if request.is_expired(now):
                 request.status = ApprovalStatus.EXPIRED
                 self._move_to_completed(request)
                 return {
@@ -349,7 +459,7 @@ class ApprovalWorkflowManager:
                 }
             
             # Check if user can approve
-            if not request.can_approve(user_id):
+            if not request.can_approve(user_id, now):
                 return {
                     "success": False,
                     "error": "User cannot approve this request"
@@ -357,8 +467,9 @@ class ApprovalWorkflowManager:
             
             # Process the action
             if action.lower() == "approve":
-                success = request.add_approval(user_id, comment)
+                success = request.add_approval(user_id, comment, now)
                 if success:
+                    self._persist_upsert(request)
                     await self._log_audit_event(
                         AuditEventType.TASK_APPROVED,
                         f"Task {request.task_id} approved by {user_id}",
@@ -399,7 +510,7 @@ class ApprovalWorkflowManager:
                         }
                 
             elif action.lower() == "reject":
-                success = request.add_rejection(user_id, comment or "No reason provided")
+                success = request.add_rejection(user_id, comment or "No reason provided", now)
                 if success:
                     self._move_to_completed(request)
                     
@@ -450,12 +561,13 @@ class ApprovalWorkflowManager:
         """
         try:
             pending_requests = []
+            now = self._now()
             
-            for request in self.active_requests.values():
+            for request in list(self.active_requests.values()):
                 if request.status != ApprovalStatus.PENDING:
                     continue
                 
-                if request.is_expired():
+                if request.is_expired(now):
                     request.status = ApprovalStatus.EXPIRED
                     self._move_to_completed(request)
                     continue
@@ -476,8 +588,8 @@ class ApprovalWorkflowManager:
                     "pending_approvers": request.get_pending_approvers(),
                     "created_at": request.created_at.isoformat(),
                     "expires_at": request.expires_at.isoformat(),
-                    "time_remaining": str(request.expires_at - datetime.utcnow()),
-                    "can_approve": user_id and request.can_approve(user_id),
+                    "time_remaining": str(request.expires_at - now),
+                    "can_approve": user_id and request.can_approve(user_id, now),
                     "metadata": request.metadata
                 }
                 
@@ -535,7 +647,13 @@ class ApprovalWorkflowManager:
     
     def _find_matching_rule(self, task: RemediationTask, context: Dict[str, Any]) -> Optional[ApprovalRule]:
         """Find approval rule that matches the task"""
-        for rule in self.approval_rules:
+        # Only rules for this task type (or for any type) can match; merge them in priority order
+        candidates = heapq.merge(
+            self._rules_by_task_type.get(task.task_type.value, []),
+            self._untyped_rules,
+            key=lambda entry: entry[0]
+        )
+        for _, rule in candidates:
             if self._rule_matches_task(rule, task, context):
                 return rule
         return None
@@ -590,7 +708,7 @@ class ApprovalWorkflowManager:
     
     def _is_business_hours(self) -> bool:
         """Check if current time is during business hours"""
-        now = datetime.utcnow()
+        now = self._now()
         # Simple implementation: Monday-Friday, 9 AM - 5 PM UTC
         return (now.weekday() < 5 and 9 <= now.hour < 17)
     
@@ -604,6 +722,7 @@ class ApprovalWorkflowManager:
         if request.request_id in self.active_requests:
             del self.active_requests[request.request_id]
             self.completed_requests[request.request_id] = request
+            self._persist_remove(request.request_id)
             
             # Clean up old completed requests
             if len(self.completed_requests) > 1000:
@@ -672,31 +791,127 @@ Request ID: {request.request_id}
                 pass
             self._cleanup_task = None
     
+    def _schedule_expiry(self, request: ApprovalRequest):
+        """Add a request's deadline to the expiry heap, waking the timer if it is now the earliest"""
+        heapq.heappush(self._expiry_heap, (request.expires_at, request.request_id))
+        if self._expiry_heap[0][1] == request.request_id:
+            self._expiry_wakeup.set()
+    
+    async def expire_due_requests(self) -> List[ApprovalRequest]:
+        """
+        Expire every pending request whose deadline has passed.
+        
+        Returns:
+            The requests that were expired
+        """
+        now = self._now()
+        expired_requests = []
+        
+        # Strictly past the deadline, matching ApprovalRequest.is_expired
+        while self._expiry_heap and self._expiry_heap[0][0] < now:
+            expires_at, request_id = heapq.heappop(self._expiry_heap)
+            request = self.active_requests.get(request_id)
+            if (request is None or request.status != ApprovalStatus.PENDING
+                    or request.expires_at != expires_at):
+                continue  # Completed earlier or rescheduled
+            request.status = ApprovalStatus.EXPIRED
+            expired_requests.append(request)
+        
+        for request in expired_requests:
+            self._move_to_completed(request)
+            await self._log_audit_event(
+                AuditEventType.TASK_EXPIRED,
+                f"Approval request {request.request_id} expired",
+                {
+                    "request_id": request.request_id,
+                    "task_id": request.task_id
+                }
+            )
+        
+        return expired_requests
+    
+    def next_expiry(self) -> Optional[datetime]:
+        """Earliest scheduled deadline, if any"""
+        return self._expiry_heap[0][0] if self._expiry_heap else None
+    
     async def _cleanup_expired_requests(self):
-        """Background task to clean up expired requests"""
+        """Background task that expires requests exactly at their deadlines"""
         while True:
             try:
-                await asyncio.sleep(60)  # Check every minute
+                await self.expire_due_requests()
                 
-                expired_requests = []
-                for request_id, request in self.active_requests.items():
-                    if request.is_expired() and request.status == ApprovalStatus.PENDING:
-                        request.status = ApprovalStatus.EXPIRED
-                        expired_requests.append(request)
-                
-                for request in expired_requests:
-                    self._move_to_completed(request)
-                    await self._log_audit_event(
-                        AuditEventType.TASK_EXPIRED,
-                        f"Approval request {request.request_id} expired",
-                        {
-                            "request_id": request.request_id,
-                            "task_id": request.task_id
-                        }
-                    )
+                # Sleep until the next deadline, or until an earlier one is scheduled
+                next_deadline = self.next_expiry()
+                timeout = None
+                if next_deadline is not None:
+                    timeout = max(0.0, (next_deadline - self._now()).total_seconds())
+                self._expiry_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._expiry_wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Error in cleanup task: {str(e)}")
-                await asyncio.sleep(60)
\ No newline at end of file
+                await asyncio.sleep(1)
+    
+    def _append_journal(self, entry: Dict[str, Any]):
+        """Append one change to the persistence journal, compacting it when it grows too long"""
+        if not self.persistence_path:
+            return
+        
+        try:
+            with open(self.persistence_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+            self._journal_entries += 1
+            if self._journal_entries > 2 * len(self.active_requests) + 100:
+                self._compact_journal()
+        except Exception as e:
+            self.logger.error(f"Failed to persist approval change: {str(e)}")
+    
+    def _persist_upsert(self, request: ApprovalRequest):
+        """Record a new or updated active request"""
+        self._append_journal({"op": "upsert", "request": request.to_dict()})
+    
+    def _persist_remove(self, request_id: str):
+        """Record that a request is no longer active"""
+        self._append_journal({"op": "remove", "request_id": request_id})
+    
+    def _compact_journal(self):
+        """Rewrite the journal so it only holds the current active requests"""
+        self.persistence_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persistence_path.with_suffix(self.persistence_path.suffix + '.tmp')
+        with open(tmp_path, 'w') as f:
+            for request in self.active_requests.values():
+                f.write(json.dumps({"op": "upsert", "request": request.to_dict()}) + "\n")
+        os.replace(tmp_path, self.persistence_path)
+        self._journal_entries = len(self.active_requests)
+    
+    def _load_pending_requests(self):
+        """Replay the persistence journal to restore active requests and their expiry schedule"""
+        self._journal_entries = 0
+        if not self.persistence_path.exists():
+            return
+        
+        try:
+            with open(self.persistence_path, 'r') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry.get("op") == "upsert":
+                        request = ApprovalRequest.from_dict(entry["request"])
+                        self.active_requests[request.request_id] = request
+                    elif entry.get("op") == "remove":
+                        self.active_requests.pop(entry["request_id"], None)
+            
+            for request in self.active_requests.values():
+                if request.status == ApprovalStatus.PENDING:
+                    self._schedule_expiry(request)
+            
+            self._compact_journal()
+            self.logger.info(f"Restored {len(self.active_requests)} pending approval requests from {self.persistence_path}")
+        except Exception as e:
+            self.logger.error(f"Failed to load pending approvals: {str(e)}")
@@ -0,0 +1,206 @@
+"""
+Async invocation layer for AWS Bedrock models.
+
+The boto3 Bedrock runtime client is synchronous. This module runs it on a
+dedicated thread pool so analyzer coroutines never block the event loop, and
+adds a concurrency limit, single-flight coalescing of identical requests, a
+TTL response cache keyed on the request content, and retry with jittered
+exponential backoff on throttling.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bedrock error codes that are worth retrying after a backoff
+RETRYABLE_ERROR_CODES = frozenset({
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+})
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    """Extract the AWS error code from a botocore ClientError (or lookalike)."""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+class AsyncBedrockInvoker:
+    """
+    Non-blocking wrapper around a Bedrock runtime client's ``invoke_model``.
+
+    Identical requests (same model and body) that are in flight at the same
+    time share a single model call, and completed responses are served from
+    an in-memory cache until their TTL expires.
+    """
+
+    def __init__(
+        self,
+        bedrock_client: Any,
+        model_id: str,
+        max_workers: int = 8,
+        max_concurrency: int = 4,
+        cache_ttl_seconds: float = 300.0,
+        cache_max_entries: int = 256,
+        max_retries: int = 4,
+        base_backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 20.0,
+        time_func: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the invoker.
+
+        Args:
+            bedrock_client: boto3 ``bedrock-runtime`` client (or any object with ``invoke_model``)
+            model_id: Bedrock model ID to invoke
+            max_workers: Size of the dedicated thread pool
+            max_concurrency: Maximum number of model calls in flight at once
+            cache_ttl_seconds: How long a response stays cached (0 disables caching)
+            cache_max_entries: Maximum number of cached responses (LRU eviction)
+            max_retries: Retries on throttling before giving up
+            base_backoff_seconds: Base delay for exponential backoff
+            max_backoff_seconds: Upper bound for a single backoff delay
+            time_func: Clock used for cache expiry (injectable for tests)
+        """
+        self.bedrock_client = bedrock_client
+        self.model_id = model_id
+        self.max_concurrency = max_concurrency
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_max_entries = cache_max_entries
+        self.max_retries = max_retries
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._time = time_func
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bedrock-invoke')
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+        self.stats = {
+            'invocations': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+            'throttle_retries': 0,
+        }
+
+    def _request_key(self, body: Dict[str, Any]) -> str:
+        """Content hash identifying a request."""
+        payload = json.dumps(body, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(f"{self.model_id}\n{payload}".encode('utf-8')).hexdigest()
+
+    def _get_cached(self, key: str) -> Optional[str]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at <= self._time():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return text
+
+    def _store_cached(self, key: str, text: str) -> None:
+        if self.cache_ttl_seconds <= 0:
+            return
+        self._cache[key] = (self._time() + self.cache_ttl_seconds, text)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Drop all cached responses."""
+        self._cache.clear()
+
+    async def invoke(self, body: Dict[str, Any], use_cache: bool = True) -> str:
+        """
+        Invoke the model and return the text of the first content block.
+
+        Args:
+            body: Bedrock request body (Anthropic messages format)
+            use_cache: Whether to serve from / store into the response cache
+
+        Returns:
+            Model response text
+        """
+        key = self._request_key(body)
+
+        if use_cache:
+            cached = self._get_cached(key)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached
+
+        # Single-flight: identical requests share one call. It runs in its own task
+        # and every caller awaits it through a shield, so a caller that gets
+        # cancelled does not cancel the call for the others.
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+        else:
+            task = asyncio.get_running_loop().create_task(self._invoke_and_cache(key, body, use_cache))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget_in_flight(key, done))
+        return await asyncio.shield(task)
+
+    async def _invoke_and_cache(self, key: str, body: Dict[str, Any], use_cache: bool) -> str:
+        text = await self._invoke_with_retry(body)
+        if use_cache:
+            self._store_cached(key, text)
+        return text
+
+    def _forget_in_flight(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _invoke_with_retry(self, body: Dict[str, Any]) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.stats['invocations'] += 1
+                    return await loop.run_in_executor(self._executor, self._invoke_sync, body)
+            except Exception as e:
+                code = _error_code(e)
+                if code not in RETRYABLE_ERROR_CODES or attempt >= self.max_retries:
+                    raise
+                # Full jitter keeps concurrent callers from retrying in lockstep
+                delay = random.uniform(0, min(self.max_backoff_seconds, self.base_backoff_seconds * (2 ** attempt)))
+                attempt += 1
+                self.stats['throttle_retries'] += 1
+                logger.warning(f"Bedrock {code}, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def _invoke_sync(self, body: Dict[str, Any]) -> str:
+        """Blocking model call, executed on the dedicated thread pool."""
+        response = self.bedrock_client.invoke_model(
+            body=json.dumps(body),
+            modelId=self.model_id,
+            accept='application/json',
+            contentType='application/json'
+        )
+        response_body = json.loads(response['body'].read())
+        return response_body['content'][0]['text']
+
+    def shutdown(self) -> None:
+        """Release the thread pool."""
+        self._executor.shutdown(wait=False)
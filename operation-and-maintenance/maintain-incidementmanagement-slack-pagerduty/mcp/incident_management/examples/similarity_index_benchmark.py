@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Similarity Index Benchmark - Compare indexed top-k similar-incident queries with an exhaustive scan.
+
+Generates synthetic resolved incidents (title, description and affected
+systems drawn from a fixed vocabulary), builds an IncidentSimilarityIndex
+incrementally, and times top-k queries against scoring every incident with
+calculate_similarity. Half the queries repeat most of a past incident's
+words, half are unrelated. Also checks that both return the same top-k.
+
+Usage:
+    python examples/similarity_index_benchmark.py [--incidents 100000] [--queries 50] [--k 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.helpers import calculate_similarity
+from utils.similarity_index import IncidentSimilarityIndex
+
+SYSTEMS = [f"service-{i}" for i in range(200)]
+SYMPTOMS = ["timeout", "latency", "error", "crash", "oom", "disk", "cpu", "throttling", "5xx",
+            "deadlock", "connection", "refused", "dns", "certificate", "expired", "queue", "backlog",
+            "replication", "lag", "failover", "leak", "spike", "saturation", "restart", "eviction"]
+FILLER = [f"word{i}" for i in range(2000)]
+
+
+def incident_text(rng: random.Random) -> str:
+    """Title, description and affected systems of one synthetic incident."""
+    words = rng.sample(SYMPTOMS, 3) + rng.sample(FILLER, 12) + rng.sample(SYSTEMS, 2)
+    return " ".join(words)
+
+
+def recurrence_text(rng: random.Random, past: str) -> str:
+    """A new incident that repeats most of the words of a past one."""
+    words = past.split()
+    return " ".join(rng.sample(words, len(words) - 5) + rng.sample(FILLER, 5))
+
+
+def exhaustive_top_k(incidents, text, k, min_score):
+    scored = [(calculate_similarity(text, other), incident_id) for incident_id, other in incidents.items()]
+    scored = [item for item in scored if item[0] > 0 and item[0] >= min_score]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [(incident_id, score) for score, incident_id in scored[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--incidents", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--min-score", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    incidents = {f"INC-{i:06d}": incident_text(rng) for i in range(args.incidents)}
+    past = list(incidents.values())
+    queries = [recurrence_text(rng, rng.choice(past)) if i % 2 else incident_text(rng)
+               for i in range(args.queries)]
+
+    started = time.perf_counter()
+    index = IncidentSimilarityIndex()
+    for incident_id, text in incidents.items():
+        index.add(incident_id, text)
+    build_seconds = time.perf_counter() - started
+    print(f"build      {build_seconds:8.2f} s for {len(index)} incidents "
+          f"({build_seconds / len(index) * 1e6:.1f} us/add)")
+
+    started = time.perf_counter()
+    indexed = [index.query(text, k=args.k, min_score=args.min_score) for text in queries]
+    indexed_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    matched = sum(len(result) for result in indexed) / len(queries)
+    print(f"indexed    {indexed_ms:8.2f} ms/query  ({matched:.1f} matches/query)")
+
+    started = time.perf_counter()
+    exhaustive = [exhaustive_top_k(incidents, text, args.k, args.min_score) for text in queries]
+    exhaustive_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    print(f"exhaustive {exhaustive_ms:8.2f} ms/query  ({exhaustive_ms / indexed_ms:.0f}x slower)")
+
+    mismatches = sum(
+        1 for got, expected in zip(indexed, exhaustive)
+        if [incident_id for incident_id, _ in got] != [incident_id for incident_id, _ in expected]
+    )
+    print(f"\nTop-{args.k} mismatches: {mismatches}/{len(queries)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
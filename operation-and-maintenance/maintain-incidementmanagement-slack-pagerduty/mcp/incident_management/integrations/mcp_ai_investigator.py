@@ -17,7 +17,7 @@ Features:
 import asyncio
 import logging
 import json
-from typing import Dict, List, Any, Optional, AsyncGenerator
+from typing import Dict, List, Any, Optional, AsyncGenerator, Tuple
 from datetime import datetime
 from contextlib import AsyncExitStack
 import boto3
@@ -93,6 +93,17 @@ class MCPAIInvestigator:
         self.bedrock_region = os.getenv('AWS_REGION', 'us-east-1')
         self.ai_investigation_enabled = os.getenv('ENABLE_AI_INVESTIGATION', 'true').lower() == 'true'
         
+        # Tool execution limits
+        self.tool_call_timeout = float(os.getenv('AI_TOOL_CALL_TIMEOUT', '120'))
+        self.max_concurrent_tool_calls = int(os.getenv('AI_MAX_CONCURRENT_TOOL_CALLS', '4'))
+        
+        # Context window budget for the messages sent to Claude (rough token estimate)
+        self.context_token_budget = int(os.getenv('AI_CONTEXT_TOKEN_BUDGET', '60000'))
+        self.history_message_char_cap = int(os.getenv('AI_HISTORY_MESSAGE_CHAR_CAP', '8000'))
+        
+        # System prompt cache, keyed on the discovered tool list
+        self._system_prompt_cache: Optional[Tuple[Tuple, str]] = None
+        
         # Initialize Bedrock client
         try:
             self.bedrock_client = boto3.client(
@@ -936,112 +947,34 @@ Continue your investigation by either making more tool calls or providing your f
             return claude_response
     
     async def _execute_tool_calls(self, tool_calls: List[Dict[str, Any]], session_id: str) -> str:
-        """Execute a list of MCP tool calls"""
-        results = []
-        
+        """Execute a list of MCP tool calls concurrently"""
         logger.info(f"🔧 TOOL EXECUTION START: Processing {len(tool_calls)} tool calls for session {session_id}")
         
-        for i, tool_call in enumerate(tool_calls, 1):
-            try:
-                server = tool_call.get('server')
-                tool_name = tool_call.get('tool')
-                arguments = tool_call.get('arguments', {})
-                
-                logger.info(f"🔧 TOOL CALL {i}: Executing {server}.{tool_name} with args: {arguments}")
-                
-                # Get the appropriate client (existing or session)
-                client = None
-                if server == 'splunk':
-                    client = self.existing_splunk_client or self.splunk_session
-                elif server == 'pagerduty':
-                    client = self.existing_pagerduty_client or self.pagerduty_session
-                
-                if not client:
-                    error_msg = f"❌ Tool {i}: Server '{server}' not available"
-                    logger.error(f"🔧 TOOL CALL {i} FAILED: {error_msg}")
-                    results.append(error_msg)
-                    continue
-                
-                # Execute the tool call using the appropriate client
-                if hasattr(client, 'call_tool'):
-                    # MCP session client
-                    logger.info(f"🔧 TOOL CALL {i}: Using MCP session client")
-                    result = await client.call_tool(tool_name, arguments)
-                else:
-                    # Existing client - call the tool method directly
-                    logger.info(f"🔧 TOOL CALL {i}: Using existing client wrapper")
-                    if server == 'splunk':
-                        result = await self._call_splunk_tool(client, tool_name, arguments)
-                    elif server == 'pagerduty':
-                        result = await self._call_pagerduty_tool(client, tool_name, arguments)
-                    else:
-                        error_msg = f"❌ Tool {i}: Unknown server type '{server}'"
-                        logger.error(f"🔧 TOOL CALL {i} FAILED: {error_msg}")
-                        results.append(error_msg)
-                        continue
-                
-                # Format the result and log detailed information
-                if result.content:
-                    content_text = ""
-                    logger.info(f"🔧 TOOL CALL {i} CONTENT DEBUG: {len(result.content)} content items")
-                    
-                    for j, content in enumerate(result.content):
-                        logger.info(f"🔧 TOOL CALL {i} CONTENT {j}: Type={type(content)}, HasText={hasattr(content, 'text')}")
-                        if hasattr(content, 'text'):
-                            logger.info(f"🔧 TOOL CALL {i} CONTENT {j} TEXT: {len(content.text)} chars - {content.text[:100]}{'...' if len(content.text) > 100 else ''}")
-                            content_text += content.text
-                        elif isinstance(content, TextContent):
-                            content_text += content.text
-                        elif isinstance(content, ImageContent):
-                            content_text += f"[Image: {content.data[:50]}...]"
-                        else:
-                            logger.warning(f"🔧 TOOL CALL {i} CONTENT {j}: Unknown content type {type(content)}")
-                    
-                    # Log the raw result for debugging
-                    logger.info(f"🔧 TOOL CALL {i} RAW RESULT: Length={len(content_text)} chars")
-                    logger.info(f"🔧 TOOL CALL {i} RESULT PREVIEW: {content_text[:200]}{'...' if len(content_text) > 200 else ''}")
-                    
-                    # Check if this looks like successful data
-                    if "SPLUNK QUERY SUCCESSFUL" in content_text and "Found" in content_text:
-                        import re
-                        match = re.search(r'Found (\d+) results', content_text)
-                        record_count = match.group(1) if match else "unknown"
-                        logger.info(f"🔧 TOOL CALL {i} SUCCESS DETECTED: Found {record_count} records")
-                    elif "NO RESULTS FOUND" in content_text or "Error" in content_text:
-                        logger.warning(f"🔧 TOOL CALL {i} NO DATA: Query returned no results or error")
-                    else:
-                        logger.info(f"🔧 TOOL CALL {i} RESULT TYPE: Unknown format")
-                    
-                    formatted_result = f"✅ Tool {i} ({server}.{tool_name}):\n{content_text}"
-                    results.append(formatted_result)
-                    
-                    # Log what will be sent to Claude
-                    logger.info(f"🔧 TOOL CALL {i} TO CLAUDE: Sending {len(formatted_result)} chars to Claude")
-                    
-                else:
-                    no_content_msg = f"✅ Tool {i} ({server}.{tool_name}): No content returned"
-                    logger.warning(f"🔧 TOOL CALL {i} NO CONTENT: Result object had no content")
-                    results.append(no_content_msg)
-                
-                # Store tool call in session
-                if session_id in self.active_investigations:
-                    stored_result = content_text if 'content_text' in locals() else 'No content'
-                    self.active_investigations[session_id]['mcp_tool_calls'].append({
-                        'server': server,
-                        'tool': tool_name,
-                        'arguments': arguments,
-                        'result': stored_result
-                    })
-                    logger.info(f"🔧 TOOL CALL {i} STORED: Added to session {session_id} with {len(stored_result)} chars")
-                
-            except Exception as e:
-                error_msg = f"❌ Tool {i}: Error - {str(e)}"
-                logger.error(f"🔧 TOOL CALL {i} EXCEPTION: {e}")
-                results.append(error_msg)
+        # Tool calls emitted in one model turn are independent of each other, so run
+        # them concurrently (bounded) and keep the results in the order Claude asked for them
+        semaphore = asyncio.Semaphore(self.max_concurrent_tool_calls)
+        
+        async def run_bounded(index: int, tool_call: Dict[str, Any]):
+            async with semaphore:
+                return await self._execute_single_tool_call(index, tool_call)
+        
+        started_at = datetime.now()
+        outcomes = await asyncio.gather(
+            *(run_bounded(i, tool_call) for i, tool_call in enumerate(tool_calls, 1))
+        )
+        elapsed = (datetime.now() - started_at).total_seconds()
+        
+        results = []
+        for result_text, tool_record in outcomes:
+            results.append(result_text)
+            
+            # Store tool call in session
+            if tool_record and session_id in self.active_investigations:
+                self.active_investigations[session_id]['mcp_tool_calls'].append(tool_record)
         
         # Log the final combined result that will be sent to Claude
         combined_results = "\n\n".join(results)
-        logger.info(f"🔧 TOOL EXECUTION COMPLETE: Returning {len(combined_results)} chars to Claude")
+        logger.info(f"🔧 TOOL EXECUTION COMPLETE: Returning {len(combined_results)} chars to Claude in {elapsed:.2f}s")
         logger.info(f"🔧 COMBINED RESULTS PREVIEW: {combined_results[:300]}{'...' if len(combined_results) > 300 else ''}")
         
         # Count successful vs failed tool calls
@@ -1051,6 +984,110 @@ Continue your investigation by either making more tool calls or providing your f
         
         return combined_results
     
+    async def _execute_single_tool_call(self, i: int, tool_call: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Execute one MCP tool call with a timeout.
+        
+        Returns:
+            Tuple of (formatted result for Claude, record to store in the session or None)
+        """
+        server = tool_call.get('server')
+        tool_name = tool_call.get('tool')
+        arguments = tool_call.get('arguments', {})
+        
+        try:
+            logger.info(f"🔧 TOOL CALL {i}: Executing {server}.{tool_name} with args: {arguments}")
+            
+            # Get the appropriate client (existing or session)
+            client = None
+            if server == 'splunk':
+                client = self.existing_splunk_client or self.splunk_session
+            elif server == 'pagerduty':
+                client = self.existing_pagerduty_client or self.pagerduty_session
+            
+            if not client:
+                error_msg = f"❌ Tool {i}: Server '{server}' not available"
+                logger.error(f"🔧 TOOL CALL {i} FAILED: {error_msg}")
+                return error_msg, None
+            
+            # Execute the tool call using the appropriate client
+            if hasattr(client, 'call_tool'):
+                # MCP session client
+                logger.info(f"🔧 TOOL CALL {i}: Using MCP session client")
+                call = client.call_tool(tool_name, arguments)
+            else:
+                # Existing client - call the tool method directly
+                logger.info(f"🔧 TOOL CALL {i}: Using existing client wrapper")
+                if server == 'splunk':
+                    call = self._call_splunk_tool(client, tool_name, arguments)
+                elif server == 'pagerduty':
+                    call = self._call_pagerduty_tool(client, tool_name, arguments)
+                else:
+                    error_msg = f"❌ Tool {i}: Unknown server type '{server}'"
+                    logger.error(f"🔧 TOOL CALL {i} FAILED: {error_msg}")
+                    return error_msg, None
+            
+            result = await asyncio.wait_for(call, timeout=self.tool_call_timeout)
+            
+            # Format the result and log detailed information
+            content_text = ""
+            if result.content:
+                logger.info(f"🔧 TOOL CALL {i} CONTENT DEBUG: {len(result.content)} content items")
+                
+                for j, content in enumerate(result.content):
+                    logger.info(f"🔧 TOOL CALL {i} CONTENT {j}: Type={type(content)}, HasText={hasattr(content, 'text')}")
+                    if hasattr(content, 'text'):
+                        logger.info(f"🔧 TOOL CALL {i} CONTENT {j} TEXT: {len(content.text)} chars - {content.text[:100]}{'...' if len(content.text) > 100 else ''}")
+                        content_text += content.text
+                    elif isinstance(content, TextContent):
+                        content_text += content.text
+                    elif isinstance(content, ImageContent):
+                        content_text += f"[Image: {content.data[:50]}...]"
+                    else:
+                        logger.warning(f"🔧 TOOL CALL {i} CONTENT {j}: Unknown content type {type(content)}")
+                
+                # Log the raw result for debugging
+                logger.info(f"🔧 TOOL CALL {i} RAW RESULT: Length={len(content_text)} chars")
+                logger.info(f"🔧 TOOL CALL {i} RESULT PREVIEW: {content_text[:200]}{'...' if len(content_text) > 200 else ''}")
+                
+                # Check if this looks like successful data
+                if "SPLUNK QUERY SUCCESSFUL" in content_text and "Found" in content_text:
+                    import re
+                    match = re.search(r'Found (\d+) results', content_text)
+                    record_count = match.group(1) if match else "unknown"
+                    logger.info(f"🔧 TOOL CALL {i} SUCCESS DETECTED: Found {record_count} records")
+                elif "NO RESULTS FOUND" in content_text or "Error" in content_text:
+                    logger.warning(f"🔧 TOOL CALL {i} NO DATA: Query returned no results or error")
+                else:
+                    logger.info(f"🔧 TOOL CALL {i} RESULT TYPE: Unknown format")
+                
+                formatted_result = f"✅ Tool {i} ({server}.{tool_name}):\n{content_text}"
+                
+                # Log what will be sent to Claude
+                logger.info(f"🔧 TOOL CALL {i} TO CLAUDE: Sending {len(formatted_result)} chars to Claude")
+                
+            else:
+                formatted_result = f"✅ Tool {i} ({server}.{tool_name}): No content returned"
+                logger.warning(f"🔧 TOOL CALL {i} NO CONTENT: Result object had no content")
+            
+            stored_result = content_text or 'No content'
+            logger.info(f"🔧 TOOL CALL {i} STORED: {len(stored_result)} chars")
+            return formatted_result, {
+                'server': server,
+                'tool': tool_name,
+                'arguments': arguments,
+                'result': stored_result
+            }
+            
+        except asyncio.TimeoutError:
+            error_msg = f"❌ Tool {i}: {server}.{tool_name} timed out after {self.tool_call_timeout:.0f}s"
+            logger.error(f"🔧 TOOL CALL {i} TIMEOUT: {error_msg}")
+            return error_msg, None
+        except Exception as e:
+            error_msg = f"❌ Tool {i}: Error - {str(e)}"
+            logger.error(f"🔧 TOOL CALL {i} EXCEPTION: {e}")
+            return error_msg, None
+    
     async def _call_splunk_tool(self, client, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool on the existing Splunk client"""
         try:
@@ -1506,12 +1543,15 @@ Search pattern: {aws_sourcetype}*
                 conversation_history = self.active_investigations[session_id]['conversation_history']
                 logger.info(f"🤖 CLAUDE CONTEXT: Added message, now {len(conversation_history)} total messages")
             
-            # Build system prompt with MCP capabilities
-            system_prompt = self._build_mcp_system_prompt()
+            # Build system prompt with MCP capabilities (cached until the tool list changes)
+            system_prompt = self._get_system_prompt()
             logger.info(f"🤖 CLAUDE SYSTEM: {len(system_prompt)} chars in system prompt")
             
-            # Prepare messages for Claude (don't add the message again since it's already in history)
-            messages = conversation_history
+            # Prepare messages for Claude (don't add the message again since it's already in history).
+            # Older turns are condensed so the request stays within the context budget.
+            messages = self._build_bounded_messages(conversation_history, session)
+            if len(messages) != len(conversation_history):
+                logger.info(f"🤖 CLAUDE CONTEXT: Condensed {len(conversation_history)} history messages to {len(messages)} for the request")
             
             # Log what we're sending to Claude
             total_input_chars = len(system_prompt) + sum(len(msg['content']) for msg in messages)
@@ -1537,15 +1577,8 @@ Search pattern: {aws_sourcetype}*
             
             logger.info(f"🤖 CLAUDE BEDROCK: Calling model {self.bedrock_model_id}")
             
-            # Call Bedrock
-            response = self.bedrock_client.invoke_model(
-                modelId=self.bedrock_model_id,
-                body=json.dumps(bedrock_payload),
-                contentType='application/json'
-            )
-            
-            # Parse response
-            response_body = json.loads(response['body'].read())
+            # Call Bedrock off the event loop so tool calls and Slack handlers keep running
+            response_body = await asyncio.to_thread(self._invoke_bedrock, bedrock_payload)
             logger.info(f"🤖 CLAUDE BEDROCK: Response received, parsing...")
             
             if 'content' in response_body and len(response_body['content']) > 0:
@@ -1626,6 +1659,95 @@ Search pattern: {aws_sourcetype}*
         # Last resort: add at the beginning
         return raw_data_section + "\n" + response
 
+    def _invoke_bedrock(self, bedrock_payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking Bedrock invocation, run in a worker thread by _chat_with_claude"""
+        response = self.bedrock_client.invoke_model(
+            modelId=self.bedrock_model_id,
+            body=json.dumps(bedrock_payload),
+            contentType='application/json'
+        )
+        return json.loads(response['body'].read())
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token estimate (~4 characters per token)"""
+        return len(text) // 4 + 1
+    
+    def _build_bounded_messages(self, conversation_history: List[Dict[str, str]], 
+                                session: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Fit the conversation history into the context token budget.
+        
+        The first message (incident context) and the most recent turns are kept.
+        Older turns are truncated and, if still over budget, replaced by a short
+        summary so the user/assistant alternation Claude requires is preserved.
+        """
+        if len(conversation_history) <= 2:
+            return conversation_history
+        
+        cap = self.history_message_char_cap
+        
+        def truncate(msg: Dict[str, str]) -> Dict[str, str]:
+            content = msg['content']
+            if len(content) <= cap:
+                return msg
+            half = cap // 2
+            omitted = len(content) - cap
+            return {
+                'role': msg['role'],
+                'content': f"{content[:half]}\n\n[... {omitted} chars truncated ...]\n\n{content[-half:]}"
+            }
+        
+        first = conversation_history[0]
+        # The latest exchange is sent in full; older messages are truncated
+        recent = conversation_history[-2:]
+        older = [truncate(msg) for msg in conversation_history[1:-2]]
+        
+        budget = self.context_token_budget - sum(self._estimate_tokens(m['content']) for m in [first] + recent)
+        
+        kept: List[Dict[str, str]] = []
+        for msg in reversed(older):
+            cost = self._estimate_tokens(msg['content'])
+            if cost > budget:
+                break
+            kept.append(msg)
+            budget -= cost
+        kept.reverse()
+        
+        omitted_count = len(older) - len(kept)
+        tail = kept + recent
+        if omitted_count == 0:
+            return [first] + tail
+        
+        summary = self._summarize_omitted_turns(omitted_count, session)
+        if tail[0]['role'] == 'user':
+            # Bridge first user message and the tail with an assistant summary turn
+            return [first, {'role': 'assistant', 'content': summary}] + tail
+        return [{'role': 'user', 'content': f"{first['content']}\n\n{summary}"}] + tail
+    
+    def _summarize_omitted_turns(self, omitted_count: int, session: Dict[str, Any]) -> str:
+        """Summarize conversation turns dropped from the request"""
+        tool_counts: Dict[str, int] = {}
+        for call in session.get('mcp_tool_calls', []):
+            key = f"{call['server']}.{call['tool']}"
+            tool_counts[key] = tool_counts.get(key, 0) + 1
+        
+        summary = f"[Earlier investigation context condensed: {omitted_count} older messages omitted to fit the context window.]"
+        if tool_counts:
+            tools_text = ", ".join(f"{name} x{count}" for name, count in tool_counts.items())
+            summary += f"\nTool calls made so far: {tools_text}"
+        return summary
+    
+    def _get_system_prompt(self) -> str:
+        """Return the cached system prompt, rebuilding it only when the tool list changes"""
+        tools_key = tuple(
+            (server_name, tuple(tool['name'] for tool in capabilities))
+            for server_name, capabilities in self.tool_capabilities.items()
+        )
+        if self._system_prompt_cache is None or self._system_prompt_cache[0] != tools_key:
+            self._system_prompt_cache = (tools_key, self._build_mcp_system_prompt())
+        return self._system_prompt_cache[1]
+    
     def _build_mcp_system_prompt(self) -> str:
         """Build system prompt with MCP capabilities"""
         available_tools_text = self._format_available_tools()
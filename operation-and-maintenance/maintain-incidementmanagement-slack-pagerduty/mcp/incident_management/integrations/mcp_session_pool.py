@@ -0,0 +1,283 @@
+"""
+Pool of stdio MCP sessions
+==========================
+
+Runs several subprocess-backed MCP sessions to the same server so tool calls
+from the API, Slack bot and monitoring loop do not queue behind a single
+stdio pipe.
+
+Features:
+- Warm-up of all sessions at startup
+- Least-busy dispatch
+- Per-call timeouts that leave the session usable
+- Periodic ping health checks and automatic respawn of dead sessions
+"""
+
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from mcp.client.stdio import stdio_client
+from mcp import ClientSession, StdioServerParameters
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSession:
+    """One MCP session and the task that owns its subprocess."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.alive = False
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.start_error: Optional[BaseException] = None
+
+
+class MCPSessionPool:
+    """
+    A fixed-size pool of stdio MCP sessions exposing the ``ClientSession``
+    calls used by the integration clients (``call_tool``, ``list_tools``).
+
+    Each session lives inside its own task so the stdio transport and
+    ``ClientSession`` contexts are entered and exited by the same task,
+    which anyio requires.
+    """
+
+    def __init__(self,
+                 name: str,
+                 server_params_factory: Callable[[], StdioServerParameters],
+                 size: int = 2,
+                 call_timeout: float = 30.0,
+                 health_check_interval: float = 30.0,
+                 startup_timeout: float = 60.0):
+        """
+        Initialize the pool.
+
+        Args:
+            name: Name used in log messages
+            server_params_factory: Builds the parameters used to spawn a server subprocess
+            size: Number of sessions to keep running
+            call_timeout: Default timeout for a single tool call in seconds
+            health_check_interval: Seconds between ping health checks (0 disables them)
+            startup_timeout: Seconds to wait for a session to initialize
+        """
+        self.name = name
+        self.server_params_factory = server_params_factory
+        self.size = max(1, size)
+        self.call_timeout = call_timeout
+        self.health_check_interval = health_check_interval
+        self.startup_timeout = startup_timeout
+
+        self._slots: List[_PooledSession] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self._respawn_lock = asyncio.Lock()
+        self._respawn_tasks: Set[asyncio.Task] = set()  # Background respawns, referenced until done
+        self._closed = False
+        self.stats = {
+            'calls': 0,
+            'timeouts': 0,
+            'respawns': 0,
+        }
+
+    @property
+    def alive_count(self) -> int:
+        """Number of sessions currently usable."""
+        return sum(1 for slot in self._slots if slot.alive)
+
+    async def start(self) -> int:
+        """
+        Spawn and initialize all sessions concurrently (warm-up).
+
+        Returns:
+            Number of sessions that started successfully
+        """
+        self._closed = False
+        self._slots = [_PooledSession(i) for i in range(self.size)]
+        await asyncio.gather(*(self._spawn(slot) for slot in self._slots))
+
+        alive = self.alive_count
+        logger.info(f"{self.name} MCP session pool started: {alive}/{self.size} sessions ready")
+
+        if self.health_check_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+        return alive
+
+    async def _spawn(self, slot: _PooledSession) -> bool:
+        """Start the task owning a session and wait until it is initialized."""
+        slot.ready.clear()
+        slot.stop.clear()
+        slot.start_error = None
+        slot.task = asyncio.create_task(self._run_session(slot))
+        try:
+            await asyncio.wait_for(slot.ready.wait(), timeout=self.startup_timeout)
+        except asyncio.TimeoutError:
+            slot.start_error = TimeoutError(f"session {slot.index} did not initialize in {self.startup_timeout}s")
+            slot.stop.set()
+
+        if slot.start_error:
+            logger.error(f"{self.name} MCP session {slot.index} failed to start: {slot.start_error}")
+            return False
+        return slot.alive
+
+    async def _run_session(self, slot: _PooledSession):
+        """Own one subprocess session until asked to stop or the transport fails."""
+        try:
+            async with AsyncExitStack() as stack:
+                stdio, write = await stack.enter_async_context(stdio_client(self.server_params_factory()))
+                session = await stack.enter_async_context(ClientSession(stdio, write))
+                await session.initialize()
+
+                slot.session = session
+                slot.alive = True
+                slot.ready.set()
+
+                await slot.stop.wait()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            slot.start_error = slot.start_error or e
+            logger.warning(f"{self.name} MCP session {slot.index} exited: {e}")
+        finally:
+            slot.alive = False
+            slot.session = None
+            slot.ready.set()
+
+    async def _retire(self, slot: _PooledSession):
+        """Stop a session's task, waiting briefly for a clean shutdown."""
+        slot.alive = False
+        slot.stop.set()
+        if slot.task and not slot.task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(slot.task), timeout=5.0)
+            except (asyncio.TimeoutError, Exception):
+                slot.task.cancel()
+
+    async def _respawn(self, slot: _PooledSession):
+        """Replace a dead session with a fresh subprocess."""
+        async with self._respawn_lock:
+            if self._closed or slot.alive:
+                return
+            await self._retire(slot)
+            # close() may have run meanwhile; its cancel can be lost if it lands
+            # as the old session finishes (asyncio.wait_for on Python < 3.12)
+            if self._closed:
+                return
+            self.stats['respawns'] += 1
+            logger.info(f"Respawning {self.name} MCP session {slot.index}")
+            await self._spawn(slot)
+
+    def _pick_session(self) -> Optional[_PooledSession]:
+        """Least-busy dispatch over live sessions."""
+        live = [slot for slot in self._slots if slot.alive and slot.session is not None]
+        if not live:
+            return None
+        return min(live, key=lambda slot: slot.in_flight)
+
+    async def _acquire(self) -> _PooledSession:
+        slot = self._pick_session()
+        if slot is None:
+            # Everything is down; try to bring one session back before failing
+            dead = next((s for s in self._slots if not s.alive), None)
+            if dead is not None:
+                await self._respawn(dead)
+            slot = self._pick_session()
+        if slot is None:
+            raise ConnectionError(f"No live {self.name} MCP sessions available")
+        return slot
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None,
+                        timeout: Optional[float] = None) -> Any:
+        """
+        Call a tool on the least busy session.
+
+        A timeout only abandons this request; the session keeps serving other
+        calls. A transport failure marks the session dead, schedules a
+        respawn and retries the call once on another session.
+        """
+        timeout = timeout or self.call_timeout
+        self.stats['calls'] += 1
+
+        for attempt in range(2):
+            slot = await self._acquire()
+            slot.in_flight += 1
+            try:
+                return await asyncio.wait_for(slot.session.call_tool(name, arguments=arguments), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                logger.warning(f"{self.name} tool {name} timed out after {timeout}s on session {slot.index}")
+                raise
+            except Exception as e:
+                transport_down = slot.task is None or slot.task.done() or self._is_transport_error(e)
+                if not transport_down:
+                    raise
+                logger.warning(f"{self.name} MCP session {slot.index} failed during {name}: {e}")
+                slot.alive = False
+                respawn = asyncio.create_task(self._respawn(slot))
+                self._respawn_tasks.add(respawn)
+                respawn.add_done_callback(self._respawn_tasks.discard)
+                if attempt == 1:
+                    raise
+            finally:
+                slot.in_flight -= 1
+
+    async def list_tools(self) -> Any:
+        """List tools from any live session."""
+        slot = await self._acquire()
+        return await asyncio.wait_for(slot.session.list_tools(), timeout=self.call_timeout)
+
+    @staticmethod
+    def _is_transport_error(error: Exception) -> bool:
+        """Whether an exception means the stdio pipe is unusable."""
+        name = type(error).__name__
+        return name in ('ClosedResourceError', 'BrokenResourceError', 'EndOfStream',
+                        'BrokenPipeError', 'ConnectionResetError', 'ConnectionError')
+
+    async def _health_check_loop(self):
+        """Ping idle sessions and respawn the ones that died."""
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            for slot in list(self._slots):
+                if self._closed:
+                    break
+                if not slot.alive or slot.task is None or slot.task.done():
+                    await self._respawn(slot)
+                    continue
+                if slot.in_flight:
+                    continue  # Busy sessions are evidently alive
+                try:
+                    await asyncio.wait_for(slot.session.send_ping(), timeout=10.0)
+                except Exception as e:
+                    logger.warning(f"{self.name} MCP session {slot.index} failed health check: {e}")
+                    slot.alive = False
+                    await self._respawn(slot)
+
+    async def close(self):
+        """Stop the health checker and all sessions."""
+        self._closed = True
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for respawn in list(self._respawn_tasks):
+            respawn.cancel()
+        await asyncio.gather(*self._respawn_tasks, return_exceptions=True)
+        await asyncio.gather(*(self._retire(slot) for slot in self._slots), return_exceptions=True)
+        self._slots = []
+        logger.info(f"{self.name} MCP session pool closed")
+
+    def get_pool_info(self) -> Dict[str, Any]:
+        """Pool state for diagnostics."""
+        return {
+            'size': self.size,
+            'alive': self.alive_count,
+            'in_flight': [slot.in_flight for slot in self._slots],
+            **self.stats,
+        }
@@ -9,11 +9,13 @@ and incident management capabilities.
 import asyncio
 import logging
 import json
+import os
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from mcp.client.stdio import stdio_client
-from mcp import ClientSession, StdioServerParameters
-from contextlib import AsyncExitStack
+from mcp import StdioServerParameters
+
+from integrations.mcp_session_pool import MCPSessionPool
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +25,44 @@ class PagerDutyMCPClient:
     Provides incident management capabilities using real PagerDuty data
     """
     
-    def __init__(self, api_key: Optional[str] = None, api_host: str = "https://api.pagerduty.com"):
+    def __init__(self, api_key: Optional[str] = None, api_host: str = "https://api.pagerduty.com",
+                 pool_size: Optional[int] = None):
         self.api_key = api_key
         self.api_host = api_host
-        self.session: Optional[ClientSession] = None
-        self.exit_stack: Optional[AsyncExitStack] = None
+        self.session: Optional[MCPSessionPool] = None
         self.connected = False
         self._connection_lock = asyncio.Lock()
+        self.pool_size = pool_size or int(os.getenv('PAGERDUTY_MCP_POOL_SIZE', '2'))
+        
+    def _server_params(self) -> StdioServerParameters:
+        """Build the parameters used to spawn a PagerDuty MCP server subprocess"""
+        # Set up environment variables for PagerDuty API
+        env = {
+            "PAGERDUTY_API_HOST": self.api_host,
+            "PAGERDUTY_USER_API_KEY": self.api_key or ""
+        }
+        
+        # Also inherit current environment to ensure uvx works
+        current_env = os.environ.copy()
+        current_env.update(env)
+        
+        # Get the absolute path to the pagerduty server directory
+        current_dir = Path(__file__).parent.parent  # Go up from integrations/ to incident_management/
+        pagerduty_server_dir = current_dir / "pagerduty-mcp-server"  # Go to pagerduty-mcp-server
+        
+        # Verify server directory exists
+        if not pagerduty_server_dir.exists():
+            raise FileNotFoundError(f"PagerDuty server directory not found: {pagerduty_server_dir}")
+        
+        return StdioServerParameters(
+            command="python",
+            args=[
+                "-m", "pagerduty_mcp",
+                "--enable-write-tools"  # Enable write operations
+            ],
+            env=current_env,
+            cwd=str(pagerduty_server_dir)
+        )
         
     async def connect(self) -> bool:
         """Connect to the PagerDuty MCP server"""
@@ -38,52 +71,23 @@ class PagerDutyMCPClient:
                 return True
                 
             try:
-                logger.info("Connecting to PagerDuty MCP server...")
-                
-                # Create new exit stack for this connection
-                self.exit_stack = AsyncExitStack()
-                
-                # Set up environment variables for PagerDuty API
-                env = {
-                    "PAGERDUTY_API_HOST": self.api_host,
-                    "PAGERDUTY_USER_API_KEY": self.api_key or ""
-                }
-                
-                # Also inherit current environment to ensure uvx works
-                import os
-                current_env = os.environ.copy()
-                current_env.update(env)
-                
-                # Connect to the local PagerDuty MCP server
-                import os
-                from pathlib import Path
-                
-                # Get the absolute path to the pagerduty server directory
-                current_dir = Path(__file__).parent.parent  # Go up from integrations/ to incident_management/
-                pagerduty_server_dir = current_dir / "pagerduty-mcp-server"  # Go to pagerduty-mcp-server
+                logger.info(f"Connecting to PagerDuty MCP server with a pool of {self.pool_size} sessions...")
                 
-                # Verify server directory exists
-                if not pagerduty_server_dir.exists():
-                    raise FileNotFoundError(f"PagerDuty server directory not found: {pagerduty_server_dir}")
+                # Fail fast on a missing server before spawning the pool
+                self._server_params()
                 
-                server_params = StdioServerParameters(
-                    command="python",
-                    args=[
-                        "-m", "pagerduty_mcp",
-                        "--enable-write-tools"  # Enable write operations
-                    ],
-                    env=current_env,
-                    cwd=str(pagerduty_server_dir)
+                # Pool of server subprocesses, warmed up before first use
+                pool = MCPSessionPool(
+                    "PagerDuty",
+                    self._server_params,
+                    size=self.pool_size,
+                    call_timeout=30.0,
+                    health_check_interval=float(os.getenv('MCP_POOL_HEALTH_CHECK_INTERVAL', '30'))
                 )
-                
-                transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
-                stdio, write = transport
-                self.session = await self.exit_stack.enter_async_context(
-                    ClientSession(stdio, write)
-                )
-                
-                # Initialize the session
-                await self.session.initialize()
+                if await pool.start() == 0:
+                    await pool.close()
+                    raise ConnectionError("No PagerDuty MCP sessions could be started")
+                self.session = pool
                 
                 # List available tools
                 tools_result = await self.session.list_tools()
@@ -97,12 +101,12 @@ class PagerDutyMCPClient:
                 logger.error(f"Failed to connect to PagerDuty MCP server: {e}")
                 self.connected = False
                 # Clean up on failure
-                if self.exit_stack:
+                if self.session:
                     try:
-                        await self.exit_stack.aclose()
+                        await self.session.close()
                     except Exception as cleanup_error:
                         logger.warning(f"Error during cleanup: {cleanup_error}")
-                    self.exit_stack = None
+                    self.session = None
                 return False
     
     async def disconnect(self):
@@ -113,29 +117,20 @@ class PagerDutyMCPClient:
                 
             try:
                 self.connected = False
-                self.session = None
+                pool, self.session = self.session, None
                 
-                if self.exit_stack:
-                    cleanup_task = asyncio.create_task(self.exit_stack.aclose())
+                if pool:
                     try:
-                        await asyncio.wait_for(cleanup_task, timeout=5.0)
+                        await asyncio.wait_for(pool.close(), timeout=10.0)
                     except asyncio.TimeoutError:
-                        logger.warning("PagerDuty MCP cleanup timed out, forcing cancellation")
-                        cleanup_task.cancel()
-                        try:
-                            await cleanup_task
-                        except asyncio.CancelledError:
-                            pass
+                        logger.warning("PagerDuty MCP session pool shutdown timed out")
                     except Exception as cleanup_error:
                         logger.warning(f"Error during PagerDuty MCP cleanup: {cleanup_error}")
-                    finally:
-                        self.exit_stack = None
                 
                 logger.info("Disconnected from PagerDuty MCP server")
                 
             except Exception as e:
                 logger.error(f"Error disconnecting from PagerDuty: {e}")
-                self.exit_stack = None
     
     async def list_incidents(self, 
                            statuses: Optional[List[str]] = None,
@@ -562,7 +557,8 @@ class PagerDutyMCPClient:
             "connected": self.connected,
             "api_host": self.api_host,
             "has_api_key": self.api_key is not None,
-            "connection_type": "PagerDuty MCP Server"
+            "connection_type": "PagerDuty MCP Server",
+            "session_pool": self.session.get_pool_info() if self.session else None
         }
 
 # Convenience wrapper for incident management integration
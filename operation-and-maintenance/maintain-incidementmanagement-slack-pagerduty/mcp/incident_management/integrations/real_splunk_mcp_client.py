@@ -4,10 +4,12 @@ Connects to the existing Splunk MCP server in ../server/splunk-server.py
 """
 import asyncio
 import logging
+import os
+from pathlib import Path
 from typing import List, Dict, Any, Optional
-from mcp.client.stdio import stdio_client
-from mcp import ClientSession, StdioServerParameters
-from contextlib import AsyncExitStack
+from mcp import StdioServerParameters
+
+from integrations.mcp_session_pool import MCPSessionPool
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +19,39 @@ class RealSplunkMCPClient:
     Uses the actual tools: get_splunk_results, get_splunk_fields, etc.
     """
     
-    def __init__(self):
-        self.session: Optional[ClientSession] = None
-        self.exit_stack: Optional[AsyncExitStack] = None
+    def __init__(self, pool_size: Optional[int] = None):
+        self.session: Optional[MCPSessionPool] = None
         self.connected = False
         self._connection_lock = asyncio.Lock()
+        self.pool_size = pool_size or int(os.getenv('SPLUNK_MCP_POOL_SIZE', '2'))
+        
+    def _server_params(self) -> StdioServerParameters:
+        """Build the parameters used to spawn a Splunk MCP server subprocess"""
+        # Get the absolute path to the server directory
+        current_dir = Path(__file__).parent.parent  # Go up from integrations/ to incident_management/
+        server_dir = current_dir / "server"  # Go to incident_management/server (copied in Docker)
+        
+        # Verify server directory exists
+        if not server_dir.exists():
+            raise FileNotFoundError(f"Splunk server directory not found: {server_dir}")
+        
+        server_script = server_dir / "splunk-server.py"
+        if not server_script.exists():
+            raise FileNotFoundError(f"Splunk server script not found: {server_script}")
+        
+        # Set up environment variables for the server
+        server_env = os.environ.copy()
+        server_env.update({
+            'secret_arn': os.getenv('SECRET_ARN', 'splunk-bedrock-secret'),
+            'FASTMCP_DEBUG': 'true'
+        })
+        
+        return StdioServerParameters(
+            command="python",
+            args=["splunk-server.py"],
+            cwd=str(server_dir),  # Use absolute path
+            env=server_env
+        )
         
     async def connect(self):
         """Connect to the existing Splunk MCP server"""
@@ -30,51 +60,23 @@ class RealSplunkMCPClient:
                 return True
                 
             try:
-                logger.info("Connecting to Splunk MCP server...")
-                
-                # Create new exit stack for this connection
-                self.exit_stack = AsyncExitStack()
+                logger.info(f"Connecting to Splunk MCP server with a pool of {self.pool_size} sessions...")
                 
-                # Connect to the existing Splunk server
-                import os
-                from pathlib import Path
+                # Fail fast on a missing server before spawning the pool
+                self._server_params()
                 
-                # Get the absolute path to the server directory
-                current_dir = Path(__file__).parent.parent  # Go up from integrations/ to incident_management/
-                server_dir = current_dir / "server"  # Go to incident_management/server (copied in Docker)
-                
-                # Verify server directory exists
-                if not server_dir.exists():
-                    raise FileNotFoundError(f"Splunk server directory not found: {server_dir}")
-                
-                server_script = server_dir / "splunk-server.py"
-                if not server_script.exists():
-                    raise FileNotFoundError(f"Splunk server script not found: {server_script}")
-                
-                logger.info(f"Using Splunk server at: {server_dir}")
-                
-                # Set up environment variables for the server
-                server_env = os.environ.copy()
-                server_env.update({
-                    'secret_arn': os.getenv('SECRET_ARN', 'splunk-bedrock-secret'),
-                    'FASTMCP_DEBUG': 'true'
-                })
-                
-                server_params = StdioServerParameters(
-                    command="python",
-                    args=["splunk-server.py"],
-                    cwd=str(server_dir),  # Use absolute path
-                    env=server_env
+                # Pool of server subprocesses, warmed up before first use
+                pool = MCPSessionPool(
+                    "Splunk",
+                    self._server_params,
+                    size=self.pool_size,
+                    call_timeout=30.0,
+                    health_check_interval=float(os.getenv('MCP_POOL_HEALTH_CHECK_INTERVAL', '30'))
                 )
-                
-                transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
-                stdio, write = transport
-                self.session = await self.exit_stack.enter_async_context(
-                    ClientSession(stdio, write)
-                )
-                
-                # Initialize the session
-                await self.session.initialize()
+                if await pool.start() == 0:
+                    await pool.close()
+                    raise ConnectionError("No Splunk MCP sessions could be started")
+                self.session = pool
                 
                 # List available tools
                 tools_result = await self.session.list_tools()
@@ -86,19 +88,18 @@ class RealSplunkMCPClient:
                 
             except Exception as e:
                 logger.error(f"Failed to connect to Splunk MCP server: {e}")
-                logger.error(f"Server directory: {server_dir}")
                 logger.error(f"Current working directory: {os.getcwd()}")
                 logger.error(f"Exception type: {type(e).__name__}")
                 logger.error(f"Exception details: {str(e)}")
                 
                 self.connected = False
                 # Clean up on failure
-                if self.exit_stack:
+                if self.session:
                     try:
-                        await self.exit_stack.aclose()
+                        await self.session.close()
                     except Exception as cleanup_error:
                         logger.warning(f"Error during cleanup: {cleanup_error}")
-                    self.exit_stack = None
+                    self.session = None
                 return False
     
     async def execute_search(self, query: str, earliest_time: str = "-1h") -> List[Dict]:
@@ -157,9 +158,6 @@ class RealSplunkMCPClient:
             return []
         except Exception as e:
             logger.error(f"Error executing Splunk search: {e}")
-            # If connection is broken, mark as disconnected
-            if "connection" in str(e).lower() or "broken" in str(e).lower():
-                self.connected = False
             return []
     
     async def get_sourcetype_fields(self, sourcetype: str) -> List[str]:
@@ -319,31 +317,20 @@ class RealSplunkMCPClient:
                 
             try:
                 self.connected = False
-                self.session = None
+                pool, self.session = self.session, None
                 
-                if self.exit_stack:
-                    # Use asyncio.create_task to handle the cleanup in the correct context
-                    cleanup_task = asyncio.create_task(self.exit_stack.aclose())
+                if pool:
                     try:
-                        await asyncio.wait_for(cleanup_task, timeout=5.0)
+                        await asyncio.wait_for(pool.close(), timeout=10.0)
                     except asyncio.TimeoutError:
-                        logger.warning("MCP cleanup timed out, forcing cancellation")
-                        cleanup_task.cancel()
-                        try:
-                            await cleanup_task
-                        except asyncio.CancelledError:
-                            pass
+                        logger.warning("MCP session pool shutdown timed out")
                     except Exception as cleanup_error:
                         logger.warning(f"Error during MCP cleanup: {cleanup_error}")
-                    finally:
-                        self.exit_stack = None
                 
                 logger.info("Disconnected from Splunk MCP server")
                 
             except Exception as e:
                 logger.error(f"Error disconnecting: {e}")
-                # Force cleanup
-                self.exit_stack = None
 
 # Convenience wrapper for incident detection
 class SplunkIncidentClient:
@@ -0,0 +1,171 @@
+"""
+Approval workflow tests: deadline-driven expiry, rule matching and
+persistence, driven by a fake clock.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from incident_management.core.approval_workflow import (
+    ApprovalLevel,
+    ApprovalRule,
+    ApprovalStatus,
+    ApprovalWorkflowManager,
+)
+from incident_management.models.remediation import RemediationTask, TaskType
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self, now=datetime(2024, 1, 6, 12, 0)):  # A Saturday, outside business hours
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, **kwargs) -> None:
+        self.now += timedelta(**kwargs)
+
+
+def restart_rule(timeout_minutes=10, auto_approve=None):
+    return ApprovalRule(
+        rule_id="restarts",
+        name="Restarts",
+        description="Production restarts",
+        conditions={"task_types": ["restart_service"], "parameters": {"environment": ["production"]}},
+        approval_level=ApprovalLevel.SINGLE,
+        required_approvers=["ops-engineer"],
+        timeout_minutes=timeout_minutes,
+        auto_approve_conditions=auto_approve,
+    )
+
+
+def make_task(task_type=TaskType.RESTART_SERVICE, **parameters):
+    return RemediationTask(
+        id="", name="restart api", description="Restart the API service", task_type=task_type,
+        parameters=parameters or {"environment": "production"}, safety_checks=[],
+        approval_required=True, estimated_duration=timedelta(minutes=5),
+    )
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_manager(clock, rules=None, persistence_path=None):
+    manager = ApprovalWorkflowManager(clock=clock, persistence_path=persistence_path)
+    if rules is not None:
+        manager.approval_rules = rules
+    return manager
+
+
+def request_approval(manager, task=None, context=None):
+    return asyncio.run(manager.evaluate_approval_requirement(task or make_task(), context or {}))
+
+
+def test_request_expires_exactly_at_its_deadline(clock):
+    manager = make_manager(clock, rules=[restart_rule(timeout_minutes=10)])
+    request = request_approval(manager)
+    assert request.expires_at == clock.now + timedelta(minutes=10)
+    assert manager.next_expiry() == request.expires_at
+
+    clock.advance(minutes=10)
+    assert asyncio.run(manager.expire_due_requests()) == []
+
+    clock.advance(seconds=1)
+    assert asyncio.run(manager.expire_due_requests()) == [request]
+    assert request.status == ApprovalStatus.EXPIRED
+    assert request.request_id in manager.completed_requests
+    assert manager.next_expiry() is None
+
+
+def test_completed_requests_are_skipped_when_their_deadline_passes(clock):
+    manager = make_manager(clock, rules=[restart_rule()])
+    approved = request_approval(manager)
+    pending = request_approval(manager)
+
+    result = asyncio.run(manager.process_approval(approved.request_id, "ops-engineer", "approve"))
+    assert result["status"] == "approved"
+
+    clock.advance(minutes=11)
+    assert asyncio.run(manager.expire_due_requests()) == [pending]
+    assert approved.status == ApprovalStatus.APPROVED
+
+
+def test_approval_after_the_deadline_is_refused(clock):
+    manager = make_manager(clock, rules=[restart_rule()])
+    request = request_approval(manager)
+
+    clock.advance(minutes=11)
+    result = asyncio.run(manager.process_approval(request.request_id, "ops-engineer", "approve"))
+
+    assert result == {"success": False, "error": "Approval request has expired"}
+    assert request.status == ApprovalStatus.EXPIRED
+    assert request.task.approved_by is None
+
+
+def test_pending_approvals_report_time_remaining(clock):
+    manager = make_manager(clock, rules=[restart_rule(timeout_minutes=10)])
+    request = request_approval(manager)
+    clock.advance(minutes=4)
+
+    pending = asyncio.run(manager.get_pending_approvals("ops-engineer"))
+
+    assert [summary["request_id"] for summary in pending] == [request.request_id]
+    assert pending[0]["time_remaining"] == str(timedelta(minutes=6))
+    assert asyncio.run(manager.get_pending_approvals("someone-else")) == []
+
+
+def test_auto_approval_follows_the_injected_clock(clock):
+    manager = make_manager(clock, rules=[restart_rule(auto_approve={"business_hours": False})])
+    assert request_approval(manager) is None
+
+    clock.now = datetime(2024, 1, 8, 10, 0)  # Monday morning
+    assert request_approval(manager) is not None
+
+
+def test_rules_match_by_task_type_in_priority_order(clock):
+    scale_rule = ApprovalRule(
+        rule_id="big-scale", name="Big scale", description="", approval_level=ApprovalLevel.SINGLE,
+        conditions={"task_types": ["scale_resource"], "parameters": {"target_capacity": {"min": 100}}},
+        required_approvers=["ops-manager"],
+    )
+    catch_all = ApprovalRule(
+        rule_id="catch-all", name="Anything else", description="", conditions={},
+        approval_level=ApprovalLevel.SINGLE, required_approvers=["ops-lead"],
+    )
+    manager = make_manager(clock, rules=[restart_rule(), scale_rule])
+    manager.add_approval_rule(catch_all)
+
+    def rule_for(task):
+        rule = manager._find_matching_rule(task, {})
+        return rule.rule_id if rule else None
+
+    assert rule_for(make_task()) == "restarts"
+    assert rule_for(make_task(TaskType.SCALE_RESOURCE, target_capacity=150)) == "big-scale"
+    assert rule_for(make_task(TaskType.SCALE_RESOURCE, target_capacity=10)) == "catch-all"
+    assert rule_for(make_task(TaskType.COLLECT_LOGS)) == "catch-all"
+
+    assert manager.remove_approval_rule("catch-all")
+    assert not manager.remove_approval_rule("catch-all")
+    assert rule_for(make_task(TaskType.COLLECT_LOGS)) is None
+
+
+def test_pending_requests_survive_a_restart(clock, tmp_path):
+    path = tmp_path / "state" / "approvals.jsonl"
+    manager = make_manager(clock, rules=[restart_rule()], persistence_path=str(path))
+    kept = request_approval(manager)
+    done = request_approval(manager)
+    asyncio.run(manager.process_approval(done.request_id, "ops-engineer", "reject", "not now"))
+
+    restarted = make_manager(clock, rules=[restart_rule()], persistence_path=str(path))
+
+    assert list(restarted.active_requests) == [kept.request_id]
+    assert restarted.next_expiry() == kept.expires_at
+    clock.advance(minutes=11)
+    expired = asyncio.run(restarted.expire_due_requests())
+    assert [request.request_id for request in expired] == [kept.request_id]
@@ -0,0 +1,140 @@
+"""
+Bedrock invoker tests against a fake model client with configurable latency
+and throttling.
+"""
+
+import asyncio
+import io
+import json
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from incident_management.core.bedrock_invoker import AsyncBedrockInvoker
+
+
+class FakeBedrockClient:
+    """Blocking ``invoke_model`` stand-in that sleeps and can throttle the first calls."""
+
+    def __init__(self, latency=0.0, throttle_first=0):
+        self.latency = latency
+        self.throttle_first = throttle_first
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke_model(self, body, modelId, accept, contentType):
+        with self._lock:
+            self.calls += 1
+            throttled = self.calls <= self.throttle_first
+        time.sleep(self.latency)
+        if throttled:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "InvokeModel")
+        prompt = json.loads(body)["messages"][0]["content"]
+        payload = json.dumps({"content": [{"type": "text", "text": f"answer to {prompt}"}]})
+        return {"body": io.BytesIO(payload.encode("utf-8"))}
+
+
+def request(prompt):
+    return {"max_tokens": 100, "messages": [{"role": "user", "content": prompt}]}
+
+
+def make_invoker(client, **kwargs):
+    kwargs.setdefault("base_backoff_seconds", 0.01)
+    return AsyncBedrockInvoker(client, "fake-model", **kwargs)
+
+
+def test_event_loop_keeps_running_during_long_model_calls():
+    client = FakeBedrockClient(latency=0.3)
+    invoker = make_invoker(client)
+
+    async def scenario():
+        ticks = 0
+        stop = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not stop.is_set():
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        answers = await asyncio.gather(*(invoker.invoke(request(f"q{i}")) for i in range(4)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticker_task
+        return answers, elapsed, ticks
+
+    answers, elapsed, ticks = asyncio.run(scenario())
+    invoker.shutdown()
+
+    assert answers == [f"answer to q{i}" for i in range(4)]
+    # Four 0.3s calls ran side by side, and the ticker ran throughout
+    assert elapsed < 0.9
+    assert ticks >= 15
+
+
+def test_identical_requests_share_one_call_and_the_cache():
+    client = FakeBedrockClient(latency=0.1)
+    invoker = make_invoker(client)
+
+    async def scenario():
+        first = await asyncio.gather(*(invoker.invoke(request("same")) for _ in range(5)))
+        second = await invoker.invoke(request("same"))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    invoker.shutdown()
+
+    assert first == ["answer to same"] * 5 and second == "answer to same"
+    assert client.calls == 1
+    assert invoker.stats["coalesced"] == 4 and invoker.stats["cache_hits"] == 1
+
+
+def test_cancelled_first_caller_does_not_cancel_coalesced_callers():
+    client = FakeBedrockClient(latency=0.2)
+    invoker = make_invoker(client)
+
+    async def scenario():
+        first = asyncio.create_task(invoker.invoke(request("shared")))
+        await asyncio.sleep(0.05)
+        followers = [asyncio.create_task(invoker.invoke(request("shared"))) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await asyncio.gather(*followers)
+
+    answers = asyncio.run(scenario())
+    invoker.shutdown()
+
+    assert answers == ["answer to shared"] * 3
+    assert client.calls == 1
+
+
+def test_throttled_calls_are_retried_with_backoff():
+    client = FakeBedrockClient(throttle_first=2)
+    invoker = make_invoker(client, max_retries=4)
+
+    answer = asyncio.run(invoker.invoke(request("busy")))
+    invoker.shutdown()
+
+    assert answer == "answer to busy"
+    assert client.calls == 3 and invoker.stats["throttle_retries"] == 2
+
+
+def test_throttling_beyond_the_retry_budget_is_raised_to_every_caller():
+    client = FakeBedrockClient(latency=0.05, throttle_first=10)
+    invoker = make_invoker(client, max_retries=1)
+
+    async def scenario():
+        return await asyncio.gather(*(invoker.invoke(request("busy")) for _ in range(3)),
+                                    return_exceptions=True)
+
+    outcomes = asyncio.run(scenario())
+    invoker.shutdown()
+
+    assert all(isinstance(outcome, ClientError) for outcome in outcomes)
+    assert client.calls == 2
@@ -0,0 +1,95 @@
+"""
+MCP AI investigator tests: tool calls from one model turn run concurrently,
+bounded, in order and each under its own timeout.
+"""
+
+import asyncio
+import time
+
+from mcp.types import CallToolResult, TextContent
+
+from integrations.mcp_ai_investigator import MCPAIInvestigator
+
+
+class FakeToolSession:
+    """MCP session whose tools sleep for the requested latency and echo their name."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def call_tool(self, name, arguments):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(arguments.get("latency", 0))
+            return CallToolResult(content=[TextContent(type="text", text=f"result of {name}")])
+        finally:
+            self.in_flight -= 1
+
+
+def make_investigator(max_concurrent=4, timeout=5.0):
+    investigator = MCPAIInvestigator()
+    investigator.splunk_session = FakeToolSession()
+    investigator.max_concurrent_tool_calls = max_concurrent
+    investigator.tool_call_timeout = timeout
+    investigator.active_investigations["session"] = {"mcp_tool_calls": []}
+    return investigator
+
+
+def tool_call(name, latency):
+    return {"server": "splunk", "tool": name, "arguments": {"latency": latency}}
+
+
+def test_tool_calls_run_concurrently_and_keep_their_order():
+    investigator = make_investigator()
+    # The slowest call comes first, so completion order differs from request order
+    calls = [tool_call(f"tool_{i}", latency) for i, latency in enumerate((0.3, 0.1, 0.2, 0.05))]
+
+    started = time.perf_counter()
+    combined = asyncio.run(investigator._execute_tool_calls(calls, "session"))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.6
+    sections = combined.split("\n\n")
+    assert [section.splitlines()[0] for section in sections] == [
+        f"✅ Tool {i + 1} (splunk.tool_{i}):" for i in range(4)
+    ]
+    stored = investigator.active_investigations["session"]["mcp_tool_calls"]
+    assert [record["tool"] for record in stored] == [f"tool_{i}" for i in range(4)]
+
+
+def test_concurrency_is_bounded():
+    investigator = make_investigator(max_concurrent=2)
+    calls = [tool_call(f"tool_{i}", 0.05) for i in range(6)]
+
+    asyncio.run(investigator._execute_tool_calls(calls, "session"))
+
+    assert investigator.splunk_session.max_in_flight == 2
+
+
+def test_slow_tool_times_out_without_holding_up_the_others():
+    investigator = make_investigator(timeout=0.2)
+    calls = [tool_call("slow", 5), tool_call("fast", 0.01)]
+
+    started = time.perf_counter()
+    combined = asyncio.run(investigator._execute_tool_calls(calls, "session"))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1
+    slow, fast = combined.split("\n\n")
+    assert slow.startswith("❌ Tool 1: splunk.slow timed out")
+    assert fast.startswith("✅ Tool 2 (splunk.fast):")
+    stored = investigator.active_investigations["session"]["mcp_tool_calls"]
+    assert [record["tool"] for record in stored] == ["fast"]
+
+
+def test_unavailable_server_is_reported_per_call():
+    investigator = make_investigator()
+    calls = [{"server": "pagerduty", "tool": "list_incidents", "arguments": {}}, tool_call("search", 0)]
+
+    combined = asyncio.run(investigator._execute_tool_calls(calls, "session"))
+
+    missing, found = combined.split("\n\n")
+    assert missing == "❌ Tool 1: Server 'pagerduty' not available"
+    assert found.startswith("✅ Tool 2 (splunk.search):")
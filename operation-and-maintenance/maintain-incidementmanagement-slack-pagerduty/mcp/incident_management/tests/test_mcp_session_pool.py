@@ -0,0 +1,95 @@
+"""
+MCP session pool tests with in-memory sessions in place of stdio subprocesses.
+"""
+
+import asyncio
+
+from integrations.mcp_session_pool import MCPSessionPool
+
+
+class ClosedResourceError(Exception):
+    """Named like the anyio error raised when a stdio pipe is gone."""
+
+
+class FakeSession:
+    def __init__(self, pool, generation):
+        self.pool = pool
+        self.generation = generation
+
+    async def call_tool(self, name, arguments=None):
+        if self.generation in self.pool.broken_generations:
+            raise ClosedResourceError()
+        return f"{name} on session generation {self.generation}"
+
+    async def send_ping(self):
+        return None
+
+
+class FakeSessionPool(MCPSessionPool):
+    """Pool whose sessions are in-memory fakes that take a while to start."""
+
+    def __init__(self, *args, spawn_seconds=0.05, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spawn_seconds = spawn_seconds
+        self.spawned = 0
+        self.broken_generations = set()
+
+    async def _run_session(self, slot):
+        try:
+            # Startup is abandoned when the slot is stopped first
+            stopped = asyncio.ensure_future(slot.stop.wait())
+            await asyncio.wait([stopped], timeout=self.spawn_seconds)
+            if stopped.done():
+                return
+            stopped.cancel()
+            self.spawned += 1
+            slot.session = FakeSession(self, self.spawned)
+            slot.alive = True
+            slot.ready.set()
+            await slot.stop.wait()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            slot.alive = False
+            slot.session = None
+            slot.ready.set()
+
+
+def make_pool(**kwargs):
+    return FakeSessionPool("fake", server_params_factory=lambda: None, size=2,
+                           health_check_interval=0, **kwargs)
+
+
+def test_failed_session_is_respawned_in_the_background():
+    async def scenario():
+        pool = make_pool()
+        await pool.start()
+        pool.broken_generations.add(1)
+
+        result = await pool.call_tool("search")
+        assert result == "search on session generation 2"
+        assert len(pool._respawn_tasks) == 1
+
+        await asyncio.gather(*pool._respawn_tasks)
+        assert not pool._respawn_tasks
+        assert pool.alive_count == 2 and pool.stats["respawns"] == 1
+        await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_close_cancels_pending_respawns():
+    async def scenario():
+        pool = make_pool(spawn_seconds=0.05)
+        await pool.start()
+        pool.broken_generations.add(1)
+        pool.spawn_seconds = 10
+
+        await pool.call_tool("search")
+        assert len(pool._respawn_tasks) == 1
+
+        await asyncio.wait_for(pool.close(), timeout=2)
+        assert not pool._respawn_tasks
+        assert pool.alive_count == 0
+
+    asyncio.run(scenario())
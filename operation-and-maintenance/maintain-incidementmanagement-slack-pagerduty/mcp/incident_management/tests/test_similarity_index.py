@@ -0,0 +1,77 @@
+"""
+Similarity index tests: indexed top-k queries return the same incidents and
+scores as scoring every incident with calculate_similarity.
+"""
+
+import random
+
+import pytest
+
+from utils.helpers import calculate_similarity
+from utils.similarity_index import IncidentSimilarityIndex
+
+VOCABULARY = [f"w{i}" for i in range(60)]
+
+
+def random_text(rng, size=8):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(size))
+
+
+def exhaustive_top_k(incidents, text, k, min_score=0.0, exclude=()):
+    scored = [(calculate_similarity(text, other), incident_id)
+              for incident_id, other in incidents.items() if incident_id not in exclude]
+    scored = [item for item in scored if item[0] > 0 and item[0] >= min_score]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [(incident_id, score) for score, incident_id in scored[:k]]
+
+
+@pytest.fixture
+def corpus():
+    rng = random.Random(3)
+    incidents = {f"INC-{i:04d}": random_text(rng) for i in range(2000)}
+    index = IncidentSimilarityIndex()
+    for incident_id, text in incidents.items():
+        index.add(incident_id, text)
+    queries = [random_text(rng, size=rng.randint(1, 12)) for _ in range(100)]
+    return incidents, index, queries
+
+
+@pytest.mark.parametrize("k,min_score", [(1, 0.0), (5, 0.0), (10, 0.2), (50, 0.1)])
+def test_top_k_matches_exhaustive_scan(corpus, k, min_score):
+    incidents, index, queries = corpus
+    for text in queries:
+        got = index.query(text, k=k, min_score=min_score)
+        expected = exhaustive_top_k(incidents, text, k, min_score)
+        assert [incident_id for incident_id, _ in got] == [incident_id for incident_id, _ in expected]
+        assert [score for _, score in got] == pytest.approx([score for _, score in expected])
+
+
+def test_excluded_incidents_are_left_out(corpus):
+    incidents, index, queries = corpus
+    for incident_id, text in list(incidents.items())[:20]:
+        got = index.query(text, k=5, exclude=[incident_id])
+        assert incident_id not in [match for match, _ in got]
+        assert got == exhaustive_top_k(incidents, text, 5, exclude={incident_id})
+
+
+def test_replaced_and_removed_incidents_stay_consistent(corpus):
+    incidents, index, queries = corpus
+    rng = random.Random(11)
+    for incident_id in rng.sample(sorted(incidents), 200):
+        index.remove(incident_id)
+        del incidents[incident_id]
+    for incident_id in rng.sample(sorted(incidents), 200):
+        incidents[incident_id] = random_text(rng)
+        index.add(incident_id, incidents[incident_id])
+
+    assert len(index) == len(incidents)
+    for text in queries:
+        got = index.query(text, k=5)
+        assert [incident_id for incident_id, _ in got] == \
+            [incident_id for incident_id, _ in exhaustive_top_k(incidents, text, 5)]
+
+
+def test_empty_query_returns_nothing(corpus):
+    _, index, _ = corpus
+    assert index.query("", k=5) == []
+    assert index.query("w1", k=0) == []
@@ -8,6 +8,9 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Union
 
 
+_WORD_PATTERN = re.compile(r'\b\w+\b')
+
+
 def generate_unique_id(prefix: str = "") -> str:
     """
     Generate a unique identifier with optional prefix.
@@ -116,14 +119,15 @@ def extract_keywords(text: str, min_length: int = 3) -> List[str]:
         'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
     }
     
-    # Filter words
-    keywords = []
+    # Filter words, de-duplicating in first-seen order (dict keys keep insertion order)
+    keywords = {}
     for word in words:
         if len(word) >= min_length and word not in stop_words:
-            if word not in keywords:  # Avoid duplicates
-                keywords.append(word)
+            keywords[word] = None
+            if len(keywords) == 20:  # Limit to top 20 keywords
+                break
     
-    return keywords[:20]  # Limit to top 20 keywords
+    return list(keywords)
 
 
 def merge_dictionaries(*dicts: Dict[str, Any]) -> Dict[str, Any]:
@@ -200,16 +204,40 @@ def calculate_similarity(text1: str, text2: str) -> float:
     if not text1 or not text2:
         return 0.0
     
-    words1 = set(re.findall(r'\b\w+\b', text1.lower()))
-    words2 = set(re.findall(r'\b\w+\b', text2.lower()))
+    return jaccard_similarity(word_set(text1), word_set(text2))
+
+
+def word_set(text: str) -> frozenset:
+    """
+    Tokenize text into the set of lowercase words used for similarity scoring.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        Frozen set of words
+    """
+    if not text:
+        return frozenset()
+    return frozenset(_WORD_PATTERN.findall(text.lower()))
+
+
+def jaccard_similarity(words1: frozenset, words2: frozenset) -> float:
+    """
+    Calculate Jaccard similarity between two pre-tokenized word sets.
+    
+    Args:
+        words1: First word set
+        words2: Second word set
     
+    Returns:
+        Similarity score between 0.0 and 1.0
+    """
     if not words1 or not words2:
         return 0.0
     
-    intersection = words1.intersection(words2)
-    union = words1.union(words2)
-    
-    return len(intersection) / len(union)
+    intersection = len(words1 & words2)
+    return intersection / (len(words1) + len(words2) - intersection)
 
 
 def chunk_list(lst: List[Any], chunk_size: int) -> List[List[Any]]:
@@ -0,0 +1,104 @@
+"""
+Incremental similarity index for historical incidents.
+
+Incidents are tokenized once when they are added. An inverted index from
+word to incident IDs lets a query score only the incidents that share at
+least one word with it, using the same word-set Jaccard similarity as
+``calculate_similarity``, so results match the exhaustive comparison.
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .helpers import word_set
+
+
+class IncidentSimilarityIndex:
+    """
+    Inverted word index over incident texts with top-k Jaccard queries.
+
+    The index is built incrementally: call ``add`` as incidents resolve and
+    ``remove`` when they are pruned from history.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._tokens: Dict[str, frozenset] = {}
+        self._postings: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def __contains__(self, incident_id: str) -> bool:
+        return incident_id in self._tokens
+
+    def add(self, incident_id: str, text: str) -> None:
+        """
+        Add or replace an incident in the index.
+
+        Args:
+            incident_id: Incident identifier
+            text: Text describing the incident (title, description, systems...)
+        """
+        if incident_id in self._tokens:
+            self.remove(incident_id)
+
+        tokens = word_set(text)
+        self._tokens[incident_id] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(incident_id)
+
+    def remove(self, incident_id: str) -> None:
+        """
+        Remove an incident from the index if present.
+
+        Args:
+            incident_id: Incident identifier
+        """
+        tokens = self._tokens.pop(incident_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.discard(incident_id)
+                if not posting:
+                    del self._postings[token]
+
+    def query(self, text: str, k: int = 5, min_score: float = 0.0,
+              exclude: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Find the incidents most similar to the given text.
+
+        Args:
+            text: Query text
+            k: Maximum number of results
+            min_score: Minimum similarity score to include
+            exclude: Incident IDs to leave out of the results
+
+        Returns:
+            List of (incident_id, score) tuples, highest score first
+        """
+        query_tokens = word_set(text)
+        if not query_tokens or k <= 0:
+            return []
+
+        # Count shared words per candidate from the postings lists
+        overlap: Dict[str, int] = {}
+        for token in query_tokens:
+            for incident_id in self._postings.get(token, ()):
+                overlap[incident_id] = overlap.get(incident_id, 0) + 1
+
+        excluded = set(exclude) if exclude else set()
+        query_size = len(query_tokens)
+        scored = []
+        for incident_id, shared in overlap.items():
+            if incident_id in excluded:
+                continue
+            score = shared / (query_size + len(self._tokens[incident_id]) - shared)
+            if score >= min_score:
+                scored.append((score, incident_id))
+
+        # Ties are broken by incident ID so results are deterministic
+        top = heapq.nsmallest(k, scored, key=lambda item: (-item[0], item[1]))
+        return [(incident_id, score) for score, incident_id in top]
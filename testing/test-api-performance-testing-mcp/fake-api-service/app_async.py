@@ -0,0 +1,995 @@
+"""
+Fake API Service for Performance Testing - ASGI version
+The endpoints of app.py on an event loop, for load tests that need a target which does not saturate first
+
+app.py sleeps in its worker threads, so gunicorn's four workers top out at
+a few requests per second per worker however fast the load generator is.
+Here simulated latency is an asyncio.sleep, so one process holds thousands
+of requests in flight, and the in-memory state is shared by every request
+instead of being split between workers. CPU-bound endpoints run in a
+thread so they do not stall the loop.
+
+Latency follows a configurable distribution around each endpoint's usual
+delay range, random draws can be seeded for repeatable runs, and the fault
+profile (latency, error rates, memory leak) can be changed while a test runs
+through the /control endpoint.
+
+Run with:
+    uvicorn app_async:app --host 0.0.0.0 --port 8080
+"""
+
+import asyncio
+import math
+import os
+import random
+import secrets
+import time
+from datetime import datetime
+import logging
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# In-memory storage for demo purposes
+users = {}
+orders = {}
+payments = {}
+
+# Memory leak simulation
+memory_hog = []
+
+LATENCY_DISTRIBUTIONS = ('uniform', 'fixed', 'normal', 'lognormal', 'bimodal')
+
+# Named fault profiles for /control; fields given alongside a profile override it
+FAULT_PROFILES = {
+    'healthy': {'latency_distribution': 'uniform', 'latency_scale': 1.0, 'error_rate': 0.0,
+                'endpoint_error_rates': {}, 'memory_leak_simulation': False},
+    'degraded': {'latency_distribution': 'lognormal', 'latency_spread': 0.5, 'latency_scale': 3.0,
+                 'error_rate': 0.05},
+    'slow_tail': {'latency_distribution': 'bimodal', 'latency_tail_probability': 0.02,
+                  'latency_tail_multiplier': 20.0},
+    'payment_outage': {'endpoint_error_rates': {'/api/v1/payments': 1.0, '/payment/process': 1.0}},
+    'leaking': {'memory_leak_simulation': True},
+}
+
+# Current fault profile, changed at runtime through /control
+fault_profile = {
+    'response_delay_min': float(os.environ.get('RESPONSE_DELAY_MIN', '0.1')),
+    'response_delay_max': float(os.environ.get('RESPONSE_DELAY_MAX', '0.5')),
+    'latency_distribution': os.environ.get('LATENCY_DISTRIBUTION', 'uniform').lower(),
+    # Coefficient of variation for normal, sigma of the log for lognormal and bimodal
+    'latency_spread': float(os.environ.get('LATENCY_SPREAD', '0.25')),
+    'latency_tail_probability': float(os.environ.get('LATENCY_TAIL_PROBABILITY', '0.05')),
+    'latency_tail_multiplier': float(os.environ.get('LATENCY_TAIL_MULTIPLIER', '10')),
+    # Multiplies every simulated delay; 0 turns simulated latency off
+    'latency_scale': float(os.environ.get('LATENCY_SCALE', '1.0')),
+    'error_rate': float(os.environ.get('ERROR_RATE', '0.05')),  # 5% error rate
+    # Path prefix -> error rate, overriding error_rate for matching requests
+    'endpoint_error_rates': {},
+    'memory_leak_simulation': os.environ.get('MEMORY_LEAK_SIMULATION', 'false').lower() == 'true',
+    'seed': int(os.environ['RANDOM_SEED']) if os.environ.get('RANDOM_SEED') else None,
+}
+
+# Seeded generator for repeatable runs, the system generator otherwise
+rng = random.Random(fault_profile['seed']) if fault_profile['seed'] is not None else secrets.SystemRandom()
+
+
+def sample_delay(low: float, high: float) -> float:
+    """Seconds of simulated latency for an endpoint whose usual delay lies between low and high"""
+    distribution = fault_profile['latency_distribution']
+    mean = (low + high) / 2
+    spread = fault_profile['latency_spread']
+
+    if distribution == 'uniform':
+        delay = rng.uniform(low, high)
+    elif distribution == 'fixed':
+        delay = mean
+    elif distribution == 'normal':
+        delay = rng.gauss(mean, mean * spread)
+    elif distribution == 'lognormal':
+        # Median at the middle of the range, right-skewed like real service latency
+        delay = rng.lognormvariate(math.log(mean), spread) if mean > 0 else 0.0
+    else:
+        # bimodal: the usual lognormal body plus a slow mode for a fraction of requests
+        delay = rng.lognormvariate(math.log(mean), spread) if mean > 0 else 0.0
+        if rng.random() < fault_profile['latency_tail_probability']:
+            delay *= fault_profile['latency_tail_multiplier']
+
+    return max(0.0, delay) * fault_profile['latency_scale']
+
+
+async def simulate_processing_time(low: float = None, high: float = None):
+    """Simulate realistic API processing time without blocking other requests"""
+    if low is None:
+        low, high = fault_profile['response_delay_min'], fault_profile['response_delay_max']
+    delay = sample_delay(low, high)
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return delay
+
+
+def should_return_error(request: Request) -> bool:
+    """Randomly return errors based on the error rate configured for the request's path"""
+    rate = fault_profile['error_rate']
+    matches = [prefix for prefix in fault_profile['endpoint_error_rates'] if request.url.path.startswith(prefix)]
+    if matches:
+        rate = fault_profile['endpoint_error_rates'][max(matches, key=len)]
+    return rng.random() < rate
+
+
+def simulate_memory_leak():
+    """Simulate memory leak for endurance testing"""
+    if fault_profile['memory_leak_simulation']:
+        # Add some data to memory that won't be cleaned up
+        memory_hog.append('x' * 1024)  # Add 1KB each time
+
+
+def apply_fault_profile(changes: dict) -> list:
+    """
+    Update the fault profile from a /control request
+
+    Returns:
+        Names of the settings that changed
+
+    Raises:
+        ValueError: If a setting is unknown or out of range; nothing is changed then
+    """
+    global rng
+
+    updated = dict(fault_profile)
+    changes = dict(changes)
+    profile_name = changes.pop('profile', None)
+    if profile_name is not None:
+        if profile_name not in FAULT_PROFILES:
+            raise ValueError(f"Unknown profile '{profile_name}', expected one of {sorted(FAULT_PROFILES)}")
+        changes = dict(FAULT_PROFILES[profile_name], **changes)
+    reset_state = bool(changes.pop('reset_state', False))
+
+    for key, value in changes.items():
+        if key not in fault_profile:
+            raise ValueError(f"Unknown setting '{key}'")
+        if key == 'latency_distribution':
+            if value not in LATENCY_DISTRIBUTIONS:
+                raise ValueError(f"latency_distribution must be one of {LATENCY_DISTRIBUTIONS}")
+        elif key == 'endpoint_error_rates':
+            if not isinstance(value, dict) or not all(_is_probability(rate) for rate in value.values()):
+                raise ValueError("endpoint_error_rates must map path prefixes to rates between 0 and 1")
+        elif key == 'memory_leak_simulation':
+            value = bool(value)
+        elif key == 'seed':
+            if value is not None and not isinstance(value, int):
+                raise ValueError("seed must be an integer or null")
+        elif key in ('error_rate', 'latency_tail_probability'):
+            if not _is_probability(value):
+                raise ValueError(f"{key} must be between 0 and 1")
+        elif not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+            raise ValueError(f"{key} must be a non-negative number")
+        updated[key] = value
+
+    if updated['response_delay_min'] > updated['response_delay_max']:
+        raise ValueError("response_delay_min must not exceed response_delay_max")
+
+    changed = [key for key in fault_profile if updated[key] != fault_profile[key]]
+    fault_profile.update(updated)
+    if 'seed' in changes:
+        # Reseeding restarts the sequence even if the seed is unchanged
+        rng = random.Random(fault_profile['seed']) if fault_profile['seed'] is not None else secrets.SystemRandom()
+        if 'seed' not in changed:
+            changed.append('seed')
+    if reset_state:
+        users.clear()
+        orders.clear()
+        payments.clear()
+        memory_hog.clear()
+        changed.append('reset_state')
+    return changed
+
+
+def _is_probability(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value <= 1
+
+
+def _token(request: Request) -> str:
+    return request.headers.get('Authorization', '').replace('Bearer ', '')
+
+
+async def _json_body(request: Request) -> dict:
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _sum_of_squares(iterations: int, pause_every: int = 0) -> int:
+    result = 0
+    for i in range(iterations):
+        result += i ** 2
+        if pause_every and i % pause_every == 0:
+            time.sleep(0.01)  # Simulate I/O operations
+    return result
+
+
+async def health_check(request: Request):
+    """Health check endpoint - always returns healthy for ECS health checks"""
+    # Don't simulate processing time or errors for health checks
+    # This ensures ECS service stays healthy
+
+    return JSONResponse({
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat(),
+        'version': '1.0.0',
+        'memory_usage': len(memory_hog) if fault_profile['memory_leak_simulation'] else 0
+    })
+
+
+async def control(request: Request):
+    """Read or change the fault profile while a test runs"""
+    if request.method == 'POST':
+        try:
+            changed = apply_fault_profile(await _json_body(request))
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+        logger.info(f"Fault profile changed: {changed}")
+        return JSONResponse({'changed': changed, 'fault_profile': fault_profile})
+
+    return JSONResponse({
+        'fault_profile': fault_profile,
+        'profiles': FAULT_PROFILES,
+        'latency_distributions': list(LATENCY_DISTRIBUTIONS)
+    })
+
+
+async def login(request: Request):
+    """User authentication endpoint"""
+    await simulate_processing_time()
+    simulate_memory_leak()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Authentication service unavailable'}, status_code=503)
+
+    data = await _json_body(request)
+    username = data.get('username', 'testuser')
+    password = data.get('password', 'password')
+
+    # Simulate authentication logic
+    if not username or not password:
+        return JSONResponse({'error': 'Username and password required'}, status_code=400)
+
+    # Generate fake JWT token
+    token = f"fake-jwt-token-{username}-{int(time.time())}"
+
+    # Store user session
+    users[token] = {
+        'username': username,
+        'login_time': datetime.utcnow().isoformat(),
+        'session_id': f"session-{rng.randint(1000, 9999)}"
+    }
+
+    return JSONResponse({
+        'token': token,
+        'username': username,
+        'expires_in': 3600,
+        'session_id': users[token]['session_id']
+    })
+
+
+async def logout(request: Request):
+    """User logout endpoint"""
+    await simulate_processing_time()
+
+    token = _token(request)
+
+    if token in users:
+        del users[token]
+        return JSONResponse({'message': 'Logged out successfully'})
+
+    return JSONResponse({'error': 'Invalid token'}, status_code=401)
+
+
+async def handle_orders(request: Request):
+    """Orders endpoint - GET to list, POST to create"""
+    await simulate_processing_time()
+    simulate_memory_leak()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Orders service temporarily unavailable'}, status_code=503)
+
+    token = _token(request)
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    if request.method == 'GET':
+        # List orders for user
+        user_orders = [order for order in orders.values() if order.get('user_token') == token]
+        return JSONResponse({
+            'orders': user_orders,
+            'total': len(user_orders),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+
+    # Create new order
+    data = await _json_body(request)
+
+    order_id = f"order-{rng.randint(10000, 99999)}"
+    order = {
+        'order_id': order_id,
+        'user_token': token,
+        'username': users[token]['username'],
+        'items': data.get('items', []),
+        'total_amount': data.get('total_amount', rng.uniform(10.0, 500.0)),
+        'status': 'pending',
+        'created_at': datetime.utcnow().isoformat()
+    }
+
+    orders[order_id] = order
+
+    return JSONResponse(order, status_code=201)
+
+
+async def handle_single_order(request: Request):
+    """Handle individual order operations"""
+    await simulate_processing_time()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Order service error'}, status_code=500)
+
+    token = _token(request)
+    order_id = request.path_params.get('order_id')
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    if order_id not in orders:
+        return JSONResponse({'error': 'Order not found'}, status_code=404)
+
+    order = orders[order_id]
+
+    # Check if user owns this order
+    if order.get('user_token') != token:
+        return JSONResponse({'error': 'Access denied'}, status_code=403)
+
+    if request.method == 'GET':
+        return JSONResponse(order)
+
+    if request.method == 'PUT':
+        # Update order
+        order.update(await _json_body(request))
+        order['updated_at'] = datetime.utcnow().isoformat()
+        return JSONResponse(order)
+
+    # Cancel order
+    del orders[order_id]
+    return JSONResponse({'message': 'Order cancelled successfully'})
+
+
+async def process_payment(request: Request):
+    """Payment processing endpoint"""
+    # Simulate longer processing time for payments
+    await simulate_processing_time(0.5, 2.0)
+    simulate_memory_leak()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Payment gateway timeout'}, status_code=504)
+
+    token = _token(request)
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    data = await _json_body(request)
+    order_id = data.get('order_id')
+    payment_method = data.get('payment_method', 'credit_card')
+    amount = data.get('amount', 0)
+
+    if not order_id or not amount:
+        return JSONResponse({'error': 'Order ID and amount required'}, status_code=400)
+
+    # Simulate payment processing
+    payment_id = f"payment-{rng.randint(100000, 999999)}"
+
+    # Random payment failure (in addition to general error rate)
+    if rng.random() < 0.02:  # 2% payment-specific failure rate
+        return JSONResponse({
+            'payment_id': payment_id,
+            'status': 'failed',
+            'error': 'Payment declined by bank',
+            'order_id': order_id
+        }, status_code=402)
+
+    payment = {
+        'payment_id': payment_id,
+        'order_id': order_id,
+        'user_token': token,
+        'amount': amount,
+        'payment_method': payment_method,
+        'status': 'completed',
+        'transaction_id': f"txn-{rng.randint(1000000, 9999999)}",
+        'processed_at': datetime.utcnow().isoformat()
+    }
+
+    payments[payment_id] = payment
+
+    # Update order status if it exists
+    if order_id in orders:
+        orders[order_id]['status'] = 'paid'
+        orders[order_id]['payment_id'] = payment_id
+
+    return JSONResponse(payment)
+
+
+async def handle_users(request: Request):
+    """User management endpoint"""
+    await simulate_processing_time()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'User service unavailable'}, status_code=503)
+
+    token = _token(request)
+
+    if request.method == 'GET':
+        # List users (admin only simulation)
+        if token not in users:
+            return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+        # Simulate user list
+        user_list = []
+        for i in range(1, 21):  # 20 demo users
+            user_list.append({
+                'id': i,
+                'username': f'user{i}',
+                'email': f'user{i}@example.com',
+                'created_at': datetime.utcnow().isoformat(),
+                'status': 'active' if i % 10 != 0 else 'inactive'
+            })
+
+        return JSONResponse({
+            'users': user_list,
+            'total': len(user_list),
+            'page': 1,
+            'per_page': 20
+        })
+
+    # Create new user
+    data = await _json_body(request)
+
+    user_id = rng.randint(100, 999)
+    new_user = {
+        'id': user_id,
+        'username': data.get('username', f'user{user_id}'),
+        'email': data.get('email', f'user{user_id}@example.com'),
+        'created_at': datetime.utcnow().isoformat(),
+        'status': 'active'
+    }
+
+    return JSONResponse(new_user, status_code=201)
+
+
+async def handle_single_user(request: Request):
+    """Handle individual user operations"""
+    await simulate_processing_time()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'User service error'}, status_code=500)
+
+    token = _token(request)
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    try:
+        user_id = int(request.path_params['user_id'])
+    except ValueError:
+        return JSONResponse({'error': 'User not found'}, status_code=404)
+
+    # Simulate user data
+    user_data = {
+        'id': user_id,
+        'username': f'user{user_id}',
+        'email': f'user{user_id}@example.com',
+        'created_at': datetime.utcnow().isoformat(),
+        'status': 'active',
+        'profile': {
+            'first_name': 'User',
+            'last_name': f'{user_id}',
+            'phone': f'+1-555-{user_id:04d}',
+            'address': {
+                'street': f'{user_id} Demo Street',
+                'city': 'Demo City',
+                'state': 'DC',
+                'zip': f'{user_id:05d}'
+            }
+        }
+    }
+
+    if request.method == 'GET':
+        return JSONResponse(user_data)
+
+    if request.method == 'PUT':
+        # Update user
+        user_data.update(await _json_body(request))
+        user_data['updated_at'] = datetime.utcnow().isoformat()
+        return JSONResponse(user_data)
+
+    # Delete user
+    return JSONResponse({'message': f'User {user_id} deleted successfully'})
+
+
+async def get_inventory(request: Request):
+    """Get product inventory"""
+    await simulate_processing_time()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Inventory service unavailable'}, status_code=503)
+
+    # Generate demo products
+    products = []
+    categories = ['Electronics', 'Clothing', 'Books', 'Home & Garden', 'Sports']
+
+    for i in range(1, 51):  # 50 demo products
+        products.append({
+            'id': i,
+            'name': f'Demo Product {i}',
+            'description': f'This is a demo product for testing purposes - Product {i}',
+            'price': round(rng.uniform(9.99, 999.99), 2),
+            'category': rng.choice(categories),
+            'stock': rng.randint(0, 100),
+            'sku': f'DEMO-{i:04d}',
+            'created_at': datetime.utcnow().isoformat(),
+            'status': 'active' if i % 20 != 0 else 'discontinued'
+        })
+
+    # Apply filters
+    category = request.query_params.get('category')
+    if category:
+        products = [p for p in products if p['category'].lower() == category.lower()]
+
+    min_price = request.query_params.get('min_price')
+    if min_price:
+        products = [p for p in products if p['price'] >= float(min_price)]
+
+    max_price = request.query_params.get('max_price')
+    if max_price:
+        products = [p for p in products if p['price'] <= float(max_price)]
+
+    return JSONResponse({
+        'products': products,
+        'total': len(products),
+        'categories': categories,
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+
+async def analytics_dashboard(request: Request):
+    """Analytics dashboard endpoint with heavy data processing simulation"""
+    # Simulate longer processing for analytics
+    await simulate_processing_time(1.0, 3.0)
+    simulate_memory_leak()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Analytics service timeout'}, status_code=504)
+
+    # Generate realistic analytics data
+    analytics_data = {
+        'summary': {
+            'total_users': rng.randint(1000, 10000),
+            'active_users_today': rng.randint(100, 1000),
+            'total_orders': rng.randint(500, 5000),
+            'revenue_today': round(rng.uniform(1000, 50000), 2),
+            'conversion_rate': round(rng.uniform(2.5, 8.5), 2)
+        },
+        'hourly_traffic': [
+            {
+                'hour': i,
+                'requests': rng.randint(50, 500),
+                'unique_users': rng.randint(20, 200),
+                'errors': rng.randint(0, 10)
+            } for i in range(24)
+        ],
+        'top_products': [
+            {
+                'id': i,
+                'name': f'Popular Product {i}',
+                'sales': rng.randint(10, 100),
+                'revenue': round(rng.uniform(100, 5000), 2)
+            } for i in range(1, 11)
+        ],
+        'geographic_data': [
+            {'country': 'US', 'users': rng.randint(100, 1000)},
+            {'country': 'CA', 'users': rng.randint(50, 500)},
+            {'country': 'UK', 'users': rng.randint(30, 300)},
+            {'country': 'DE', 'users': rng.randint(20, 200)},
+            {'country': 'FR', 'users': rng.randint(15, 150)}
+        ],
+        'generated_at': datetime.utcnow().isoformat(),
+        'processing_time_ms': rng.randint(1000, 3000)
+    }
+
+    return JSONResponse(analytics_data)
+
+
+async def handle_notifications(request: Request):
+    """Notification system endpoint"""
+    await simulate_processing_time()
+
+    token = _token(request)
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    if request.method == 'GET':
+        # Get user notifications
+        notifications = []
+        for i in range(1, 11):  # 10 demo notifications
+            notifications.append({
+                'id': i,
+                'title': f'Notification {i}',
+                'message': f'This is demo notification {i} for testing purposes',
+                'type': rng.choice(['info', 'warning', 'success', 'error']),
+                'read': rng.choice([True, False]),
+                'created_at': datetime.utcnow().isoformat()
+            })
+
+        return JSONResponse({
+            'notifications': notifications,
+            'unread_count': len([n for n in notifications if not n['read']]),
+            'total': len(notifications)
+        })
+
+    # Send notification
+    data = await _json_body(request)
+
+    notification = {
+        'id': rng.randint(1000, 9999),
+        'title': data.get('title', 'Demo Notification'),
+        'message': data.get('message', 'Demo notification message'),
+        'type': data.get('type', 'info'),
+        'read': False,
+        'created_at': datetime.utcnow().isoformat(),
+        'sent_to': users[token]['username']
+    }
+
+    return JSONResponse(notification, status_code=201)
+
+
+async def search_endpoint(request: Request):
+    """Search endpoint with configurable response time"""
+    query = request.query_params.get('q', '')
+    category = request.query_params.get('category', '')
+
+    # Simulate search processing time based on query complexity, capped at 3 seconds
+    base = len(query) * 0.1
+    search_delay = await simulate_processing_time(min(base + 0.2, 3.0), min(base + 1.0, 3.0))
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Search service unavailable'}, status_code=503)
+
+    # Generate search results
+    results = []
+    if query:
+        for i in range(1, min(21, len(query) * 3)):  # Results based on query length
+            results.append({
+                'id': i,
+                'title': f'Search Result {i} for "{query}"',
+                'description': f'This is a demo search result matching "{query}"',
+                'category': category or rng.choice(['Electronics', 'Books', 'Clothing']),
+                'relevance_score': round(rng.uniform(0.5, 1.0), 2),
+                'url': f'/products/{i}'
+            })
+
+    return JSONResponse({
+        'query': query,
+        'results': results,
+        'total_results': len(results),
+        'search_time_ms': int(search_delay * 1000),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+
+async def get_payment(request: Request):
+    """Get payment details"""
+    await simulate_processing_time()
+
+    token = _token(request)
+    payment_id = request.path_params['payment_id']
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    if payment_id not in payments:
+        return JSONResponse({'error': 'Payment not found'}, status_code=404)
+
+    payment = payments[payment_id]
+
+    if payment.get('user_token') != token:
+        return JSONResponse({'error': 'Access denied'}, status_code=403)
+
+    return JSONResponse(payment)
+
+
+def _heavy_records(size: int) -> list:
+    return [{
+        'id': i,
+        'name': f'Record {i}',
+        'description': f'This is a description for record {i}' * 10,  # Make it longer
+        'timestamp': datetime.utcnow().isoformat(),
+        'random_data': ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=100))
+    } for i in range(size)]
+
+
+async def heavy_data_endpoint(request: Request):
+    """Endpoint that returns large amounts of data for testing"""
+    await simulate_processing_time()
+
+    # Generate large response
+    size = int(request.query_params.get('size', '1000'))  # Number of records
+    data = await asyncio.to_thread(_heavy_records, size)
+
+    return JSONResponse({
+        'records': data,
+        'total': len(data),
+        'generated_at': datetime.utcnow().isoformat()
+    })
+
+
+async def cpu_intensive_endpoint(request: Request):
+    """CPU intensive endpoint for stress testing"""
+    # Simulate CPU intensive work
+    iterations = int(request.query_params.get('iterations', '100000'))
+
+    start_time = time.time()
+    result = await asyncio.to_thread(_sum_of_squares, iterations)
+    processing_time = time.time() - start_time
+
+    return JSONResponse({
+        'result': result,
+        'iterations': iterations,
+        'processing_time_seconds': processing_time,
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+
+async def upload_file(request: Request):
+    """File upload simulation endpoint"""
+    # Simulate file processing time
+    await simulate_processing_time(2.0, 5.0)
+    simulate_memory_leak()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'File upload service unavailable'}, status_code=503)
+
+    token = _token(request)
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    # Simulate file upload processing
+    file_id = f"file-{rng.randint(100000, 999999)}"
+    file_size = rng.randint(1024, 10485760)  # 1KB to 10MB
+
+    upload_result = {
+        'file_id': file_id,
+        'filename': f'demo-file-{file_id}.pdf',
+        'size_bytes': file_size,
+        'content_type': 'application/pdf',
+        'upload_time': datetime.utcnow().isoformat(),
+        'status': 'uploaded',
+        'url': f'/api/v1/files/{file_id}',
+        'user': users[token]['username']
+    }
+
+    return JSONResponse(upload_result, status_code=201)
+
+
+async def handle_file(request: Request):
+    """File download/delete endpoint"""
+    await simulate_processing_time()
+
+    token = _token(request)
+    file_id = request.path_params['file_id']
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    if request.method == 'GET':
+        # Simulate file download
+        file_info = {
+            'file_id': file_id,
+            'filename': f'demo-file-{file_id}.pdf',
+            'size_bytes': rng.randint(1024, 10485760),
+            'content_type': 'application/pdf',
+            'created_at': datetime.utcnow().isoformat(),
+            'download_url': f'https://demo-cdn.example.com/files/{file_id}',
+            'expires_at': datetime.utcnow().isoformat()
+        }
+        return JSONResponse(file_info)
+
+    # Delete file
+    return JSONResponse({'message': f'File {file_id} deleted successfully'})
+
+
+async def generate_report(request: Request):
+    """Report generation endpoint - CPU intensive"""
+    # Simulate heavy report generation
+    iterations = int(request.query_params.get('complexity', '500000'))
+
+    start_time = time.time()
+    await asyncio.to_thread(_sum_of_squares, iterations, 50000)
+    processing_time = time.time() - start_time
+    simulate_memory_leak()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Report generation failed'}, status_code=500)
+
+    token = _token(request)
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    report_id = f"report-{rng.randint(100000, 999999)}"
+
+    report_data = {
+        'report_id': report_id,
+        'type': 'performance_analysis',
+        'status': 'completed',
+        'generated_by': users[token]['username'],
+        'processing_time_seconds': round(processing_time, 2),
+        'complexity_level': iterations,
+        'data_points': rng.randint(1000, 10000),
+        'file_size_mb': round(rng.uniform(1.0, 50.0), 2),
+        'download_url': f'/api/v1/reports/{report_id}/download',
+        'created_at': datetime.utcnow().isoformat(),
+        'expires_at': datetime.utcnow().isoformat()
+    }
+
+    return JSONResponse(report_data, status_code=201)
+
+
+async def clear_cache(request: Request):
+    """Cache clearing endpoint"""
+    await simulate_processing_time()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Cache service unavailable'}, status_code=503)
+
+    # Simulate cache clearing
+    cache_stats = {
+        'cache_cleared': True,
+        'items_removed': rng.randint(100, 10000),
+        'memory_freed_mb': round(rng.uniform(10.0, 500.0), 2),
+        'operation_time_ms': rng.randint(100, 2000),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+    return JSONResponse(cache_stats)
+
+
+async def batch_process(request: Request):
+    """Batch processing endpoint"""
+    data = await _json_body(request)
+    batch_size = data.get('batch_size', 100)
+
+    # Simulate batch processing time based on size, capped at 10 seconds
+    base = batch_size * 0.01
+    processing_time = await simulate_processing_time(min(base + 0.5, 10.0), min(base + 2.0, 10.0))
+
+    simulate_memory_leak()
+
+    if should_return_error(request):
+        return JSONResponse({'error': 'Batch processing failed'}, status_code=500)
+
+    token = _token(request)
+
+    if token not in users:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+
+    batch_id = f"batch-{rng.randint(100000, 999999)}"
+
+    # Simulate some failures in batch
+    success_count = int(batch_size * rng.uniform(0.85, 0.98))
+    failed_count = batch_size - success_count
+
+    batch_result = {
+        'batch_id': batch_id,
+        'total_items': batch_size,
+        'successful': success_count,
+        'failed': failed_count,
+        'success_rate': round((success_count / batch_size) * 100, 2) if batch_size else 0.0,
+        'processing_time_seconds': round(processing_time, 2),
+        'started_by': users[token]['username'],
+        'started_at': datetime.utcnow().isoformat(),
+        'completed_at': datetime.utcnow().isoformat(),
+        'status': 'completed'
+    }
+
+    return JSONResponse(batch_result, status_code=201)
+
+
+async def get_stats(request: Request):
+    """Get API statistics"""
+    return JSONResponse({
+        'active_users': len(users),
+        'total_orders': len(orders),
+        'total_payments': len(payments),
+        'memory_usage_kb': len(memory_hog) if fault_profile['memory_leak_simulation'] else 0,
+        'configuration': fault_profile,
+        'endpoints': {
+            'authentication': ['/auth/login', '/auth/logout'],
+            'users': ['/api/v1/users', '/api/v1/users/{id}'],
+            'orders': ['/api/v1/orders', '/api/v1/orders/{id}'],
+            'payments': ['/api/v1/payments', '/payment/process'],
+            'products': ['/api/v1/products', '/api/v1/inventory'],
+            'analytics': ['/api/v1/analytics/dashboard'],
+            'search': ['/api/v1/search'],
+            'files': ['/api/v1/files/upload', '/api/v1/files/{id}'],
+            'reports': ['/api/v1/reports/generate'],
+            'utilities': ['/api/v1/cache/clear', '/api/v1/batch/process'],
+            'testing': ['/data/heavy', '/cpu/intensive', '/health', '/control']
+        },
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+
+async def not_found(request: Request, exc):
+    return JSONResponse({'error': 'Endpoint not found'}, status_code=404)
+
+
+async def internal_error(request: Request, exc):
+    return JSONResponse({'error': 'Internal server error'}, status_code=500)
+
+
+# Specific paths come before the parameterised paths that would also match them
+routes = [
+    Route('/health', health_check, methods=['GET']),
+    Route('/control', control, methods=['GET', 'POST']),
+    Route('/auth/login', login, methods=['POST']),
+    Route('/api/v1/users/login', login, methods=['POST']),
+    Route('/auth/logout', logout, methods=['POST']),
+    Route('/orders', handle_orders, methods=['GET', 'POST']),
+    Route('/api/v1/orders', handle_orders, methods=['GET', 'POST']),
+    Route('/api/v1/cart/items', handle_orders, methods=['GET', 'POST']),
+    Route('/api/v1/cart', handle_orders, methods=['GET']),
+    Route('/orders/{order_id}', handle_single_order, methods=['GET', 'PUT', 'DELETE']),
+    Route('/api/v1/orders/{order_id}', handle_single_order, methods=['GET', 'PUT', 'DELETE']),
+    Route('/api/v1/products/search', handle_single_order, methods=['GET']),
+    Route('/api/v1/products/{order_id}', handle_single_order, methods=['GET']),
+    Route('/payment/process', process_payment, methods=['POST']),
+    Route('/api/v1/payments', process_payment, methods=['POST']),
+    Route('/api/v1/users', handle_users, methods=['GET', 'POST']),
+    Route('/api/v1/users/{user_id}', handle_single_user, methods=['GET', 'PUT', 'DELETE']),
+    Route('/api/v1/inventory', get_inventory, methods=['GET']),
+    Route('/api/v1/products', get_inventory, methods=['GET']),
+    Route('/api/v1/analytics/dashboard', analytics_dashboard, methods=['GET']),
+    Route('/api/v1/notifications', handle_notifications, methods=['GET', 'POST']),
+    Route('/api/v1/search', search_endpoint, methods=['GET']),
+    Route('/payment/{payment_id}', get_payment, methods=['GET']),
+    Route('/data/heavy', heavy_data_endpoint, methods=['GET']),
+    Route('/cpu/intensive', cpu_intensive_endpoint, methods=['GET']),
+    Route('/api/v1/files/upload', upload_file, methods=['POST']),
+    Route('/api/v1/files/{file_id}', handle_file, methods=['GET', 'DELETE']),
+    Route('/api/v1/reports/generate', generate_report, methods=['POST']),
+    Route('/api/v1/cache/clear', clear_cache, methods=['POST']),
+    Route('/api/v1/batch/process', batch_process, methods=['POST']),
+    Route('/stats', get_stats, methods=['GET']),
+]
+
+app = Starlette(routes=routes, exception_handlers={404: not_found, 500: internal_error})
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 8080))
+    # Allow host binding to be configured - defaults to 0.0.0.0 for containerized deployment
+    host = os.environ.get('HOST', '0.0.0.0')
+
+    logger.info(f"Starting Fake API Service (ASGI) on {host}:{port}")
+    logger.info(f"Fault profile: {fault_profile}")
+
+    uvicorn.run(app, host=host, port=port, access_log=False)
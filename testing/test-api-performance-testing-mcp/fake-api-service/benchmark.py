@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Fake API Benchmark - Find the highest request rate each fake API implementation sustains.
+
+Starts the Flask app under gunicorn as the Dockerfile runs it, and the ASGI
+app under uvicorn, both with the same fixed simulated delay and no injected
+errors. Each is driven by an open-loop load that sends requests on a fixed
+schedule at doubling rates, then bisects between the last rate it sustained
+and the first it did not. A rate is sustained when at least 99% of requests
+succeed and the 95th percentile latency stays within twice the simulated
+delay (or the delay plus 100 ms, whichever is larger). The load generator
+shares the machine with the server, so the ASGI figure is a lower bound on
+hosts with more cores.
+
+Needs aiohttp, gunicorn and uvicorn.
+
+Usage:
+    python benchmark.py [--delay 0.1] [--step-seconds 5] [--max-rps 5000] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import aiohttp
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENDPOINT = '/api/v1/users'
+MIN_SUCCESS_RATIO = 0.99
+# Rates within this fraction of each other end the bisection
+BISECT_RESOLUTION = 0.1
+
+
+def start_server(kind: str, port: int, delay: float, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, RESPONSE_DELAY_MIN=str(delay), RESPONSE_DELAY_MAX=str(delay), ERROR_RATE='0',
+               LATENCY_DISTRIBUTION='fixed', RANDOM_SEED='1')
+    if kind == 'flask':
+        command = ['gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--timeout', '30',
+                   '--log-level', 'warning', 'app:app']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'app_async:app', '--host', '127.0.0.1', '--port', str(port),
+                   '--no-access-log', '--log-level', 'warning']
+    server = subprocess.Popen(command, cwd=SERVICE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1).read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"{kind} server did not become healthy on port {port}")
+
+
+async def run_step(session: aiohttp.ClientSession, url: str, rps: float, seconds: float, timeout: float) -> dict:
+    """Send requests on a fixed schedule for the given time and wait for them all"""
+    latencies = []
+    lag = 0.0
+
+    async def one_request():
+        started = time.perf_counter()
+        try:
+            async with session.post(url, json={'username': 'bench'},
+                                    timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                await response.read()
+                if response.status >= 400:
+                    return
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return
+        latencies.append(time.perf_counter() - started)
+
+    tasks = []
+    total = int(rps * seconds)
+    start = time.perf_counter()
+    for i in range(total):
+        due = start + i / rps
+        wait = due - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        else:
+            lag = max(lag, -wait)
+        tasks.append(asyncio.ensure_future(one_request()))
+    await asyncio.gather(*tasks)
+
+    latencies.sort()
+    return {
+        'sent': total,
+        'success_ratio': len(latencies) / total if total else 0.0,
+        'p95': latencies[int(0.95 * (len(latencies) - 1))] if latencies else float('inf'),
+        'schedule_lag': lag,
+    }
+
+
+def sustained(step: dict, delay: float) -> bool:
+    return step['success_ratio'] >= MIN_SUCCESS_RATIO and step['p95'] <= max(2 * delay, delay + 0.1)
+
+
+async def max_sustainable_rps(kind: str, url: str, args) -> float:
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        def report(rps, step):
+            ok = sustained(step, args.delay)
+            print(f"  {kind:<6} {rps:7.0f} rps  success {step['success_ratio']:6.1%}  p95 {step['p95'] * 1000:7.0f} ms"
+                  f"  schedule lag {step['schedule_lag'] * 1000:5.0f} ms  {'ok' if ok else 'over'}")
+            return ok
+
+        good, bad = 0.0, None
+        rps = args.start_rps
+        while rps <= args.max_rps:
+            if report(rps, await run_step(session, url, rps, args.step_seconds, args.timeout)):
+                good, rps = rps, rps * 2
+            else:
+                bad = rps
+                break
+            # Let queued work drain before the next step
+            await asyncio.sleep(1)
+
+        while bad is not None and good and (bad - good) / good > BISECT_RESOLUTION:
+            await asyncio.sleep(1)
+            rps = (good + bad) / 2
+            if report(rps, await run_step(session, url, rps, args.step_seconds, args.timeout)):
+                good = rps
+            else:
+                bad = rps
+        return good
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--delay", type=float, default=0.1, help="Simulated delay per request in seconds")
+    parser.add_argument("--step-seconds", type=float, default=5.0)
+    parser.add_argument("--start-rps", type=float, default=10.0)
+    parser.add_argument("--max-rps", type=float, default=5000.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers for the Flask app, as in the Dockerfile")
+    args = parser.parse_args()
+
+    results = {}
+    for kind, port in (('flask', 18081), ('asgi', 18082)):
+        server = start_server(kind, port, args.delay, args.workers)
+        try:
+            results[kind] = asyncio.run(max_sustainable_rps(kind, f'http://127.0.0.1:{port}{ENDPOINT}', args))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"\nPOST {ENDPOINT} with a fixed {args.delay * 1000:.0f} ms delay:")
+    for label, kind in ((f"Flask, gunicorn {args.workers} sync workers", 'flask'), ("ASGI, uvicorn 1 process", 'asgi')):
+        print(f"  {label + ':':<34} {results[kind]:.0f} rps")
+
+
+if __name__ == "__main__":
+    main()
@@ -511,6 +511,17 @@ class PerformanceTestingStack(Stack):
                                 f"arn:aws:logs:{self.region}:{self.account}:log-group:/aws/lambda/performance-testing-mcp-server:*"
                             ]
                         ),
+                        # Read JMeter task logs to report errors of completed tests
+                        iam.PolicyStatement(
+                            effect=iam.Effect.ALLOW,
+                            actions=[
+                                "logs:GetLogEvents",
+                                "logs:FilterLogEvents"
+                            ],
+                            resources=[
+                                f"arn:aws:logs:{self.region}:{self.account}:log-group:/ecs/jmeter-runner:*"
+                            ]
+                        ),
                         # Bedrock access for AI (all regions for model availability)
                         iam.PolicyStatement(
                             effect=iam.Effect.ALLOW,
@@ -601,7 +612,9 @@ class PerformanceTestingStack(Stack):
                 "AWS_ACCOUNT_ID": self.account,
                 "ECS_EXECUTION_ROLE_ARN": self.ecs_task_execution_role.role_arn,
                 "ECS_TASK_ROLE_ARN": self.ecs_task_role.role_arn,
-                "INTERNAL_ALB_DNS": self.internal_load_balancer.load_balancer_dns_name
+                "INTERNAL_ALB_DNS": self.internal_load_balancer.load_balancer_dns_name,
+                "JMETER_LOG_GROUP": self.jmeter_log_group.log_group_name,
+                "JMETER_LOG_STREAM_PREFIX": "jmeter/jmeter-runner"
             }
         )
         
@@ -628,6 +641,7 @@ class PerformanceTestingStack(Stack):
                         "Resource::arn:aws:bedrock:*::foundation-model/*",
                         f"Resource::arn:aws:ecs:{self.region}:{self.account}:task/*",
                         f"Resource::arn:aws:logs:{self.region}:{self.account}:log-group:/aws/lambda/performance-testing-mcp-server:*",
+                        f"Resource::arn:aws:logs:{self.region}:{self.account}:log-group:/ecs/jmeter-runner:*",
                         f"Resource::arn:aws:ecs:{self.region}:{self.account}:task-definition/PerformanceTestingStackJMeterTaskDefinitionF58D664C:*",
                         f"Resource::arn:aws:bedrock:*:{self.account}:inference-profile/*",
                         "Resource::*"
@@ -168,6 +168,16 @@ class StreamlitStack(Stack):
                                 f"arn:aws:s3:::performance-testing-{self.account}-{self.region}/*"
                             ]
                         ),
+                        # S3 write permission limited to the cached JTL summaries the dashboard stores
+                        iam.PolicyStatement(
+                            effect=iam.Effect.ALLOW,
+                            actions=[
+                                "s3:PutObject"
+                            ],
+                            resources=[
+                                f"arn:aws:s3:::performance-testing-{self.account}-{self.region}/perf-pipeline/*/results/*.summary.json"
+                            ]
+                        ),
                         # Lambda permissions for invoking MCP function
                         iam.PolicyStatement(
                             effect=iam.Effect.ALLOW,
@@ -193,6 +203,11 @@ class StreamlitStack(Stack):
                     "reason": "S3 bucket wildcard (/*) is required to access all objects within the performance testing artifacts bucket. This follows AWS best practice for S3 object access patterns.",
                     "appliesTo": [f"Resource::arn:aws:s3:::performance-testing-{self.account}-{self.region}/*"]
                 },
+                {
+                    "id": "AwsSolutions-IAM5",
+                    "reason": "The dashboard writes a cached summary next to each JTL result file. Session IDs and result file names are not known at deployment time, so the write is limited by key pattern to summary files under results/.",
+                    "appliesTo": [f"Resource::arn:aws:s3:::performance-testing-{self.account}-{self.region}/perf-pipeline/*/results/*.summary.json"]
+                },
                 {
                     "id": "AwsSolutions-IAM5", 
                     "reason": "Lambda function wildcard (*) is required because the Streamlit app needs to invoke dynamically created MCP Lambda functions. Function names are not known at deployment time and follow the pattern of MCP server implementations.",
@@ -138,6 +138,65 @@ run_java_test() {
     fi
 }
 
+# Live result segments: every LIVE_SEGMENT_SECONDS, upload the complete rows
+# each JTL file gained since the last upload, so the MCP server can follow
+# the run (get_live_metrics) and abort it early. 0 disables streaming.
+LIVE_SEGMENT_SECONDS="${LIVE_SEGMENT_SECONDS:-10}"
+if ! [[ "$LIVE_SEGMENT_SECONDS" =~ ^[0-9]+$ ]]; then
+    echo "WARNING: LIVE_SEGMENT_SECONDS must be a whole number of seconds, got '${LIVE_SEGMENT_SECONDS}'; using 10"
+    LIVE_SEGMENT_SECONDS=10
+fi
+mkdir -p /jmeter/live
+
+upload_live_segments() {
+    local jtl
+    for jtl in /jmeter/results/*.jtl /jmeter/plans/*.jtl; do
+        [ -f "$jtl" ] || continue
+        local base_name=$(basename "$jtl" .jtl)
+        base_name="${base_name%_results}"
+        local state="/jmeter/live/${base_name}"
+        local offset=$(cat "${state}.offset" 2>/dev/null || echo 0)
+        local sequence=$(cat "${state}.seq" 2>/dev/null || echo 0)
+        local size=$(stat -c %s "$jtl")
+        [ "$size" -gt "$offset" ] || continue
+
+        # Only upload whole rows; a partly written last row waits for the next round
+        local chunk="${state}.chunk"
+        tail -c +$((offset + 1)) "$jtl" | head -c $((size - offset)) > "$chunk"
+        local length=$(stat -c %s "$chunk")
+        if [ -n "$(tail -c 1 "$chunk")" ]; then
+            length=$((length - $(tail -n 1 "$chunk" | wc -c)))
+        fi
+        [ "$length" -gt 0 ] || continue
+
+        # Every segment starts with the header line
+        local segment="${state}.segment"
+        if [ "$offset" -gt 0 ]; then
+            head -n 1 "$jtl" > "$segment"
+        else
+            : > "$segment"
+        fi
+        head -c "$length" "$chunk" >> "$segment"
+
+        if aws s3 cp "$segment" "s3://${S3_BUCKET}/perf-pipeline/${SESSION_ID}/live/${base_name}/segment-$(printf '%06d' "$sequence").jtl" --only-show-errors; then
+            echo $((offset + length)) > "${state}.offset"
+            echo $((sequence + 1)) > "${state}.seq"
+        fi
+    done
+}
+
+stream_live_segments() {
+    while true; do
+        sleep "$LIVE_SEGMENT_SECONDS"
+        upload_live_segments || true
+    done
+}
+
+if [ "$LIVE_SEGMENT_SECONDS" -gt 0 ]; then
+    stream_live_segments &
+    LIVE_STREAM_PID=$!
+fi
+
 # Run specific test file if PLAN_NAME is specified, otherwise run all
 cd /jmeter/plans
 
@@ -177,6 +236,13 @@ else
     done
 fi
 
+# Upload the rows written since the last live segment
+if [ -n "$LIVE_STREAM_PID" ]; then
+    kill "$LIVE_STREAM_PID" 2>/dev/null || true
+    wait "$LIVE_STREAM_PID" 2>/dev/null || true
+    upload_live_segments || true
+fi
+
 # Generate summary report
 echo "Generating test summary..."
 cat > /jmeter/results/test_summary.json << EOF
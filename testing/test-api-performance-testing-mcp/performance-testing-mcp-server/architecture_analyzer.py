@@ -10,6 +10,7 @@ import uuid
 from typing import Dict, Any, List
 import boto3
 from botocore.exceptions import ClientError
+from rate_limiter import bedrock_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -143,7 +144,9 @@ Please provide a comprehensive analysis focusing on performance testing requirem
         body = json.dumps(prompt_config)
         model_id = os.environ.get("BEDROCK_MODEL_ID", "us.anthropic.claude-3-7-sonnet-20250219-v1:0")
         
-        response = bedrock_client.invoke_model(
+        response = bedrock_rate_limiter.invoke_model(
+            bedrock_client,
+            priority='interactive',
             body=body,
             modelId=model_id,
             accept="application/json",
@@ -1,21 +1,159 @@
 """
 Code Validator Module
 Validates and corrects generated JMeter test plans by compiling them
+
+Each plan is scanned once, and the fixers and the syntax checks both
+work from that scan; fixes become edits applied in one rebuild of the
+source instead of one regex substitution pass each. Outcomes are cached
+by a hash of the file name and content, so plans unchanged since they
+were last validated are not validated again, and plans large enough to
+be worth it are validated in a process pool.
 """
 
+import hashlib
 import json
 import logging
 import os
 import re
-from typing import Dict, Any, List, Tuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Plans whose validation outcomes are kept between calls
+VALIDATION_CACHE_ENTRIES = 1024
+# Plans at least this large are validated in worker processes when more than one needs it;
+# below this, starting the workers and copying plans to them costs more than it saves
+PARALLEL_VALIDATION_MIN_BYTES = 1024 * 1024
+
+REQUIRED_IMPORTS = (
+    'org.apache.jmeter.testelement.TestPlan',
+    'org.apache.jmeter.threads.ThreadGroup',
+    'org.apache.jmeter.control.LoopController',
+    'org.apache.jmeter.protocol.http.sampler.HTTPSamplerProxy',
+    'org.apache.jmeter.reporters.ResultCollector',
+    'org.apache.jmeter.util.JMeterUtils',
+    'org.apache.jmeter.engine.StandardJMeterEngine',
+    'org.apache.jorphan.collections.ListedHashTree'
+)
+# Imports a plan cannot run without; the others are added by the fixers but not required
+VALIDATED_IMPORTS = (
+    'org.apache.jmeter.testelement.TestPlan',
+    'org.apache.jmeter.threads.ThreadGroup',
+    'org.apache.jmeter.util.JMeterUtils',
+    'org.apache.jmeter.engine.StandardJMeterEngine'
+)
+# JMeter API fixes, reported by the patterns the fixers originally matched with
+API_FIX_DURATION = r'\.setDuration\((\d+)\);'
+API_FIX_DELAY = r'\.setDelay\((\d+)\);'
+API_FIX_SHARE_MODE = r'CSVDataSet\.SHARE_MODE_ALL'
+API_FIX_THREAD_GROUP_ALLOWED_DURATION = r'threadGroup\.setAllowedDuration\((\d+)\);'
+API_FIX_THREAD_GROUP_SCHEDULER = r'threadGroup\.setDuration\((\d+)\);'
+API_FIX_LOOPS = r'loopController\.setLoops\(-1\);'
+API_FIXES = (API_FIX_DURATION, API_FIX_DELAY, API_FIX_SHARE_MODE, API_FIX_THREAD_GROUP_ALLOWED_DURATION,
+             API_FIX_THREAD_GROUP_SCHEDULER, API_FIX_LOOPS)
+INFINITE_LOOPS_COMMENT = ' // Infinite loops with scheduler'
+
+# Patterns start with a literal so the regex engine can skip ahead to candidates;
+# word boundaries before that literal are checked by _JavaScan.
+_IMPORT_PATTERN = re.compile(r'import\s+(?:static\s+)?([\w$.*]+)\s*;')
+_MAIN_PATTERN = re.compile(r'public\s+static\s+void\s+main\s*\(\s*String\s*\[\s*\]\s*[A-Za-z_$][\w$]*\s*\)')
+_CLASS_PATTERN = re.compile(
+    r'class\s+([A-Za-z_$][\w$]*)\s*(?:<[^>{;]*>\s*)?(?:(?:extends|implements)\s+[\w$.<>,\s]+?)?\{'
+)
+_CLASS_MODIFIERS = frozenset(('public', 'protected', 'private', 'static', 'final', 'abstract', 'strictfp'))
+_CALL_PATTERN = re.compile(r'\.\s*(set(?:Duration|AllowedDuration|Delay|Loops))\s*\(\s*(-?\d+)\s*\)\s*;')
+_SHARE_MODE_PATTERN = re.compile(r'CSVDataSet\s*\.\s*SHARE_MODE_ALL\b')
+# Comments and string literals, only masked when raw bracket counts disagree
+_LITERAL_PATTERN = re.compile(r'''
+    //[^\n]*
+  | /\*.*?(?:\*/|\Z)
+  | """.*?(?:"""|\Z)
+  | "(?:[^"\\\n]|\\.)*"?
+  | '(?:[^'\\\n]|\\.)*'?
+''', re.S | re.X)
+_SCHEDULER_CALL = 'threadGroup.setScheduler(true);'
+
+_validation_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_validation_cache_lock = threading.Lock()
+
+class _JavaScan:
+    """
+    Facts about a Java source, gathered once and shared by the fixers and the checks
+
+    Each fact is one search of the source. Brackets are counted raw, and
+    only when the counts disagree are they counted again with comments and
+    string literals left out, so a brace in a string is not reported as
+    unmatched.
+    """
+
+    __slots__ = ('braces', 'parens', 'classes', 'has_main', 'imports', 'calls', 'share_modes')
+
+    def __init__(self, code: str):
+        self.braces = (code.count('{'), code.count('}'))
+        self.parens = (code.count('('), code.count(')'))
+        if self.braces[0] != self.braces[1] or self.parens[0] != self.parens[1]:
+            masked = _LITERAL_PATTERN.sub(lambda match: ' ' * len(match.group()), code)
+            self.braces = (masked.count('{'), masked.count('}'))
+            self.parens = (masked.count('('), masked.count(')'))
+
+        self.has_main = any(_is_word_start(code, match.start()) for match in _MAIN_PATTERN.finditer(code))
+
+        # (declaration start, name start, name end, name, public) of each class
+        self.classes = []
+        for match in _CLASS_PATTERN.finditer(code):
+            if not _is_word_start(code, match.start()):
+                continue
+            start, modifiers = match.start(), set()
+            word_start, word = _word_before(code, start)
+            while word in _CLASS_MODIFIERS:
+                start = word_start
+                modifiers.add(word)
+                word_start, word = _word_before(code, start)
+            self.classes.append((start, match.start(1), match.end(1), match.group(1), 'public' in modifiers))
+
+        # Imports come before the first class, so only that part is searched
+        header_end = self.classes[0][0] if self.classes else len(code)
+        self.imports = {match.group(1) for match in _IMPORT_PATTERN.finditer(code, 0, header_end)
+                        if _is_word_start(code, match.start())}
+
+        # (receiver, method, argument, statement start, statement end, method span, argument span)
+        self.calls = []
+        for match in _CALL_PATTERN.finditer(code):
+            receiver_start, receiver = _word_before(code, match.start())
+            if receiver:
+                self.calls.append((receiver, match.group(1), match.group(2), receiver_start,
+                                   match.end(), match.span(1), match.span(2)))
+
+        self.share_modes = []
+        if 'SHARE_MODE_ALL' in code:
+            self.share_modes = [match.span() for match in _SHARE_MODE_PATTERN.finditer(code)
+                                if _is_word_start(code, match.start())]
+
+def _word_before(code: str, position: int) -> Tuple[int, str]:
+    """Start and text of the name ending just before position, whitespace between allowed"""
+    end = position
+    while end > 0 and code[end - 1].isspace():
+        end -= 1
+    start = end
+    while start > 0 and (code[start - 1].isalnum() or code[start - 1] in '_$'):
+        start -= 1
+    return start, code[start:end]
+
+def _is_word_start(code: str, position: int) -> bool:
+    # Not preceded by part of a name, nor by a dot as in Foo.class
+    return position == 0 or not (code[position - 1].isalnum() or code[position - 1] in '_$.')
+
 def validate_and_fix_test_plans(test_plans: Dict[str, str]) -> Dict[str, Any]:
     """
     Validate and fix generated test plans using pattern-based validation
     Focuses on the top 4 common AI errors without full compilation
     
+    Plans whose name and content were validated before reuse that outcome.
+    
     Args:
         test_plans: Dictionary of filename -> code content
     
@@ -30,54 +168,57 @@ def validate_and_fix_test_plans(test_plans: Dict[str, str]) -> Dict[str, Any]:
             'total_plans': len(test_plans),
             'validated_plans': {},
             'validation_errors': [],
-            'fixes_applied': []
+            'fixes_applied': [],
+            'cached_plans': 0
         }
         
-        for filename, code_content in test_plans.items():
-            logger.info(f"Validating {filename}")
-            
-            # Fix common AI issues
-            fixed_code, fixes = _fix_common_issues(filename, code_content)
-            
-            # Validate the fixed code
-            validation_issues = _validate_java_syntax(filename, fixed_code)
-            
-            if not validation_issues:
-                validation_results['validated_plans'][filename] = fixed_code
-                if fixes:
-                    validation_results['fixes_applied'].extend([f"{filename}: {fix}" for fix in fixes])
-                logger.info(f"✅ {filename} validated successfully")
-            else:
-                # Try additional fixes for validation issues
-                auto_fixed_code, auto_fixes = _auto_fix_validation_issues(
-                    filename, fixed_code, validation_issues
-                )
-                
-                if auto_fixed_code:
-                    # Re-validate after auto-fix
-                    retry_issues = _validate_java_syntax(filename, auto_fixed_code)
-                    if not retry_issues:
-                        validation_results['validated_plans'][filename] = auto_fixed_code
-                        validation_results['fixes_applied'].extend([f"{filename}: {fix}" for fix in fixes + auto_fixes])
-                        logger.info(f"✅ {filename} auto-fixed and validated")
-                    else:
-                        validation_results['validation_errors'].append({
-                            'filename': filename,
-                            'issues': retry_issues
-                        })
-                        logger.error(f"❌ {filename} failed validation after auto-fix")
+        outcomes = {}
+        misses = {}
+        with _validation_cache_lock:
+            for filename, code_content in test_plans.items():
+                cache_key = _validation_cache_key(filename, code_content)
+                if cache_key in _validation_cache:
+                    _validation_cache.move_to_end(cache_key)
+                    outcomes[filename] = _validation_cache[cache_key]
                 else:
-                    validation_results['validation_errors'].append({
-                        'filename': filename,
-                        'issues': validation_issues
-                    })
-                    logger.error(f"❌ {filename} failed validation")
+                    misses[filename] = cache_key
+        validation_results['cached_plans'] = len(outcomes)
+        
+        outcomes.update(_validate_plans({filename: test_plans[filename] for filename in misses}))
+        
+        with _validation_cache_lock:
+            for filename, cache_key in misses.items():
+                outcome = outcomes[filename]
+                _validation_cache[cache_key] = outcome
+                # Validated code is a fixed point of the fixers, so uploading it back is not validated again
+                if outcome['code'] is not None and outcome['code'] != test_plans[filename]:
+                    _validation_cache[_validation_cache_key(filename, outcome['code'])] = {
+                        'code': outcome['code'], 'fixes': [], 'issues': [], 'auto_fixed': False
+                    }
+            while len(_validation_cache) > VALIDATION_CACHE_ENTRIES:
+                _validation_cache.popitem(last=False)
+        
+        for filename in test_plans:
+            outcome = outcomes[filename]
+            if outcome['code'] is not None:
+                validation_results['validated_plans'][filename] = outcome['code']
+                validation_results['fixes_applied'].extend([f"{filename}: {fix}" for fix in outcome['fixes']])
+                if filename in misses:
+                    logger.info(f"✅ {filename} {'auto-fixed and validated' if outcome['auto_fixed'] else 'validated successfully'}")
+            else:
+                validation_results['validation_errors'].append({
+                    'filename': filename,
+                    'issues': list(outcome['issues'])
+                })
+                if filename in misses:
+                    logger.error(f"❌ {filename} failed validation{' after auto-fix' if outcome['auto_fixed'] else ''}")
         
         # Update status based on results
         if validation_results['validation_errors']:
             validation_results['status'] = 'partial_success' if validation_results['validated_plans'] else 'failed'
         
-        logger.info(f"Validation complete: {len(validation_results['validated_plans'])}/{len(test_plans)} plans validated")
+        logger.info(f"Validation complete: {len(validation_results['validated_plans'])}/{len(test_plans)} plans validated"
+                    f" ({validation_results['cached_plans']} unchanged since last validated)")
         return validation_results
         
     except Exception as e:
@@ -91,136 +232,202 @@ def validate_and_fix_test_plans(test_plans: Dict[str, str]) -> Dict[str, Any]:
             'fixes_applied': []
         }
 
-def _fix_common_issues(filename: str, code_content: str) -> Tuple[str, List[str]]:
+def _validation_cache_key(filename: str, code_content: str) -> str:
+    # The file name is part of the key because the class name is fixed to match it
+    return hashlib.sha256(f"{filename}\0{code_content}".encode('utf-8')).hexdigest()
+
+def _validate_plans(test_plans: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Validate plans, the large ones in worker processes when there are several"""
+    large = [filename for filename, code_content in test_plans.items()
+             if len(code_content) >= PARALLEL_VALIDATION_MIN_BYTES]
+    workers = min(len(large), os.cpu_count() or 1)
+    outcomes = {}
+    
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {filename: executor.submit(_validate_plan, filename, test_plans[filename])
+                           for filename in large}
+                outcomes = {filename: future.result() for filename, future in futures.items()}
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            # Environments without shared memory for process pools, such as Lambda
+            logger.warning(f"Validating in process, worker processes unavailable: {str(e)}")
+            outcomes = {}
+    
+    for filename, code_content in test_plans.items():
+        if filename not in outcomes:
+            logger.info(f"Validating {filename}")
+            outcomes[filename] = _validate_plan(filename, code_content)
+    return outcomes
+
+def _validate_plan(filename: str, code_content: str) -> Dict[str, Any]:
+    """
+    Fix, validate and if needed auto-fix one plan
+    
+    Returns:
+        The validated code (None when it fails), fixes applied, remaining issues,
+        and whether the auto-fixes were needed
+    """
+    # Fix common AI issues
+    scan = _JavaScan(code_content)
+    fixed_code, fixes = _fix_common_issues(filename, code_content, scan)
+    if fixed_code != code_content:
+        scan = _JavaScan(fixed_code)
+    
+    # Validate the fixed code
+    validation_issues = _validate_java_syntax(filename, fixed_code, scan)
+    if not validation_issues:
+        return {'code': fixed_code, 'fixes': fixes, 'issues': [], 'auto_fixed': False}
+    
+    # Try additional fixes for validation issues
+    auto_fixed_code, auto_fixes = _auto_fix_validation_issues(filename, fixed_code, validation_issues, scan)
+    if not auto_fixed_code:
+        return {'code': None, 'fixes': [], 'issues': validation_issues, 'auto_fixed': False}
+    
+    # Re-validate after auto-fix
+    retry_issues = _validate_java_syntax(filename, auto_fixed_code)
+    if retry_issues:
+        return {'code': None, 'fixes': [], 'issues': retry_issues, 'auto_fixed': True}
+    return {'code': auto_fixed_code, 'fixes': fixes + auto_fixes, 'issues': [], 'auto_fixed': True}
+
+def _apply_edits(code_content: str, edits: List[Tuple[int, int, str]]) -> str:
+    """Replace (start, end, text) spans, which must not overlap, in one rebuild of the source"""
+    parts = []
+    position = 0
+    for start, end, text in sorted(edits, key=lambda edit: (edit[0], edit[1])):
+        parts.append(code_content[position:start])
+        parts.append(text)
+        position = end
+    parts.append(code_content[position:])
+    return ''.join(parts)
+
+def _fix_common_issues(filename: str, code_content: str, scan: Optional[_JavaScan] = None) -> Tuple[str, List[str]]:
     """Fix common issues in generated code"""
+    if scan is None:
+        scan = _JavaScan(code_content)
     fixes_applied = []
-    fixed_code = code_content
+    edits = []
     
     # Extract expected class name from filename
     expected_class_name = filename.replace('.java', '').replace('-', '').replace('_', '')
     
-    # Fix 1: Ensure class name matches filename
-    class_pattern = r'class\s+(\w+)\s*\{'
-    class_match = re.search(class_pattern, fixed_code)
-    
-    if class_match:
-        current_class_name = class_match.group(1)
+    # Fix 1: Ensure the top-level class name matches filename
+    if scan.classes:
+        _, name_start, name_end, current_class_name, _ = scan.classes[0]
         if current_class_name.lower() != expected_class_name.lower():
-            fixed_code = re.sub(
-                class_pattern, 
-                f'class {expected_class_name} {{', 
-                fixed_code
-            )
+            edits.append((name_start, name_end, expected_class_name))
             fixes_applied.append(f"Fixed class name: {current_class_name} -> {expected_class_name}")
     
-    # Fix 2: Add missing imports
-    required_imports = [
-        'import org.apache.jmeter.testelement.TestPlan;',
-        'import org.apache.jmeter.threads.ThreadGroup;',
-        'import org.apache.jmeter.control.LoopController;',
-        'import org.apache.jmeter.protocol.http.sampler.HTTPSamplerProxy;',
-        'import org.apache.jmeter.reporters.ResultCollector;',
-        'import org.apache.jmeter.util.JMeterUtils;',
-        'import org.apache.jmeter.engine.StandardJMeterEngine;',
-        'import org.apache.jorphan.collections.ListedHashTree;'
-    ]
-    
-    for import_stmt in required_imports:
-        if import_stmt not in fixed_code:
-            # Add import at the beginning
-            fixed_code = import_stmt + '\n' + fixed_code
-            fixes_applied.append(f"Added missing import: {import_stmt}")
+    # Fix 2: Add missing imports, each placed before those added after it
+    missing_imports = [f"import {name};" for name in REQUIRED_IMPORTS if name not in scan.imports]
+    if missing_imports:
+        edits.append((0, 0, ''.join(f"{import_stmt}\n" for import_stmt in reversed(missing_imports))))
+        fixes_applied.extend(f"Added missing import: {import_stmt}" for import_stmt in missing_imports)
     
     # Fix 3: Ensure public class
-    if 'public class' not in fixed_code and 'class ' in fixed_code:
-        fixed_code = fixed_code.replace('class ', 'public class ')
+    if scan.classes and not any(public for *_, public in scan.classes):
+        edits.append((scan.classes[0][0], scan.classes[0][0], 'public '))
         fixes_applied.append("Made class public")
     
     # Fix 4: Fix common JMeter API issues
-    api_fixes = [
-        # Fix DurationAssertion API
-        (r'\.setDuration\((\d+)\);', r'.setAllowedDuration(\1);'),
-        # Fix ConstantTimer API - convert int to string
-        (r'\.setDelay\((\d+)\);', r'.setDelay("\1");'),
+    api_fixes = set()
+    for start, end in scan.share_modes:
         # Fix CSVDataSet share mode
-        (r'CSVDataSet\.SHARE_MODE_ALL', r'"shareMode.all"'),
-        # Fix ThreadGroup setAllowedDuration -> setDuration
-        (r'threadGroup\.setAllowedDuration\((\d+)\);', r'threadGroup.setDuration(\1);'),
-        # Fix ThreadGroup duration (ensure scheduler is set)
-        (r'threadGroup\.setDuration\((\d+)\);', r'threadGroup.setScheduler(true);\n        threadGroup.setDuration(\1);'),
-        # Fix LoopController
-        (r'loopController\.setLoops\(-1\);', r'loopController.setLoops(-1); // Infinite loops with scheduler'),
-    ]
+        edits.append((start, end, '"shareMode.all"'))
+        api_fixes.add(API_FIX_SHARE_MODE)
+    
+    for receiver, method, argument, call_start, call_end, method_span, argument_span in scan.calls:
+        if receiver == 'threadGroup' and method in ('setDuration', 'setAllowedDuration'):
+            # Fix ThreadGroup duration: setDuration, with the scheduler enabled before it
+            has_scheduler = code_content[max(0, call_start - 2 * len(_SCHEDULER_CALL)):call_start].rstrip() \
+                .endswith(_SCHEDULER_CALL)
+            if method == 'setAllowedDuration':
+                api_fixes.add(API_FIX_THREAD_GROUP_ALLOWED_DURATION)
+            elif has_scheduler:
+                continue
+            replacement = f"threadGroup.setDuration({argument});"
+            if not has_scheduler:
+                indent = code_content[code_content.rfind('\n', 0, call_start) + 1:call_start]
+                replacement = f"{_SCHEDULER_CALL}\n{'        ' if indent.strip() else indent}{replacement}"
+                api_fixes.add(API_FIX_THREAD_GROUP_SCHEDULER)
+            edits.append((call_start, call_end, replacement))
+        elif method == 'setDuration' and not argument.startswith('-'):
+            # Fix DurationAssertion API
+            edits.append((*method_span, 'setAllowedDuration'))
+            api_fixes.add(API_FIX_DURATION)
+        elif method == 'setDelay' and not argument.startswith('-'):
+            # Fix ConstantTimer API - convert int to string
+            edits.append((*argument_span, f'"{argument}"'))
+            api_fixes.add(API_FIX_DELAY)
+        elif receiver == 'loopController' and method == 'setLoops' and argument == '-1':
+            # Fix LoopController: note that loops are unbounded and the scheduler ends the test
+            line_end = code_content.find('\n', call_end)
+            if INFINITE_LOOPS_COMMENT.strip() not in code_content[call_end:line_end if line_end >= 0 else None]:
+                edits.append((call_end, call_end, INFINITE_LOOPS_COMMENT))
+                api_fixes.add(API_FIX_LOOPS)
     
-    for pattern, replacement in api_fixes:
-        if re.search(pattern, fixed_code):
-            fixed_code = re.sub(pattern, replacement, fixed_code)
-            fixes_applied.append(f"Fixed JMeter API usage: {pattern}")
+    fixes_applied.extend(f"Fixed JMeter API usage: {pattern}" for pattern in API_FIXES if pattern in api_fixes)
     
-    return fixed_code, fixes_applied
+    return _apply_edits(code_content, edits), fixes_applied
 
-def _validate_java_syntax(filename: str, code_content: str) -> List[str]:
+def _validate_java_syntax(filename: str, code_content: str, scan: Optional[_JavaScan] = None) -> List[str]:
     """Validate Java syntax using pattern matching (no compilation needed)"""
+    if scan is None:
+        scan = _JavaScan(code_content)
     issues = []
     
     # Check 1: Class declaration exists
-    if not re.search(r'(public\s+)?class\s+\w+\s*\{', code_content):
+    if not scan.classes:
         issues.append("No class declaration found")
     
     # Check 2: Main method exists
-    if not re.search(r'public\s+static\s+void\s+main\s*\(\s*String\[\]\s+\w+\s*\)', code_content):
+    if not scan.has_main:
         issues.append("No main method found")
     
     # Check 3: Basic bracket matching
-    open_braces = code_content.count('{')
-    close_braces = code_content.count('}')
+    open_braces, close_braces = scan.braces
     if open_braces != close_braces:
         issues.append(f"Unmatched braces: {open_braces} open, {close_braces} close")
     
     # Check 4: Basic parentheses matching
-    open_parens = code_content.count('(')
-    close_parens = code_content.count(')')
+    open_parens, close_parens = scan.parens
     if open_parens != close_parens:
         issues.append(f"Unmatched parentheses: {open_parens} open, {close_parens} close")
     
     # Check 5: Required imports present
-    required_imports = [
-        'org.apache.jmeter.testelement.TestPlan',
-        'org.apache.jmeter.threads.ThreadGroup',
-        'org.apache.jmeter.util.JMeterUtils',
-        'org.apache.jmeter.engine.StandardJMeterEngine'
-    ]
-    
-    for required_import in required_imports:
+    for required_import in VALIDATED_IMPORTS:
         if required_import not in code_content:
             issues.append(f"Missing required import: {required_import}")
     
     return issues
 
-def _auto_fix_validation_issues(filename: str, code_content: str, issues: List[str]) -> Tuple[str, List[str]]:
+def _auto_fix_validation_issues(filename: str, code_content: str, issues: List[str],
+                                scan: Optional[_JavaScan] = None) -> Tuple[str, List[str]]:
     """Attempt to automatically fix validation issues"""
+    if scan is None:
+        scan = _JavaScan(code_content)
     fixes_applied = []
-    fixed_code = code_content
+    missing_imports = []
+    edits = []
     
     for issue in issues:
         # Fix missing imports
         if "Missing required import:" in issue:
             import_class = issue.replace("Missing required import: ", "")
-            import_stmt = f"import {import_class};"
-            if import_stmt not in fixed_code:
-                fixed_code = import_stmt + '\n' + fixed_code
+            if import_class not in scan.imports and import_class not in missing_imports:
+                missing_imports.append(import_class)
                 fixes_applied.append(f"Added missing import: {import_class}")
         
         # Fix missing public class
-        if "No class declaration found" in issue:
-            # Try to find and fix class declaration
-            class_match = re.search(r'class\s+(\w+)\s*\{', fixed_code)
-            if class_match:
-                fixed_code = re.sub(r'class\s+(\w+)\s*\{', r'public class \1 {', fixed_code)
-                fixes_applied.append("Made class public")
+        if "No class declaration found" in issue and scan.classes and not scan.classes[0][4]:
+            edits.append((scan.classes[0][0], scan.classes[0][0], 'public '))
+            fixes_applied.append("Made class public")
+    
+    if missing_imports:
+        edits.append((0, 0, ''.join(f"import {name};\n" for name in reversed(missing_imports))))
     
     if fixes_applied:
-        return fixed_code, fixes_applied
+        return _apply_edits(code_content, edits), fixes_applied
     else:
         return None, []
 
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Bedrock Rate Limiter Benchmark - Check the shared limiter on a fake clock and under real concurrency.
+
+The fake-clock checks are deterministic: sequential callers are spaced by
+the request and token quotas, a throttled call halves the rate until
+successes restore it, an interactive call overtakes a queue of batch
+callers, and many async callers waiting on a virtual clock split the budget
+evenly. The real-time checks run threads against a fast quota to show the
+granted rate matches the budget and is shared fairly, and compare how long
+the event loop stalls while async callers wait with the previous limiter,
+which slept under its lock, and with acquire_async.
+
+Usage:
+    python examples/bedrock_rate_limiter_benchmark.py [--callers 8] [--rpm 1200] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import BedrockRateLimiter
+
+
+class FakeClock:
+    """Clock that only moves when slept on."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class VirtualTimeLoop:
+    """Async sleep on a virtual clock: time jumps to the next wake-up once every task is asleep."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.timers = []
+        self.order = itertools.count()
+
+    async def sleep(self, seconds: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.timers, (self.clock.now + seconds, next(self.order), future))
+        await future
+
+    async def run(self, *coroutines):
+        tasks = [asyncio.ensure_future(c) for c in coroutines]
+        while not all(t.done() for t in tasks):
+            await asyncio.sleep(0)
+            running = sum(1 for t in tasks if not t.done())
+            if self.timers and len(self.timers) == running:
+                wake_at, _, future = heapq.heappop(self.timers)
+                self.clock.now = max(self.clock.now, wake_at)
+                future.set_result(None)
+        return [t.result() for t in tasks]
+
+
+class LegacyRateLimiter:
+    """The previous limiter: fixed spacing, sleeping while holding its lock."""
+
+    def __init__(self, requests_per_minute=50):
+        self.min_interval = 60.0 / requests_per_minute
+        self.last_request_time = 0
+        self.lock = threading.Lock()
+
+    def wait_if_needed(self):
+        with self.lock:
+            time_since_last = time.time() - self.last_request_time
+            if time_since_last < self.min_interval:
+                time.sleep(self.min_interval - time_since_last)
+            self.last_request_time = time.time()
+
+
+def fake_limiter(clock: FakeClock, **kwargs) -> BedrockRateLimiter:
+    return BedrockRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def check_request_spacing():
+    clock = FakeClock()
+    limiter = fake_limiter(clock, requests_per_minute=50)
+    for _ in range(60):
+        limiter.acquire()
+    # A burst of 5, then one every 1.2 seconds
+    assert abs(clock.now - 55 * 1.2) < 1e-6, clock.now
+    print(f"request spacing    60 calls at 50 rpm took {clock.now:.1f}s (5 burst + 55 x 1.2s)")
+
+
+def check_token_budget():
+    clock = FakeClock()
+    limiter = fake_limiter(clock, requests_per_minute=600, tokens_per_minute=20000)
+    for _ in range(10):
+        limiter.acquire(tokens=4000, priority='batch')
+    # 20000 tokens up front, then 4000 every 12 seconds
+    assert abs(clock.now - 5 * 12) < 1e-6, clock.now
+    limiter.record_usage(reserved_tokens=4000, used_tokens=1000)
+    waited = limiter.acquire(tokens=4000)
+    assert waited == 3.0, waited
+    print(f"token budget       10 x 4000 tokens at 20000 tpm took {clock.now - waited:.0f}s; "
+          f"refunding 3000 unused tokens cut the next wait to {waited:.0f}s")
+
+
+def check_throttle_adaptation():
+    clock = FakeClock()
+    limiter = fake_limiter(clock, requests_per_minute=60, burst_requests=1)
+    limiter.acquire()
+    limiter.record_throttle()
+    start = clock.now
+    limiter.acquire()
+    assert abs(clock.now - start - 2.0) < 1e-6 and limiter.rate_multiplier == 0.5
+    for _ in range(10):
+        limiter.record_success()
+    assert limiter.rate_multiplier == 1.0, limiter.rate_multiplier
+    start = clock.now
+    limiter.acquire()
+    assert abs(clock.now - start - 1.0) < 1e-6
+    print("throttling         one ThrottlingException doubled the spacing to 2.0s; "
+          "10 successes restored 1.0s")
+
+
+async def check_priority_lanes():
+    clock = FakeClock()
+    loop = VirtualTimeLoop(clock)
+    limiter = BedrockRateLimiter(requests_per_minute=60, burst_requests=1, clock=clock, async_sleep=loop.sleep)
+    await limiter.acquire_async()
+
+    async def batch():
+        await limiter.acquire_async(priority='batch')
+
+    async def interactive():
+        await loop.sleep(5.5)
+        return await limiter.acquire_async(priority='interactive')
+
+    results = await loop.run(*(batch() for _ in range(20)), interactive())
+    waited = results[-1]
+    stats = limiter.stats['lanes']
+    assert waited <= 1.0, waited
+    print(f"priority lanes     interactive call behind 20 queued batch calls waited {waited:.1f}s "
+          f"(batch mean {stats['batch']['mean_wait_seconds']:.1f}s, max {stats['batch']['max_wait_seconds']:.1f}s)")
+
+
+async def check_fair_share(callers: int):
+    clock = FakeClock()
+    loop = VirtualTimeLoop(clock)
+    limiter = BedrockRateLimiter(requests_per_minute=60, burst_requests=1, clock=clock, async_sleep=loop.sleep)
+    minutes = 10
+    # Spend the burst so every caller is queued before the first turn is granted
+    await limiter.acquire_async()
+
+    async def caller():
+        granted = 0
+        while clock.now < minutes * 60:
+            await limiter.acquire_async(priority='batch')
+            granted += 1
+        return granted
+
+    counts = await loop.run(*(caller() for _ in range(callers)))
+    total = sum(counts)
+    assert total <= minutes * 60 + callers and max(counts) - min(counts) <= 1, counts
+    print(f"fair share (fake)  {callers} async callers over {minutes} min at 60 rpm: {total} calls, "
+          f"per caller {min(counts)}-{max(counts)}")
+
+
+def check_threaded_throughput(callers: int, rpm: float, seconds: float):
+    limiter = BedrockRateLimiter(requests_per_minute=rpm, burst_requests=1)
+    limiter.acquire()
+    counts = [0] * callers
+    deadline = time.monotonic() + seconds
+
+    def caller(index):
+        while True:
+            limiter.acquire(priority='batch')
+            if time.monotonic() >= deadline:
+                return
+            counts[index] += 1
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    budget = rpm / 60 * seconds
+    print(f"fair share (real)  {callers} threads for {seconds:.0f}s at {rpm:.0f} rpm: {sum(counts)} calls "
+          f"(budget {budget:.0f}), per thread {min(counts)}-{max(counts)}, "
+          f"mean wait {limiter.stats['lanes']['batch']['mean_wait_seconds']:.2f}s")
+
+
+async def event_loop_stall(callers: int, wait) -> float:
+    """Longest gap between ticks of a 10 ms heartbeat while callers wait for turns."""
+    gaps = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    beat = asyncio.ensure_future(heartbeat())
+    await asyncio.gather(*(wait() for _ in range(callers)))
+    done.set()
+    await beat
+    return max(gaps) if gaps else 0.0
+
+
+async def check_event_loop(callers: int):
+    legacy = LegacyRateLimiter(requests_per_minute=600)
+
+    async def legacy_wait():
+        # How the async tool handler called the previous limiter
+        legacy.wait_if_needed()
+
+    limiter = BedrockRateLimiter(requests_per_minute=600, burst_requests=1)
+    legacy_gap = await event_loop_stall(callers, legacy_wait)
+    shared_gap = await event_loop_stall(callers, limiter.acquire_async)
+    print(f"event loop stall   {callers} async callers at 600 rpm: previous limiter {legacy_gap * 1000:.0f} ms, "
+          f"acquire_async {shared_gap * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--rpm", type=float, default=1200.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    check_request_spacing()
+    check_token_budget()
+    check_throttle_adaptation()
+    asyncio.run(check_priority_lanes())
+    asyncio.run(check_fair_share(args.callers))
+    check_threaded_throughput(args.callers, args.rpm, args.seconds)
+    asyncio.run(check_event_loop(args.callers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Code Validator Benchmark - Time repeated validation of many plans when most are unchanged.
+
+Generates plans shaped like the model's output, a share of them with the
+mistakes the fixers correct, and validates them all once. The validated
+plans are then passed back, as the validate tool does after uploading
+them, with a share edited, and validated again. Reports both timings,
+how many plans were served from the cache, and checks the second result
+against validating everything from scratch.
+
+Usage:
+    python examples/code_validator_benchmark.py [--plans 200] [--changed 0.1] [--samplers 40]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import code_validator
+
+SAMPLER_BLOCK = '''
+        HTTPSamplerProxy sampler{i} = new HTTPSamplerProxy();
+        sampler{i}.setDomain(targetHost);
+        sampler{i}.setPort(Integer.parseInt(targetPort));
+        sampler{i}.setPath("/api/v1/items/{i}?fields={{id,name}}");
+        sampler{i}.setMethod("GET");
+        // Think time between requests (ms)
+        ConstantTimer timer{i} = new ConstantTimer();
+        timer{i}.setDelay({delay});
+        testPlanTree.add(threadGroup, sampler{i});
+'''
+
+
+def make_plan(index: int, samplers: int, rng: random.Random, with_mistakes: bool) -> str:
+    class_name = f"TestPlan{index:03d}"
+    code = code_validator._create_fallback_test_plan(f"{class_name}.java")
+    blocks = ''.join(SAMPLER_BLOCK.format(i=i, delay=f'"{rng.randint(100, 900)}"') for i in range(samplers))
+    code = code.replace("        StandardJMeterEngine engine", blocks + "\n        StandardJMeterEngine engine")
+    if with_mistakes:
+        # The model's usual slips: another class name, a missing import, numeric delays, no scheduler
+        code = code.replace(f"public class {class_name}", f"public class LoadTest{index}")
+        code = code.replace("import org.apache.jorphan.collections.ListedHashTree;\n", "")
+        code = code.replace('setDelay("', 'setDelay(').replace('");\n        testPlanTree.add(threadGroup, sampler',
+                                                              ');\n        testPlanTree.add(threadGroup, sampler')
+        code = code.replace("threadGroup.setRampUp(10);", "threadGroup.setRampUp(10);\n        threadGroup.setDuration(600);")
+    return code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plans", type=int, default=200)
+    parser.add_argument("--changed", type=float, default=0.1, help="Share of plans edited between calls")
+    parser.add_argument("--samplers", type=int, default=40, help="Samplers per plan, which sets plan size")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    rng = random.Random(1)
+    plans = {f"TestPlan{i:03d}.java": make_plan(i, args.samplers, rng, with_mistakes=i % 3 == 0)
+             for i in range(args.plans)}
+    size_kb = sum(len(code) for code in plans.values()) / len(plans) / 1024
+
+    started = time.perf_counter()
+    first = code_validator.validate_and_fix_test_plans(plans)
+    first_seconds = time.perf_counter() - started
+    assert first['status'] == 'success', first['validation_errors']
+
+    # The validated plans come back, a share of them edited
+    second_input = dict(first['validated_plans'])
+    for filename in rng.sample(sorted(second_input), int(args.plans * args.changed)):
+        second_input[filename] = second_input[filename].replace('threadGroup.setNumThreads(5);',
+                                                                'threadGroup.setNumThreads(25);')
+
+    started = time.perf_counter()
+    second = code_validator.validate_and_fix_test_plans(second_input)
+    second_seconds = time.perf_counter() - started
+
+    code_validator._validation_cache.clear()
+    started = time.perf_counter()
+    uncached = code_validator.validate_and_fix_test_plans(second_input)
+    uncached_seconds = time.perf_counter() - started
+    assert second['validated_plans'] == uncached['validated_plans'], "cached validation differs"
+    assert not uncached['fixes_applied'], "validated plans changed when validated again"
+
+    print(f"{args.plans} plans of {size_kb:.0f} KB, {args.changed:.0%} edited between calls\n")
+    print(f"first call, all plans new          {first_seconds * 1000:8.1f} ms  "
+          f"{len(first['fixes_applied'])} fixes applied")
+    print(f"second call                        {second_seconds * 1000:8.1f} ms  "
+          f"{second['cached_plans']} plans unchanged since validated")
+    print(f"second call, cache cleared         {uncached_seconds * 1000:8.1f} ms")
+    print(f"\nspeedup from the cache: {uncached_seconds / second_seconds:.1f}x; results identical")
+
+
+if __name__ == "__main__":
+    main()
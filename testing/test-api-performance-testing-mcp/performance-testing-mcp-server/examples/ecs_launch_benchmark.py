@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+ECS Launch Benchmark - Time test task launch and completion detection for many plans.
+
+Replaces ECS with a stub whose run_task takes a fixed API latency and whose
+tasks stop at staggered times on a fake clock, and S3 with an in-memory
+stand-in holding each plan's JTL file. Compares sequential launches with
+fixed 30 second polling against concurrent launches with adaptive polling,
+reporting launch time, how long after a task stopped the monitor noticed,
+describe_tasks calls, and when the first results were available.
+
+Usage:
+    python examples/ecs_launch_benchmark.py [--plans 50] [--run-task-ms 150] [--test-minutes 10]
+"""
+
+import argparse
+import io
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import test_executor
+
+JTL_CONTENT = (
+    "timeStamp,elapsed,label,responseCode,responseMessage,threadName,dataType,success\n"
+    "2024/01/01 00:00:00.000,120,GET /,200,OK,Users 1-1,text,true\n"
+)
+
+
+class FakeClock:
+    """Clock that only moves when slept on."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.lock = threading.Lock()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        with self.lock:
+            self.now += seconds
+
+
+class StubECSClient:
+    """Starts tasks that stop after a per-plan run time on the fake clock."""
+
+    def __init__(self, clock: FakeClock, run_task_seconds: float, run_times: dict):
+        self.clock = clock
+        self.run_task_seconds = run_task_seconds
+        self.run_times = run_times
+        self.stop_at = {}
+        self.plans = {}
+        self.describe_calls = 0
+        self.lock = threading.Lock()
+
+    def describe_task_definition(self, taskDefinition):
+        return {}
+
+    def run_task(self, **kwargs):
+        time.sleep(self.run_task_seconds)
+        plan_name = next(e['value'] for e in kwargs['overrides']['containerOverrides'][0]['environment']
+                         if e['name'] == 'PLAN_NAME')
+        task_arn = f"arn:aws:ecs:us-east-1:123456789012:task/benchmark/{plan_name}"
+        with self.lock:
+            self.stop_at[task_arn] = self.clock() + self.run_times[plan_name]
+            self.plans[task_arn] = plan_name
+        return {'tasks': [{'taskArn': task_arn}], 'failures': []}
+
+    def describe_tasks(self, cluster, tasks):
+        assert len(tasks) <= 100, "describe_tasks accepts at most 100 tasks"
+        self.describe_calls += 1
+        now = self.clock()
+        return {'tasks': [
+            {'taskArn': arn, 'lastStatus': 'STOPPED' if now >= self.stop_at[arn] else 'RUNNING',
+             'stoppedReason': 'Essential container in task exited'}
+            for arn in tasks
+        ]}
+
+
+class LocalS3Client:
+    """Serves the same JTL file for every plan."""
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(JTL_CONTENT.encode('utf-8'))}
+
+
+class NoLogsClient:
+    def get_log_events(self, **kwargs):
+        return {'events': []}
+
+
+def run(name: str, plans: int, run_task_seconds: float, run_times: dict, env: dict) -> None:
+    os.environ.update(env)
+    clock = FakeClock()
+    ecs = StubECSClient(clock, run_task_seconds, run_times)
+    test_plans = {plan_name: "" for plan_name in run_times}
+
+    started = time.perf_counter()
+    execution = test_executor._start_test_execution(
+        "benchmark", test_plans, {'cluster_name': 'benchmark'}, ecs
+    )
+    launch_seconds = time.perf_counter() - started
+    assert execution['failed_to_start'] == 0, execution
+
+    monitor_start = clock()
+    result = test_executor._monitor_execution(
+        "benchmark", execution, {'duration': '2h'}, ecs,
+        s3_client=LocalS3Client(), logs_client=NoLogsClient(), clock=clock, sleep=clock.sleep
+    )
+    completed = result['completed_tasks']
+    assert len(completed) == plans and all('summary' in t['results'] for t in completed)
+
+    delays = [t['completion_time'] - ecs.stop_at[t['task_arn']] for t in completed]
+    first_result = min(t['completion_time'] for t in completed) - monitor_start
+    print(f"{name:<12} launch {launch_seconds:6.2f}s  detection mean {sum(delays) / len(delays):5.1f}s "
+          f"max {max(delays):5.1f}s  describe calls {ecs.describe_calls:3d}  "
+          f"first results after {first_result:6.0f}s  all after {result['monitoring_duration']:6.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plans", type=int, default=50)
+    parser.add_argument("--run-task-ms", type=float, default=150.0)
+    parser.add_argument("--test-minutes", type=float, default=10.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    os.environ.setdefault('ECS_SUBNETS', 'subnet-benchmark')
+    os.environ.setdefault('ECS_SECURITY_GROUPS', 'sg-benchmark')
+
+    # Plans finish spread over two minutes after the nominal test length
+    rng = random.Random(1)
+    run_times = {f"TestPlan{i:02d}.java": args.test_minutes * 60 + rng.uniform(0, 120) for i in range(args.plans)}
+    run_task_seconds = args.run_task_ms / 1000
+
+    run("sequential", args.plans, run_task_seconds, run_times, {
+        'ECS_LAUNCH_CONCURRENCY': '1',
+        'TASK_POLLING_MIN_INTERVAL_SECONDS': '30',
+        'TASK_POLLING_INTERVAL_SECONDS': '30',
+    })
+    run("concurrent", args.plans, run_task_seconds, run_times, {
+        'ECS_LAUNCH_CONCURRENCY': str(test_executor.MAX_CONCURRENT_LAUNCHES),
+        'TASK_POLLING_MIN_INTERVAL_SECONDS': '5',
+        'TASK_POLLING_INTERVAL_SECONDS': '30',
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Live Metrics Demo - Follow a synthetic test through get_live_metrics and auto-abort it.
+
+A synthetic JTL writer plays the JMeter runner: every segment interval it
+uploads the rows each plan gained, in the runner's segment layout, to a
+local directory standing in for S3. The target starts failing part way
+through; get_live_metrics is polled after every upload with an error-rate
+abort rule, and the stubbed ECS client records the stop_task calls. Reports
+how long after the failures began the run was stopped and what each poll
+cost.
+
+Usage:
+    python examples/live_metrics_demo.py [--plans 3] [--rps 200] [--fail-after 240] [--segment-seconds 10]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import live_metrics
+
+JTL_HEADER = "timeStamp,elapsed,label,responseCode,responseMessage,threadName,dataType,success,failureMessage,bytes,sentBytes,grpThreads,allThreads,URL,Latency,IdleTime,Connect\n"
+LABELS = ("Login", "List Products", "Checkout")
+
+
+class LocalDirectoryS3Client:
+    """The parts of the S3 client API used here, backed by a local directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        path = self.root / Key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(Body if isinstance(Body, bytes) else Body.encode('utf-8'))
+        return {}
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO((self.root / Key).read_bytes())}
+
+    def list_objects_v2(self, Bucket, Prefix, Delimiter=None, StartAfter=None, **kwargs):
+        keys = sorted(str(p.relative_to(self.root)) for p in self.root.rglob('*') if p.is_file())
+        keys = [k for k in keys if k.startswith(Prefix) and (StartAfter is None or k > StartAfter)]
+        if Delimiter:
+            prefixes = sorted({Prefix + k[len(Prefix):].split(Delimiter)[0] + Delimiter
+                               for k in keys if Delimiter in k[len(Prefix):]})
+            return {'CommonPrefixes': [{'Prefix': p} for p in prefixes],
+                    'Contents': [{'Key': k} for k in keys if Delimiter not in k[len(Prefix):]]}
+        return {'Contents': [{'Key': k} for k in keys]}
+
+
+class StubECSClient:
+    def __init__(self):
+        self.stopped = []
+
+    def stop_task(self, cluster, task, reason):
+        self.stopped.append(task)
+
+
+def synthetic_segment(rng: random.Random, start_ms: int, seconds: float, rps: float, error_rate: float) -> str:
+    """JTL rows for one plan over one segment interval."""
+    rows = [JTL_HEADER]
+    for i in range(int(seconds * rps)):
+        ts = start_ms + int(i * 1000 / rps)
+        stamp = time.strftime('%Y/%m/%d %H:%M:%S', time.localtime(ts // 1000)) + f".{ts % 1000:03d}"
+        failed = rng.random() < error_rate
+        elapsed = int(rng.lognormvariate(4.0, 0.5)) + (400 if failed else 0)
+        code, success = ('503', 'false') if failed else ('200', 'true')
+        label = LABELS[i % len(LABELS)]
+        rows.append(f"{stamp},{elapsed},{label},{code},OK,Users 1-1,text,{success},,512,0,10,10,"
+                    f"http://target/{label},{elapsed},0,0\n")
+    return ''.join(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plans", type=int, default=3)
+    parser.add_argument("--rps", type=float, default=200.0)
+    parser.add_argument("--fail-after", type=float, default=240.0, help="Seconds until the target starts failing")
+    parser.add_argument("--segment-seconds", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=900.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    rules = [{"metric": "error_rate", "threshold": 10, "for_seconds": 30},
+             {"metric": "p95", "threshold": 2000, "for_seconds": 60}]
+
+    with tempfile.TemporaryDirectory() as root:
+        os.environ['S3_BUCKET_NAME'] = 'local'
+        s3 = LocalDirectoryS3Client(root)
+        ecs = StubECSClient()
+        s3.put_object(Bucket='local', Key='perf-pipeline/demo/execution_results.json', Body=json.dumps({
+            'execution': {'cluster_name': 'demo', 'running_tasks': [
+                {'plan_name': f"TestPlan{p:02d}.java", 'task_arn': f"arn:aws:ecs:task/demo/{p}"}
+                for p in range(args.plans)]}
+        }))
+
+        rng = random.Random(7)
+        start_ms = int(time.time() * 1000)
+        poll_ms = []
+        elapsed = 0.0
+        result = {}
+        while elapsed < args.duration:
+            error_rate = 0.01 if elapsed < args.fail_after else 0.30
+            for p in range(args.plans):
+                sequence = int(elapsed / args.segment_seconds)
+                s3.put_object(Bucket='local', Key=f"perf-pipeline/demo/live/TestPlan{p:02d}/segment-{sequence:06d}.jtl",
+                              Body=synthetic_segment(rng, start_ms + int(elapsed * 1000), args.segment_seconds,
+                                                     args.rps, error_rate))
+            elapsed += args.segment_seconds
+
+            started = time.perf_counter()
+            result = live_metrics.get_live_metrics('demo', s3, ecs, window_seconds=60, abort_rules=rules)
+            poll_ms.append((time.perf_counter() - started) * 1000)
+            if result['status'] == 'aborted':
+                break
+
+        overall = result['overall']
+        print(f"rows read          {result['rows_read']} in {result['segments_read']} segments")
+        print(f"last 60s           {overall['requests']} requests, {overall['throughput_rps']} rps, "
+              f"error rate {overall['error_rate']}%, p95 {overall['latency_ms']['p95']} ms")
+        print(f"poll cost          mean {sum(poll_ms) / len(poll_ms):.1f} ms, max {max(poll_ms):.1f} ms "
+              f"({args.plans * args.rps * args.segment_seconds:.0f} new rows per poll)")
+        if result['status'] == 'aborted':
+            print(f"aborted            {elapsed - args.fail_after:.0f}s after failures began "
+                  f"(test data up to {elapsed:.0f}s of {args.duration:.0f}s), stopped {len(ecs.stopped)} tasks")
+            print(f"reason             {result['abort']['reason']}")
+        else:
+            print("not aborted")
+
+
+if __name__ == "__main__":
+    main()
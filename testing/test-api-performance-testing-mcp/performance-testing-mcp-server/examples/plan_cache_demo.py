@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Plan Cache Demo - Count model calls across two generate_plans sessions with overlapping scenarios.
+
+Stores two scenario sets in a local directory standing in for S3 and runs
+generate_plans for each with a fake Bedrock client that counts its calls
+and takes a fixed time to answer. The first session has four scenarios of
+a standard shape, which are rendered from JMX templates, and three that
+need the model. The second repeats two of those three (one with its keys
+reordered), changes one and adds one, so only two calls should be made.
+The second session is then repeated with the in-memory cache cleared, as a
+new process would start, to show the S3 plan cache serves it. Templated
+plans are parsed with the local load engine to check their thread groups.
+
+Usage:
+    python examples/plan_cache_demo.py [--latency 0.5] [--concurrency 4]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import local_load_engine
+import test_plan_generator
+
+JAVA_PLAN = """import org.apache.jmeter.testelement.TestPlan;
+import org.apache.jmeter.threads.ThreadGroup;
+import org.apache.jmeter.control.LoopController;
+import org.apache.jmeter.protocol.http.sampler.HTTPSamplerProxy;
+import org.apache.jmeter.reporters.ResultCollector;
+import org.apache.jmeter.util.JMeterUtils;
+import org.apache.jmeter.engine.StandardJMeterEngine;
+import org.apache.jorphan.collections.ListedHashTree;
+
+public class CLASS_NAME {
+    public static void main(String[] args) throws Exception {
+        JMeterUtils.loadJMeterProperties("jmeter.properties");
+        JMeterUtils.initLocale();
+        String targetHost = System.getProperty("target.host", "localhost");
+        String targetPort = System.getProperty("target.port", "8080");
+        TestPlan testPlan = new TestPlan("SCENARIO");
+        ThreadGroup threadGroup = new ThreadGroup();
+        threadGroup.setNumThreads(USERS);
+        threadGroup.setRampUp(10);
+        threadGroup.setScheduler(true);
+        threadGroup.setDuration(60);
+        LoopController loopController = new LoopController();
+        loopController.setLoops(-1);
+        threadGroup.setSamplerController(loopController);
+        HTTPSamplerProxy sampler1 = new HTTPSamplerProxy();
+        sampler1.setDomain(targetHost);
+        sampler1.setPort(Integer.parseInt(targetPort));
+        sampler1.setPath("/api/login");
+        sampler1.setMethod("POST");
+        ListedHashTree testPlanTree = new ListedHashTree();
+        testPlanTree.add(testPlan);
+        testPlanTree.add(testPlan, threadGroup);
+        testPlanTree.add(threadGroup, sampler1);
+        StandardJMeterEngine jmeter = new StandardJMeterEngine();
+        jmeter.configure(testPlanTree);
+        jmeter.run();
+    }
+}
+"""
+
+
+class LocalDirectoryS3Client:
+    """The parts of the S3 client API used here, backed by a local directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        path = self.root / Key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(Body if isinstance(Body, bytes) else Body.encode('utf-8'))
+        return {}
+
+    def get_object(self, Bucket, Key):
+        path = self.root / Key
+        if not path.exists():
+            raise KeyError(Key)
+        return {'Body': io.BytesIO(path.read_bytes())}
+
+
+class FakeBedrockClient:
+    """invoke_model that answers with a valid Java plan after a fixed latency, counting calls."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def invoke_model(self, body, modelId, **kwargs):
+        prompt = json.loads(body)['messages'][0]['content'][0]['text']
+        class_name = re.search(r'Class name MUST be: (\w+)', prompt).group(1)
+        users = re.search(r'"users": (\d+)', prompt)
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+        code = JAVA_PLAN.replace('CLASS_NAME', class_name).replace('USERS', users.group(1) if users else '5')
+        return {'body': io.BytesIO(json.dumps({'content': [{'type': 'text', 'text': code}]}).encode('utf-8'))}
+
+
+def endpoint(method, path, **extra):
+    return dict({'method': method, 'endpoint': path}, **extra)
+
+
+BROWSE = [endpoint('GET', '/api/products'), endpoint('GET', '/api/products/42')]
+CHECKOUT = [endpoint('POST', '/api/login', body={'user': 'demo', 'password': 'demo'}, extract={'token': '$.token'}),
+            endpoint('POST', '/api/orders', headers={'Authorization': 'Bearer {{token}}'})]
+
+STANDARD = {
+    'load': {'name': 'Baseline load', 'type': 'load', 'users': 50, 'ramp_up_time': '30s', 'duration': '10m',
+             'test_steps': BROWSE},
+    'stress': {'name': 'Stepped stress', 'type': 'stress', 'users': 200, 'ramp_up_time': '1m', 'duration': '20m',
+               'test_steps': BROWSE},
+    'spike': {'name': 'Flash sale spike', 'type': 'spike', 'users': 300, 'duration': '15m',
+              'test_steps': ['GET /api/products', 'GET /api/deals']},
+    'soak': {'name': 'Overnight soak', 'type': 'soak', 'users': 40, 'ramp_up_time': '2m', 'duration': '8h',
+             'test_steps': BROWSE},
+}
+CHECKOUT_FLOW = {'name': 'Checkout flow', 'type': 'load', 'users': 80, 'duration': '10m', 'test_steps': CHECKOUT}
+VOLUME = {'name': 'Catalog volume', 'type': 'volume', 'users': 20, 'duration': '30m', 'test_steps': BROWSE,
+          'data_volume': '1M products'}
+MIXED = {'name': 'Mixed traffic', 'users': 120, 'duration': '20m', 'test_steps': BROWSE + CHECKOUT,
+         'traffic_mix': {'browse': 0.8, 'checkout': 0.2}}
+
+
+def reordered(config):
+    """The same scenario as a model would write it on another day: same content, different key order"""
+    return dict(reversed(list(config.items())))
+
+
+SESSION_ONE = dict(STANDARD, checkout=CHECKOUT_FLOW, volume=VOLUME, mixed=MIXED)
+SESSION_TWO = dict(
+    STANDARD,
+    volume=VOLUME,
+    checkout=reordered(CHECKOUT_FLOW),
+    mixed=dict(MIXED, users=150),
+    search={'name': 'Search flow', 'users': 60, 'duration': '10m',
+            'test_steps': [endpoint('GET', '/api/search?q={{term}}')]},
+)
+
+
+def run_session(s3, session_id, scenarios, client):
+    s3.put_object(Bucket='local', Key=f"perf-pipeline/{session_id}/scenarios.json",
+                  Body=json.dumps({'scenarios': scenarios}))
+    calls_before = client.calls
+    started = time.perf_counter()
+    result = test_plan_generator.generate_plans(session_id, 'java_dsl', s3, client)
+    elapsed = time.perf_counter() - started
+    assert result['status'] == 'completed', result
+    generation = result['generation']
+    print(f"{session_id:<18} {generation['scenarios']} scenarios: {generation['templated']} templated, "
+          f"{generation['cache_hits']} cached, {client.calls - calls_before} model calls "
+          f"(previously {generation['scenarios']}) in {elapsed:.2f}s")
+    return result
+
+
+def check_templates(root, session_id):
+    for path in sorted((Path(root) / f"perf-pipeline/{session_id}/plans").glob('*.jmx')):
+        plan = local_load_engine.load_plan(path.read_text(), path.name)
+        groups = ', '.join(f"{g['num_threads']} users +{g['delay']:.0f}s for {g['duration']:.0f}s"
+                           for g in plan['thread_groups'])
+        samplers = len(plan['thread_groups'][0]['samplers'])
+        print(f"  {path.name:<16} {samplers} samplers; {groups}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds the fake model takes per call")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    os.environ['PLAN_GENERATION_CONCURRENCY'] = str(args.concurrency)
+    with tempfile.TemporaryDirectory() as root:
+        os.environ['S3_BUCKET_NAME'] = 'local'
+        s3 = LocalDirectoryS3Client(root)
+        client = FakeBedrockClient(args.latency)
+
+        first = run_session(s3, 'session-one', SESSION_ONE, client)
+        check_templates(root, 'session-one')
+        second = run_session(s3, 'session-two', SESSION_TWO, client)
+        assert client.calls == 3 + 2, client.calls
+
+        # A new process: nothing in memory, cached plans come from S3
+        test_plan_generator._plan_cache.clear()
+        cold = run_session(s3, 'session-two-cold', SESSION_TWO, client)
+        assert cold['generation']['model_calls'] == 0 and cold['generation']['cache_hits'] == 4, cold['generation']
+        assert second['plans_generated'] == cold['plans_generated'], (second['plans_generated'], cold['plans_generated'])
+
+        reused = (Path(root) / 'perf-pipeline/session-two/plans/TestPlan06.java').read_text()
+        assert 'public class TestPlan06 ' in reused and 'TestPlan05 ' not in reused
+        scenarios = len(SESSION_ONE) + 2 * len(SESSION_TWO)
+        print(f"\n{client.calls} model calls for {scenarios} scenarios over three sessions, "
+              f"at most {client.max_in_flight} in flight; session-one plans: {', '.join(first['plans_generated'])}")
+
+
+if __name__ == "__main__":
+    main()
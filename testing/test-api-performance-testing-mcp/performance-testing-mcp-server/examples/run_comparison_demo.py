@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Run Comparison Demo - Check compare_runs against synthetic runs with regressions of known size.
+
+Writes synthetic JTL results for a baseline run and several candidate runs
+to a local directory standing in for S3, then compares each candidate with
+the baseline. Candidates include reruns of the same system, which must not
+be flagged, and runs with an injected latency shift, a slow tail, a higher
+error rate, a throughput drop and a shift below the minimum effect. For
+each, the demo reports the verdict, the flagged metrics with their measured
+change, and whether the result matches the injected change.
+
+Usage:
+    python examples/run_comparison_demo.py [--minutes 10] [--rps 90] [--reruns 5]
+"""
+
+import argparse
+import io
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run_comparison
+
+JTL_HEADER = "timeStamp,elapsed,label,responseCode,responseMessage,threadName,dataType,success,failureMessage,bytes,sentBytes,grpThreads,allThreads,URL,Latency,IdleTime,Connect\n"
+# Label -> (median latency ms, error rate)
+LABELS = {"Login": (80.0, 0.01), "List Products": (120.0, 0.01), "Checkout": (250.0, 0.01)}
+
+
+class LocalDirectoryS3Client:
+    """The parts of the S3 client API used here, backed by a local directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        path = self.root / Key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(Body if isinstance(Body, bytes) else Body.encode('utf-8'))
+        return {}
+
+    def get_object(self, Bucket, Key):
+        path = self.root / Key
+        if not path.exists():
+            raise KeyError(Key)
+        return {'Body': io.BytesIO(path.read_bytes())}
+
+    def list_objects_v2(self, Bucket, Prefix, **kwargs):
+        paths = sorted(p for p in self.root.rglob('*') if p.is_file())
+        return {'Contents': [{'Key': str(p.relative_to(self.root)), 'Size': p.stat().st_size}
+                             for p in paths if str(p.relative_to(self.root)).startswith(Prefix)]}
+
+
+def synthetic_run(seed: int, minutes: float, rps: float, shift=None, tail=None, errors=None) -> str:
+    """
+    JTL rows for one run
+
+    shift: (label, factor) multiplies that label's latencies
+    tail: (label, fraction, extra_ms) adds extra_ms to a fraction of that label's requests
+    errors: (label, rate) replaces that label's error rate
+    """
+    rng = random.Random(seed)
+    rows = [JTL_HEADER]
+    start_ms = 1_700_000_000_000
+    names = list(LABELS)
+    for i in range(int(minutes * 60 * rps)):
+        ts = start_ms + int(i * 1000 / rps)
+        label = names[i % len(names)]
+        median, error_rate = LABELS[label]
+        elapsed = rng.lognormvariate(0, 0.4) * median
+        if shift and shift[0] == label:
+            elapsed *= shift[1]
+        if tail and tail[0] == label and rng.random() < tail[1]:
+            elapsed += tail[2]
+        if errors and errors[0] == label:
+            error_rate = errors[1]
+        failed = rng.random() < error_rate
+        code, success = ('500', 'false') if failed else ('200', 'true')
+        rows.append(f"{ts},{int(elapsed)},{label},{code},OK,Users 1-1,text,{success},,512,0,10,10,"
+                    f"http://target/{label},{int(elapsed)},0,0\n")
+    return ''.join(rows)
+
+
+def store_run(s3, session_id: str, content: str) -> int:
+    s3.put_object(Bucket='local', Key=f"perf-pipeline/{session_id}/results/TestPlan01_results.jtl", Body=content)
+    return len(content)
+
+
+def describe(result) -> str:
+    findings = []
+    for finding in result['regressions'] + result['improvements']:
+        change = (f"{finding['change_percent']:+.1f}%" if 'change_percent' in finding
+                  else f"{finding['change_points']:+.1f} pts")
+        findings.append(f"{finding['label']} {finding['metric']} {change}")
+    return ', '.join(findings) or '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--rps", type=float, default=90.0)
+    parser.add_argument("--reruns", type=int, default=5, help="Reruns of the baseline system to check for false alarms")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    with tempfile.TemporaryDirectory() as root:
+        os.environ['S3_BUCKET_NAME'] = 'local'
+        s3 = LocalDirectoryS3Client(root)
+        jtl_bytes = store_run(s3, 'baseline', synthetic_run(1, args.minutes, args.rps))
+
+        started = time.perf_counter()
+        summary = run_comparison.get_run_summary('baseline', s3)
+        summary_seconds = time.perf_counter() - started
+        summary_bytes = (Path(root) / 'perf-pipeline/baseline/analysis/run_summary.json').stat().st_size
+        print(f"baseline           {summary['samples']} samples, JTL {jtl_bytes / 1024:.0f} KiB -> "
+              f"summary {summary_bytes / 1024:.1f} KiB in {summary_seconds:.2f}s\n")
+
+        # (session, expected flagged metrics, run arguments)
+        candidates = [(f"rerun-{n}", set(), {'seed': 100 + n}) for n in range(args.reruns)]
+        candidates += [
+            ('checkout-10pct', {('Checkout', 'p50'), ('Checkout', 'p95'), ('Checkout', 'p99')},
+             {'seed': 200, 'shift': ('Checkout', 1.10)}),
+            ('checkout-3pct', set(), {'seed': 201, 'shift': ('Checkout', 1.03)}),
+            ('products-tail', {('List Products', 'p99')}, {'seed': 202, 'tail': ('List Products', 0.005, 400)}),
+            ('login-errors', {('Login', 'error_rate')}, {'seed': 203, 'errors': ('Login', 0.04)}),
+            ('throughput-drop', {(label, 'throughput') for label in LABELS}, {'seed': 204, 'rps': args.rps * 0.8}),
+        ]
+
+        correct = 0
+        for session_id, expected, options in candidates:
+            rps = options.pop('rps', args.rps)
+            store_run(s3, session_id, synthetic_run(options.pop('seed'), args.minutes, rps, **options))
+            started = time.perf_counter()
+            result = run_comparison.compare_runs('baseline', session_id, s3)
+            elapsed = time.perf_counter() - started
+            flagged = {(f['label'], f['metric']) for f in result['regressions']}
+            matches = flagged == expected
+            correct += matches
+            print(f"{session_id:<16} {result['verdict']:<11} {'ok  ' if matches else 'MISS'} "
+                  f"{elapsed:5.2f}s  {describe(result)}")
+
+        print(f"\n{correct} of {len(candidates)} comparisons flagged exactly the injected regressions")
+
+
+if __name__ == "__main__":
+    main()
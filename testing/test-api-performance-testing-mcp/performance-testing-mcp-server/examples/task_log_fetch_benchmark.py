@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Task Log Fetch Benchmark - Time reading CloudWatch logs of many completed JMeter tasks.
+
+Replaces CloudWatch Logs with a stub serving one large stream per task,
+paged as the service pages them (at most 10,000 events or 1 MB per call),
+with a fixed latency per call. Errors are planted early, in the middle and
+at the end of each stream, followed by JMeter's final summary line.
+Compares reading each stream completely from the head, one task at a time,
+with _fetch_task_logs, then calls _fetch_task_logs again to show the cache.
+
+Usage:
+    python examples/task_log_fetch_benchmark.py [--tasks 50] [--events 200000] [--call-ms 80]
+"""
+
+import argparse
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import test_executor
+
+PAGE_EVENTS = 10000
+PAGE_BYTES = 1024 * 1024
+FINAL_SUMMARY = "summary =  90000 in 00:10:00 =  150.0/s Avg:   120 Min:    80 Max:  2100 Err:   180 (0.20%)"
+
+
+class StubLogsClient:
+    """Paginated get_log_events and filter_log_events over generated streams."""
+
+    def __init__(self, events_per_stream: int, call_seconds: float):
+        self.events_per_stream = events_per_stream
+        self.call_seconds = call_seconds
+        self.calls = {'get_log_events': 0, 'filter_log_events': 0}
+        self.bytes_returned = 0
+        self.lock = threading.Lock()
+        # Every stream holds the same events, generated and matched once so the stub's own work stays out of
+        # the timings
+        terms = [term.strip('"') for term in test_executor.LOG_FILTER_PATTERN.replace('?', '').split('" "')]
+        self.events = [self._event(i) for i in range(events_per_stream)]
+        self.timestamps = [event['timestamp'] for event in self.events]
+        self.matching = [i for i, event in enumerate(self.events) if any(term in event['message'] for term in terms)]
+
+    def _event(self, i: int) -> dict:
+        if i == 50:
+            message = "ERROR o.a.j.t.JMeterThread: Test failed! java.net.SocketException: Connection reset"
+        elif i == self.events_per_stream // 2:
+            message = "ERROR o.a.j.p.h.s.HTTPHCAbstractImpl: Exception in sampler"
+        elif i == self.events_per_stream - 2:
+            message = "Error: Could not find or load main class TestPlan"
+        elif i == self.events_per_stream - 1:
+            message = FINAL_SUMMARY
+        elif i % 1000 == 0:
+            message = f"summary +   1500 in 00:00:10 =  150.0/s Avg:   120 Min:    80 Max:   400 Err:     0 (0.00%) {i}"
+        else:
+            message = f"INFO o.a.j.t.JMeterThread: Thread Users 1-{i % 50} sample {i} completed OK"
+        return {'timestamp': 1_700_000_000_000 + i * 5, 'message': message}
+
+    def _page(self, indexes) -> list:
+        events, size = [], 0
+        for i in indexes:
+            event = self.events[i]
+            size += len(event['message']) + 26
+            if len(events) == PAGE_EVENTS or size > PAGE_BYTES:
+                break
+            events.append(event)
+        return events
+
+    def _record(self, operation: str, events: list) -> None:
+        time.sleep(self.call_seconds)
+        with self.lock:
+            self.calls[operation] += 1
+            self.bytes_returned += sum(len(e['message']) for e in events)
+
+    def get_log_events(self, logGroupName, logStreamName, startFromHead=False, limit=PAGE_EVENTS, nextToken=None):
+        n = self.events_per_stream
+        if startFromHead:
+            start = int(nextToken[2:]) if nextToken else 0
+            events = self._page(range(start, n))
+            end = start + len(events)
+            response = {'events': events, 'nextForwardToken': f"f/{end}", 'nextBackwardToken': f"b/{start}"}
+        else:
+            end = int(nextToken[2:]) if nextToken else n
+            events = self._page(range(end - 1, -1, -1))[::-1]
+            start = end - len(events)
+            response = {'events': events, 'nextForwardToken': f"f/{end}", 'nextBackwardToken': f"b/{start}"}
+        self._record('get_log_events', events)
+        return response
+
+    def filter_log_events(self, logGroupName, logStreamNames, filterPattern, endTime=None, nextToken=None):
+        assert filterPattern == test_executor.LOG_FILTER_PATTERN
+        start = int(nextToken) if nextToken else 0
+        end = self.events_per_stream
+        if endTime is not None:
+            end = bisect.bisect_right(self.timestamps, endTime)
+        # The service scans a bounded slice of the stream per call, whatever it matches
+        scan_end = min(end, start + 50000)
+        events = [self.events[i] for i in self.matching[bisect.bisect_left(self.matching, start):
+                                                         bisect.bisect_left(self.matching, scan_end)]]
+        self._record('filter_log_events', events)
+        response = {'events': events}
+        if scan_end < end:
+            response['nextToken'] = str(scan_end)
+        return response
+
+
+def read_streams_sequentially(completed_tasks: list, logs_client) -> dict:
+    """Each stream read completely from the head with nextForwardToken, one task at a time"""
+    found = {}
+    for task in completed_tasks:
+        stream = f"ecs/jmeter-runner/{task['task_arn'].split('/')[-1]}"
+        token, errors, last_summary = None, 0, None
+        while True:
+            request = {'logGroupName': '/ecs/java-jmeter-runner', 'logStreamName': stream, 'startFromHead': True}
+            if token:
+                request['nextToken'] = token
+            response = logs_client.get_log_events(**request)
+            for event in response['events']:
+                lowered = event['message'].lower()
+                errors += any(pattern in lowered for pattern in test_executor.ERROR_PATTERNS)
+                if 'summary =' in event['message']:
+                    last_summary = event['message']
+            if response['nextForwardToken'] == token or not response['events']:
+                break
+            token = response['nextForwardToken']
+        found[task['plan_name']] = (errors, last_summary)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--events", type=int, default=200000, help="Log events per task stream")
+    parser.add_argument("--call-ms", type=float, default=80.0, help="CloudWatch Logs latency per call")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    completed_tasks = [
+        {'task_arn': f"arn:aws:ecs:us-east-1:123456789012:task/benchmark/{i:032x}",
+         'plan_name': f"TestPlan{i:02d}.java", 'final_status': 'STOPPED'}
+        for i in range(args.tasks)
+    ]
+
+    def measure(name, fetch):
+        logs_client = StubLogsClient(args.events, args.call_ms / 1000)
+        started = time.perf_counter()
+        result = fetch(logs_client)
+        seconds = time.perf_counter() - started
+        calls = ", ".join(f"{count} {operation}" for operation, count in logs_client.calls.items() if count)
+        print(f"{name:<28} {seconds:7.2f}s  {logs_client.bytes_returned / 1024 ** 2:8.1f} MB  {calls or 'no calls'}")
+        return result, logs_client
+
+    print(f"{args.tasks} tasks, {args.events:,} log events each, {args.call_ms:.0f} ms per call\n")
+    full, _ = measure("sequential, whole stream", lambda client: read_streams_sequentially(completed_tasks, client))
+    logs, _ = measure("_fetch_task_logs", lambda client: test_executor._fetch_task_logs(completed_tasks, client))
+    again, _ = measure("_fetch_task_logs again", lambda client: test_executor._fetch_task_logs(completed_tasks, client))
+
+    for task in completed_tasks:
+        summary = logs['summary'][task['plan_name']]
+        assert summary['error_count'] == full[task['plan_name']][0] == 3, (summary, full[task['plan_name']])
+        assert summary['jmeter_summary'] == FINAL_SUMMARY and summary['has_compilation_errors']
+        assert not summary['truncated']
+    assert again['logs_cached'] == args.tasks and again['summary'] == logs['summary']
+    print(f"\nEvery task: the same 3 errors and final JMeter summary as the whole-stream read; "
+          f"{again['logs_cached']} of {args.tasks} served from the cache on the second call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""
+Live Metrics Module
+Follows partial JTL segments while a test runs and keeps rolling metrics
+
+Test runners upload the rows each JTL file gained since their last upload
+as numbered segments under perf-pipeline/{session_id}/live/{plan}/. This
+module reads only segments it has not seen, folds their samples into
+per-label latency sketches over fixed windows of sample time, and checks
+auto-abort rules against the most recent windows, so a broken run can be
+stopped early instead of after its full duration.
+"""
+
+import csv
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Width of the windows samples are aggregated into, in seconds of sample time
+WINDOW_SECONDS = 5
+# Windows kept per session (one hour at the default width)
+MAX_WINDOWS = 720
+# Sessions whose tails are kept between calls
+MAX_TRACKED_SESSIONS = 32
+# Relative accuracy of latency percentiles
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+RULE_METRICS = ('error_rate', 'throughput', 'p50', 'p90', 'p95', 'p99')
+_TIMESTAMP_FORMAT = '%Y/%m/%d %H:%M:%S'
+
+
+class LatencySketch:
+    """
+    Latency sketch with log-spaced buckets
+
+    Every value is counted in a bucket whose bounds are within the relative
+    accuracy of each other, so quantiles are accurate to that fraction and
+    the number of buckets grows with the log of the latency range, not the
+    sample count. Sketches merge by adding bucket counts, which is what lets
+    windows and labels be combined in any grouping.
+    """
+
+    __slots__ = ('buckets', 'zero_count', 'count')
+
+    _gamma = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+    _log_gamma = math.log(_gamma)
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.count += count
+        if value <= 0:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def merge(self, other: 'LatencySketch') -> None:
+        self.count += other.count
+        self.zero_count += other.zero_count
+        buckets = self.buckets
+        for index, count in other.buckets.items():
+            buckets[index] = buckets.get(index, 0) + count
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.buckets))
+
+    @classmethod
+    def bucket_value(cls, index: int) -> float:
+        """Representative latency of a bucket, within the relative accuracy of all its values"""
+        return 2 * cls._gamma ** index / (cls._gamma + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'zero_count': self.zero_count,
+                'buckets': {str(index): count for index, count in sorted(self.buckets.items())}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencySketch':
+        sketch = cls()
+        sketch.zero_count = int(data.get('zero_count', 0))
+        sketch.buckets = {int(index): int(count) for index, count in data.get('buckets', {}).items()}
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
+
+
+class _LabelStats:
+    """Requests, errors and latencies of one label within one window"""
+
+    __slots__ = ('requests', 'errors', 'sketch')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.sketch = LatencySketch()
+
+    def merge(self, other: '_LabelStats') -> None:
+        self.requests += other.requests
+        self.errors += other.errors
+        self.sketch.merge(other.sketch)
+
+
+class LiveMetrics:
+    """Rolling per-label metrics over fixed windows of sample time"""
+
+    def __init__(self, window_seconds: float = WINDOW_SECONDS, max_windows: int = MAX_WINDOWS):
+        self.window_ms = int(window_seconds * 1000)
+        self.max_windows = max_windows
+        # Window index -> label -> stats
+        self.windows: Dict[int, Dict[str, _LabelStats]] = {}
+        self.totals: Dict[str, _LabelStats] = {}
+        self.first_ms: Optional[int] = None
+        self.latest_ms: Optional[int] = None
+        self.rows = 0
+        self._stamp_cache: Dict[str, int] = {}
+
+    def add_sample(self, timestamp_ms: int, label: str, elapsed_ms: float, success: bool) -> None:
+        window = self.windows.get(timestamp_ms // self.window_ms)
+        if window is None:
+            window = self.windows[timestamp_ms // self.window_ms] = {}
+            if len(self.windows) > self.max_windows:
+                self._prune()
+        stats = window.get(label)
+        if stats is None:
+            stats = window[label] = _LabelStats()
+        stats.requests += 1
+        stats.sketch.add(elapsed_ms)
+        total = self.totals.get(label)
+        if total is None:
+            total = self.totals[label] = _LabelStats()
+        total.requests += 1
+        total.sketch.add(elapsed_ms)
+        if not success:
+            stats.errors += 1
+            total.errors += 1
+        if self.first_ms is None or timestamp_ms < self.first_ms:
+            self.first_ms = timestamp_ms
+        if self.latest_ms is None or timestamp_ms > self.latest_ms:
+            self.latest_ms = timestamp_ms
+        self.rows += 1
+
+    def add_jtl_segment(self, content: str) -> int:
+        """Add the rows of a CSV JTL segment whose first line is the header; returns rows added"""
+        reader = csv.reader(content.splitlines())
+        header = next(reader, None)
+        if not header:
+            return 0
+        try:
+            ts_col = header.index('timeStamp')
+            elapsed_col = header.index('elapsed')
+            label_col = header.index('label')
+            success_col = header.index('success')
+        except ValueError:
+            logger.warning("Skipping JTL segment without timeStamp, elapsed, label and success columns")
+            return 0
+
+        width = max(ts_col, elapsed_col, label_col, success_col)
+        added = 0
+        for row in reader:
+            if len(row) <= width:
+                continue
+            try:
+                timestamp_ms = self._parse_timestamp(row[ts_col])
+                elapsed_ms = float(row[elapsed_col])
+            except ValueError:
+                continue
+            self.add_sample(timestamp_ms, row[label_col], elapsed_ms, row[success_col].lower() == 'true')
+            added += 1
+        return added
+
+    def _parse_timestamp(self, value: str) -> int:
+        """Epoch milliseconds from a JTL timeStamp (epoch ms or yyyy/MM/dd HH:mm:ss.SSS)"""
+        if value.isdigit():
+            return int(value)
+        seconds_part, _, millis = value.partition('.')
+        base = self._stamp_cache.get(seconds_part)
+        if base is None:
+            if len(self._stamp_cache) > 4096:
+                self._stamp_cache.clear()
+            base = int(time.mktime(datetime.strptime(seconds_part, _TIMESTAMP_FORMAT).timetuple())) * 1000
+            self._stamp_cache[seconds_part] = base
+        return base + int(millis or 0)
+
+    def _prune(self) -> None:
+        for index in sorted(self.windows)[:len(self.windows) - self.max_windows]:
+            del self.windows[index]
+
+    def _recent_windows(self, seconds: float, complete_only: bool = False) -> List[int]:
+        """Indexes of the windows covering the last `seconds` of sample time"""
+        if self.latest_ms is None:
+            return []
+        newest = self.latest_ms // self.window_ms
+        if complete_only:
+            # The newest window is still filling up
+            newest -= 1
+        count = max(1, math.ceil(seconds * 1000 / self.window_ms))
+        return list(range(newest - count + 1, newest + 1))
+
+    def snapshot(self, rolling_seconds: float = 60) -> Dict[str, Any]:
+        """Per-label and overall metrics over the last rolling_seconds, plus totals since the start"""
+        labels: Dict[str, _LabelStats] = {}
+        window_indexes = self._recent_windows(rolling_seconds)
+        for index in window_indexes:
+            for label, stats in self.windows.get(index, {}).items():
+                merged = labels.get(label)
+                if merged is None:
+                    merged = labels[label] = _LabelStats()
+                merged.merge(stats)
+
+        # Sample time covered by the windows, for throughput
+        span_seconds = 1.0
+        if window_indexes:
+            span_start = max(self.first_ms, window_indexes[0] * self.window_ms)
+            span_seconds = (self.latest_ms - span_start) / 1000 or 1.0
+
+        overall = _LabelStats()
+        for stats in labels.values():
+            overall.merge(stats)
+        cumulative = _LabelStats()
+        for stats in self.totals.values():
+            cumulative.merge(stats)
+
+        return {
+            'window_seconds': rolling_seconds,
+            'latest_sample_time': datetime.fromtimestamp(self.latest_ms / 1000).isoformat() if self.latest_ms else None,
+            'elapsed_seconds': round((self.latest_ms - self.first_ms) / 1000, 1) if self.latest_ms else 0,
+            'overall': _describe(overall, span_seconds),
+            'labels': {label: _describe(stats, span_seconds) for label, stats in sorted(labels.items())},
+            'cumulative': _describe(cumulative, None),
+        }
+
+    def evaluate_rules(self, rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Check auto-abort rules against the most recent windows
+
+        A rule such as {"metric": "error_rate", "threshold": 10, "for_seconds": 30}
+        is breached when the test has run for at least for_seconds and the
+        metric is above the threshold in every window of the last for_seconds
+        of sample time (rounded up to whole windows). Optional keys: "label"
+        to watch one label, and "comparison": "below" (e.g. for throughput).
+
+        Returns:
+            Rule results, each with 'breached' and the per-window values
+        """
+        results = []
+        for rule in rules:
+            metric = rule.get('metric', 'error_rate')
+            if metric not in RULE_METRICS:
+                results.append({**rule, 'breached': False, 'error': f"Unknown metric: {metric}"})
+                continue
+            threshold = float(rule.get('threshold', 0))
+            below = rule.get('comparison', 'above') == 'below'
+            label = rule.get('label')
+            for_seconds = float(rule.get('for_seconds', 30))
+            window_indexes = self._recent_windows(for_seconds, metric == 'throughput')
+
+            # Only judge once the test has run for the whole rule period
+            values = []
+            breached = (bool(window_indexes) and self.first_ms // self.window_ms <= window_indexes[0]
+                        and self.latest_ms - self.first_ms >= for_seconds * 1000)
+            for index in window_indexes:
+                stats = _LabelStats()
+                for name, window_stats in self.windows.get(index, {}).items():
+                    if label is None or name == label:
+                        stats.merge(window_stats)
+                value = _rule_value(metric, stats, self.window_ms / 1000)
+                values.append(value)
+                if value is None or (value >= threshold if below else value <= threshold):
+                    breached = False
+            results.append({
+                **rule,
+                'breached': breached,
+                'recent_values': [round(v, 2) if v is not None else None for v in values]
+            })
+        return results
+
+
+def _describe(stats: _LabelStats, span_seconds: Optional[float]) -> Dict[str, Any]:
+    sketch = stats.sketch
+    described = {
+        'requests': stats.requests,
+        'errors': stats.errors,
+        'error_rate': round(stats.errors / stats.requests * 100, 2) if stats.requests else 0,
+        'latency_ms': {
+            'p50': round(sketch.quantile(0.50), 1),
+            'p90': round(sketch.quantile(0.90), 1),
+            'p95': round(sketch.quantile(0.95), 1),
+            'p99': round(sketch.quantile(0.99), 1),
+        },
+    }
+    if span_seconds is not None:
+        described['throughput_rps'] = round(stats.requests / span_seconds, 2)
+    return described
+
+def _rule_value(metric: str, stats: _LabelStats, window_seconds: float) -> Optional[float]:
+    """Value of a rule metric in one window; None when the window holds no samples"""
+    if metric == 'throughput':
+        return stats.requests / window_seconds
+    if not stats.requests:
+        return None
+    if metric == 'error_rate':
+        return stats.errors / stats.requests * 100
+    return stats.sketch.quantile(int(metric[1:]) / 100)
+
+
+class LiveResultsTail:
+    """Reads a session's live JTL segments from S3, fetching only segments not yet seen"""
+
+    def __init__(self, session_id: str, s3_client, bucket_name: str):
+        self.session_id = session_id
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.prefix = f"perf-pipeline/{session_id}/live/"
+        self.metrics = LiveMetrics()
+        # Plan prefix -> last segment key read; segment keys sort in upload order
+        self.cursors: Dict[str, str] = {}
+        self.segments = 0
+        self.aborted: Optional[Dict[str, Any]] = None
+        self.lock = threading.Lock()
+
+    def poll(self) -> int:
+        """Read new segments; returns how many were read"""
+        read = 0
+        for plan_prefix in self._plan_prefixes():
+            kwargs = {'Bucket': self.bucket_name, 'Prefix': plan_prefix}
+            if plan_prefix in self.cursors:
+                kwargs['StartAfter'] = self.cursors[plan_prefix]
+            while True:
+                response = self.s3_client.list_objects_v2(**kwargs)
+                for obj in response.get('Contents', []):
+                    key = obj['Key']
+                    body = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)['Body'].read()
+                    self.metrics.add_jtl_segment(body.decode('utf-8', errors='replace'))
+                    self.cursors[plan_prefix] = key
+                    read += 1
+                if not response.get('IsTruncated'):
+                    break
+                kwargs['ContinuationToken'] = response['NextContinuationToken']
+        self.segments += read
+        return read
+
+    def _plan_prefixes(self) -> List[str]:
+        prefixes = []
+        kwargs = {'Bucket': self.bucket_name, 'Prefix': self.prefix, 'Delimiter': '/'}
+        while True:
+            response = self.s3_client.list_objects_v2(**kwargs)
+            prefixes.extend(p['Prefix'] for p in response.get('CommonPrefixes', []))
+            if not response.get('IsTruncated'):
+                return prefixes
+            kwargs['ContinuationToken'] = response['NextContinuationToken']
+
+
+# Tails of recently queried sessions, so repeat calls only read new segments
+_tails: "OrderedDict[str, LiveResultsTail]" = OrderedDict()
+_tails_lock = threading.Lock()
+
+def _get_tail(session_id: str, s3_client, bucket_name: str) -> LiveResultsTail:
+    with _tails_lock:
+        tail = _tails.get(session_id)
+        if tail is None or tail.s3_client is not s3_client:
+            tail = _tails[session_id] = LiveResultsTail(session_id, s3_client, bucket_name)
+        _tails.move_to_end(session_id)
+        while len(_tails) > MAX_TRACKED_SESSIONS:
+            _tails.popitem(last=False)
+        return tail
+
+def get_live_metrics(session_id: str, s3_client, ecs_client=None, window_seconds: float = 60,
+                     abort_rules: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Rolling metrics of a running test, with optional auto-abort
+
+    Args:
+        session_id: Session ID of the running test
+        s3_client: AWS S3 client
+        ecs_client: AWS ECS client, used to stop the session's tasks when a rule is breached
+        window_seconds: Rolling window for percentiles, error rate and throughput
+        abort_rules: Rules as accepted by LiveMetrics.evaluate_rules
+
+    Returns:
+        Rolling and cumulative metrics per label, rule results and any abort taken
+    """
+    from test_executor import _sanitize_session_id
+
+    try:
+        session_id = _sanitize_session_id(session_id)
+        bucket_name = os.environ.get('S3_BUCKET_NAME')
+        tail = _get_tail(session_id, s3_client, bucket_name)
+
+        with tail.lock:
+            new_segments = tail.poll()
+            result = {
+                'session_id': session_id,
+                'status': 'live' if tail.metrics.rows else 'no_data',
+                'segments_read': tail.segments,
+                'new_segments': new_segments,
+                'rows_read': tail.metrics.rows,
+                **tail.metrics.snapshot(window_seconds),
+            }
+
+            if abort_rules:
+                rule_results = tail.metrics.evaluate_rules(abort_rules)
+                result['abort_rules'] = rule_results
+                breached = [r for r in rule_results if r['breached']]
+                if breached and tail.aborted is None:
+                    reason = "Auto-abort: " + "; ".join(
+                        f"{r.get('metric', 'error_rate')} {r.get('comparison', 'above')} {r.get('threshold')} "
+                        f"for {r.get('for_seconds', 30)}s" for r in breached)
+                    tail.aborted = _abort_session(session_id, reason, s3_client, ecs_client, bucket_name)
+            if tail.aborted is not None:
+                result['status'] = 'aborted'
+                result['abort'] = tail.aborted
+
+        return result
+
+    except Exception as e:
+        logger.error(f"Error getting live metrics: {str(e)}")
+        return {
+            'session_id': session_id,
+            'status': 'error',
+            'error': str(e)
+        }
+
+def _abort_session(session_id: str, reason: str, s3_client, ecs_client, bucket_name: str) -> Dict[str, Any]:
+    """Stop the ECS tasks started for a session and record the abort next to its results"""
+    stopped = []
+    errors = []
+    if ecs_client is not None:
+        try:
+            response = s3_client.get_object(Bucket=bucket_name, Key=f"perf-pipeline/{session_id}/execution_results.json")
+            execution = json.loads(response['Body'].read()).get('execution', {})
+        except Exception as e:
+            execution = {}
+            errors.append(f"Could not load execution details: {str(e)}")
+
+        for task in execution.get('running_tasks', []):
+            if not task.get('task_arn'):
+                continue
+            try:
+                ecs_client.stop_task(cluster=execution.get('cluster_name'), task=task['task_arn'], reason=reason[:255])
+                stopped.append(task['task_arn'])
+            except Exception as e:
+                errors.append(f"{task['task_arn']}: {str(e)}")
+
+    abort = {'reason': reason, 'stopped_tasks': stopped, 'errors': errors, 'timestamp': time.time()}
+    try:
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=f"perf-pipeline/{session_id}/abort.json",
+            Body=json.dumps(abort, indent=2),
+            ContentType='application/json'
+        )
+    except Exception as e:
+        logger.warning(f"Could not record abort for {session_id}: {str(e)}")
+    logger.warning(f"{reason} - stopped {len(stopped)} tasks for session {session_id}")
+    return abort
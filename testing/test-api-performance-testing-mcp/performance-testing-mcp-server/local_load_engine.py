@@ -0,0 +1,1186 @@
+"""
+Local Load Engine Module
+Executes generated test plans with asyncio/aiohttp, without JMeter or ECS
+
+Reads JMX plans (including those from _generate_jmx_fallback) and the Java
+test plans produced by generate_plans from the JMeter traditional API
+template. Runs thread groups closed-model (virtual users looping through
+the samplers) or open-model (iterations arriving at a target rate), and
+writes CSV JTL files in the format the ECS runner produces, so
+results_analyzer can analyze local runs unchanged.
+
+Latencies are also recorded corrected for coordinated omission: in the
+open model each iteration is measured from when it was scheduled to start,
+not from when a free virtual user got to it; in the closed model a response
+slower than the think time is back-filled with the samples the virtual user
+would have sent meanwhile.
+
+Usage:
+    python local_load_engine.py PLAN [--host localhost] [--port 8080] [--users N]
+        [--duration SECONDS] [--ramp-up SECONDS] [--target-rps RPS] [--output results.jtl]
+        [--abort-rules '[{"metric": "error_rate", "threshold": 10, "for_seconds": 30}]']
+    python local_load_engine.py --self-benchmark [--seconds 5] [--users 64]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import re
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from live_metrics import LiveMetrics
+
+logger = logging.getLogger(__name__)
+
+# Columns of the CSV result files, in the order the ECS JMeter runner writes them
+JTL_FIELDS = [
+    'timeStamp', 'elapsed', 'label', 'responseCode', 'responseMessage', 'threadName',
+    'dataType', 'success', 'failureMessage', 'bytes', 'sentBytes', 'grpThreads',
+    'allThreads', 'URL', 'Latency', 'IdleTime', 'Connect'
+]
+
+# Rows buffered before a write to the JTL file
+JTL_FLUSH_ROWS = 2048
+
+# Used when a plan runs forever (no scheduler, infinite loops) and no duration is given
+DEFAULT_DURATION_SECONDS = 60
+
+# How often new rows are handed on as a live segment, matching the ECS runner's default
+LIVE_SEGMENT_SECONDS = float(os.environ.get('LIVE_SEGMENT_SECONDS', '10'))
+
+# JMeter ResponseAssertion test_type bits
+ASSERT_MATCHES = 1
+ASSERT_CONTAINS = 2
+ASSERT_NOT = 4
+ASSERT_EQUALS = 8
+ASSERT_SUBSTRING = 16
+ASSERT_OR = 32
+
+TIMER_TAGS = ('ConstantTimer', 'UniformRandomTimer', 'GaussianRandomTimer')
+THREAD_GROUP_TAGS = ('ThreadGroup', 'SetupThreadGroup', 'PostThreadGroup')
+
+_PROPERTY_REF = re.compile(r'\$\{__P(?:roperty)?\(([^,)]+)(?:,([^)]*))?\)\}')
+_VARIABLE_REF = re.compile(r'\$\{([\w.]+)\}')
+
+
+# ---------------------------------------------------------------------------
+# Plan parsing
+# ---------------------------------------------------------------------------
+
+def load_plan(content: str, filename: str = '', properties: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Parse a test plan into thread groups and samplers
+
+    Args:
+        content: JMX XML or Java test plan source
+        filename: Plan file name, used for the plan name and to pick the format
+        properties: JMeter properties (-J), e.g. target.host and target.port
+
+    Returns:
+        Plan dictionary with name and thread_groups
+    """
+    properties = properties or {}
+    name = os.path.splitext(os.path.basename(filename))[0] if filename else 'test_plan'
+
+    if filename.endswith('.jmx') or content.lstrip().startswith('<'):
+        plan = _parse_jmx(content, properties)
+    elif filename.endswith('.java') or 'HTTPSamplerProxy' in content:
+        plan = _parse_java_plan(content, properties)
+    else:
+        raise ValueError(f"Unrecognized test plan format: {filename or 'content'}")
+
+    plan['name'] = name
+    if not plan['thread_groups']:
+        raise ValueError(f"No thread groups with HTTP samplers found in {filename or 'plan'}")
+    return plan
+
+def _parse_jmx(content: str, properties: Dict[str, str]) -> Dict[str, Any]:
+    """Parse a JMX test plan"""
+    root = ET.fromstring(content)
+    top = root.find('hashTree')
+    if top is None:
+        raise ValueError("JMX plan has no hashTree")
+
+    context = {'variables': {}, 'properties': properties, 'thread_groups': []}
+    _walk_jmx_tree(top, _empty_scope(), None, context)
+    return {'thread_groups': [g for g in context['thread_groups'] if g['samplers']]}
+
+def _empty_scope() -> Dict[str, Any]:
+    return {'headers': {}, 'timers': [], 'assertions': [], 'defaults': {}, 'target_rps': None}
+
+def _jmx_children(tree: ET.Element) -> List[Tuple[ET.Element, Optional[ET.Element]]]:
+    """Pair each test element in a hashTree with the hashTree holding its children"""
+    pairs = []
+    children = list(tree)
+    i = 0
+    while i < len(children):
+        element = children[i]
+        subtree = None
+        if i + 1 < len(children) and children[i + 1].tag == 'hashTree':
+            subtree = children[i + 1]
+            i += 1
+        i += 1
+        if element.tag != 'hashTree' and element.get('enabled', 'true') != 'false':
+            pairs.append((element, subtree))
+    return pairs
+
+def _walk_jmx_tree(tree: ET.Element, inherited: Dict[str, Any], group: Optional[Dict[str, Any]],
+                   context: Dict[str, Any]) -> None:
+    """Collect samplers under a hashTree, applying config elements by JMeter scoping rules"""
+    pairs = _jmx_children(tree)
+
+    # Config elements, timers and assertions apply to every sampler at this level and below
+    scope = {
+        'headers': dict(inherited['headers']),
+        'timers': list(inherited['timers']),
+        'assertions': list(inherited['assertions']),
+        'defaults': dict(inherited['defaults']),
+        'target_rps': inherited['target_rps'],
+    }
+    for element, _ in pairs:
+        _apply_scoped_element(element, scope, context)
+    if group is not None and group['target_rps'] is None:
+        group['target_rps'] = scope['target_rps']
+
+    for element, subtree in pairs:
+        tag = element.tag
+        if tag == 'TestPlan':
+            _collect_arguments(_find_prop(element, 'TestPlan.user_defined_variables'), context)
+            if subtree is not None:
+                _walk_jmx_tree(subtree, scope, group, context)
+        elif tag in THREAD_GROUP_TAGS:
+            new_group = _parse_jmx_thread_group(element, context)
+            context['thread_groups'].append(new_group)
+            if subtree is not None:
+                _walk_jmx_tree(subtree, scope, new_group, context)
+        elif tag == 'HTTPSamplerProxy':
+            if group is None:
+                continue
+            sampler_scope = scope
+            if subtree is not None:
+                # Children of a sampler apply to that sampler only
+                sampler_scope = {
+                    'headers': dict(scope['headers']),
+                    'timers': list(scope['timers']),
+                    'assertions': list(scope['assertions']),
+                    'defaults': scope['defaults'],
+                    'target_rps': scope['target_rps'],
+                }
+                for child, _ in _jmx_children(subtree):
+                    _apply_scoped_element(child, sampler_scope, context)
+                if group['target_rps'] is None:
+                    group['target_rps'] = sampler_scope['target_rps']
+            group['samplers'].append(_parse_jmx_sampler(element, sampler_scope, context))
+        elif subtree is not None and tag not in ('ResultCollector', 'BackendListener'):
+            # Logic controllers: run their samplers in order as part of the parent
+            _walk_jmx_tree(subtree, scope, group, context)
+
+def _apply_scoped_element(element: ET.Element, scope: Dict[str, Any], context: Dict[str, Any]) -> None:
+    """Add a config element, timer or assertion to a scope"""
+    tag = element.tag
+    if tag == 'HeaderManager':
+        collection = _find_prop(element, 'HeaderManager.headers')
+        for header in _collection_items(collection):
+            name = _substitute(_prop(header, 'Header.name'), context)
+            if name:
+                scope['headers'][name] = _substitute(_prop(header, 'Header.value'), context)
+    elif tag in TIMER_TAGS:
+        delay = _to_float(_substitute(_prop(element, 'ConstantTimer.delay'), context), 0.0)
+        spread = _to_float(_substitute(_prop(element, 'RandomTimer.range'), context), 0.0)
+        kind = 'gaussian' if tag == 'GaussianRandomTimer' else 'uniform'
+        scope['timers'].append({'constant_ms': delay, 'random_ms': spread, 'kind': kind})
+    elif tag == 'ConstantThroughputTimer':
+        per_minute = _to_float(_substitute(_prop(element, 'throughput'), context), 0.0)
+        if per_minute > 0:
+            scope['target_rps'] = per_minute / 60.0
+    elif tag == 'ResponseAssertion':
+        strings = [_substitute(item.text or '', context)
+                   for item in _collection_items(_find_prop(element, 'Asserion.test_strings'), raw=True)]
+        scope['assertions'].append({
+            'type': 'response',
+            'field': _prop(element, 'Assertion.test_field') or 'Assertion.response_data',
+            'test_type': int(_to_float(_prop(element, 'Assertion.test_type'), ASSERT_SUBSTRING)),
+            'strings': strings,
+            'custom_message': _prop(element, 'Assertion.custom_message'),
+            'assume_success': _prop(element, 'Assertion.assume_success') == 'true',
+        })
+    elif tag == 'DurationAssertion':
+        scope['assertions'].append({
+            'type': 'duration',
+            'max_ms': _to_float(_substitute(_prop(element, 'DurationAssertion.duration'), context), 0.0),
+        })
+    elif tag == 'ConfigTestElement':
+        for key in ('domain', 'port', 'protocol', 'path'):
+            value = _prop(element, f'HTTPSampler.{key}')
+            if value:
+                scope['defaults'][key] = _substitute(value, context)
+    elif tag == 'Arguments':
+        _collect_arguments(element, context)
+
+def _parse_jmx_thread_group(element: ET.Element, context: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a ThreadGroup element"""
+    loops = -1
+    controller = _find_prop(element, 'ThreadGroup.main_controller')
+    if controller is not None:
+        if _prop(controller, 'LoopController.continue_forever') == 'true':
+            loops = -1
+        else:
+            loops = int(_to_float(_substitute(_prop(controller, 'LoopController.loops'), context), -1))
+
+    scheduler = _prop(element, 'ThreadGroup.scheduler') == 'true'
+    duration = _to_float(_substitute(_prop(element, 'ThreadGroup.duration'), context), 0.0)
+
+    return {
+        'name': element.get('testname') or 'Thread Group',
+        'num_threads': max(1, int(_to_float(_substitute(_prop(element, 'ThreadGroup.num_threads'), context), 1))),
+        'ramp_up': _to_float(_substitute(_prop(element, 'ThreadGroup.ramp_time'), context), 0.0),
+        'duration': duration if scheduler and duration > 0 else None,
+        'delay': _to_float(_substitute(_prop(element, 'ThreadGroup.delay'), context), 0.0) if scheduler else 0.0,
+        'loops': loops,
+        'target_rps': None,
+        'samplers': [],
+    }
+
+def _parse_jmx_sampler(element: ET.Element, scope: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse an HTTPSamplerProxy element with the scope that applies to it"""
+    defaults = scope['defaults']
+
+    def field(key: str, default: str = '') -> str:
+        value = _substitute(_prop(element, f'HTTPSampler.{key}'), context)
+        return value if value else defaults.get(key, default)
+
+    arguments = []
+    for argument in _collection_items(_find_prop(_find_prop(element, 'HTTPsampler.Arguments'), 'Arguments.arguments')):
+        arguments.append((
+            _substitute(_prop(argument, 'Argument.name'), context),
+            _substitute(_prop(argument, 'Argument.value'), context),
+        ))
+
+    method = (field('method', 'GET') or 'GET').upper()
+    body = None
+    params = []
+    if _prop(element, 'HTTPSampler.postBodyRaw') == 'true':
+        body = ''.join(value for _, value in arguments)
+    elif method in ('POST', 'PUT', 'PATCH'):
+        body = '&'.join(f"{name}={value}" for name, value in arguments) or None
+    else:
+        params = [(name, value) for name, value in arguments if name]
+
+    return _build_sampler(
+        name=element.get('testname') or field('path', '/'),
+        method=method,
+        protocol=field('protocol', 'http') or 'http',
+        domain=field('domain', _property_default(context, 'target.host', 'localhost')),
+        port=field('port'),
+        path=field('path', '/'),
+        params=params,
+        body=body,
+        headers=scope['headers'],
+        timers=scope['timers'],
+        assertions=scope['assertions'],
+        follow_redirects=_prop(element, 'HTTPSampler.follow_redirects') != 'false',
+        keepalive=_prop(element, 'HTTPSampler.use_keepalive') != 'false',
+        connect_timeout_ms=_to_float(field('connect_timeout'), 0.0),
+        response_timeout_ms=_to_float(field('response_timeout'), 0.0),
+    )
+
+def _parse_java_plan(content: str, properties: Dict[str, str]) -> Dict[str, Any]:
+    """Parse a Java plan written against the JMeter traditional API template"""
+    context = {'variables': {}, 'properties': properties, 'thread_groups': []}
+
+    # String variables such as targetHost = System.getProperty("target.host", "localhost")
+    java_vars = {}
+    for var, prop, default in re.findall(
+            r'String\s+(\w+)\s*=\s*System\.getProperty\(\s*"([^"]+)"\s*(?:,\s*"([^"]*)")?\s*\)', content):
+        java_vars[var] = properties.get(prop, default)
+
+    def call_arg(var: str, method: str) -> Optional[str]:
+        match = re.search(rf'\b{re.escape(var)}\.{method}\(\s*(.*?)\s*\);', content)
+        return match.group(1) if match else None
+
+    def java_value(expression: Optional[str]) -> Optional[str]:
+        if expression is None:
+            return None
+        literal = re.fullmatch(r'"(.*)"', expression)
+        if literal:
+            return literal.group(1)
+        parsed = re.fullmatch(r'Integer\.parseInt\((\w+)\)', expression)
+        if parsed:
+            return java_vars.get(parsed.group(1))
+        return java_vars.get(expression, expression)
+
+    groups = {}
+    for var in re.findall(r'ThreadGroup\s+(\w+)\s*=\s*new\s+ThreadGroup\(', content):
+        loops = -1
+        loop_var = re.search(rf'{re.escape(var)}\.setSamplerController\((\w+)\)', content)
+        if loop_var:
+            loops = int(_to_float(java_value(call_arg(loop_var.group(1), 'setLoops')), -1))
+        scheduler = (call_arg(var, 'setScheduler') or 'false') == 'true'
+        duration = _to_float(java_value(call_arg(var, 'setDuration')), 0.0)
+        groups[var] = {
+            'name': java_value(call_arg(var, 'setName')) or 'Thread Group',
+            'num_threads': max(1, int(_to_float(java_value(call_arg(var, 'setNumThreads')), 1))),
+            'ramp_up': _to_float(java_value(call_arg(var, 'setRampUp')), 0.0),
+            'duration': duration if duration > 0 and (scheduler or loops < 0) else None,
+            'delay': 0.0,
+            'loops': loops,
+            'target_rps': None,
+            'samplers': [],
+        }
+
+    # Headers and timers added to a thread group apply to all its samplers
+    group_headers = {var: {} for var in groups}
+    group_timers = {var: [] for var in groups}
+    for manager in re.findall(r'HeaderManager\s+(\w+)\s*=\s*new\s+HeaderManager\(', content):
+        headers = dict(re.findall(
+            rf'{re.escape(manager)}\.add\(\s*new\s+Header\(\s*"([^"]*)"\s*,\s*"([^"]*)"\s*\)\s*\)', content))
+        for var in _java_tree_parents(content, manager, groups):
+            group_headers[var].update(headers)
+    for timer in re.findall(r'ConstantTimer\s+(\w+)\s*=\s*new\s+ConstantTimer\(', content):
+        delay = _to_float(java_value(call_arg(timer, 'setDelay')), 0.0)
+        for var in _java_tree_parents(content, timer, groups):
+            group_timers[var].append({'constant_ms': delay, 'random_ms': 0.0, 'kind': 'uniform'})
+
+    for sampler_var in re.findall(r'HTTPSamplerProxy\s+(\w+)\s*=\s*new\s+HTTPSamplerProxy\(', content):
+        parents = _java_tree_parents(content, sampler_var, groups) or list(groups)[:1]
+        for var in parents:
+            groups[var]['samplers'].append(_build_sampler(
+                name=java_value(call_arg(sampler_var, 'setName')) or java_value(call_arg(sampler_var, 'setPath')) or '/',
+                method=(java_value(call_arg(sampler_var, 'setMethod')) or 'GET').upper(),
+                protocol=java_value(call_arg(sampler_var, 'setProtocol')) or 'http',
+                domain=java_value(call_arg(sampler_var, 'setDomain')) or _property_default(context, 'target.host', 'localhost'),
+                port=java_value(call_arg(sampler_var, 'setPort')) or '',
+                path=java_value(call_arg(sampler_var, 'setPath')) or '/',
+                params=[],
+                body=None,
+                headers=group_headers[var],
+                timers=group_timers[var],
+                assertions=[],
+                follow_redirects=(call_arg(sampler_var, 'setFollowRedirects') or 'true') != 'false',
+                keepalive=(call_arg(sampler_var, 'setUseKeepAlive') or 'true') != 'false',
+                connect_timeout_ms=0.0,
+                response_timeout_ms=0.0,
+            ))
+
+    return {'thread_groups': [g for g in groups.values() if g['samplers']]}
+
+def _java_tree_parents(content: str, child: str, groups: Dict[str, Any]) -> List[str]:
+    """Thread group variables a Java plan adds an element to via testPlanTree.add(group, child)"""
+    parents = re.findall(rf'\.add\(\s*(\w+)\s*,\s*{re.escape(child)}\s*\)', content)
+    return [parent for parent in parents if parent in groups]
+
+def _build_sampler(name: str, method: str, protocol: str, domain: str, port: str, path: str,
+                   params: List[Tuple[str, str]], body: Optional[str], headers: Dict[str, str],
+                   timers: List[Dict[str, Any]], assertions: List[Dict[str, Any]], follow_redirects: bool,
+                   keepalive: bool, connect_timeout_ms: float, response_timeout_ms: float) -> Dict[str, Any]:
+    return {
+        'name': name,
+        'method': method,
+        'protocol': protocol.lower(),
+        'domain': domain,
+        'port': str(port or ''),
+        'path': path if path.startswith(('/', 'http://', 'https://')) else f"/{path}",
+        'params': params,
+        'body': body,
+        'headers': dict(headers),
+        'timers': list(timers),
+        'assertions': list(assertions),
+        'follow_redirects': follow_redirects,
+        'keepalive': keepalive,
+        'connect_timeout_ms': connect_timeout_ms,
+        'response_timeout_ms': response_timeout_ms,
+    }
+
+def _property_default(context: Dict[str, Any], name: str, default: str) -> str:
+    """Value of a JMeter property from the run, or a default"""
+    return context['properties'].get(name, default)
+
+def _find_prop(element: Optional[ET.Element], name: str) -> Optional[ET.Element]:
+    if element is None:
+        return None
+    for child in element:
+        if child.get('name') == name:
+            return child
+    return None
+
+def _prop(element: Optional[ET.Element], name: str) -> str:
+    prop = _find_prop(element, name)
+    return (prop.text or '').strip() if prop is not None else ''
+
+def _collection_items(collection: Optional[ET.Element], raw: bool = False) -> List[ET.Element]:
+    """Items of a collectionProp: elementProps, or any props when raw"""
+    if collection is None:
+        return []
+    if collection.tag == 'elementProp':
+        collection = collection.find('collectionProp')
+        if collection is None:
+            return []
+    return [item for item in collection if raw or item.tag == 'elementProp']
+
+def _collect_arguments(element: Optional[ET.Element], context: Dict[str, Any]) -> None:
+    """Add User Defined Variables to the variable context"""
+    for argument in _collection_items(_find_prop(element, 'Arguments.arguments')):
+        name = _prop(argument, 'Argument.name')
+        if name:
+            context['variables'][name] = _substitute(_prop(argument, 'Argument.value'), context)
+
+def _substitute(value: str, context: Dict[str, Any]) -> str:
+    """Resolve ${__P(name,default)} properties and ${name} variables"""
+    if not value or '${' not in value:
+        return value
+    properties = context['properties']
+    variables = context['variables']
+    for _ in range(3):
+        previous = value
+        value = _PROPERTY_REF.sub(lambda m: properties.get(m.group(1).strip(), m.group(2) or ''), value)
+        value = _VARIABLE_REF.sub(lambda m: variables.get(m.group(1), m.group(0)), value)
+        if value == previous:
+            break
+    return value
+
+def _to_float(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+# ---------------------------------------------------------------------------
+# Latency recording
+# ---------------------------------------------------------------------------
+
+class LatencyHistogram:
+    """Latency counts per whole millisecond; memory grows with the spread of values, not the sample count"""
+
+    __slots__ = ('counts', 'total', 'sum_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum_ms = 0
+        self.max_ms = 0
+
+    def record(self, value_ms: int, count: int = 1) -> None:
+        self.counts[value_ms] = self.counts.get(value_ms, 0) + count
+        self.total += count
+        self.sum_ms += value_ms * count
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def record_corrected(self, value_ms: int, expected_interval_ms: int) -> None:
+        """Record a value, back-filling the samples a stalled closed-loop sender would have taken"""
+        self.record(value_ms)
+        if expected_interval_ms <= 0:
+            return
+        missing = value_ms - expected_interval_ms
+        while missing >= expected_interval_ms:
+            self.record(missing)
+            missing -= expected_interval_ms
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for value, count in other.counts.items():
+            self.record(value, count)
+
+    def percentile(self, percent: float) -> int:
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(self.total * percent / 100.0))
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= rank:
+                return value
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.total,
+            'mean': round(self.sum_ms / self.total, 2) if self.total else 0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max_ms,
+        }
+
+
+class JtlWriter:
+    """Buffered CSV JTL writer matching the ECS runner's jmeter.properties"""
+
+    def __init__(self, path: Optional[str], segments: bool = False):
+        """
+        Args:
+            path: JTL file to write, or None
+            segments: Also keep rows for take_segment, for live metrics
+        """
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8') if path else None
+        self._rows: List[str] = []
+        self._segment: Optional[List[str]] = [] if segments else None
+        self._second = -1
+        self._stamp = ''
+        if self._file:
+            self._file.write(','.join(JTL_FIELDS) + '\n')
+
+    def write(self, timestamp: float, elapsed_ms: int, label: str, code: str, message: str,
+              thread_name: str, success: bool, failure: str, received: int, sent: int,
+              group_threads: int, all_threads: int, url: str, latency_ms: int) -> None:
+        if self._file is None and self._segment is None:
+            return
+        # Same timestamp_format as jmeter.properties: yyyy/MM/dd HH:mm:ss.SSS
+        millis = int(timestamp * 1000)
+        second = millis // 1000
+        if second != self._second:
+            self._second = second
+            self._stamp = time.strftime('%Y/%m/%d %H:%M:%S', time.localtime(second))
+        row = (
+            f"{self._stamp}.{millis % 1000:03d},{elapsed_ms},{label},{code},{message},{thread_name},"
+            f"text,{'true' if success else 'false'},{failure},{received},{sent},{group_threads},"
+            f"{all_threads},{url},{latency_ms},0,0\n"
+        )
+        if self._segment is not None:
+            self._segment.append(row)
+        if self._file is not None:
+            self._rows.append(row)
+            if len(self._rows) >= JTL_FLUSH_ROWS:
+                self.flush()
+
+    def flush(self) -> None:
+        if self._file is not None and self._rows:
+            self._file.write(''.join(self._rows))
+            self._rows.clear()
+
+    def take_segment(self) -> Optional[str]:
+        """Rows written since the last call, with the header line, or None if there are none"""
+        if not self._segment:
+            return None
+        segment = ','.join(JTL_FIELDS) + '\n' + ''.join(self._segment)
+        self._segment.clear()
+        return segment
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+def _csv_safe(text: str) -> str:
+    """results_analyzer splits rows on commas, so keep delimiters out of free-text fields"""
+    if not text:
+        return ''
+    return text.replace(',', ';').replace('\r', ' ').replace('\n', ' ')
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+class _PreparedSampler:
+    """Sampler fields resolved once before the run"""
+
+    __slots__ = ('label', 'method', 'url', 'jtl_url', 'params', 'body', 'sent_bytes', 'headers', 'timers',
+                 'think_ms', 'assertions', 'needs_body_text', 'assume_success', 'follow_redirects', 'timeout')
+
+    def __init__(self, sampler: Dict[str, Any], overrides: Dict[str, Any]):
+        protocol = overrides.get('protocol') or sampler['protocol'] or 'http'
+        domain = overrides.get('host') or sampler['domain'] or 'localhost'
+        port = str(overrides.get('port') or sampler['port'] or '')
+        path = sampler['path']
+        if path.startswith(('http://', 'https://')):
+            self.url = path
+        else:
+            netloc = f"{domain}:{port}" if port else domain
+            self.url = f"{protocol}://{netloc}{path}"
+        self.jtl_url = _csv_safe(self.url)
+        self.label = _csv_safe(sampler['name'])
+        self.method = sampler['method']
+        self.params = sampler['params'] or None
+        self.body = sampler['body'].encode('utf-8') if sampler['body'] else None
+        self.sent_bytes = len(self.body) if self.body else 0
+        self.headers = dict(sampler['headers'])
+        if not sampler['keepalive']:
+            self.headers['Connection'] = 'close'
+        self.timers = sampler['timers']
+        self.think_ms = sum(t['constant_ms'] + (t['random_ms'] / 2 if t['kind'] == 'uniform' else 0)
+                            for t in self.timers)
+        self.assertions = sampler['assertions']
+        self.needs_body_text = any(a['type'] == 'response' and a['field'] == 'Assertion.response_data'
+                                   for a in self.assertions)
+        # "Ignore Status" on a response assertion: HTTP errors alone do not fail the sample
+        self.assume_success = any(a.get('assume_success') for a in self.assertions)
+        self.follow_redirects = sampler['follow_redirects']
+        self.timeout = None
+        if sampler['connect_timeout_ms'] or sampler['response_timeout_ms']:
+            self.timeout = aiohttp.ClientTimeout(
+                total=(sampler['response_timeout_ms'] or 0) / 1000 or None,
+                connect=(sampler['connect_timeout_ms'] or 0) / 1000 or None,
+            )
+
+    def think_time(self) -> float:
+        """Seconds to wait before this sampler, summing the timers in scope"""
+        if not self.timers:
+            return 0.0
+        total_ms = 0.0
+        for timer in self.timers:
+            if timer['kind'] == 'gaussian':
+                total_ms += max(0.0, timer['constant_ms'] + random.gauss(0.0, timer['random_ms']))
+            else:
+                total_ms += timer['constant_ms'] + random.uniform(0.0, timer['random_ms'])
+        return total_ms / 1000.0
+
+
+class _GroupRun:
+    """Run state of one thread group"""
+
+    __slots__ = ('name', 'samplers', 'num_threads', 'ramp_up', 'delay', 'loops', 'target_rps',
+                 'active', 'end_at')
+
+    def __init__(self, group: Dict[str, Any], overrides: Dict[str, Any]):
+        self.name = group['name']
+        self.samplers = [_PreparedSampler(s, overrides) for s in group['samplers']]
+        self.num_threads = int(overrides.get('users') or group['num_threads'])
+        self.ramp_up = float(overrides['ramp_up'] if overrides.get('ramp_up') is not None else group['ramp_up'])
+        self.delay = group['delay']
+        self.loops = group['loops']
+        self.target_rps = overrides.get('target_rps') or group['target_rps']
+        self.active = 0
+        duration = overrides.get('duration') or group['duration']
+        if duration is None and self.loops < 0:
+            duration = DEFAULT_DURATION_SECONDS
+        self.end_at = duration
+
+
+class _LoadRun:
+    """Executes the thread groups of a plan and records every sample"""
+
+    def __init__(self, plan: Dict[str, Any], writer: JtlWriter, overrides: Dict[str, Any],
+                 segment_sink: Optional[Callable[[int, str], None]] = None,
+                 segment_seconds: float = LIVE_SEGMENT_SECONDS,
+                 abort_rules: Optional[List[Dict[str, Any]]] = None):
+        self.groups = [_GroupRun(g, overrides) for g in plan['thread_groups']]
+        self.writer = writer
+        self.max_connections = overrides.get('max_connections')
+        self.all_active = 0
+        self.raw = {}
+        self.corrected = {}
+        self.errors = 0
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.t0 = 0.0
+        self.segment_sink = segment_sink
+        self.segment_seconds = segment_seconds
+        self.segments = 0
+        self.abort_rules = abort_rules
+        self.live = LiveMetrics() if abort_rules else None
+        self.aborted: Optional[str] = None
+
+    async def run(self) -> float:
+        self.loop = asyncio.get_running_loop()
+        limit = self.max_connections or sum(g.num_threads for g in self.groups)
+        connector = aiohttp.TCPConnector(limit=limit, limit_per_host=0, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         cookie_jar=aiohttp.DummyCookieJar(),
+                                         skip_auto_headers=('User-Agent',)) as session:
+            self.session = session
+            self.t0 = self.loop.time()
+            for group in self.groups:
+                # Convert relative end times to loop times
+                if group.end_at is not None:
+                    group.end_at = self.t0 + group.delay + group.end_at
+            tasks = []
+            for group in self.groups:
+                if group.target_rps:
+                    tasks.extend(self._open_model_workers(group))
+                else:
+                    tasks.extend(self._closed_model_users(group))
+            streaming = None
+            if self.segment_sink is not None or self.live is not None:
+                streaming = asyncio.ensure_future(self._stream_segments())
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                if streaming is not None:
+                    streaming.cancel()
+            if streaming is not None:
+                await self._emit_segment()
+        self.writer.flush()
+        return self.loop.time() - self.t0
+
+    # Live segments and auto-abort
+
+    async def _stream_segments(self) -> None:
+        while True:
+            await asyncio.sleep(self.segment_seconds)
+            await self._emit_segment()
+
+    async def _emit_segment(self) -> None:
+        """Hand new rows to the sink and stop the run if an abort rule is breached"""
+        segment = self.writer.take_segment()
+        if segment is None:
+            return
+        if self.segment_sink is not None:
+            try:
+                await self.loop.run_in_executor(None, self.segment_sink, self.segments, segment)
+                self.segments += 1
+            except Exception as e:
+                # Live segments are a convenience; the run and its final results go on without them
+                logger.warning(f"Live segment upload failed, no more segments will be sent for this run: {e}")
+                self.segment_sink = None
+        if self.live is not None and self.aborted is None:
+            self.live.add_jtl_segment(segment)
+            breached = [r for r in self.live.evaluate_rules(self.abort_rules) if r['breached']]
+            if breached:
+                self.abort("Auto-abort: " + "; ".join(
+                    f"{r.get('metric', 'error_rate')} {r.get('comparison', 'above')} {r.get('threshold')} "
+                    f"for {r.get('for_seconds', 30)}s" for r in breached))
+
+    def abort(self, reason: str) -> None:
+        """End every thread group now; virtual users stop before their next sample"""
+        self.aborted = reason
+        logger.warning(f"{reason} - stopping run")
+        now = self.loop.time()
+        for group in self.groups:
+            group.end_at = now
+
+    # Closed model: each virtual user loops through the samplers
+
+    def _closed_model_users(self, group: _GroupRun) -> List[Any]:
+        step = group.ramp_up / group.num_threads if group.num_threads else 0.0
+        return [self._virtual_user(group, i, self.t0 + group.delay + i * step) for i in range(group.num_threads)]
+
+    async def _virtual_user(self, group: _GroupRun, index: int, start_at: float) -> None:
+        await self._sleep_until(start_at)
+        if group.end_at is not None and self.loop.time() >= group.end_at:
+            return
+        thread_name = f"{group.name} 1-{index + 1}"
+        group.active += 1
+        self.all_active += 1
+        try:
+            iteration = 0
+            while group.loops < 0 or iteration < group.loops:
+                if not await self._run_iteration(group, thread_name, None):
+                    break
+                iteration += 1
+        finally:
+            group.active -= 1
+            self.all_active -= 1
+
+    # Open model: iterations arrive at the target rate; virtual users are the concurrency limit
+
+    def _open_model_workers(self, group: _GroupRun) -> List[Any]:
+        arrivals = itertools.count()
+        return [self._arrival_worker(group, i, arrivals) for i in range(group.num_threads)]
+
+    def _arrival_offset(self, group: _GroupRun, n: int) -> float:
+        """Seconds from group start to the nth arrival, with the rate ramping up linearly over ramp_up"""
+        rate = group.target_rps
+        ramp = group.ramp_up
+        if ramp > 0 and n < rate * ramp / 2:
+            return math.sqrt(2 * ramp * n / rate)
+        return n / rate + ramp / 2
+
+    async def _arrival_worker(self, group: _GroupRun, index: int, arrivals) -> None:
+        thread_name = f"{group.name} 1-{index + 1}"
+        start = self.t0 + group.delay
+        while True:
+            n = next(arrivals)
+            if group.loops >= 0 and n >= group.loops * group.num_threads:
+                return
+            intended = start + self._arrival_offset(group, n)
+            if group.end_at is not None and intended >= group.end_at:
+                return
+            await self._sleep_until(intended)
+            group.active += 1
+            self.all_active += 1
+            try:
+                if not await self._run_iteration(group, thread_name, intended):
+                    return
+            finally:
+                group.active -= 1
+                self.all_active -= 1
+
+    async def _run_iteration(self, group: _GroupRun, thread_name: str, intended: Optional[float]) -> bool:
+        """Run the samplers once; returns False once the group's duration is over"""
+        # How late the iteration started against its schedule (open model only)
+        lateness_ms = int((self.loop.time() - intended) * 1000) if intended is not None else 0
+        for sampler in group.samplers:
+            think = sampler.think_time()
+            if think:
+                await asyncio.sleep(think)
+            if group.end_at is not None and self.loop.time() >= group.end_at:
+                return False
+            elapsed_ms = await self._sample(group, sampler, thread_name)
+            corrected = self.corrected.get(sampler.label)
+            if corrected is None:
+                corrected = self.corrected[sampler.label] = LatencyHistogram()
+                self.raw[sampler.label] = LatencyHistogram()
+            self.raw[sampler.label].record(elapsed_ms)
+            if intended is not None:
+                corrected.record(elapsed_ms + lateness_ms)
+            else:
+                corrected.record_corrected(elapsed_ms, int(sampler.think_ms))
+        return True
+
+    async def _sample(self, group: _GroupRun, sampler: _PreparedSampler, thread_name: str) -> int:
+        """Send one request and write its JTL row; returns the elapsed milliseconds"""
+        timestamp = time.time()
+        started = time.perf_counter()
+        latency_ms = 0
+        received = 0
+        failure = ''
+        try:
+            async with self.session.request(
+                    sampler.method, sampler.url, params=sampler.params, data=sampler.body,
+                    headers=sampler.headers, allow_redirects=sampler.follow_redirects,
+                    timeout=sampler.timeout) as response:
+                latency_ms = int((time.perf_counter() - started) * 1000)
+                body = await response.read()
+                elapsed_ms = int((time.perf_counter() - started) * 1000)
+                code = str(response.status)
+                message = _csv_safe(response.reason or '')
+                received = len(body) + sum(len(k) + len(v) + 4 for k, v in response.raw_headers)
+                success = response.status < 400 or sampler.assume_success
+                if sampler.assertions:
+                    failure = _check_assertions(sampler, response, body, elapsed_ms)
+                    if failure:
+                        success = False
+        except Exception as e:
+            elapsed_ms = int((time.perf_counter() - started) * 1000)
+            code = f"Non HTTP response code: {type(e).__name__}"
+            message = _csv_safe(f"Non HTTP response message: {e}")
+            success = False
+
+        if not success:
+            self.errors += 1
+        self.writer.write(timestamp, elapsed_ms, sampler.label, code, message, thread_name, success,
+                          failure, received, sampler.sent_bytes, group.active, self.all_active,
+                          sampler.jtl_url, latency_ms)
+        return elapsed_ms
+
+    async def _sleep_until(self, when: float) -> None:
+        delay = when - self.loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+def _check_assertions(sampler: _PreparedSampler, response: aiohttp.ClientResponse, body: bytes,
+                      elapsed_ms: int) -> str:
+    """Apply the sampler's assertions; returns the failure message, or '' when all pass"""
+    body_text = body.decode('utf-8', errors='replace') if sampler.needs_body_text else ''
+    for assertion in sampler.assertions:
+        if assertion['type'] == 'duration':
+            if assertion['max_ms'] and elapsed_ms > assertion['max_ms']:
+                return f"The operation lasted too long: It took {elapsed_ms} milliseconds; but should not have lasted longer than {int(assertion['max_ms'])} milliseconds."
+            continue
+
+        field = assertion['field']
+        if field == 'Assertion.response_code':
+            subject = str(response.status)
+        elif field == 'Assertion.response_message':
+            subject = response.reason or ''
+        elif field == 'Assertion.response_headers':
+            subject = '\n'.join(f"{k}: {v}" for k, v in response.headers.items())
+        elif field == 'Assertion.request_data':
+            subject = sampler.body.decode('utf-8', errors='replace') if sampler.body else ''
+        elif field == 'Assertion.sample_label':
+            subject = sampler.label
+        else:
+            subject = body_text
+
+        test_type = assertion['test_type']
+        results = []
+        for pattern in assertion['strings']:
+            if test_type & ASSERT_MATCHES:
+                matched = re.fullmatch(pattern, subject, re.DOTALL) is not None
+            elif test_type & ASSERT_CONTAINS:
+                matched = re.search(pattern, subject) is not None
+            elif test_type & ASSERT_EQUALS:
+                matched = subject == pattern
+            else:
+                matched = pattern in subject
+            results.append(not matched if test_type & ASSERT_NOT else matched)
+
+        passed = any(results) if test_type & ASSERT_OR else all(results)
+        if not passed:
+            return _csv_safe(assertion['custom_message'] or f"Test failed: {field.split('.')[-1]} expected {assertion['strings']}")
+    return ''
+
+
+async def run_plan_async(plan: Dict[str, Any], output_path: Optional[str] = None,
+                         overrides: Optional[Dict[str, Any]] = None,
+                         segment_sink: Optional[Callable[[int, str], None]] = None,
+                         segment_seconds: float = LIVE_SEGMENT_SECONDS,
+                         abort_rules: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Execute a parsed plan against its target
+
+    Args:
+        plan: Plan from load_plan
+        output_path: JTL file to write, or None to only summarize
+        overrides: Optional host, port, protocol, users, duration, ramp_up,
+            target_rps (switches to the open model) and max_connections
+        segment_sink: Called from a worker thread with (sequence, JTL text)
+            every segment_seconds with the rows written since the last call
+        segment_seconds: Live segment interval
+        abort_rules: Auto-abort rules as accepted by LiveMetrics.evaluate_rules,
+            checked every segment_seconds
+
+    Returns:
+        Run summary with raw and coordinated-omission-corrected latencies
+    """
+    overrides = overrides or {}
+    writer = JtlWriter(output_path, segments=segment_sink is not None or bool(abort_rules))
+    run = _LoadRun(plan, writer, overrides, segment_sink, segment_seconds, abort_rules)
+    try:
+        wall_seconds = await run.run()
+    finally:
+        writer.close()
+
+    raw_total = LatencyHistogram()
+    corrected_total = LatencyHistogram()
+    labels = {}
+    for label, histogram in run.raw.items():
+        raw_total.merge(histogram)
+        corrected_total.merge(run.corrected[label])
+        labels[label] = {
+            'latency_ms': histogram.summary(),
+            'corrected_latency_ms': run.corrected[label].summary(),
+        }
+
+    total = raw_total.total
+    return {
+        'plan': plan['name'],
+        'status': 'aborted' if run.aborted else 'completed',
+        'abort_reason': run.aborted,
+        'model': 'open' if any(g.target_rps for g in run.groups) else 'closed',
+        'jtl_path': output_path,
+        'duration_seconds': round(wall_seconds, 2),
+        'total_requests': total,
+        'successful_requests': total - run.errors,
+        'failed_requests': run.errors,
+        'error_rate': (run.errors / total * 100) if total else 0,
+        'throughput_rps': round(total / wall_seconds, 2) if wall_seconds > 0 else 0,
+        'latency_ms': raw_total.summary(),
+        'corrected_latency_ms': corrected_total.summary(),
+        'labels': labels,
+    }
+
+def run_plan(plan: Dict[str, Any], output_path: Optional[str] = None,
+             overrides: Optional[Dict[str, Any]] = None, **live_options) -> Dict[str, Any]:
+    """Synchronous wrapper around run_plan_async"""
+    return asyncio.run(run_plan_async(plan, output_path, overrides, **live_options))
+
+
+async def execute_local_test(session_id: str, target_url: str, overrides: Dict[str, Any], s3_client,
+                             abort_rules: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Run a session's test plans locally and store the JTL results in S3
+
+    Results go to the same keys the ECS runner uses, so analyze_test_results
+    works on local runs too. While a plan runs, live segments are uploaded
+    under perf-pipeline/{session_id}/live/ for get_live_metrics.
+
+    Args:
+        session_id: Session ID linking to test plans
+        target_url: Target as host:port or a URL
+        overrides: Optional users, duration, ramp_up and target_rps for every plan
+        s3_client: AWS S3 client
+        abort_rules: Auto-abort rules; a breach stops the run and skips remaining plans
+
+    Returns:
+        Per-plan run summaries and result locations
+    """
+    import test_executor
+
+    try:
+        session_id = test_executor._sanitize_session_id(session_id)
+        # S3 calls are blocking; keep them off the event loop the run shares with the server
+        test_plans = await asyncio.to_thread(test_executor._load_test_plans, session_id, s3_client)
+        target = _parse_target(target_url)
+        properties = {'target.host': target['host'], 'target.port': str(target['port'] or '')}
+        run_overrides = {**overrides, **target}
+        bucket_name = os.environ.get('S3_BUCKET_NAME')
+
+        results = []
+        with tempfile.TemporaryDirectory() as work_dir:
+            for plan_name, content in sorted(test_plans.items()):
+                if not plan_name.endswith(('.jmx', '.java')):
+                    continue
+                base_name = os.path.splitext(os.path.basename(plan_name))[0]
+                try:
+                    plan = load_plan(content, plan_name, properties)
+                except (ValueError, ET.ParseError) as e:
+                    results.append({'plan': base_name, 'status': 'invalid_plan', 'error': str(e)})
+                    continue
+
+                def upload_segment(sequence: int, segment: str, base_name=base_name) -> None:
+                    s3_client.put_object(
+                        Bucket=bucket_name,
+                        Key=f"perf-pipeline/{session_id}/live/{base_name}/segment-{sequence:06d}.jtl",
+                        Body=segment.encode('utf-8'),
+                        ContentType='text/csv'
+                    )
+
+                jtl_path = os.path.join(work_dir, f"{base_name}_results.jtl")
+                summary = await run_plan_async(plan, jtl_path, run_overrides,
+                                               segment_sink=upload_segment, abort_rules=abort_rules)
+
+                s3_key = f"perf-pipeline/{session_id}/results/{base_name}_results.jtl"
+
+                def upload_results(jtl_path=jtl_path, s3_key=s3_key) -> None:
+                    with open(jtl_path, 'rb') as f:
+                        s3_client.put_object(Bucket=bucket_name, Key=s3_key, Body=f.read(), ContentType='text/csv')
+
+                await asyncio.to_thread(upload_results)
+                summary['jtl_path'] = f"s3://{bucket_name}/{s3_key}"
+                results.append(summary)
+                if summary['status'] == 'aborted':
+                    break
+
+        aborted = [r for r in results if r['status'] == 'aborted']
+        return {
+            'session_id': session_id,
+            'status': 'aborted' if aborted else 'completed',
+            'abort_reason': aborted[0]['abort_reason'] if aborted else None,
+            'execution_mode': 'local',
+            'target': target_url,
+            'plans_executed': len([r for r in results if r['status'] == 'completed']),
+            'results': results,
+        }
+    except Exception as e:
+        logger.error(f"Error executing local test: {str(e)}")
+        return {
+            'session_id': session_id,
+            'status': 'error',
+            'error': str(e)
+        }
+
+def _parse_target(target_url: str) -> Dict[str, Any]:
+    """Split host:port or a URL into run overrides"""
+    if not target_url:
+        return {}
+    parsed = urlparse(target_url if '://' in target_url else f"http://{target_url}")
+    return {'protocol': parsed.scheme or 'http', 'host': parsed.hostname, 'port': parsed.port}
+
+
+# ---------------------------------------------------------------------------
+# Self-benchmark
+# ---------------------------------------------------------------------------
+
+def _serve_benchmark_target(port: int, ready) -> None:
+    """Minimal HTTP target for the self-benchmark, run in a child process"""
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(text='ok')
+
+    async def serve():
+        app = web.Application()
+        app.router.add_get('/', handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', port).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+def self_benchmark(seconds: float = 5.0, users: int = 64) -> Dict[str, Any]:
+    """
+    Measure the engine's maximum request rate per CPU core
+
+    Drives a trivial local target closed-model with no think time, writing
+    a JTL file, and divides the requests sent by the CPU seconds this
+    process used. The target runs in a separate process, so its own CPU
+    use is not counted.
+    """
+    import multiprocessing
+    import socket
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=_serve_benchmark_target, args=(port, ready), daemon=True)
+    server.start()
+    try:
+        if not ready.wait(10):
+            raise RuntimeError("Benchmark target did not start")
+        plan = {
+            'name': 'self_benchmark',
+            'thread_groups': [{
+                'name': 'Benchmark', 'num_threads': users, 'ramp_up': 0, 'duration': seconds,
+                'delay': 0.0, 'loops': -1, 'target_rps': None,
+                'samplers': [_build_sampler('GET /', 'GET', 'http', '127.0.0.1', str(port), '/', [], None, {},
+                                            [], [], True, True, 0.0, 0.0)],
+            }],
+        }
+        with tempfile.TemporaryDirectory() as work_dir:
+            cpu_started = time.process_time()
+            summary = run_plan(plan, os.path.join(work_dir, 'benchmark.jtl'))
+            cpu_seconds = time.process_time() - cpu_started
+    finally:
+        server.terminate()
+        server.join()
+
+    return {
+        'requests': summary['total_requests'],
+        'errors': summary['failed_requests'],
+        'wall_seconds': summary['duration_seconds'],
+        'cpu_seconds': round(cpu_seconds, 2),
+        'requests_per_second': summary['throughput_rps'],
+        'requests_per_core_second': round(summary['total_requests'] / cpu_seconds) if cpu_seconds else 0,
+        'latency_ms': summary['latency_ms'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a generated test plan locally without JMeter or ECS")
+    parser.add_argument('plan', nargs='?', help="JMX or Java test plan file")
+    parser.add_argument('--host', help="Target host (target.host)")
+    parser.add_argument('--port', help="Target port (target.port)")
+    parser.add_argument('--protocol', help="http or https")
+    parser.add_argument('--users', type=int, help="Virtual users per thread group")
+    parser.add_argument('--duration', type=float, help="Duration in seconds")
+    parser.add_argument('--ramp-up', type=float, help="Ramp-up in seconds")
+    parser.add_argument('--target-rps', type=float, help="Run open-model at this many iterations per second")
+    parser.add_argument('--output', help="JTL output file (default: <plan>_results.jtl)")
+    parser.add_argument('--abort-rules', type=json.loads, help="JSON list of auto-abort rules")
+    parser.add_argument('--self-benchmark', action='store_true', help="Measure the maximum request rate per core")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Self-benchmark duration")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.self_benchmark:
+        print(json.dumps(self_benchmark(args.seconds, args.users or 64), indent=2))
+        return
+    if not args.plan:
+        parser.error("a plan file is required")
+
+    with open(args.plan, encoding='utf-8') as f:
+        content = f.read()
+    properties = {k: v for k, v in (('target.host', args.host), ('target.port', args.port)) if v}
+    plan = load_plan(content, args.plan, properties)
+    overrides = {
+        'host': args.host, 'port': args.port, 'protocol': args.protocol, 'users': args.users,
+        'duration': args.duration, 'ramp_up': args.ramp_up, 'target_rps': args.target_rps,
+    }
+    output = args.output or f"{plan['name']}_results.jtl"
+    summary = run_plan(plan, output, overrides, abort_rules=args.abort_rules)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -3,11 +3,10 @@ Performance Testing MCP Server
 Implements the Model Context Protocol for performance testing tools
 """
 
+import asyncio
 import json
 import logging
 import os
-import time
-import threading
 import uuid
 from typing import Any, Dict, List, Optional
 import boto3
@@ -27,36 +26,31 @@ import architecture_analyzer
 import scenario_generator
 import test_plan_generator
 import test_executor
+import local_load_engine
+import live_metrics
 import results_analyzer
+import run_comparison
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class BedrockRateLimiter:
-    """Rate limiter for Bedrock API calls to prevent throttling"""
-    
-    def __init__(self, requests_per_minute=50):
-        self.requests_per_minute = requests_per_minute
-        self.min_interval = 60.0 / requests_per_minute
-        self.last_request_time = 0
-        self.lock = threading.Lock()
-    
-    def wait_if_needed(self):
-        """Wait if necessary to respect rate limits"""
-        with self.lock:
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            
-            if time_since_last < self.min_interval:
-                sleep_time = self.min_interval - time_since_last
-                logger.info(f"Rate limiting: waiting {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-            
-            self.last_request_time = time.time()
+ABORT_RULES_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "metric": {"type": "string", "enum": list(live_metrics.RULE_METRICS)},
+            "threshold": {"type": "number"},
+            "for_seconds": {"type": "number"},
+            "label": {"type": "string"},
+            "comparison": {"type": "string", "enum": ["above", "below"]}
+        },
+        "required": ["metric", "threshold"]
+    },
+    "description": "Stop the test when a metric stays past its threshold for for_seconds, e.g. error_rate above 10 for 30s"
+}
 
-# Global rate limiter instance
-bedrock_rate_limiter = BedrockRateLimiter(requests_per_minute=50)
 
 class PerformanceTestingMCPServer:
     def __init__(self):
@@ -237,6 +231,51 @@ class PerformanceTestingMCPServer:
                     "required": ["session_id"]
                 }
             ),
+            Tool(
+                name="execute_local_test",
+                description="Run test plans locally with the built-in asyncio load engine, without JMeter or ECS",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "session_id": {
+                            "type": "string",
+                            "description": "Session ID linking to test plans"
+                        },
+                        "target_url": {
+                            "type": "string",
+                            "description": "Target as host:port or URL (sets target.host and target.port)"
+                        },
+                        "users": {"type": "integer", "description": "Override virtual users per thread group"},
+                        "duration": {"type": "number", "description": "Override duration in seconds"},
+                        "ramp_up": {"type": "number", "description": "Override ramp-up in seconds"},
+                        "target_rps": {
+                            "type": "number",
+                            "description": "Run open-model at this many iterations per second instead of closed-model"
+                        },
+                        "abort_rules": ABORT_RULES_SCHEMA
+                    },
+                    "required": ["session_id", "target_url"]
+                }
+            ),
+            Tool(
+                name="get_live_metrics",
+                description="Rolling per-label percentiles, error rates and throughput of a running test, with optional auto-abort",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "session_id": {
+                            "type": "string",
+                            "description": "Session ID of the running test"
+                        },
+                        "window_seconds": {
+                            "type": "number",
+                            "description": "Rolling window in seconds (default 60)"
+                        },
+                        "abort_rules": ABORT_RULES_SCHEMA
+                    },
+                    "required": ["session_id"]
+                }
+            ),
             Tool(
                 name="validate_test_plans",
                 description="Validate and fix generated test plans by compiling them",
@@ -283,17 +322,55 @@ class PerformanceTestingMCPServer:
                     },
                     "required": ["session_id"]
                 }
+            ),
+            Tool(
+                name="compare_runs",
+                description="Compare a test run against a baseline run and flag statistically significant latency, error rate and throughput regressions",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "baseline_session_id": {
+                            "type": "string",
+                            "description": "Session ID of the reference run"
+                        },
+                        "candidate_session_id": {
+                            "type": "string",
+                            "description": "Session ID of the run to check"
+                        },
+                        "min_effect_percent": {
+                            "type": "number",
+                            "description": "Smallest latency or throughput change in percent that counts (default 5)"
+                        },
+                        "min_error_rate_increase": {
+                            "type": "number",
+                            "description": "Smallest error rate increase in percentage points that counts (default 1)"
+                        },
+                        "confidence": {
+                            "type": "number",
+                            "description": "Confidence level across all tests in the comparison (default 0.95)"
+                        },
+                        "labels": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Compare only these sampler labels"
+                        }
+                    },
+                    "required": ["baseline_session_id", "candidate_session_id"]
+                }
             )
         ]
     
     async def _handle_call_tool(self, name: str, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
         """Handle tool calls by using integrated modules directly"""
         try:
+            # Tools that call Bedrock run on worker threads: a wait for the shared
+            # rate limiter must not stall the server's event loop
             if name == "analyze_architecture":
                 documents_path = arguments.get("documents_path", "")
                 session_id = arguments.get("session_id", str(uuid.uuid4())[:8])
                 
-                result = architecture_analyzer.analyze_documents(
+                result = await asyncio.to_thread(
+                    architecture_analyzer.analyze_documents,
                     documents_path=documents_path,
                     session_id=session_id,
                     s3_client=self.s3_client,
@@ -307,7 +384,8 @@ class PerformanceTestingMCPServer:
                 nfrs = arguments.get("nfrs", {})
                 scenario_types = arguments.get("scenario_types", ["load"])
                 
-                result = scenario_generator.generate_scenarios(
+                result = await asyncio.to_thread(
+                    scenario_generator.generate_scenarios,
                     session_id=session_id,
                     workflow_apis=workflow_apis,
                     nfrs=nfrs,
@@ -321,7 +399,8 @@ class PerformanceTestingMCPServer:
                 session_id = arguments.get("session_id", "")
                 output_format = arguments.get("output_format", "java_dsl")
                 
-                result = test_plan_generator.generate_plans(
+                result = await asyncio.to_thread(
+                    test_plan_generator.generate_plans,
                     session_id=session_id,
                     output_format=output_format,
                     s3_client=self.s3_client,
@@ -334,7 +413,8 @@ class PerformanceTestingMCPServer:
                 execution_environment = arguments.get("execution_environment", {})
                 monitoring_config = arguments.get("monitoring_config", {})
                 
-                result = test_executor.execute_test(
+                result = await asyncio.to_thread(
+                    test_executor.execute_test,
                     session_id=session_id,
                     execution_environment=execution_environment,
                     monitoring_config=monitoring_config,
@@ -344,6 +424,32 @@ class PerformanceTestingMCPServer:
                 )
                 return [TextContent(type="text", text=json.dumps(result, indent=2))]
             
+            elif name == "execute_local_test":
+                session_id = arguments.get("session_id", "")
+                target_url = arguments.get("target_url", "")
+                overrides = {key: arguments.get(key) for key in ("users", "duration", "ramp_up", "target_rps")}
+                
+                result = await local_load_engine.execute_local_test(
+                    session_id=session_id,
+                    target_url=target_url,
+                    overrides=overrides,
+                    s3_client=self.s3_client,
+                    abort_rules=arguments.get("abort_rules")
+                )
+                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+            
+            elif name == "get_live_metrics":
+                session_id = arguments.get("session_id", "")
+                
+                result = live_metrics.get_live_metrics(
+                    session_id=session_id,
+                    s3_client=self.s3_client,
+                    ecs_client=self.ecs_client,
+                    window_seconds=float(arguments.get("window_seconds", 60)),
+                    abort_rules=arguments.get("abort_rules")
+                )
+                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+            
             elif name == "validate_test_plans":
                 session_id = arguments.get("session_id", "")
                 
@@ -399,13 +505,27 @@ class PerformanceTestingMCPServer:
             elif name == "analyze_test_results":
                 session_id = arguments.get("session_id", "")
                 
-                result = results_analyzer.analyze_results(
+                result = await asyncio.to_thread(
+                    results_analyzer.analyze_results,
                     session_id=session_id,
                     s3_client=self.s3_client,
                     bedrock_client=self.bedrock_client
                 )
                 return [TextContent(type="text", text=json.dumps(result, indent=2))]
             
+            elif name == "compare_runs":
+                result = run_comparison.compare_runs(
+                    baseline_session_id=arguments.get("baseline_session_id", ""),
+                    candidate_session_id=arguments.get("candidate_session_id", ""),
+                    s3_client=self.s3_client,
+                    min_effect_percent=float(arguments.get("min_effect_percent", run_comparison.DEFAULT_MIN_EFFECT_PERCENT)),
+                    min_error_rate_increase=float(arguments.get("min_error_rate_increase",
+                                                                run_comparison.DEFAULT_MIN_ERROR_RATE_INCREASE)),
+                    confidence=float(arguments.get("confidence", run_comparison.DEFAULT_CONFIDENCE)),
+                    labels=arguments.get("labels")
+                )
+                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+            
             else:
                 return [TextContent(type="text", text=f"Unknown tool: {name}")]
             
@@ -469,5 +589,4 @@ async def run_server():
         )
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(run_server())
\ No newline at end of file
@@ -0,0 +1,356 @@
+"""
+Plan Templates Module
+Renders JMX test plans for standard scenario shapes without a model call
+
+Most generated scenarios are one of four shapes: a steady load, a stepped
+stress ramp, a spike on top of a base load, or a long soak. When a
+scenario's shape, user count, duration and endpoints can be read without
+guessing, the plan is filled in from a template here. Scenarios with
+anything the templates cannot express (unknown shapes, dynamic values such
+as extracted tokens, missing parameters) are left to the model.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+logger = logging.getLogger(__name__)
+
+SHAPES = ('load', 'stress', 'spike', 'soak')
+# Words in a scenario's type or name that identify its shape
+SHAPE_KEYWORDS = {
+    'load': ('load', 'baseline', 'steady', 'constant'),
+    'stress': ('stress', 'step', 'incremental', 'ramp'),
+    'spike': ('spike', 'burst'),
+    'soak': ('soak', 'endurance', 'longevity'),
+}
+USER_KEYS = ('users', 'concurrent_users', 'max_users', 'virtual_users', 'num_users', 'user_count',
+             'number_of_users', 'threads', 'peak_users')
+RAMP_UP_KEYS = ('ramp_up', 'ramp_up_time', 'rampup', 'ramp_up_period', 'ramp_up_seconds')
+DURATION_KEYS = ('duration', 'total_duration', 'test_duration', 'hold_duration', 'duration_seconds')
+THINK_TIME_KEYS = ('think_time', 'think_time_ms', 'pacing')
+STEP_KEYS = ('workflow_steps', 'test_steps', 'specific_endpoints', 'endpoints', 'steps', 'requests')
+
+DEFAULT_STRESS_STEPS = 4
+DEFAULT_SOAK_THINK_TIME_MS = 1000
+DEFAULT_SPIKE_RAMP_UP_SECONDS = 5
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS')
+# Placeholders the templates cannot fill, such as tokens extracted from earlier responses
+_DYNAMIC_VALUE = re.compile(r'\{\{|\$\{|<[a-z_]+>')
+
+
+def match_template(scenario_name: str, scenario_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Template parameters for a scenario of a standard shape
+
+    Returns:
+        Parameters for render_jmx, or None when the scenario needs the model
+    """
+    if not isinstance(scenario_config, dict):
+        return None
+    config = _configuration(scenario_config)
+
+    shape = _shape(scenario_name, scenario_config, config)
+    users = _first_int(config, USER_KEYS)
+    duration = _first_seconds(config, DURATION_KEYS)
+    endpoints = _endpoints(scenario_config)
+    if shape is None or not users or not duration or not endpoints:
+        return None
+
+    ramp_up = _first_seconds(config, RAMP_UP_KEYS)
+    if ramp_up is None:
+        ramp_up = min(60, duration // 10)
+    think_time_ms = _first_seconds(config, THINK_TIME_KEYS, milliseconds=True)
+    if think_time_ms is None and shape == 'soak':
+        think_time_ms = DEFAULT_SOAK_THINK_TIME_MS
+
+    params = {
+        'shape': shape,
+        'name': str(scenario_config.get('name') or scenario_name),
+        'description': str(scenario_config.get('description', '')),
+        'users': users,
+        'ramp_up': min(ramp_up, duration),
+        'duration': duration,
+        'think_time_ms': think_time_ms or 0,
+        'endpoints': endpoints,
+    }
+    if shape == 'stress':
+        params['steps'] = max(1, min(users, _first_int(config, ('steps', 'step_count', 'number_of_steps'))
+                                     or DEFAULT_STRESS_STEPS))
+    elif shape == 'spike':
+        base_users = _first_int(config, ('base_users', 'baseline_users', 'normal_users'))
+        spike_users = _first_int(config, ('spike_users', 'peak_users', 'max_users'))
+        if spike_users and base_users and spike_users > base_users:
+            # Peak is given as the total at the top of the spike
+            spike_users -= base_users
+        base_users = base_users or max(1, users // 10)
+        spike_users = spike_users or max(1, users - base_users)
+        spike_duration = _first_seconds(config, ('spike_duration', 'peak_duration')) or max(10, duration // 6)
+        spike_start = _first_seconds(config, ('spike_start', 'spike_at', 'spike_delay'))
+        if spike_start is None:
+            spike_start = duration // 3
+        params.update({
+            'base_users': base_users,
+            'spike_users': spike_users,
+            'spike_start': min(spike_start, max(0, duration - spike_duration)),
+            'spike_duration': min(spike_duration, duration),
+            'spike_ramp_up': _first_seconds(config, ('spike_ramp_up', 'spike_ramp_up_time'))
+                             or DEFAULT_SPIKE_RAMP_UP_SECONDS,
+        })
+    return params
+
+
+def render_jmx(params: Dict[str, Any]) -> str:
+    """JMX test plan for the template parameters returned by match_template"""
+    shape = params['shape']
+    groups = []
+    if shape == 'stress':
+        steps = params['steps']
+        step_seconds = max(1, params['duration'] // steps)
+        per_step, extra = divmod(params['users'], steps)
+        for step in range(steps):
+            delay = step * step_seconds
+            groups.append({
+                'name': f"Stress step {step + 1}",
+                'users': per_step + (1 if step < extra else 0),
+                'ramp_up': min(params['ramp_up'], step_seconds),
+                'delay': delay,
+                'duration': params['duration'] - delay,
+            })
+    elif shape == 'spike':
+        groups.append({'name': 'Base load', 'users': params['base_users'], 'ramp_up': params['ramp_up'],
+                       'delay': 0, 'duration': params['duration']})
+        groups.append({'name': 'Spike', 'users': params['spike_users'],
+                       'ramp_up': min(params['spike_ramp_up'], params['spike_duration']),
+                       'delay': params['spike_start'], 'duration': params['spike_duration']})
+    else:
+        groups.append({'name': 'Soak Test Users' if shape == 'soak' else 'Load Test Users',
+                       'users': params['users'], 'ramp_up': params['ramp_up'], 'delay': 0,
+                       'duration': params['duration']})
+
+    samplers = ''.join(_render_sampler(endpoint) for endpoint in params['endpoints'])
+    timer = ''
+    if params['think_time_ms']:
+        timer = (
+            f'<ConstantTimer guiclass="ConstantTimerGui" testclass="ConstantTimer" testname="Think Time">'
+            f'<stringProp name="ConstantTimer.delay">{int(params["think_time_ms"])}</stringProp>'
+            f'</ConstantTimer><hashTree/>'
+        )
+    thread_groups = ''.join(
+        f'<ThreadGroup guiclass="ThreadGroupGui" testclass="ThreadGroup" testname={quoteattr(group["name"])}>'
+        f'<stringProp name="ThreadGroup.on_sample_error">continue</stringProp>'
+        f'<elementProp name="ThreadGroup.main_controller" elementType="LoopController" guiclass="LoopControlPanel" '
+        f'testclass="LoopController" testname="Loop Controller">'
+        f'<boolProp name="LoopController.continue_forever">false</boolProp>'
+        f'<stringProp name="LoopController.loops">-1</stringProp></elementProp>'
+        f'<stringProp name="ThreadGroup.num_threads">{int(group["users"])}</stringProp>'
+        f'<stringProp name="ThreadGroup.ramp_time">{int(group["ramp_up"])}</stringProp>'
+        f'<boolProp name="ThreadGroup.scheduler">true</boolProp>'
+        f'<stringProp name="ThreadGroup.duration">{int(group["duration"])}</stringProp>'
+        f'<stringProp name="ThreadGroup.delay">{int(group["delay"])}</stringProp>'
+        f'<boolProp name="ThreadGroup.same_user_on_next_iteration">true</boolProp>'
+        f'</ThreadGroup><hashTree>{timer}{samplers}</hashTree>'
+        for group in groups if group['users'] > 0
+    )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<jmeterTestPlan version="1.2" properties="5.0" jmeter="5.6.3"><hashTree>'
+        f'<TestPlan guiclass="TestPlanGui" testclass="TestPlan" testname={quoteattr(params["name"])}>'
+        f'<stringProp name="TestPlan.comments">{escape(params["description"])}</stringProp>'
+        '<boolProp name="TestPlan.functional_mode">false</boolProp>'
+        '<boolProp name="TestPlan.serialize_threadgroups">false</boolProp>'
+        '<elementProp name="TestPlan.user_defined_variables" elementType="Arguments" guiclass="ArgumentsPanel" '
+        'testclass="Arguments" testname="User Defined Variables"><collectionProp name="Arguments.arguments"/>'
+        '</elementProp></TestPlan><hashTree>'
+        '<ConfigTestElement guiclass="HttpDefaultsGui" testclass="ConfigTestElement" testname="HTTP Request Defaults">'
+        '<elementProp name="HTTPsampler.Arguments" elementType="Arguments"><collectionProp name="Arguments.arguments"/>'
+        '</elementProp>'
+        '<stringProp name="HTTPSampler.domain">${__P(target.host,localhost)}</stringProp>'
+        '<stringProp name="HTTPSampler.port">${__P(target.port,8080)}</stringProp>'
+        '<stringProp name="HTTPSampler.protocol">${__P(target.protocol,http)}</stringProp>'
+        '</ConfigTestElement><hashTree/>'
+        f'{thread_groups}'
+        '</hashTree></hashTree></jmeterTestPlan>\n'
+    )
+
+
+def _render_sampler(endpoint: Dict[str, Any]) -> str:
+    body = endpoint.get('body')
+    if body is not None:
+        arguments = (
+            '<boolProp name="HTTPSampler.postBodyRaw">true</boolProp>'
+            '<elementProp name="HTTPsampler.Arguments" elementType="Arguments"><collectionProp name="Arguments.arguments">'
+            '<elementProp name="" elementType="HTTPArgument"><boolProp name="HTTPArgument.always_encode">false</boolProp>'
+            f'<stringProp name="Argument.value">{escape(body)}</stringProp>'
+            '<stringProp name="Argument.metadata">=</stringProp></elementProp></collectionProp></elementProp>'
+        )
+    else:
+        arguments = ('<elementProp name="HTTPsampler.Arguments" elementType="Arguments">'
+                     '<collectionProp name="Arguments.arguments"/></elementProp>')
+
+    headers = dict(endpoint.get('headers', {}))
+    if body is not None:
+        headers.setdefault('Content-Type', 'application/json')
+    header_manager = '<hashTree/>'
+    if headers:
+        header_manager = (
+            '<hashTree><HeaderManager guiclass="HeaderPanel" testclass="HeaderManager" testname="HTTP Header Manager">'
+            '<collectionProp name="HeaderManager.headers">'
+            + ''.join(f'<elementProp name="" elementType="Header"><stringProp name="Header.name">{escape(name)}'
+                      f'</stringProp><stringProp name="Header.value">{escape(value)}</stringProp></elementProp>'
+                      for name, value in headers.items())
+            + '</collectionProp></HeaderManager><hashTree/></hashTree>'
+        )
+
+    return (
+        f'<HTTPSamplerProxy guiclass="HttpTestSampleGui" testclass="HTTPSamplerProxy" testname={quoteattr(endpoint["name"])}>'
+        f'{arguments}'
+        f'<stringProp name="HTTPSampler.path">{escape(endpoint["path"])}</stringProp>'
+        f'<stringProp name="HTTPSampler.method">{endpoint["method"]}</stringProp>'
+        '<boolProp name="HTTPSampler.follow_redirects">true</boolProp>'
+        '<boolProp name="HTTPSampler.use_keepalive">true</boolProp>'
+        f'</HTTPSamplerProxy>{header_manager}'
+    )
+
+
+def _configuration(scenario_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Scenario settings with any nested configuration block merged over the top level"""
+    config = dict(scenario_config)
+    for key in ('test_configuration', 'configuration', 'load_profile', 'load_pattern'):
+        nested = scenario_config.get(key)
+        if isinstance(nested, dict):
+            config.update(nested)
+    return config
+
+
+def _shape(scenario_name: str, scenario_config: Dict[str, Any], config: Dict[str, Any]) -> Optional[str]:
+    """Shape named by the scenario's type, or failing that its name; None if unclear"""
+    for text in (config.get('type'), config.get('test_type'), config.get('scenario_type'),
+                 config.get('pattern') if isinstance(config.get('pattern'), str) else None,
+                 scenario_config.get('name'), scenario_name):
+        if not isinstance(text, str):
+            continue
+        words = set(re.split(r'[^a-z]+', text.lower()))
+        found = [shape for shape in SHAPES if words & set(SHAPE_KEYWORDS[shape])]
+        if len(found) == 1:
+            return found[0]
+        if found:
+            # Ambiguous ("spike and soak"): let the model read it
+            return None
+    return None
+
+
+def _first_int(config: Dict[str, Any], keys) -> Optional[int]:
+    for key in keys:
+        if key in config:
+            value = config[key]
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                return int(value)
+            match = re.fullmatch(r'\s*(\d+)\s*(users?|threads?|vus?)?\s*', str(value).lower())
+            if match:
+                return int(match.group(1))
+            return None
+    return None
+
+
+def _first_seconds(config: Dict[str, Any], keys, milliseconds: bool = False) -> Optional[int]:
+    for key in keys:
+        if key in config:
+            seconds = parse_duration(config[key], default_unit='ms' if key.endswith('_ms') else 's')
+            if seconds is None:
+                return None
+            return int(round(seconds * 1000)) if milliseconds else int(round(seconds))
+    return None
+
+
+def parse_duration(value: Any, default_unit: str = 's') -> Optional[float]:
+    """Seconds in values like 30, "30s", "10 minutes", "1h 30m" or "500ms"; None if unreadable"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if default_unit == 'ms' else float(value)
+    text = str(value).strip().lower()
+    units = {'ms': 0.001, 'millisecond': 0.001, 's': 1, 'sec': 1, 'second': 1,
+             'm': 60, 'min': 60, 'minute': 60, 'h': 3600, 'hr': 3600, 'hour': 3600}
+    parts = re.findall(r'(\d+(?:\.\d+)?)\s*([a-z]*)', text)
+    if not parts or re.sub(r'[\d.\s a-z]', '', text):
+        return None
+    total = 0.0
+    for number, unit in parts:
+        unit = unit.rstrip('s') if unit not in ('s', 'ms') else unit
+        if not unit:
+            unit = default_unit
+        if unit not in units:
+            return None
+        total += float(number) * units[unit]
+    return total
+
+
+def _endpoints(scenario_config: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """HTTP requests of the scenario's workflow, or None if any step cannot be templated"""
+    steps = None
+    workflow = scenario_config.get('workflow_execution')
+    if isinstance(workflow, dict) and isinstance(workflow.get('sequence'), list):
+        steps = workflow['sequence']
+    else:
+        for key in STEP_KEYS:
+            if isinstance(scenario_config.get(key), list):
+                steps = scenario_config[key]
+                break
+    if not steps:
+        return None
+
+    endpoints = []
+    for step in steps:
+        endpoint = _endpoint(step)
+        if endpoint is None:
+            return None
+        endpoints.append(endpoint)
+    return endpoints
+
+
+def _endpoint(step: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(step, str):
+        match = re.fullmatch(r'\s*([A-Za-z]+)\s+(/\S*)\s*', step)
+        if not match or match.group(1).upper() not in HTTP_METHODS:
+            return None
+        method, path = match.group(1).upper(), match.group(2)
+        return {'name': f"{method} {path}", 'method': method, 'path': path}
+    if not isinstance(step, dict):
+        return None
+
+    path = next((step[k] for k in ('endpoint', 'path', 'url', 'api') if isinstance(step.get(k), str)), None)
+    method = str(step.get('method', 'GET')).upper()
+    if path and ' ' in path.strip():
+        # "POST /api/orders" in the endpoint field
+        first, _, rest = path.strip().partition(' ')
+        if first.upper() in HTTP_METHODS:
+            method, path = first.upper(), rest.strip()
+    if not path or not path.startswith('/') or method not in HTTP_METHODS:
+        return None
+
+    body = next((step[k] for k in ('body', 'payload', 'request_body', 'data') if k in step), None)
+    if body is not None and not isinstance(body, str):
+        body = json.dumps(body)
+    headers = step.get('headers') or {}
+    if not isinstance(headers, dict):
+        return None
+    headers = {str(k): str(v) for k, v in headers.items()}
+
+    # Values produced at run time (auth tokens, ids from earlier responses) need correlation
+    dynamic = [path, body or ''] + list(headers.values())
+    if any(_DYNAMIC_VALUE.search(value) for value in dynamic):
+        return None
+    if any(k in step for k in ('extract', 'extractors', 'correlation', 'save', 'capture')):
+        return None
+
+    name = step.get('name') or step.get('description') or f"{method} {path}"
+    endpoint = {'name': str(name), 'method': method, 'path': path, 'headers': headers}
+    if body is not None:
+        endpoint['body'] = body
+    return endpoint
@@ -12,6 +12,7 @@ from typing import Dict, Any, List
 import boto3
 from datetime import datetime
 import statistics
+from rate_limiter import bedrock_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -309,7 +310,9 @@ Format your response as JSON with the structure:
         body = json.dumps(prompt_config)
         model_id = os.environ.get("BEDROCK_MODEL_ID", "us.anthropic.claude-3-7-sonnet-20250219-v1:0")
         
-        response = bedrock_client.invoke_model(
+        response = bedrock_rate_limiter.invoke_model(
+            bedrock_client,
+            priority='interactive',
             body=body,
             modelId=model_id,
             accept="application/json",
@@ -0,0 +1,435 @@
+"""
+Run Comparison Module
+Compares a performance test run against a baseline run and flags regressions
+
+Each run is reduced once to a compact summary stored next to its results:
+per-label latency sketches, error counts and a throughput series over fixed
+windows. Labels are aligned by name across the two runs. Latency is
+compared with a Mann-Whitney U test over the sketch buckets and bootstrap
+confidence intervals on the change in p50, p95 and p99. Error rates use a
+two-proportion test and throughput a Welch test over the window series.
+A change is a regression only when it is statistically significant after
+correcting for the number of tests and at least as large as the minimum
+effect, so noise between identical runs does not fail a comparison.
+"""
+
+import json
+import logging
+import math
+import os
+from datetime import datetime
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from live_metrics import LatencySketch, LiveMetrics
+import test_executor
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_VERSION = 1
+# Width of the throughput series windows, in seconds of sample time
+SUMMARY_WINDOW_SECONDS = 10
+# Windows kept per run (24 hours at the default width)
+SUMMARY_MAX_WINDOWS = 8640
+COMPARED_QUANTILES = (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+# Samples a label needs in both runs before it is compared
+MIN_LABEL_SAMPLES = 30
+# Samples a run needs beyond a quantile (e.g. 1000 for p99) before that quantile is compared
+MIN_TAIL_SAMPLES = 10
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_SEED = 20240101
+# Floor for zero latencies when comparing on a log scale
+MIN_LATENCY_MS = 0.5
+
+DEFAULT_MIN_EFFECT_PERCENT = 5.0
+DEFAULT_MIN_ERROR_RATE_INCREASE = 1.0
+DEFAULT_CONFIDENCE = 0.95
+
+
+def compare_runs(baseline_session_id: str, candidate_session_id: str, s3_client,
+                 min_effect_percent: float = DEFAULT_MIN_EFFECT_PERCENT,
+                 min_error_rate_increase: float = DEFAULT_MIN_ERROR_RATE_INCREASE,
+                 confidence: float = DEFAULT_CONFIDENCE,
+                 labels: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Compare a candidate run's results against a baseline run
+
+    Args:
+        baseline_session_id: Session ID of the reference run
+        candidate_session_id: Session ID of the run being checked
+        s3_client: AWS S3 client
+        min_effect_percent: Smallest latency or throughput change (%) that counts
+        min_error_rate_increase: Smallest error rate increase (percentage points) that counts
+        confidence: Confidence level for the whole comparison
+        labels: Compare only these labels (default: all labels)
+
+    Returns:
+        Per-label comparison and an overall verdict: 'regression', 'improvement',
+        'no_change' or 'inconclusive'
+    """
+    try:
+        baseline_session_id = test_executor._sanitize_session_id(baseline_session_id)
+        candidate_session_id = test_executor._sanitize_session_id(candidate_session_id)
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+
+        baseline = get_run_summary(baseline_session_id, s3_client)
+        candidate = get_run_summary(candidate_session_id, s3_client)
+        for session_id, summary in ((baseline_session_id, baseline), (candidate_session_id, candidate)):
+            if not summary['labels']:
+                raise ValueError(f"No results found for session {session_id}")
+
+        comparison = compare_summaries(baseline, candidate, min_effect_percent,
+                                       min_error_rate_increase, confidence, labels)
+        comparison.update({
+            'baseline_session_id': baseline_session_id,
+            'candidate_session_id': candidate_session_id,
+            'comparison_timestamp': datetime.utcnow().isoformat(),
+        })
+
+        bucket_name = os.environ.get('S3_BUCKET_NAME')
+        s3_key = f"perf-pipeline/{candidate_session_id}/analysis/comparison_{baseline_session_id}.json"
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=s3_key,
+            Body=json.dumps(comparison, indent=2),
+            ContentType='application/json'
+        )
+        logger.info(f"Comparison of {candidate_session_id} against {baseline_session_id}: {comparison['verdict']}")
+
+        return {'status': 'completed', **comparison, 's3_location': f"s3://{bucket_name}/{s3_key}"}
+
+    except Exception as e:
+        logger.error(f"Error comparing runs: {str(e)}")
+        return {
+            'baseline_session_id': baseline_session_id,
+            'candidate_session_id': candidate_session_id,
+            'status': 'error',
+            'error': str(e)
+        }
+
+
+def get_run_summary(session_id: str, s3_client) -> Dict[str, Any]:
+    """
+    Compact summary of a run's JTL results, built once and stored in S3
+
+    The stored summary is reused while the result files it was built from
+    are unchanged.
+    """
+    bucket_name = os.environ.get('S3_BUCKET_NAME')
+    response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix=f"perf-pipeline/{session_id}/results/")
+    source_files = sorted(
+        ({'key': obj['Key'], 'size': obj.get('Size', 0)} for obj in response.get('Contents', [])
+         if obj['Key'].endswith('.jtl')),
+        key=lambda f: f['key']
+    )
+
+    summary_key = f"perf-pipeline/{session_id}/analysis/run_summary.json"
+    try:
+        stored = json.loads(s3_client.get_object(Bucket=bucket_name, Key=summary_key)['Body'].read())
+        if stored.get('summary_version') == SUMMARY_VERSION and stored.get('source_files') == source_files:
+            return stored
+    except Exception:
+        pass
+
+    metrics = LiveMetrics(window_seconds=SUMMARY_WINDOW_SECONDS, max_windows=SUMMARY_MAX_WINDOWS)
+    for source in source_files:
+        content = s3_client.get_object(Bucket=bucket_name, Key=source['key'])['Body'].read().decode('utf-8')
+        rows = metrics.add_jtl_segment(content)
+        logger.info(f"Summarized {rows} samples from {source['key']}")
+
+    summary = summarize_metrics(metrics)
+    summary.update({'session_id': session_id, 'source_files': source_files})
+    if source_files:
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=summary_key,
+            Body=json.dumps(summary),
+            ContentType='application/json'
+        )
+    return summary
+
+
+def summarize_metrics(metrics: LiveMetrics) -> Dict[str, Any]:
+    """Per-label sketches, errors and throughput series of the samples in metrics"""
+    window_indexes = sorted(metrics.windows)
+    # Drop the partly covered first and last windows when there are enough others
+    if len(window_indexes) > 3:
+        window_indexes = window_indexes[1:-1]
+    first = window_indexes[0] if window_indexes else 0
+    span = range(first, window_indexes[-1] + 1) if window_indexes else range(0)
+
+    labels = {}
+    for label, stats in sorted(metrics.totals.items()):
+        labels[label] = {
+            'requests': stats.requests,
+            'errors': stats.errors,
+            'sketch': stats.sketch.to_dict(),
+            'throughput_series': [
+                metrics.windows[index][label].requests
+                if index in metrics.windows and label in metrics.windows[index] else 0
+                for index in span
+            ],
+        }
+    return {
+        'summary_version': SUMMARY_VERSION,
+        'created': datetime.utcnow().isoformat(),
+        'window_seconds': metrics.window_ms / 1000,
+        'duration_seconds': round((metrics.latest_ms - metrics.first_ms) / 1000, 1) if metrics.rows else 0,
+        'samples': metrics.rows,
+        'labels': labels,
+    }
+
+
+def compare_summaries(baseline: Dict[str, Any], candidate: Dict[str, Any],
+                      min_effect_percent: float = DEFAULT_MIN_EFFECT_PERCENT,
+                      min_error_rate_increase: float = DEFAULT_MIN_ERROR_RATE_INCREASE,
+                      confidence: float = DEFAULT_CONFIDENCE,
+                      labels: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Compare two run summaries label by label"""
+    baseline_labels = set(baseline['labels'])
+    candidate_labels = set(candidate['labels'])
+    if labels:
+        baseline_labels &= set(labels)
+        candidate_labels &= set(labels)
+    shared = sorted(baseline_labels & candidate_labels)
+
+    # Bonferroni: the confidence level holds across every test in the comparison
+    tests = max(1, len(shared) * (len(COMPARED_QUANTILES) + 3))
+    alpha = (1 - confidence) / tests
+    z_critical = NormalDist().inv_cdf(1 - alpha / 2)
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+
+    results = {}
+    for label in shared:
+        results[label] = _compare_label(
+            baseline['labels'][label], candidate['labels'][label], baseline['window_seconds'],
+            candidate['window_seconds'], min_effect_percent, min_error_rate_increase, alpha, z_critical, rng
+        )
+    for label in sorted(baseline_labels - candidate_labels):
+        results[label] = {'status': 'removed'}
+    for label in sorted(candidate_labels - baseline_labels):
+        results[label] = {'status': 'added'}
+
+    regressions, improvements = [], []
+    for label, result in results.items():
+        for finding in result.get('findings', []):
+            entry = {'label': label, **finding}
+            (regressions if finding['direction'] == 'regression' else improvements).append(entry)
+
+    compared = [r for r in results.values() if r['status'] not in ('removed', 'added', 'insufficient_data')]
+    if regressions:
+        verdict = 'regression'
+    elif not compared:
+        verdict = 'inconclusive'
+    elif improvements:
+        verdict = 'improvement'
+    else:
+        verdict = 'no_change'
+
+    return {
+        'verdict': verdict,
+        'passed': verdict != 'regression',
+        'regressions': regressions,
+        'improvements': improvements,
+        'labels_compared': len(compared),
+        'labels': results,
+        'settings': {
+            'min_effect_percent': min_effect_percent,
+            'min_error_rate_increase': min_error_rate_increase,
+            'confidence': confidence,
+            'per_test_alpha': alpha,
+            'bootstrap_resamples': BOOTSTRAP_RESAMPLES,
+        },
+    }
+
+
+def _compare_label(baseline: Dict[str, Any], candidate: Dict[str, Any], baseline_window: float,
+                   candidate_window: float, min_effect_percent: float, min_error_rate_increase: float,
+                   alpha: float, z_critical: float, rng) -> Dict[str, Any]:
+    base_sketch = LatencySketch.from_dict(baseline['sketch'])
+    cand_sketch = LatencySketch.from_dict(candidate['sketch'])
+    result = {
+        'baseline': _describe_side(baseline, base_sketch, baseline_window),
+        'candidate': _describe_side(candidate, cand_sketch, candidate_window),
+    }
+    if min(base_sketch.count, cand_sketch.count) < MIN_LABEL_SAMPLES:
+        result['status'] = 'insufficient_data'
+        return result
+
+    findings = []
+    latency = {}
+    base_boot = _bootstrap_quantiles(base_sketch, rng)
+    cand_boot = _bootstrap_quantiles(cand_sketch, rng)
+    for column, (name, q) in enumerate(COMPARED_QUANTILES):
+        if min(base_sketch.count, cand_sketch.count) * (1 - q) < MIN_TAIL_SAMPLES:
+            latency[name] = {'status': 'insufficient_data'}
+            continue
+        base_value = max(base_sketch.quantile(q), MIN_LATENCY_MS)
+        cand_value = max(cand_sketch.quantile(q), MIN_LATENCY_MS)
+        log_ratio = math.log(cand_value / base_value)
+        standard_error = float(np.std(np.log(cand_boot[:, column]) - np.log(base_boot[:, column]), ddof=1))
+        low = math.exp(log_ratio - z_critical * standard_error) - 1
+        high = math.exp(log_ratio + z_critical * standard_error) - 1
+        change = (cand_value / base_value - 1) * 100
+        entry = {
+            'baseline_ms': round(base_value, 1),
+            'candidate_ms': round(cand_value, 1),
+            'change_percent': round(change, 2),
+            'ci_percent': [round(low * 100, 2), round(high * 100, 2)],
+            'status': _classify(change, low > 0, high < 0, min_effect_percent),
+        }
+        latency[name] = entry
+        if entry['status'] != 'no_change':
+            findings.append({'metric': name, 'direction': entry['status'],
+                             'change_percent': entry['change_percent'], 'ci_percent': entry['ci_percent']})
+    result['latency'] = latency
+
+    shift = _mann_whitney(base_sketch, cand_sketch)
+    shift['significant'] = shift['p_value'] < alpha
+    result['distribution_shift'] = shift
+
+    error_rate = _compare_error_rates(baseline, candidate, min_error_rate_increase, alpha)
+    result['error_rate'] = error_rate
+    if error_rate['status'] != 'no_change':
+        findings.append({'metric': 'error_rate', 'direction': error_rate['status'],
+                         'change_points': error_rate['change_points']})
+
+    throughput = _compare_throughput(baseline['throughput_series'], candidate['throughput_series'],
+                                     baseline_window, candidate_window, min_effect_percent, alpha)
+    result['throughput'] = throughput
+    if throughput['status'] not in ('no_change', 'insufficient_data'):
+        findings.append({'metric': 'throughput', 'direction': throughput['status'],
+                         'change_percent': throughput['change_percent']})
+
+    result['findings'] = findings
+    directions = {f['direction'] for f in findings}
+    result['status'] = ('regression' if 'regression' in directions
+                        else 'improvement' if directions else 'no_change')
+    return result
+
+
+def _classify(change_percent: float, significantly_higher: bool, significantly_lower: bool,
+              min_effect_percent: float, higher_is_worse: bool = True) -> str:
+    if significantly_higher and change_percent >= min_effect_percent:
+        return 'regression' if higher_is_worse else 'improvement'
+    if significantly_lower and change_percent <= -min_effect_percent:
+        return 'improvement' if higher_is_worse else 'regression'
+    return 'no_change'
+
+
+def _describe_side(data: Dict[str, Any], sketch: LatencySketch, window_seconds: float) -> Dict[str, Any]:
+    series = data['throughput_series']
+    return {
+        'requests': data['requests'],
+        'error_rate': round(data['errors'] / data['requests'] * 100, 2) if data['requests'] else 0,
+        'p50_ms': round(sketch.quantile(0.50), 1),
+        'p95_ms': round(sketch.quantile(0.95), 1),
+        'p99_ms': round(sketch.quantile(0.99), 1),
+        'throughput_rps': round(sum(series) / (len(series) * window_seconds), 2) if series else None,
+    }
+
+
+def _sketch_histogram(sketch: LatencySketch):
+    """Bucket values in ascending order and their counts, zero latencies first"""
+    indexes = sorted(sketch.buckets)
+    values = np.array([0.0] + [LatencySketch.bucket_value(i) for i in indexes])
+    counts = np.array([sketch.zero_count] + [sketch.buckets[i] for i in indexes], dtype=np.int64)
+    return values, counts
+
+
+def _bootstrap_quantiles(sketch: LatencySketch, rng) -> np.ndarray:
+    """Compared quantiles of BOOTSTRAP_RESAMPLES resamples of the sketch, one row per resample"""
+    values, counts = _sketch_histogram(sketch)
+    total = int(counts.sum())
+    draws = rng.multinomial(total, counts / total, size=BOOTSTRAP_RESAMPLES)
+    cumulative = np.cumsum(draws, axis=1)
+    columns = []
+    for _, q in COMPARED_QUANTILES:
+        rank = q * (total - 1)
+        columns.append(values[np.argmax(cumulative > rank, axis=1)])
+    return np.maximum(np.column_stack(columns), MIN_LATENCY_MS)
+
+
+def _mann_whitney(baseline: LatencySketch, candidate: LatencySketch) -> Dict[str, Any]:
+    """
+    Mann-Whitney U test of candidate against baseline latencies
+
+    Values in the same sketch bucket are treated as ties. Returns the
+    probability that a random candidate request is slower than a random
+    baseline request (0.5 when the distributions match) and its p-value.
+    """
+    n_base, n_cand = baseline.count, candidate.count
+    u = 0.0
+    base_below = 0
+    tie_term = 0
+    buckets = [(baseline.zero_count, candidate.zero_count)] + [
+        (baseline.buckets.get(i, 0), candidate.buckets.get(i, 0))
+        for i in sorted(set(baseline.buckets) | set(candidate.buckets))
+    ]
+    for base_count, cand_count in buckets:
+        u += cand_count * (base_below + 0.5 * base_count)
+        base_below += base_count
+        tied = base_count + cand_count
+        tie_term += tied ** 3 - tied
+
+    n = n_base + n_cand
+    variance = n_base * n_cand / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    z = (u - n_base * n_cand / 2) / math.sqrt(variance) if variance > 0 else 0.0
+    return {
+        'probability_slower': round(u / (n_base * n_cand), 4),
+        'z': round(z, 2),
+        'p_value': math.erfc(abs(z) / math.sqrt(2)),
+    }
+
+
+def _compare_error_rates(baseline: Dict[str, Any], candidate: Dict[str, Any],
+                         min_increase: float, alpha: float) -> Dict[str, Any]:
+    """Two-proportion z-test on the error rates"""
+    n1, e1 = baseline['requests'], baseline['errors']
+    n2, e2 = candidate['requests'], candidate['errors']
+    rate1, rate2 = e1 / n1, e2 / n2
+    pooled = (e1 + e2) / (n1 + n2)
+    standard_error = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    z = (rate2 - rate1) / standard_error if standard_error > 0 else 0.0
+    p_value = math.erfc(abs(z) / math.sqrt(2))
+    change_points = (rate2 - rate1) * 100
+    significant = p_value < alpha
+    return {
+        'baseline_percent': round(rate1 * 100, 2),
+        'candidate_percent': round(rate2 * 100, 2),
+        'change_points': round(change_points, 2),
+        'p_value': p_value,
+        'status': _classify(change_points, significant and z > 0, significant and z < 0, min_increase),
+    }
+
+
+def _compare_throughput(baseline_series: List[int], candidate_series: List[int], baseline_window: float,
+                        candidate_window: float, min_effect_percent: float, alpha: float) -> Dict[str, Any]:
+    """Welch test on the per-window request rates"""
+    if len(baseline_series) < 2 or len(candidate_series) < 2:
+        return {'status': 'insufficient_data'}
+    base = np.asarray(baseline_series, dtype=float) / baseline_window
+    cand = np.asarray(candidate_series, dtype=float) / candidate_window
+    base_mean, cand_mean = float(base.mean()), float(cand.mean())
+    if base_mean <= 0:
+        return {'status': 'insufficient_data'}
+    standard_error = math.sqrt(base.var(ddof=1) / len(base) + cand.var(ddof=1) / len(cand))
+    if standard_error > 0:
+        z = (cand_mean - base_mean) / standard_error
+    else:
+        # Perfectly steady rates: any difference is real
+        z = math.copysign(math.inf, cand_mean - base_mean) if cand_mean != base_mean else 0.0
+    p_value = math.erfc(abs(z) / math.sqrt(2))
+    change = (cand_mean / base_mean - 1) * 100
+    significant = p_value < alpha
+    return {
+        'baseline_rps': round(base_mean, 2),
+        'candidate_rps': round(cand_mean, 2),
+        'change_percent': round(change, 2),
+        'p_value': p_value,
+        'status': _classify(change, significant and z > 0, significant and z < 0, min_effect_percent,
+                            higher_is_worse=False),
+    }
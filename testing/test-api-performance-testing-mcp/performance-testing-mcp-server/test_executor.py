@@ -6,14 +6,47 @@ Handles end-to-end test execution and analysis using ECS/Fargate
 import json
 import logging
 import os
+import random
 import re
+import threading
 import time
-from typing import Dict, Any, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
 import boto3
 from botocore.exceptions import ClientError
+from rate_limiter import bedrock_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# run_task calls in flight at once: enough to overlap launch latency while leaving
+# headroom under the ECS API rate limit (ECS_LAUNCH_CONCURRENCY overrides it)
+MAX_CONCURRENT_LAUNCHES = 10
+# describe_tasks accepts at most 100 task ARNs per call
+DESCRIBE_TASKS_BATCH_SIZE = 100
+LAUNCH_RETRY_ATTEMPTS = 5
+THROTTLING_ERROR_CODES = ('ThrottlingException', 'TooManyRequestsException', 'RequestLimitExceeded')
+STOPPED_STATUSES = ('STOPPED', 'DEPROVISIONING')
+# Completed tasks whose CloudWatch logs are read at once
+MAX_CONCURRENT_LOG_FETCHES = 8
+# Bytes of log messages read per task: the raw tail first, then filtered matches before it
+TASK_LOG_TAIL_BYTES = 256 * 1024
+TASK_LOG_MAX_BYTES = 1024 * 1024
+LOG_PAGE_EVENTS = 10000
+# Stopped tasks write no more logs, so their parsed logs are kept for repeated monitoring calls
+TASK_LOG_CACHE_ENTRIES = 512
+ERROR_PATTERNS = ('error:', 'exception', 'failed', 'could not find or load main class',
+                  'classnotfoundexception', 'compilation error')
+# Server-side filter for error lines and JMeter's periodic "summary +" / final "summary =" lines.
+# CloudWatch terms are case-sensitive, so each casing ERROR_PATTERNS matches is listed.
+LOG_FILTER_PATTERN = ' '.join(f'?"{term}"' for term in (
+    'error:', 'Error:', 'ERROR', 'exception', 'Exception', 'EXCEPTION', 'failed', 'Failed', 'FAILED',
+    'Could not find or load main class', 'could not find or load main class', 'summary =', 'summary +'
+))
+
+_task_log_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_task_log_cache_lock = threading.Lock()
+
 def execute_test(session_id: str, execution_environment: Dict, monitoring_config: Dict,
                 s3_client, ecs_client, bedrock_client) -> Dict[str, Any]:
     """
@@ -186,21 +219,31 @@ def _start_test_execution(session_id: str, test_plans: Dict, execution_environme
         # Create task definition if it doesn't exist
         _ensure_task_definition_exists(task_definition, execution_environment, ecs_client)
         
-        # Start ECS tasks for each test plan
-        running_tasks = []
+        # Start one ECS task per test plan. Each task needs its own PLAN_NAME
+        # override, which run_task's count cannot vary, so launch them concurrently
         target_url = execution_environment.get('target_url')
+        launch_start = time.time()
+        max_workers = min(int(os.environ.get('ECS_LAUNCH_CONCURRENCY', MAX_CONCURRENT_LAUNCHES)), len(test_plans)) or 1
         
-        for plan_name, plan_content in test_plans.items():
-            task_result = _start_single_test_task(
-                session_id, plan_name, cluster_name, task_definition, ecs_client, target_url
-            )
-            running_tasks.append(task_result)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running_tasks = list(executor.map(
+                lambda plan_name: _start_single_test_task(
+                    session_id, plan_name, cluster_name, task_definition, ecs_client, target_url
+                ),
+                test_plans
+            ))
+        
+        failed = [t for t in running_tasks if t['status'] != 'started']
+        if failed:
+            logger.warning(f"{len(failed)} of {len(running_tasks)} test tasks failed to start")
         
         return {
             'cluster_name': cluster_name,
             'task_definition': task_definition,
             'running_tasks': running_tasks,
             'total_tasks': len(running_tasks),
+            'failed_to_start': len(failed),
+            'launch_duration': time.time() - launch_start,
             'start_time': time.time()
         }
         
@@ -291,7 +334,8 @@ def _start_single_test_task(session_id: str, plan_name: str, cluster_name: str,
                 target_host = target_url
                 target_port = "80"
         
-        response = ecs_client.run_task(
+        response = _run_task_with_retry(
+            ecs_client,
             cluster=cluster_name,
             taskDefinition=task_definition,
             launchType='FARGATE',
@@ -322,6 +366,14 @@ def _start_single_test_task(session_id: str, plan_name: str, cluster_name: str,
             ]
         )
         
+        if not response.get('tasks'):
+            reasons = [f.get('reason', 'Unknown') for f in response.get('failures', [])]
+            return {
+                'plan_name': plan_name,
+                'status': 'failed_to_start',
+                'error': f"ECS did not start the task: {', '.join(reasons) or 'no tasks returned'}"
+            }
+        
         task_arn = response['tasks'][0]['taskArn']
         
         return {
@@ -339,10 +391,48 @@ def _start_single_test_task(session_id: str, plan_name: str, cluster_name: str,
             'error': str(e)
         }
 
-def _monitor_execution(session_id: str, execution_result: Dict, monitoring_config: Dict, ecs_client) -> Dict[str, Any]:
-    """Monitor test execution progress"""
+def _run_task_with_retry(ecs_client, **run_task_args) -> Dict[str, Any]:
+    """Call run_task, backing off and retrying when ECS throttles concurrent launches"""
+    return _call_with_retry(ecs_client.run_task, **run_task_args)
+
+def _call_with_retry(operation, **kwargs) -> Dict[str, Any]:
+    """Call an AWS API operation, backing off and retrying when it is throttled"""
+    for attempt in range(LAUNCH_RETRY_ATTEMPTS):
+        try:
+            return operation(**kwargs)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in THROTTLING_ERROR_CODES or attempt == LAUNCH_RETRY_ATTEMPTS - 1:
+                raise
+            # Full jitter keeps concurrent launches from retrying in lockstep
+            time.sleep(random.uniform(0, 0.5 * 2 ** attempt))
+
+def _monitor_execution(session_id: str, execution_result: Dict, monitoring_config: Dict, ecs_client,
+                       s3_client=None, logs_client=None, clock=time.time, sleep=time.sleep) -> Dict[str, Any]:
+    """
+    Monitor test execution progress
+    
+    Polls all tasks with batched describe_tasks calls. The polling interval
+    starts at TASK_POLLING_MIN_INTERVAL_SECONDS and backs off towards
+    TASK_POLLING_INTERVAL_SECONDS while nothing changes, dropping back to
+    the minimum whenever a task stops, since tasks of one session tend to
+    finish close together. When s3_client is given, each task's results
+    are collected as soon as it stops rather than after the last one.
+    
+    Args:
+        session_id: Session ID linking to test results
+        execution_result: Result of _start_test_execution
+        monitoring_config: Monitoring configuration; duration caps the wait
+        ecs_client: AWS ECS client
+        s3_client: AWS S3 client for incremental result collection
+        logs_client: CloudWatch Logs client (created if not given)
+        clock: Time source in seconds
+        sleep: Sleep function matching clock
+    
+    Returns:
+        Completed tasks with their results, and tasks still running
+    """
     try:
-        running_tasks = execution_result.get('running_tasks', [])
+        running_tasks = [t for t in execution_result.get('running_tasks', []) if t.get('task_arn')]
         cluster_name = execution_result.get('cluster_name')
         
         if not running_tasks:
@@ -351,60 +441,81 @@ def _monitor_execution(session_id: str, execution_result: Dict, monitoring_confi
         # Monitor tasks until completion
         max_wait_time = monitoring_config.get('duration', '30m')
         max_wait_seconds = _time_to_seconds(max_wait_time)
+        min_interval = float(os.environ.get('TASK_POLLING_MIN_INTERVAL_SECONDS', '5'))
+        max_interval = max(min_interval, float(os.environ.get('TASK_POLLING_INTERVAL_SECONDS', '30')))
         
-        start_time = time.time()
+        start_time = clock()
         completed_tasks = []
+        pending = {task['task_arn']: task for task in running_tasks}
+        polling_interval = min_interval
+        describe_calls = 0
         
-        while time.time() - start_time < max_wait_seconds:
-            task_arns = [task['task_arn'] for task in running_tasks if task.get('task_arn')]
-            
-            if not task_arns:
-                break
-            
-            # Check task status
-            response = ecs_client.describe_tasks(
-                cluster=cluster_name,
-                tasks=task_arns
-            )
+        with ThreadPoolExecutor(max_workers=4) as collector:
+            result_futures = {}
             
-            still_running = []
-            
-            for task in response['tasks']:
-                task_arn = task['taskArn']
-                last_status = task['lastStatus']
+            while pending:
+                stopped = []
+                arns = list(pending)
+                for i in range(0, len(arns), DESCRIBE_TASKS_BATCH_SIZE):
+                    response = ecs_client.describe_tasks(
+                        cluster=cluster_name,
+                        tasks=arns[i:i + DESCRIBE_TASKS_BATCH_SIZE]
+                    )
+                    describe_calls += 1
+                    
+                    for task in response.get('tasks', []):
+                        if task['lastStatus'] in STOPPED_STATUSES:
+                            stopped.append((task['taskArn'], task['lastStatus'], task.get('stoppedReason', 'Unknown')))
+                    # Tasks ECS no longer knows about will never report STOPPED
+                    for failure in response.get('failures', []):
+                        if failure.get('reason') == 'MISSING':
+                            stopped.append((failure.get('arn'), 'MISSING', 'Task not found'))
                 
-                if last_status in ['STOPPED', 'DEPROVISIONING']:
-                    # Task completed
-                    task_info = next((t for t in running_tasks if t.get('task_arn') == task_arn), {})
-                    completed_tasks.append({
+                now = clock()
+                for task_arn, last_status, stop_reason in stopped:
+                    task_info = pending.pop(task_arn, None)
+                    if task_info is None:
+                        continue
+                    completed = {
                         **task_info,
                         'final_status': last_status,
-                        'stop_reason': task.get('stoppedReason', 'Unknown'),
-                        'completion_time': time.time()
-                    })
-                else:
-                    still_running.append(task_arn)
-            
-            running_tasks = [t for t in running_tasks if t.get('task_arn') in still_running]
-            
-            if not running_tasks:
-                break
+                        'stop_reason': stop_reason,
+                        'completion_time': now
+                    }
+                    completed_tasks.append(completed)
+                    if s3_client is not None:
+                        result_futures[task_arn] = collector.submit(
+                            _collect_plan_results, session_id, task_info['plan_name'], s3_client
+                        )
+                
+                if not pending:
+                    break
+                
+                remaining = max_wait_seconds - (now - start_time)
+                if remaining <= 0:
+                    break
+                
+                # Intentional sleep: Poll ECS task status with backoff to avoid API throttling
+                polling_interval = min_interval if stopped else min(polling_interval * 1.5, max_interval)
+                sleep(min(polling_interval, remaining))
             
-            # Intentional sleep: Poll ECS task status every 30 seconds to avoid API throttling
-            # This is necessary for monitoring long-running performance test tasks
-            polling_interval = int(os.environ.get('TASK_POLLING_INTERVAL_SECONDS', '30'))
-            time.sleep(polling_interval)
+            for completed in completed_tasks:
+                future = result_futures.get(completed['task_arn'])
+                if future is not None:
+                    completed['results'] = future.result()
         
         # Fetch logs for failed tasks
-        logs_client = boto3.client('logs', region_name=os.environ.get('DEPLOYMENT_REGION', 'us-west-2'))
+        if logs_client is None:
+            logs_client = boto3.client('logs', region_name=os.environ.get('DEPLOYMENT_REGION', 'us-west-2'))
         task_logs = _fetch_task_logs(completed_tasks, logs_client)
         
         return {
             'session_id': session_id,
-            'monitoring_duration': time.time() - start_time,
+            'monitoring_duration': clock() - start_time,
             'completed_tasks': completed_tasks,
-            'still_running': len(running_tasks),
-            'total_tasks': len(completed_tasks) + len(running_tasks),
+            'still_running': len(pending),
+            'total_tasks': len(completed_tasks) + len(pending),
+            'describe_calls': describe_calls,
             'task_logs': task_logs
         }
         
@@ -448,6 +559,21 @@ def _collect_test_results(session_id: str, s3_client) -> Dict[str, Any]:
             'error': str(e)
         }
 
+def _collect_plan_results(session_id: str, plan_name: str, s3_client) -> Dict[str, Any]:
+    """Collect the results of one test plan from S3 once its task has stopped"""
+    try:
+        bucket_name = os.environ.get('S3_BUCKET_NAME')
+        base_name = os.path.splitext(os.path.basename(plan_name))[0]
+        s3_key = _sanitize_s3_path(f"perf-pipeline/{session_id}/results/{base_name}_results.jtl")
+        
+        result_response = s3_client.get_object(Bucket=bucket_name, Key=s3_key)
+        content = result_response['Body'].read().decode('utf-8')
+        return _parse_jtl_results(content)
+        
+    except Exception as e:
+        logger.warning(f"Could not collect results for {plan_name}: {str(e)}")
+        return {'error': f'Results not available: {str(e)}'}
+
 def _parse_jtl_results(jtl_content: str) -> Dict[str, Any]:
     """Parse JMeter JTL results file"""
     try:
@@ -526,7 +652,9 @@ Provide comprehensive analysis and recommendations."""
         body = json.dumps(prompt_config)
         model_id = os.environ.get("BEDROCK_MODEL_ID", "us.anthropic.claude-3-7-sonnet-20250219-v1:0")
         
-        response = bedrock_client.invoke_model(
+        response = bedrock_rate_limiter.invoke_model(
+            bedrock_client,
+            priority='batch',
             body=body,
             modelId=model_id,
             accept="application/json",
@@ -688,90 +816,97 @@ def _time_to_seconds(time_str: str) -> int:
             return 1800
 
 def _fetch_task_logs(completed_tasks: List[Dict], logs_client) -> Dict[str, Any]:
-    """Fetch CloudWatch logs for completed tasks to identify errors"""
+    """
+    Fetch CloudWatch logs for completed tasks to identify errors
+    
+    Tasks are read concurrently, up to LOG_FETCH_CONCURRENCY (default
+    MAX_CONCURRENT_LOG_FETCHES) at a time, with throttled calls retried.
+    Each task's stream is read tail first, since the end holds JMeter's
+    final summary and the reason a task stopped; when the stream is longer
+    than TASK_LOG_TAIL_BYTES, only error and summary lines before the tail
+    are fetched, filtered server-side, up to TASK_LOG_MAX_BYTES. Results
+    for a stream are cached, so monitoring the same tasks again does not
+    read their logs again.
+    
+    Args:
+        completed_tasks: Completed tasks from _monitor_execution
+        logs_client: CloudWatch Logs client
+    
+    Returns:
+        Error lines, compilation errors and a per-plan summary
+    """
     try:
         task_logs = {
             'logs_fetched': 0,
+            'logs_cached': 0,
             'error_logs': [],
             'summary': {}
         }
         
-        log_group_name = "/ecs/java-jmeter-runner"
+        log_group_name = os.environ.get('JMETER_LOG_GROUP', '/ecs/java-jmeter-runner')
+        stream_prefix = os.environ.get('JMETER_LOG_STREAM_PREFIX', 'ecs/jmeter-runner')
         
+        streams = []
         for task in completed_tasks:
             task_arn = task.get('task_arn', '')
-            plan_name = task.get('plan_name', 'unknown')
-            
             # Extract task ID from ARN
             task_id = task_arn.split('/')[-1] if task_arn else ''
-            
-            if not task_id:
-                continue
-            
-            # Construct log stream name
-            log_stream_name = f"ecs/jmeter-runner/{task_id}"
-            
+            if task_id:
+                streams.append((task, f"{stream_prefix}/{task_id}"))
+        
+        def fetch(log_stream_name: str) -> Tuple[Dict[str, Any], bool]:
+            cache_key = (log_group_name, log_stream_name)
+            with _task_log_cache_lock:
+                if cache_key in _task_log_cache:
+                    _task_log_cache.move_to_end(cache_key)
+                    return _task_log_cache[cache_key], True
+            parsed = _parse_task_log_events(*_read_task_log(logs_client, log_group_name, log_stream_name))
+            with _task_log_cache_lock:
+                _task_log_cache[cache_key] = parsed
+                while len(_task_log_cache) > TASK_LOG_CACHE_ENTRIES:
+                    _task_log_cache.popitem(last=False)
+            return parsed, False
+        
+        max_workers = min(int(os.environ.get('LOG_FETCH_CONCURRENCY', MAX_CONCURRENT_LOG_FETCHES)), len(streams)) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch, log_stream_name) for _, log_stream_name in streams]
+        
+        for (task, log_stream_name), future in zip(streams, futures):
+            plan_name = task.get('plan_name', 'unknown')
             try:
-                # Get log events
-                response = logs_client.get_log_events(
-                    logGroupName=log_group_name,
-                    logStreamName=log_stream_name,
-                    startFromHead=True
-                )
-                
-                events = response.get('events', [])
-                task_logs['logs_fetched'] += 1
-                
-                # Look for error messages
-                error_messages = []
-                compilation_errors = []
-                
-                for event in events:
-                    message = event.get('message', '')
-                    timestamp = event.get('timestamp', 0)
-                    
-                    # Check for common error patterns
-                    if any(error_pattern in message.lower() for error_pattern in [
-                        'error:', 'exception', 'failed', 'could not find or load main class',
-                        'classnotfoundexception', 'compilation error'
-                    ]):
-                        error_messages.append({
-                            'timestamp': timestamp,
-                            'message': message,
-                            'plan_name': plan_name
-                        })
-                    
-                    # Specific compilation errors
-                    if 'could not find or load main class' in message.lower():
-                        compilation_errors.append({
-                            'type': 'ClassNotFoundException',
-                            'message': message,
-                            'plan_name': plan_name,
-                            'timestamp': timestamp
-                        })
-                
-                if error_messages:
-                    task_logs['error_logs'].extend(error_messages)
-                
-                if compilation_errors:
-                    if 'compilation_errors' not in task_logs:
-                        task_logs['compilation_errors'] = []
-                    task_logs['compilation_errors'].extend(compilation_errors)
-                
-                # Summary for this task
-                task_logs['summary'][plan_name] = {
-                    'total_log_events': len(events),
-                    'error_count': len(error_messages),
-                    'has_compilation_errors': len(compilation_errors) > 0,
-                    'task_status': task.get('final_status', 'unknown')
-                }
-                
+                parsed, cached = future.result()
             except Exception as log_error:
-                logger.warning(f"Could not fetch logs for task {task_id}: {str(log_error)}")
+                logger.warning(f"Could not fetch logs for stream {log_stream_name}: {str(log_error)}")
                 task_logs['summary'][plan_name] = {
                     'log_fetch_error': str(log_error),
                     'task_status': task.get('final_status', 'unknown')
                 }
+                continue
+            
+            task_logs['logs_fetched'] += 1
+            if cached:
+                task_logs['logs_cached'] += 1
+            
+            error_messages = [{**error, 'plan_name': plan_name} for error in parsed['errors']]
+            compilation_errors = [{**error, 'plan_name': plan_name} for error in parsed['compilation_errors']]
+            
+            if error_messages:
+                task_logs['error_logs'].extend(error_messages)
+            
+            if compilation_errors:
+                if 'compilation_errors' not in task_logs:
+                    task_logs['compilation_errors'] = []
+                task_logs['compilation_errors'].extend(compilation_errors)
+            
+            # Summary for this task
+            task_logs['summary'][plan_name] = {
+                'total_log_events': parsed['total_log_events'],
+                'truncated': parsed['truncated'],
+                'jmeter_summary': parsed['jmeter_summary'],
+                'error_count': len(error_messages),
+                'has_compilation_errors': len(compilation_errors) > 0,
+                'task_status': task.get('final_status', 'unknown')
+            }
         
         return task_logs
         
@@ -781,4 +916,100 @@ def _fetch_task_logs(completed_tasks: List[Dict], logs_client) -> Dict[str, Any]
             'logs_fetched': 0,
             'error_logs': [],
             'fetch_error': str(e)
-        }
\ No newline at end of file
+        }
+
+def _read_task_log(logs_client, log_group_name: str, log_stream_name: str) -> Tuple[List[Dict], bool]:
+    """
+    Read a task's log stream, tail first, within TASK_LOG_MAX_BYTES
+    
+    Returns:
+        Events in time order, and whether events were left out to stay within the cap
+    """
+    tail = []
+    tail_bytes = 0
+    token = None
+    reached_head = False
+    while tail_bytes < TASK_LOG_TAIL_BYTES:
+        request = {'logGroupName': log_group_name, 'logStreamName': log_stream_name,
+                   'startFromHead': False, 'limit': LOG_PAGE_EVENTS}
+        if token:
+            request['nextToken'] = token
+        response = _call_with_retry(logs_client.get_log_events, **request)
+        events = response.get('events', [])
+        tail[:0] = events
+        tail_bytes += sum(len(event.get('message', '')) for event in events)
+        # Pages can be empty mid-stream; the start is reached when the backward token stops changing
+        next_token = response.get('nextBackwardToken')
+        if not next_token or next_token == token:
+            reached_head = True
+            break
+        token = next_token
+    
+    if reached_head or not tail:
+        return tail, False
+    
+    # Only errors and summary lines from before the tail; the tail's first millisecond is
+    # requested again so no event is lost between the two reads, and duplicates dropped
+    tail_start = tail[0].get('timestamp', 0)
+    seen = {(event.get('timestamp'), event.get('message')) for event in tail if event.get('timestamp') == tail_start}
+    matched = []
+    matched_bytes = tail_bytes
+    token = None
+    truncated = False
+    while True:
+        request = {'logGroupName': log_group_name, 'logStreamNames': [log_stream_name],
+                   'filterPattern': LOG_FILTER_PATTERN, 'endTime': tail_start}
+        if token:
+            request['nextToken'] = token
+        response = _call_with_retry(logs_client.filter_log_events, **request)
+        for event in response.get('events', []):
+            if (event.get('timestamp'), event.get('message')) in seen:
+                continue
+            matched_bytes += len(event.get('message', ''))
+            if matched_bytes > TASK_LOG_MAX_BYTES:
+                truncated = True
+                break
+            matched.append({'timestamp': event.get('timestamp', 0), 'message': event.get('message', '')})
+        token = response.get('nextToken')
+        if truncated or not token:
+            break
+    
+    return matched + tail, truncated
+
+def _parse_task_log_events(events: List[Dict], truncated: bool) -> Dict[str, Any]:
+    """Errors, compilation errors and the last JMeter summary line in a task's log events"""
+    errors = []
+    compilation_errors = []
+    jmeter_summary = None
+    
+    for event in events:
+        message = event.get('message', '')
+        timestamp = event.get('timestamp', 0)
+        lowered = message.lower()
+        
+        # Check for common error patterns
+        if any(error_pattern in lowered for error_pattern in ERROR_PATTERNS):
+            errors.append({
+                'timestamp': timestamp,
+                'message': message
+            })
+        
+        # Specific compilation errors
+        if 'could not find or load main class' in lowered:
+            compilation_errors.append({
+                'type': 'ClassNotFoundException',
+                'message': message,
+                'timestamp': timestamp
+            })
+        
+        # JMeter's cumulative totals, logged periodically and once at the end
+        if 'summary =' in message:
+            jmeter_summary = message.strip()
+    
+    return {
+        'total_log_events': len(events),
+        'truncated': truncated,
+        'jmeter_summary': jmeter_summary,
+        'errors': errors,
+        'compilation_errors': compilation_errors
+    }
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+JTL Memory Check - Summarize multi-gigabyte synthetic JTL files and assert peak RSS stays bounded.
+
+Streams a synthetic CSV JTL (2 GB by default) and a smaller XML JTL through
+read_jtl_summary with an S3 stand-in whose object bodies are generated as
+they are read, so nothing the size of the file exists anywhere. Each run
+happens in a fresh interpreter, which reports its peak RSS; the check fails
+if any exceeds --max-rss-mb. Percentiles are compared with the exact values
+known from the generator, the cached summary is checked to be reused
+without reading the file again and to be ignored once the file changes,
+and the previous whole-file pandas reader is measured on a small file for
+comparison.
+
+Usage:
+    python examples/jtl_memory_check.py [--csv-gb 2] [--xml-gb 0.25] [--max-rss-mb 160] [--legacy-mb 100]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+JTL_HEADER = ("timeStamp,elapsed,label,responseCode,responseMessage,threadName,dataType,success,failureMessage,"
+              "bytes,sentBytes,grpThreads,allThreads,URL,Latency,IdleTime,Connect\n")
+LABELS = ("Login", "List Products", "Checkout")
+ROWS_PER_BLOCK = 20000
+BLOCK_VARIANTS = 8
+# Percentile error allowed: the sketch's 1% plus rank rounding
+PERCENTILE_TOLERANCE = 0.02
+
+
+class SyntheticJTLStream:
+    """A JTL body produced as it is read: a header, then pre-built blocks of samples in rotation."""
+
+    def __init__(self, fmt: str, size_bytes: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.blocks, self.latencies = [], []
+        for _ in range(BLOCK_VARIANTS):
+            rows, latencies = [], []
+            for i in range(ROWS_PER_BLOCK):
+                elapsed = int(rng.lognormvariate(0, 0.5) * 120) + (2000 if rng.random() < 0.01 else 0)
+                failed = rng.random() < 0.02
+                label = LABELS[i % len(LABELS)]
+                if fmt == "csv":
+                    rows.append(f"{1700000000000 + i},{elapsed},{label},{500 if failed else 200},OK,Users 1-{i % 50},"
+                                f"text,{'false' if failed else 'true'},,512,0,50,50,http://target/{label},"
+                                f"{elapsed},0,0\n")
+                else:
+                    child = (f'<httpSample t="{elapsed // 2}" s="true" lb="{label} redirect" rc="200"/>'
+                             if i % 50 == 0 else "")
+                    rows.append(f'<httpSample t="{elapsed}" it="0" lt="{elapsed}" ct="3" ts="{1700000000000 + i}" '
+                                f's="{"false" if failed else "true"}" lb="{label}" rc="{500 if failed else 200}" '
+                                f'rm="OK" tn="Users 1-{i % 50}" dt="text" by="512" sby="0" ng="50" na="50">'
+                                f'{child}</httpSample>\n')
+                latencies.append(elapsed)
+            self.blocks.append("".join(rows).encode("utf-8"))
+            self.latencies.append(latencies)
+
+        self.head = (JTL_HEADER if fmt == "csv" else '<?xml version="1.0" encoding="UTF-8"?>\n'
+                     '<testResults version="1.2">\n').encode("utf-8")
+        self.tail = b"" if fmt == "csv" else b"</testResults>\n"
+        block_bytes = sum(len(b) for b in self.blocks) / BLOCK_VARIANTS
+        self.block_count = max(1, round(size_bytes / block_bytes))
+        self.size = (len(self.head) + len(self.tail)
+                     + sum(len(self.blocks[i % BLOCK_VARIANTS]) for i in range(self.block_count)))
+        self.reset()
+
+    def reset(self):
+        self.position = 0
+        self._parts = self._iter_parts()
+        self._buffer = b""
+
+    def _iter_parts(self):
+        yield self.head
+        for i in range(self.block_count):
+            yield self.blocks[i % BLOCK_VARIANTS]
+        yield self.tail
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            part = next(self._parts, None)
+            if part is None:
+                break
+            self._buffer += part
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self.position += len(data)
+        return data
+
+    def close(self):
+        pass
+
+    def expected(self):
+        """Exact request count and percentiles of the whole stream"""
+        counts = {}
+        for i in range(BLOCK_VARIANTS):
+            repeats = len(range(i, self.block_count, BLOCK_VARIANTS))
+            for value in self.latencies[i]:
+                counts[value] = counts.get(value, 0) + repeats
+        total = sum(counts.values())
+        result = {"requests": total}
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            rank, seen = q * (total - 1), 0
+            for value in sorted(counts):
+                seen += counts[value]
+                if seen > rank:
+                    result[name] = value
+                    break
+        return result
+
+
+class SyntheticS3Client:
+    """head_object, get_object and put_object over one synthetic JTL and the summaries written next to it."""
+
+    def __init__(self, key: str, stream: SyntheticJTLStream):
+        self.key = key
+        self.stream = stream
+        self.etag = '"v1"'
+        self.objects = {}
+        self.jtl_reads = 0
+
+    def head_object(self, Bucket, Key):
+        return {"ETag": self.etag, "ContentLength": self.stream.size}
+
+    def get_object(self, Bucket, Key, IfMatch=None):
+        if Key == self.key:
+            assert IfMatch in (None, self.etag)
+            self.jtl_reads += 1
+            self.stream.reset()
+            return {"Body": self.stream}
+        if Key not in self.objects:
+            from botocore.exceptions import ClientError
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "Not Found"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body.encode("utf-8") if isinstance(Body, str) else Body
+        return {}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child_streaming(fmt: str, size_gb: float) -> dict:
+    import s3_utils
+
+    stream = SyntheticJTLStream(fmt, int(size_gb * 1024 ** 3))
+    key = f"perf-pipeline/memory-check/results/TestPlan01_results.{fmt}.jtl"
+    client = SyntheticS3Client(key, stream)
+    s3_utils.s3 = client
+    rss_before = peak_rss_mb()
+
+    started = time.perf_counter()
+    summary = s3_utils.read_jtl_summary("local", key)
+    seconds = time.perf_counter() - started
+    rss_after = peak_rss_mb()
+
+    # The page reruns, then a new process starts: neither reads the file again
+    assert s3_utils.read_jtl_summary("local", key) == summary
+    s3_utils._summary_memo.clear()
+    assert s3_utils.read_jtl_summary("local", key) == summary and client.jtl_reads == 1, client.jtl_reads
+    # The file is rewritten: the stored summary no longer applies
+    client.etag = '"v2"'
+    s3_utils.read_jtl_summary("local", key)
+    assert client.jtl_reads == 2, client.jtl_reads
+
+    return {"summary": summary, "expected": stream.expected(), "bytes": stream.size, "seconds": seconds,
+            "rss_before_mb": rss_before, "rss_peak_mb": rss_after}
+
+
+def child_legacy(size_mb: float) -> dict:
+    import pandas as pd
+
+    stream = SyntheticJTLStream("csv", int(size_mb * 1024 ** 2))
+    rss_before = peak_rss_mb()
+    # The previous reader: the whole body in memory, then a DataFrame of it
+    body = stream.read()
+    df = pd.read_csv(io.BytesIO(body))
+    times = pd.to_numeric(df["elapsed"], errors="coerce").dropna()
+    float(times.quantile(0.95))
+    return {"bytes": stream.size, "rss_before_mb": rss_before, "rss_peak_mb": peak_rss_mb()}
+
+
+def run_child(*args) -> dict:
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *map(str, args)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--csv-gb", type=float, default=2.0)
+    parser.add_argument("--xml-gb", type=float, default=0.25)
+    parser.add_argument("--max-rss-mb", type=float, default=160.0, help="Peak RSS allowed for a streaming summary")
+    parser.add_argument("--legacy-mb", type=float, default=100.0, help="File size for the previous reader, 0 to skip")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, size = args.child[0], float(args.child[1])
+        result = child_legacy(size) if mode == "legacy" else child_streaming(mode, size)
+        print(json.dumps(result))
+        return
+
+    failures = []
+    for fmt, size_gb in (("csv", args.csv_gb), ("xml", args.xml_gb)):
+        if size_gb <= 0:
+            continue
+        result = run_child(fmt, size_gb)
+        summary, expected = result["summary"], result["expected"]
+        errors = [name for name in ("p50", "p95", "p99")
+                  if abs(summary[name] - expected[name]) > PERCENTILE_TOLERANCE * expected[name]]
+        if summary["requests"] != expected["requests"]:
+            errors.append("requests")
+        if result["rss_peak_mb"] > args.max_rss_mb:
+            errors.append("peak RSS")
+        failures += [f"{fmt}: {error}" for error in errors]
+        print(f"{fmt}  {result['bytes'] / 1024 ** 3:5.2f} GB, {summary['requests']:,} samples in "
+              f"{result['seconds']:5.1f}s ({result['bytes'] / 1024 ** 2 / result['seconds']:.0f} MB/s); "
+              f"peak RSS {result['rss_peak_mb']:.0f} MB (before parsing {result['rss_before_mb']:.0f} MB, "
+              f"bound {args.max_rss_mb:.0f} MB)")
+        print(f"     p50/p95/p99 {summary['p50']:.0f}/{summary['p95']:.0f}/{summary['p99']:.0f} ms, exact "
+              f"{expected['p50']}/{expected['p95']}/{expected['p99']} ms; cached summary reused, "
+              f"reparsed after the file changed")
+
+    if args.legacy_mb > 0:
+        legacy = run_child("legacy", args.legacy_mb)
+        print(f"\nprevious reader on {legacy['bytes'] / 1024 ** 2:.0f} MB: peak RSS {legacy['rss_peak_mb']:.0f} MB "
+              f"(+{legacy['rss_peak_mb'] - legacy['rss_before_mb']:.0f} MB for the file)")
+
+    if failures:
+        print(f"\nFAILED: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nAll summaries within bounds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Streaming JTL summaries in bounded memory
+
+Result files from long runs reach gigabytes, so they are never read whole:
+XML is walked with iterparse and each sample is cleared once counted, CSV
+is read line by line with csv.reader, and latencies go into a log-bucket
+quantile sketch whose size depends on the latency range, not the number
+of samples. Percentiles are accurate to SKETCH_RELATIVE_ACCURACY.
+"""
+import csv
+import math
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+try:
+    # Use secure XML parser to prevent XXE attacks
+    import defusedxml.ElementTree as ET
+    XML_PARSER_SAFE = True
+except ImportError:
+    # XML summaries are refused rather than parsed unsafely
+    ET = None
+    XML_PARSER_SAFE = False
+
+# Bytes read from the stream at a time
+READ_CHUNK_BYTES = 1024 * 1024
+# Relative error of reported percentiles
+SKETCH_RELATIVE_ACCURACY = 0.01
+# Response time columns in order of preference, as in the pandas reader this replaces
+TIME_COLUMNS = ("elapsed", "Elapsed", "responseTime", "t")
+# Distinct integer latencies counted exactly before further values go straight to the sketch
+MAX_EXACT_VALUES = 65536
+
+
+class LatencySketch:
+    """
+    Latency sketch with log-spaced buckets
+
+    Each value is counted in a bucket whose bounds are within the relative
+    accuracy of each other, so quantiles keep that accuracy while the number
+    of buckets grows only with the log of the latency range.
+    """
+
+    __slots__ = ("buckets", "zero_count", "count")
+
+    _gamma = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+    _log_gamma = math.log(_gamma)
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.count += count
+        if value <= 0:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.buckets))
+
+    @classmethod
+    def bucket_value(cls, index: int) -> float:
+        """Representative latency of a bucket, within the relative accuracy of all its values"""
+        return 2 * cls._gamma ** index / (cls._gamma + 1)
+
+
+class JTLSummarizer:
+    """Online request, error and latency aggregation for one result file"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.timed = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = LatencySketch()
+        # Integer latencies repeat constantly, so each distinct value is counted and sketched once
+        self._counts: Dict[float, int] = {}
+
+    def add(self, elapsed: Optional[float], success: bool) -> None:
+        self.requests += 1
+        if not success:
+            self.errors += 1
+        if elapsed is not None:
+            self.add_latency(elapsed)
+
+    def add_latency(self, elapsed: float) -> None:
+        self.timed += 1
+        self.total += elapsed
+        if elapsed < self.min:
+            self.min = elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        if elapsed in self._counts or (elapsed.is_integer() and len(self._counts) < MAX_EXACT_VALUES):
+            self._counts[elapsed] = self._counts.get(elapsed, 0) + 1
+        else:
+            self.sketch.add(elapsed)
+
+    def summary(self) -> Dict[str, Any]:
+        """Summary in the shape the dashboard shows; percentiles None when no latencies were read"""
+        for value, count in self._counts.items():
+            self.sketch.add(value, count)
+        self._counts.clear()
+
+        if not self.timed:
+            return {"requests": self.requests, "errors_pct": 0, "p95": None, "p99": None}
+        return {
+            "requests": self.requests,
+            "errors_pct": (self.errors / self.requests) * 100,
+            "p50": self.sketch.quantile(0.50),
+            "p90": self.sketch.quantile(0.90),
+            "p95": self.sketch.quantile(0.95),
+            "p99": self.sketch.quantile(0.99),
+            "avg": self.total / self.timed,
+            "min": float(self.min),
+            "max": float(self.max)
+        }
+
+
+def summarize_jtl_stream(stream: BinaryIO) -> Dict[str, Any]:
+    """
+    Summarize a JTL file from a binary stream, such as an S3 StreamingBody
+
+    Args:
+        stream: Object with read(size) returning bytes
+
+    Returns:
+        Dictionary with requests, errors_pct, avg, min, max and percentiles
+    """
+    head = stream.read(READ_CHUNK_BYTES)
+    sample = head[:1000].decode("utf-8", "ignore")
+    stream = _PrefixedStream(head, stream)
+
+    if "<testResults" in sample or "<httpSample" in sample:
+        return summarize_xml_jtl(stream)
+    return summarize_csv_jtl(stream)
+
+
+def summarize_xml_jtl(stream: BinaryIO) -> Dict[str, Any]:
+    """Summarize an XML JTL, keeping only the sample being read in memory"""
+    if not XML_PARSER_SAFE or ET is None:
+        raise RuntimeError(
+            "XML parsing disabled for security. Install defusedxml to enable: pip install defusedxml"
+        )
+
+    summarizer = JTLSummarizer()
+    depth = 0
+    root = None
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if root is None:
+                root = element
+            continue
+        depth -= 1
+        if depth == 1:
+            # A top-level sample; sub-samples are part of it and go with it
+            summarizer.add(float(int(element.get("t", "0"))), element.get("s", "true") == "true")
+            element.clear()
+            root.clear()
+    return summarizer.summary()
+
+
+def summarize_csv_jtl(stream: BinaryIO) -> Dict[str, Any]:
+    """Summarize a CSV JTL with a header row, one row at a time"""
+    reader = csv.reader(_iter_lines(stream))
+    header = next(reader, None)
+    summarizer = JTLSummarizer()
+    if not header:
+        return summarizer.summary()
+
+    time_index = next((header.index(name) for name in TIME_COLUMNS if name in header), None)
+    success_index = header.index("success") if "success" in header else None
+    code_index = header.index("responseCode") if "responseCode" in header else None
+
+    first = next(reader, None)
+    if first is None:
+        return summarizer.summary()
+    if time_index is None:
+        # Fall back to the first numeric column, judged by the first row
+        time_index = next((i for i, value in enumerate(first) if _to_number(value) is not None), 0)
+
+    for row in _chain_first(first, reader):
+        if not row:
+            continue
+        success = True
+        if success_index is not None:
+            success = success_index >= len(row) or row[success_index].strip().lower() != "false"
+        elif code_index is not None:
+            success = code_index < len(row) and row[code_index].startswith("2")
+        summarizer.add(_to_number(row[time_index]) if time_index < len(row) else None, success)
+    return summarizer.summary()
+
+
+def _to_number(value: str) -> Optional[float]:
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _chain_first(first, rest) -> Iterator:
+    yield first
+    yield from rest
+
+
+def _iter_lines(stream: BinaryIO) -> Iterator[str]:
+    """Decoded lines, newline included, read from the stream a chunk at a time"""
+    pending = b""
+    while True:
+        chunk = stream.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        # The last piece may be a partial line; a newline byte never falls inside a UTF-8 character
+        pending = lines.pop()
+        for line in lines:
+            yield line.decode("utf-8", "replace") + "\n"
+    if pending:
+        yield pending.decode("utf-8", "replace")
+
+
+class _PrefixedStream:
+    """A stream with bytes already read from it put back in front"""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if self._prefix:
+            if size is None or size < 0:
+                data, self._prefix = self._prefix + self._stream.read(), b""
+                return data
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            return data
+        return self._stream.read() if size is None or size < 0 else self._stream.read(size)
@@ -4,30 +4,29 @@ S3 utilities for reading performance testing artifacts
 import os
 import io
 import json
-import pandas as pd
 import boto3
 from typing import Dict, List, Optional, Any
 from botocore.exceptions import ClientError
-try:
-    # Use secure XML parser to prevent XXE attacks
-    import defusedxml.ElementTree as ET
-    XML_PARSER_SAFE = True
-except ImportError:
-    # Secure fallback: disable XML parsing entirely if defusedxml not available
-    ET = None
-    XML_PARSER_SAFE = False
+from jtl_summary import XML_PARSER_SAFE, summarize_csv_jtl, summarize_jtl_stream, summarize_xml_jtl
+if not XML_PARSER_SAFE:
+    # Secure fallback: XML parsing is disabled entirely if defusedxml not available
     import warnings
     warnings.warn(
         "defusedxml not available. XML parsing disabled for security. "
         "Install defusedxml to enable XML JTL parsing: pip install defusedxml", 
         UserWarning
     )
-import numpy as np
 
 # Configuration
 BUCKET = os.environ.get("ARTIFACT_BUCKET", "")
 DEMO_MODE = os.environ.get("DEMO_MODE", "false").lower() == "true"
 
+# Cached JTL summaries, stored next to each result file
+SUMMARY_SUFFIX = ".summary.json"
+SUMMARY_VERSION = 1
+# (bucket, key, etag, size) -> summary, so reruns of the page skip even the S3 read
+_summary_memo: Dict[tuple, Dict[str, Any]] = {}
+
 # S3 client
 s3 = boto3.client("s3") if not DEMO_MODE else None
 
@@ -114,6 +113,10 @@ def read_jtl_summary(bucket: str, key: str) -> Dict[str, Any]:
     """
     Read JTL file and compute performance summary statistics
     
+    The file is streamed from S3 and summarized in bounded memory. The
+    summary is stored next to it as <key>.summary.json together with the
+    file's ETag and size, so an unchanged file is never parsed again.
+    
     Args:
         bucket: S3 bucket name
         key: S3 object key for JTL file
@@ -125,59 +128,70 @@ def read_jtl_summary(bucket: str, key: str) -> Dict[str, Any]:
         return _demo_jtl_summary(key)
     
     try:
-        response = s3.get_object(Bucket=bucket, Key=key)
-        body = response["Body"].read()
+        head = s3.head_object(Bucket=bucket, Key=key)
+        source = {"etag": head.get("ETag", ""), "size": head.get("ContentLength", 0)}
         
-        # Detect format by sampling first 1000 bytes
-        sample = body[:1000].decode("utf-8", "ignore")
+        cached = _read_cached_summary(bucket, key, source)
+        if cached is not None:
+            return cached
         
-        if "<testResults" in sample or "<httpSample" in sample:
-            # XML JTL format
-            return _parse_xml_jtl(body)
-        else:
-            # CSV JTL format
-            return _parse_csv_jtl(body)
+        request = {"Bucket": bucket, "Key": key}
+        if source["etag"]:
+            # Parse exactly the version the summary is recorded against
+            request["IfMatch"] = source["etag"]
+        response = s3.get_object(**request)
+        try:
+            summary = summarize_jtl_stream(response["Body"])
+        finally:
+            response["Body"].close()
+        
+        _write_cached_summary(bucket, key, source, summary)
+        return summary
             
     except ClientError as e:
         raise RuntimeError(f"Failed to read JTL file {key}: {str(e)}")
     except Exception as e:
         raise RuntimeError(f"Failed to parse JTL file {key}: {str(e)}")
 
+def _summary_key(key: str) -> str:
+    return f"{key}{SUMMARY_SUFFIX}"
+
+def _read_cached_summary(bucket: str, key: str, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Stored summary of the JTL, or None if missing or computed from another version of the file"""
+    memo_key = (bucket, key, source["etag"], source["size"])
+    if memo_key in _summary_memo:
+        return _summary_memo[memo_key]
+    
+    try:
+        response = s3.get_object(Bucket=bucket, Key=_summary_key(key))
+        artifact = json.loads(response["Body"].read().decode("utf-8"))
+    except (ClientError, ValueError):
+        return None
+    
+    if artifact.get("version") != SUMMARY_VERSION or artifact.get("source") != source:
+        return None
+    _summary_memo[memo_key] = artifact["summary"]
+    return artifact["summary"]
+
+def _write_cached_summary(bucket: str, key: str, source: Dict[str, Any], summary: Dict[str, Any]) -> None:
+    _summary_memo[(bucket, key, source["etag"], source["size"])] = summary
+    try:
+        s3.put_object(
+            Bucket=bucket,
+            Key=_summary_key(key),
+            Body=json.dumps({"version": SUMMARY_VERSION, "source": source, "summary": summary}),
+            ContentType="application/json"
+        )
+    except ClientError:
+        # Read-only credentials: the summary is still kept for this process
+        pass
+
 def _parse_xml_jtl(body: bytes) -> Dict[str, Any]:
     """Parse XML format JTL file"""
-    if not XML_PARSER_SAFE or ET is None:
-        raise RuntimeError(
-            "XML parsing disabled for security. Install defusedxml to enable: pip install defusedxml"
-        )
-    
     try:
-        root = ET.fromstring(body)
-        latencies = []
-        errors = 0
-        
-        for sample in root:
-            # Get response time (t attribute)
-            latency = int(sample.get("t", "0"))
-            latencies.append(latency)
-            
-            # Check success (s attribute, default true)
-            if sample.get("s", "true") != "true":
-                errors += 1
-        
-        if not latencies:
-            return {"requests": 0, "errors_pct": 0, "p95": None, "p99": None}
-        
-        arr = pd.Series(latencies)
-        return {
-            "requests": len(arr),
-            "errors_pct": (errors / len(arr)) * 100,
-            "p95": float(arr.quantile(0.95)),
-            "p99": float(arr.quantile(0.99)),
-            "avg": float(arr.mean()),
-            "min": float(arr.min()),
-            "max": float(arr.max())
-        }
-        
+        return summarize_xml_jtl(io.BytesIO(body))
+    except RuntimeError:
+        raise
     except Exception as e:
         if hasattr(e, 'msg'):  # defusedxml ParseError
             raise RuntimeError(f"Invalid XML in JTL file: {str(e)}")
@@ -187,46 +201,7 @@ def _parse_xml_jtl(body: bytes) -> Dict[str, Any]:
 def _parse_csv_jtl(body: bytes) -> Dict[str, Any]:
     """Parse CSV format JTL file"""
     try:
-        df = pd.read_csv(io.BytesIO(body))
-        
-        if df.empty:
-            return {"requests": 0, "errors_pct": 0, "p95": None, "p99": None}
-        
-        # Find response time column (usually 'elapsed' or 'Elapsed')
-        time_col = None
-        for col in ["elapsed", "Elapsed", "responseTime", "t"]:
-            if col in df.columns:
-                time_col = col
-                break
-        
-        if not time_col:
-            # Use first numeric column as fallback
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            time_col = numeric_cols[0] if len(numeric_cols) > 0 else df.columns[0]
-        
-        # Count errors (success column or responseCode)
-        errors = 0
-        if "success" in df.columns:
-            errors = (df["success"] == False).sum()
-        elif "responseCode" in df.columns:
-            errors = (~df["responseCode"].astype(str).str.startswith("2")).sum()
-        
-        # Calculate statistics
-        times = pd.to_numeric(df[time_col], errors='coerce').dropna()
-        
-        if times.empty:
-            return {"requests": len(df), "errors_pct": 0, "p95": None, "p99": None}
-        
-        return {
-            "requests": len(df),
-            "errors_pct": (errors / len(df)) * 100,
-            "p95": float(times.quantile(0.95)),
-            "p99": float(times.quantile(0.99)),
-            "avg": float(times.mean()),
-            "min": float(times.min()),
-            "max": float(times.max())
-        }
-        
+        return summarize_csv_jtl(io.BytesIO(body))
     except Exception as e:
         raise RuntimeError(f"Failed to parse CSV JTL: {str(e)}")
 